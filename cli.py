@@ -0,0 +1,373 @@
+# automated_content_creator/cli.py
+#
+# Консольный запуск полного цикла (анализ -> лучшие N -> экспорт -> контент-план)
+# без окон и QApplication, например для ночной обработки на серверах:
+#
+#   python -m cli /data/recordings --preset "Original MP4" --top-n 5 --output-dir /data/out
+#   python -m cli /data/recordings --shard-index 0 --shard-count 4 ...   # 1-я из 4 машин
+#   python -m cli /data/recordings --parallel-videos 2 ...               # 2 видео одновременно
+#   python -m cli /data/recordings --draft ...                           # только черновики
+#   python -m cli --promote /data/out/video/export_manifest_video_<время>.json --approve 1,3   # финал одобренных
+#
+# Итоги пишутся в JSON-манифест (по умолчанию <output-dir>/manifest.json,
+# при распределении - manifest_shard<N>of<M>.json).
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+# Модули приложения импортируются внутри функций: процессы параллельного анализа (spawn)
+# импортируют этот модуль как __main__ и не должны загружать Qt и весь конвейер
+
+MANIFEST_FORMAT_VERSION = 1
+LOG_LEVELS = ["DEBUG", "INFO", "WARN", "ERROR", "CRITICAL"]
+
+
+class ConsoleLogger:
+    """Заменяет MainWindow.log_message для модулей: печатает сообщения не ниже min_level в stderr."""
+
+    def __init__(self, min_level: str = "WARN"):
+        self.min_level_index = LOG_LEVELS.index(min_level)
+
+    def log_message(self, message: str, level: str = "INFO"):
+        level_index = LOG_LEVELS.index(level) if level in LOG_LEVELS else LOG_LEVELS.index("DEBUG")
+        if level_index >= self.min_level_index:
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} [{level}] {message}", file=sys.stderr, flush=True)
+
+
+def collect_videos(inputs: list) -> list:
+    """Файлы из аргументов и видео из указанных папок (без рекурсии), отсортированные - порядок одинаков на всех машинах."""
+    from modules.batch_queue import VIDEO_EXTENSIONS
+    videos = set()
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            for name in os.listdir(input_path):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.add(os.path.abspath(os.path.join(input_path, name)))
+        elif os.path.isfile(input_path):
+            videos.add(os.path.abspath(input_path))
+        else:
+            print(f"Пропуск: '{input_path}' не найден.", file=sys.stderr)
+    return sorted(videos)
+
+
+def select_shard(videos: list, shard_index: int, shard_count: int) -> list:
+    """Каждое shard_count-е видео, начиная с shard_index: машины делят список без пересечений."""
+    return videos[shard_index::shard_count]
+
+
+def build_settings(args) -> dict:
+    """Словарь настроек с теми же ключами, что SettingsDialog.get_current_settings()."""
+    return {
+        'paths/ffmpeg_path': args.ffmpeg,
+        'pyscenedetect_threshold': args.threshold,
+        'min_scene_len_sec': args.min_scene_len,
+        'final_min_highlight_duration_sec': args.min_highlight_len,
+        'analysis_cache_enabled': not args.no_cache,
+        'audio_scoring_enabled': not args.no_audio_scoring,
+        'visual_scoring_enabled': not args.no_visual_scoring,
+        'analysis_speed_mode': args.speed_mode,
+        'analysis_workers': args.analysis_workers,
+        'whisper_model_size': args.whisper_model,
+        'export_parallel_jobs': args.jobs,
+        'export_batch_cutting': not args.no_batch_cutting,
+        'export_encoder': args.encoder,
+        'export_speed_tier': args.speed_tier,
+        'export_threads': args.threads,
+        'planner_posts_per_day': args.posts_per_day,
+        'planner_start_time_hour': args.start_hour,
+    }
+
+
+def parse_args(argv=None):
+    from modules.ai_analyzer import ANALYSIS_SPEED_MODES, DEFAULT_ANALYSIS_SPEED_MODE
+    from modules.encoders import ENCODER_BACKENDS, SPEED_TIERS, DEFAULT_ENCODER, DEFAULT_SPEED_TIER
+    from modules.pipeline import DEFAULT_TOP_N
+    from modules.whisper_models import WHISPER_MODEL_SIZES, DEFAULT_WHISPER_MODEL_SIZE
+
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Поиск хайлайтов, экспорт лучших клипов и контент-план без графического интерфейса.")
+    parser.add_argument("inputs", nargs="*", help="Видеофайлы и/или папки с видео")
+    parser.add_argument("-o", "--output-dir", help="Папка результатов (для каждого видео создается подпапка)")
+    parser.add_argument("-p", "--preset", default="Original MP4", help="Пресет экспорта (см. --list-presets)")
+    parser.add_argument("-n", "--top-n", type=int, default=DEFAULT_TOP_N,
+                        help="Сколько лучших хайлайтов экспортировать из видео (0 = все)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Параллельных процессов FFmpeg при экспорте (0 = автоматически)")
+    parser.add_argument("--encoder", default=DEFAULT_ENCODER, choices=list(ENCODER_BACKENDS),
+                        help="Кодировщик видео для перекодируемых пресетов")
+    parser.add_argument("--speed-tier", default=DEFAULT_SPEED_TIER, choices=list(SPEED_TIERS),
+                        help="Уровень скорости кодирования (draft - быстрее, final - меньше файл)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Потоков кодировщика на процесс FFmpeg (0 = автоматически)")
+    parser.add_argument("--benchmark-encoders", metavar="VIDEO",
+                        help="Замерить скорость кодирования и размер файла по кодировщикам и уровням и выйти")
+    parser.add_argument("--benchmark-sample-sec", type=float, default=10.0,
+                        help="Длина фрагмента для --benchmark-encoders, сек")
+    parser.add_argument("--draft", action="store_true",
+                        help="Экспортировать быстрые черновики низкого разрешения (подпапка drafts) и манифест "
+                             "экспорта вместо финальных клипов")
+    parser.add_argument("--promote", metavar="EXPORT_MANIFEST",
+                        help="Финальный экспорт одобренных черновиков по манифесту чернового экспорта")
+    parser.add_argument("--approve", default="",
+                        help="Номера одобренных клипов для --promote через запятую (по умолчанию - все черновики)")
+    parser.add_argument("--no-batch-cutting", action="store_true",
+                        help="Резать каждый клип отдельным процессом FFmpeg (без пакетной нарезки коротких клипов)")
+    parser.add_argument("--parallel-videos", type=int, default=1,
+                        help="Сколько видео обрабатывать одновременно в отдельных процессах")
+    parser.add_argument("--analysis-workers", type=int, default=0,
+                        help="Процессов анализа сцен (0 = автоматически, 1 = без параллельного анализа)")
+    parser.add_argument("--speed-mode", default=DEFAULT_ANALYSIS_SPEED_MODE,
+                        choices=[mode for mode in ANALYSIS_SPEED_MODES if mode != "custom"],
+                        help="Режим скорости анализа")
+    parser.add_argument("--threshold", type=float, default=27.0, help="Порог ContentDetector")
+    parser.add_argument("--min-scene-len", type=float, default=2.0, help="Мин. длина сцены для детектора, сек")
+    parser.add_argument("--min-highlight-len", type=float, default=3.0, help="Мин. длина хайлайта, сек")
+    parser.add_argument("--no-cache", action="store_true", help="Не использовать кеш результатов анализа")
+    parser.add_argument("--no-audio-scoring", action="store_true", help="Не оценивать хайлайты по звуку")
+    parser.add_argument("--no-visual-scoring", action="store_true", help="Не оценивать хайлайты по движению")
+    parser.add_argument("--subtitles", action="store_true", help="Создавать субтитры (.srt) для клипов")
+    parser.add_argument("--whisper-model", default=DEFAULT_WHISPER_MODEL_SIZE, choices=WHISPER_MODEL_SIZES)
+    parser.add_argument("--posts-per-day", type=int, default=1, help="Постов в день в контент-плане")
+    parser.add_argument("--start-hour", type=int, default=10, help="Час первой публикации в день")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="Путь к исполняемому файлу FFmpeg")
+    parser.add_argument("--manifest", help="Путь к JSON-манифесту (по умолчанию в --output-dir)")
+    parser.add_argument("--shard-index", type=int, default=0, help="Номер этой машины (с 0) при распределении")
+    parser.add_argument("--shard-count", type=int, default=1, help="Сколько машин делят список видео")
+    parser.add_argument("--log-level", default="WARN", choices=LOG_LEVELS, help="Подробность лога в stderr")
+    parser.add_argument("--list-presets", action="store_true", help="Показать пресеты экспорта и выйти")
+    args = parser.parse_args(argv)
+
+    if not args.list_presets and not args.benchmark_encoders and not args.promote:
+        if not args.inputs:
+            parser.error("не указаны видеофайлы или папки")
+        if not args.output_dir:
+            parser.error("не указана папка результатов (--output-dir)")
+    if args.parallel_videos < 1:
+        parser.error("--parallel-videos должен быть не меньше 1")
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index должен быть в диапазоне [0, --shard-count)")
+    try:
+        args.approve = [int(number) for number in args.approve.split(",") if number.strip()]
+    except ValueError:
+        parser.error("--approve: ожидаются номера клипов через запятую, например 1,3,5")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from modules.export_module import ExportModule
+
+    if args.list_presets:
+        export_module = ExportModule()
+        for preset_name in export_module.get_available_presets():
+            print(f"{preset_name}: {export_module.get_preset_config(preset_name).get('description', '')}")
+        return 0
+
+    if args.benchmark_encoders:
+        return run_encoder_benchmark(args)
+
+    if args.promote:
+        return run_promote(args)
+
+    settings = build_settings(args)
+    options = {
+        "output_folder": os.path.abspath(args.output_dir),
+        "top_n": args.top_n,
+        "export_preset": args.preset,
+        "generate_subtitles": args.subtitles,
+        "draft": args.draft,
+    }
+    os.makedirs(options["output_folder"], exist_ok=True)
+    # У каждой машины свой манифест по умолчанию, чтобы они не перезаписывали друг друга в общей папке
+    default_manifest_name = "manifest.json" if args.shard_count == 1 else \
+        f"manifest_shard{args.shard_index + 1}of{args.shard_count}.json"
+    manifest_path = args.manifest or os.path.join(options["output_folder"], default_manifest_name)
+
+    all_videos = collect_videos(args.inputs)
+    videos = select_shard(all_videos, args.shard_index, args.shard_count)
+    print(f"Видео к обработке: {len(videos)} (всего найдено {len(all_videos)}, "
+          f"часть {args.shard_index + 1} из {args.shard_count}).", file=sys.stderr)
+
+    manifest = {
+        "version": MANIFEST_FORMAT_VERSION,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "host": socket.gethostname(),
+        "shard": {"index": args.shard_index, "count": args.shard_count},
+        "options": options,
+        "settings": settings,
+        "videos": [],
+    }
+    failed_count = 0
+    start_time = time.perf_counter()
+
+    def record(entry):
+        nonlocal failed_count
+        failed_count += entry["status"] == "failed"
+        manifest["videos"].append(entry)
+        # Манифест перезаписывается после каждого видео: при сбое уже сделанное не теряется
+        _write_manifest(manifest, manifest_path)
+
+    labels = {video_path: f"[{number}/{len(videos)}] {os.path.basename(video_path)}"
+              for number, video_path in enumerate(videos, start=1)}
+    if args.parallel_videos > 1 and len(videos) > 1:
+        # Движки не зависят от Qt, поэтому видео обрабатываются в отдельных процессах целиком
+        # (spawn - одинаково на всех платформах; анализ внутри процесса может запускать свои процессы)
+        with ProcessPoolExecutor(max_workers=min(args.parallel_videos, len(videos)),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(process_video, video_path, settings, options, args.log_level,
+                                       labels[video_path]) for video_path in videos]
+            try:
+                for future in as_completed(futures):
+                    record(future.result())
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                print("Прервано пользователем.", file=sys.stderr)
+    else:
+        for video_path in videos:
+            try:
+                entry = process_video(video_path, settings, options, args.log_level, labels[video_path])
+            except KeyboardInterrupt:
+                record({"video_path": video_path, "status": "cancelled"})
+                print("Прервано пользователем.", file=sys.stderr)
+                break
+            record(entry)
+
+    manifest["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    manifest["elapsed_sec"] = round(time.perf_counter() - start_time, 1)
+    manifest["totals"] = {
+        "videos": len(manifest["videos"]),
+        "failed": failed_count,
+        "clips": sum(len(entry.get("result", {}).get("exported_clips", [])) for entry in manifest["videos"]),
+    }
+    _write_manifest(manifest, manifest_path)
+    print(f"Готово за {manifest['elapsed_sec']}s: видео {manifest['totals']['videos']}, "
+          f"клипов {manifest['totals']['clips']}, ошибок {failed_count}. Манифест: {manifest_path}", file=sys.stderr)
+    return 1 if failed_count else 0
+
+
+def run_encoder_benchmark(args) -> int:
+    """Таблица 'кодировщик / уровень скорости -> кадров/с, скорость, битрейт, размер' на фрагменте видео."""
+    from modules.encoders import list_available_encoders, benchmark_encoders
+
+    if not os.path.isfile(args.benchmark_encoders):
+        print(f"Файл не найден: '{args.benchmark_encoders}'", file=sys.stderr)
+        return 2
+    encoders = list_available_encoders(args.ffmpeg)
+    if not encoders:
+        print(f"Не удалось получить список кодировщиков FFmpeg ('{args.ffmpeg}').", file=sys.stderr)
+        return 2
+    print(f"Кодировщики: {', '.join(encoders)}. Фрагмент: {args.benchmark_sample_sec:g} с, "
+          f"потоков: {args.threads or 'авто'}.", file=sys.stderr)
+    print(f"{'кодировщик':<12} {'уровень':<9} {'кадр/с':>8} {'скорость':>9} {'кбит/с':>9} {'размер, КБ':>11}")
+
+    def print_result(result):
+        if not result["ok"]:
+            print(f"{result['encoder']:<12} {result['speed_tier']:<9} ОШИБКА: {result.get('error', '')}")
+            return
+        print(f"{result['encoder']:<12} {result['speed_tier']:<9} {result['encode_fps']:>8.1f} "
+              f"{result['speed']:>8.2f}x {result['bitrate_kbps']:>9.0f} {result['size_bytes'] / 1024:>11.0f}",
+              flush=True)
+
+    results = benchmark_encoders(args.benchmark_encoders, ffmpeg_path=args.ffmpeg, encoders=encoders,
+                                 sample_sec=args.benchmark_sample_sec, threads=args.threads,
+                                 result_callback=print_result)
+    return 0 if any(result["ok"] for result in results) else 1
+
+
+def run_promote(args) -> int:
+    """Финальный экспорт одобренных черновиков (--approve, по умолчанию все черновики) по манифесту."""
+    from modules.cutting_engine import CuttingEngine
+    from modules.export_module import ExportModule
+    from modules.clip_exporter_worker import ClipExporter, ExportError
+    from modules.export_manifest import load_export_manifest, CLIP_STATUS_DRAFT, CLIP_STATUS_FINAL
+
+    try:
+        manifest = load_export_manifest(args.promote)
+    except (OSError, ValueError) as e:
+        print(f"Не удалось прочитать манифест экспорта: {e}", file=sys.stderr)
+        return 2
+    approved_numbers = args.approve or [entry["number"] for entry in manifest["clips"]
+                                        if entry.get("status") == CLIP_STATUS_DRAFT]
+    if not approved_numbers:
+        print("Нет одобренных черновиков для финального экспорта.", file=sys.stderr)
+        return 0
+
+    settings = build_settings(args)
+    logger = ConsoleLogger(args.log_level)
+    export_module = ExportModule(logger)
+    export_module.set_encoder_options(settings['export_encoder'], settings['export_speed_tier'],
+                                      settings['export_threads'])
+    cutting_engine = CuttingEngine(logger)
+    cutting_engine.set_ffmpeg_path(args.ffmpeg)
+    cutting_engine.set_encoder_options(settings['export_encoder'], settings['export_speed_tier'],
+                                       settings['export_threads'])
+    exporter = ClipExporter(cutting_engine, export_module, parent_logger=logger,
+                            max_parallel_jobs=args.jobs, batch_cutting=not args.no_batch_cutting)
+    print(f"Финальный экспорт клипов: {', '.join(map(str, approved_numbers))}.", file=sys.stderr)
+    try:
+        _, successful_exports_count = exporter.promote_to_final(args.promote, approved_numbers)
+    except ExportError as e:
+        print(f"ОШИБКА {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        exporter.cancel_export()
+        print("Прервано пользователем.", file=sys.stderr)
+        return 1
+    promoted = load_export_manifest(args.promote)
+    final_count = sum(entry.get("status") == CLIP_STATUS_FINAL for entry in promoted["clips"]
+                      if entry["number"] in approved_numbers)
+    print(f"Готово: финальных клипов {final_count} из {len(approved_numbers)} "
+          f"(файлов: {successful_exports_count}). Манифест: {args.promote}", file=sys.stderr)
+    return 0 if final_count == len(approved_numbers) else 1
+
+
+def process_video(video_path: str, settings: dict, options: dict, log_level: str, label: str) -> dict:
+    """
+    Полный цикл для одного видео; возвращает запись манифеста.
+    Функция верхнего уровня с простыми аргументами - ее можно выполнять в рабочем процессе.
+    """
+    from modules.pipeline import VideoPipeline, STAGE_TITLES
+    last_stage = [None]
+
+    def on_progress(percent, stage, message):
+        if stage != last_stage[0]:
+            last_stage[0] = stage
+            print(f"{label}: {STAGE_TITLES[stage]}...", file=sys.stderr, flush=True)
+
+    entry = {"video_path": video_path}
+    try:
+        entry["result"] = VideoPipeline(settings, options, parent_logger=ConsoleLogger(log_level)).run(
+            video_path, on_progress)
+        entry["status"] = "done"
+        export_stats = entry["result"].get("export_stats")
+        speed_text = f" ({export_stats['clips_per_sec']:.2f} клипов/с, режим: {export_stats['mode']})" \
+            if export_stats else ""
+        print(f"{label}: экспортировано клипов: {len(entry['result']['exported_clips'])}{speed_text}", file=sys.stderr)
+        if entry["result"].get("export_manifest"):
+            print(f"{label}: черновики готовы, манифест для --promote: {entry['result']['export_manifest']}",
+                  file=sys.stderr)
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__} - {e}"
+        print(f"{label}: ОШИБКА {entry['error']}", file=sys.stderr)
+    return entry
+
+
+def _write_manifest(manifest: dict, manifest_path: str):
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
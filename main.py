@@ -1,17 +1,52 @@
+import time
+_PROCESS_START_TIME = time.perf_counter()  # Точка отсчета для --profile-startup (до тяжелых импортов)
+
 import sys
-from PyQt6.QtWidgets import QApplication
-from main_window import MainWindow
 import faulthandler; faulthandler.enable(all_threads=True)
 
+def _report_startup_profile(marks: list):
+    """Печатает длительность этапов запуска (для отслеживания регрессий времени старта)."""
+    print("Профиль запуска:")
+    previous_time = _PROCESS_START_TIME
+    for stage_name, stage_time in marks:
+        print(f"  {stage_name:<32} {(stage_time - previous_time) * 1000:8.1f} мс")
+        previous_time = stage_time
+    print(f"  {'Итого до показа окна':<32} {(marks[-1][1] - _PROCESS_START_TIME) * 1000:8.1f} мс")
+
 def main():
     """
     Главная функция для запуска приложения.
     Инициализирует QApplication и отображает главное окно.
+    С флагом --profile-startup печатает время этапов запуска и завершает работу
+    (для подробностей по импортам: python -X importtime main.py --profile-startup).
     """
-    app = QApplication(sys.argv)
+    profile_startup = "--profile-startup" in sys.argv
+    qt_argv = [arg for arg in sys.argv if arg != "--profile-startup"]
+    # Импорты GUI внутри main(): процессы параллельного анализа (spawn) импортируют этот модуль
+    # и не должны загружать Qt
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+    startup_marks = [("Импорт PyQt6", time.perf_counter())]
+    from main_window import MainWindow
+    startup_marks.append(("Импорт main_window", time.perf_counter()))
+
+    app = QApplication(qt_argv)
+    startup_marks.append(("Создание QApplication", time.perf_counter()))
 
     main_window = MainWindow()
+    startup_marks.append(("Создание MainWindow", time.perf_counter()))
     main_window.show()
+
+    def on_event_loop_started():
+        startup_marks.append(("Показ окна (первый цикл событий)", time.perf_counter()))
+        if profile_startup:
+            _report_startup_profile(startup_marks)
+            app.quit()
+        else:
+            main_window.start_background_warmup()
+            main_window.resume_batch_queue()
+
+    QTimer.singleShot(0, on_event_loop_started)
     sys.exit(app.exec())
 
 if __name__ == '__main__':
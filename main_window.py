@@ -4,28 +4,42 @@ from PyQt6.QtMultimedia import QMediaPlayer
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
                              QPushButton, QLabel, QFileDialog, QMenuBar,
                              QStatusBar, QTextEdit, QFrame, QMessageBox,
-                             QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar,
+                             QTableView, QAbstractItemView, QHeaderView, QProgressBar, QDoubleSpinBox,
                              QApplication, QProgressDialog, QTabWidget, QSizePolicy,
-                             QSpacerItem, QDialog,
+                             QSpacerItem, QDialog, QSlider,
                              QComboBox)  # Добавлен QComboBox для примера, если понадобится где-то еще
-from PyQt6.QtCore import Qt, QSize, QStandardPaths, QThread, pyqtSignal, pyqtSlot, QDateTime, QTimer, QUrl, QDate
-from PyQt6.QtGui import QAction, QIcon, QPalette, QColor
+from PyQt6.QtCore import Qt, QSize, QStandardPaths, QThread, pyqtSlot, QDateTime, QTimer, QUrl, QDate
+from PyQt6.QtGui import QAction, QIcon, QPalette, QColor, QTextCursor
 
 import os
 import subprocess
+import threading
 import traceback
 
 from modules.video_importer import VideoImporter
 from modules.video_player import VideoPlayerWidget
-from modules.ai_analyzer import AIAnalyzer
+from modules.ai_analyzer import warm_up_heavy_imports
+from modules.qt_workers import AIAnalyzer, ClipExporterWorker, CacheBuildWorker
+from modules.clip_exporter_worker import EXPORT_PROGRESS_UNITS_PER_CLIP
 from modules.cutting_engine import CuttingEngine
 from modules.export_module import ExportModule
 from modules.content_planner import ContentPlannerWidget
 from modules.api_integrations import APIManager
-from modules.settings_dialog import SettingsDialog, CONFIG_DEFAULT_EXPORT_FOLDER, CONFIG_FFMPEG_PATH
-from modules.clip_exporter_worker import ClipExporterWorker
+from modules.settings_dialog import SettingsDialog, CONFIG_DEFAULT_EXPORT_FOLDER, CONFIG_FFMPEG_PATH, \
+    CONFIG_AI_PYSCENEDETECT_THRESHOLD
 from modules.export_options_dialog import ExportOptionsDialog  # <--- ДОБАВЛЕНО
-from utils import get_default_output_folder
+from modules.promote_drafts_dialog import PromoteDraftsDialog
+from modules.export_manifest import load_export_manifest, EXPORT_MANIFEST_GLOB
+from modules.whisper_models import get_model_registry
+from modules.batch_queue import BatchQueue
+from modules.batch_queue_dialog import BatchQueueDialog
+from modules.log_pipeline import LogPipeline
+from modules.preview_proxy import PreviewProxyCache
+from modules.thumbnail_index import ThumbnailIndexCache
+from modules.filmstrip_popup import FilmstripPopup
+from modules.highlights_table_model import (HighlightsTableModel, COLUMN_CHECK, COLUMN_DESCRIPTION, COLUMN_START,
+                                            COLUMN_END, COLUMN_SCORE)
+from utils import get_default_output_folder, get_app_data_folder
 
 MODERN_STYLESHEET = """
     QCalendarWidget QWidget { /* Viewport календаря */
@@ -52,11 +66,11 @@ MODERN_STYLESHEET = """
         color: #4C566A;
     }
     /* Для таблицы plan_table_widget, если нужны особые стили ячеек или выделения */
-    QTableWidget::item {
+    QTableView::item {
         padding: 5px;
          /* border-bottom: 1px solid #4C566A; (если нужны разделители строк) */
     }
-    QTableWidget::item:selected {
+    QTableView::item:selected {
         background-color: #5E81AC; /* Nord Frost - синий, для выделенной строки */
         color: #ECEFF4;
     }
@@ -123,7 +137,7 @@ MODERN_STYLESHEET = """
         border: 1px solid #4C566A;
         selection-background-color: #5E81AC; /* Цвет выделения */
     }
-    QTableWidget {
+    QTableView {
         background-color: #3B4252;
         color: #D8DEE9;
         gridline-color: #4C566A;
@@ -223,17 +237,23 @@ MODERN_STYLESHEET = """
 """
 
 
-class MainWindow(QMainWindow):
-    log_updated_signal = pyqtSignal(str)
+LOG_FLUSH_INTERVAL_MS = 150  # Как часто новые строки лога переносятся в окно
+LOG_FLUSH_MAX_LINES = 1000  # Максимум строк за одно обновление окна (остальные - в следующий раз)
+LOG_FILE_NAME = "application.log"
+
 
+class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        # Журнал создается первым: log_message вызывается уже при построении окна
+        self.log_pipeline = LogPipeline(source="MainWindow")
         self.setWindowTitle("Автоматизированный Создатель Контента")
         self.log_message(f"MainWindow: Инициализация QMainWindow (PID: {os.getpid()})", level="DEBUG")
 
         self.setStyleSheet(MODERN_STYLESHEET)
 
         self.settings_dialog = SettingsDialog(self)
+        self.apply_log_settings()
         self.log_message("MainWindow: SettingsDialog инициализирован.", level="DEBUG")
 
         self._create_status_bar()
@@ -242,6 +262,10 @@ class MainWindow(QMainWindow):
         self.log_message("MainWindow: Статус-бар, действия и меню созданы.", level="DEBUG")
 
         self._init_ui()
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self.log_flush_timer.timeout.connect(self._flush_log_to_widget)
+        self.log_flush_timer.start()
         self.log_message("MainWindow: Основной UI (_init_ui) завершен.", level="DEBUG")
 
         self.video_importer = VideoImporter(self)
@@ -253,6 +277,7 @@ class MainWindow(QMainWindow):
 
         self.current_video_path = None
         self.detected_highlights = []
+        self.scene_metrics = None  # SceneMetrics последнего анализа (для пересчета порога без декодирования)
         self.last_exported_clips_info = []
 
         self.analysis_thread = None
@@ -261,8 +286,12 @@ class MainWindow(QMainWindow):
         self.export_worker = None
         self.export_progress_dialog = None
         self._export_actually_started_and_not_cancelled = False
+        self._export_is_draft = False
+        self.last_draft_manifest_path = None  # Манифест последнего чернового экспорта (для финала)
+        self.batch_queue = None  # Создается после показа окна (resume_batch_queue) или при открытии окна очереди
+        self.batch_queue_dialog = None
+        self.background_builds = {}  # 'preview' / 'thumbnails' -> (QThread, CacheBuildWorker)
 
-        self.log_updated_signal.connect(self._append_log_message_to_widget)
         self.log_message("Приложение полностью инициализировано и готово к работе.", level="INFO")
 
     # ... (остальные методы _init_ui, _create_actions, и т.д. без изменений) ...
@@ -317,19 +346,73 @@ class MainWindow(QMainWindow):
         self.clips_label = QLabel("Найденные хайлайты:")
         highlights_section_layout.addWidget(self.clips_label)
 
-        self.clips_table_widget = QTableWidget()
-        self.clips_table_widget.setColumnCount(5)
-        self.clips_table_widget.setHorizontalHeaderLabels(["Выбор", "Описание", "Старт", "Конец", "Оценка"])
-        self.clips_table_widget.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        self.clips_table_widget.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.clips_table_widget.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
-        self.clips_table_widget.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Interactive)
-        self.clips_table_widget.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Interactive)
-        self.clips_table_widget.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.clips_table_widget.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.clips_table_widget.setAlternatingRowColors(True)
-        self.clips_table_widget.doubleClicked.connect(self.on_highlight_table_double_clicked)
-        highlights_section_layout.addWidget(self.clips_table_widget)
+        threshold_layout = QHBoxLayout()
+        threshold_layout.addWidget(QLabel("Порог сцен:"))
+        self.threshold_slider = QSlider(Qt.Orientation.Horizontal)
+        self.threshold_slider.setRange(1, 100)
+        self.threshold_slider.setValue(int(round(float(
+            self.settings_dialog.settings.value(CONFIG_AI_PYSCENEDETECT_THRESHOLD, 27.0)))))
+        self.threshold_slider.setToolTip(
+            "Порог ContentDetector для уже проанализированного видео.\n"
+            "Хайлайты пересчитываются мгновенно из сохраненных покадровых оценок, без повторного анализа."
+        )
+        self.threshold_slider.setEnabled(False)
+        self.threshold_value_label = QLabel(str(self.threshold_slider.value()))
+        self.threshold_value_label.setMinimumWidth(30)
+        threshold_layout.addWidget(self.threshold_slider, stretch=1)
+        threshold_layout.addWidget(self.threshold_value_label)
+        highlights_section_layout.addLayout(threshold_layout)
+
+        # Пересчет запускается после короткой паузы, чтобы не перестраивать таблицу на каждом шаге перетаскивания
+        self.threshold_preview_timer = QTimer(self)
+        self.threshold_preview_timer.setSingleShot(True)
+        self.threshold_preview_timer.setInterval(120)
+        self.threshold_preview_timer.timeout.connect(self._apply_threshold_preview)
+        self.threshold_slider.valueChanged.connect(self._on_threshold_slider_changed)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Мин. оценка:"))
+        self.min_score_spinbox = QDoubleSpinBox()
+        self.min_score_spinbox.setRange(0.0, 1.0)
+        self.min_score_spinbox.setSingleStep(0.05)
+        self.min_score_spinbox.setDecimals(2)
+        self.min_score_spinbox.setToolTip("Скрыть хайлайты с оценкой ниже заданной (отметки скрытых сохраняются).")
+        self.min_score_spinbox.valueChanged.connect(self._on_min_score_changed)
+        filter_layout.addWidget(self.min_score_spinbox)
+        self.highlights_count_label = QLabel()
+        filter_layout.addWidget(self.highlights_count_label, stretch=1)
+        self.check_all_button = QPushButton("Отметить все")
+        self.check_all_button.setToolTip("Отметить все показанные хайлайты")
+        self.check_all_button.clicked.connect(lambda: self.highlights_model.set_all_visible_checked(True))
+        filter_layout.addWidget(self.check_all_button)
+        self.uncheck_all_button = QPushButton("Снять все")
+        self.uncheck_all_button.clicked.connect(lambda: self.highlights_model.set_all_visible_checked(False))
+        filter_layout.addWidget(self.uncheck_all_button)
+        highlights_section_layout.addLayout(filter_layout)
+
+        # Модель со столбцами NumPy: представление запрашивает только видимые строки
+        self.highlights_model = HighlightsTableModel(self)
+        self.highlights_model.checked_count_changed.connect(self._on_highlights_checked_count_changed)
+        self.clips_table_view = QTableView()
+        self.clips_table_view.setModel(self.highlights_model)
+        header = self.clips_table_view.horizontalHeader()
+        header.setSectionResizeMode(COLUMN_CHECK, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(COLUMN_DESCRIPTION, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(COLUMN_START, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(COLUMN_END, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(COLUMN_SCORE, QHeaderView.ResizeMode.Interactive)
+        # Одинаковая высота строк: представлению не нужно измерять каждую строку
+        self.clips_table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.clips_table_view.verticalHeader().setVisible(False)
+        self.clips_table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.clips_table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.clips_table_view.setAlternatingRowColors(True)
+        self.clips_table_view.setSortingEnabled(True)
+        self.clips_table_view.sortByColumn(COLUMN_START, Qt.SortOrder.AscendingOrder)
+        self.clips_table_view.doubleClicked.connect(self.on_highlight_table_double_clicked)
+        # Полоса кадров хайлайта при наведении - из индекса миниатюр, без перемотки плеера
+        self.filmstrip_popup = FilmstripPopup(self.clips_table_view, self.highlights_model)
+        highlights_section_layout.addWidget(self.clips_table_view)
 
         self.export_clips_button = QPushButton(QIcon.fromTheme("document-save-as", QIcon()),
                                                " Экспорт выбранных клипов")
@@ -339,6 +422,12 @@ class MainWindow(QMainWindow):
         self.export_clips_button.clicked.connect(self.export_selected_clips)  # ИЗМЕНЕНО НА НОВЫЙ МЕТОД
         highlights_section_layout.addWidget(self.export_clips_button)
 
+        self.promote_drafts_button = QPushButton(" Финал из черновиков...")
+        self.promote_drafts_button.setToolTip("Экспортировать в полном качестве только одобренные черновики "
+                                              "(по манифесту чернового экспорта)")
+        self.promote_drafts_button.clicked.connect(self.promote_drafts_to_final)
+        highlights_section_layout.addWidget(self.promote_drafts_button)
+
         processing_workspace_layout.addLayout(highlights_section_layout, stretch=2)
 
         processing_layout.addLayout(processing_workspace_layout, stretch=1)
@@ -368,6 +457,9 @@ class MainWindow(QMainWindow):
         logs_layout.addWidget(self.log_label_tab)
         self.log_text_edit = QTextEdit()
         self.log_text_edit.setReadOnly(True)
+        self.log_text_edit.setAcceptRichText(False)
+        # Окно хранит не больше строк, чем кольцевой буфер журнала
+        self.log_text_edit.document().setMaximumBlockCount(self.log_pipeline.ring_buffer_size)
         logs_layout.addWidget(self.log_text_edit, stretch=1)
         self.tab_widget.addTab(logs_tab, QIcon.fromTheme("text-x-generic"), "Логи")
 
@@ -398,6 +490,10 @@ class MainWindow(QMainWindow):
         self.generate_plan_action = QAction(QIcon.fromTheme("view-calendar-list"), "Сгенерировать &план", self)
         self.generate_plan_action.setEnabled(False)
         self.generate_plan_action.triggered.connect(self.generate_content_plan_for_exported_clips)
+
+        self.batch_queue_action = QAction(QIcon.fromTheme("view-list-details"), "&Пакетная обработка...", self)
+        self.batch_queue_action.triggered.connect(self.open_batch_queue)
+        self.batch_queue_action.setShortcut("Ctrl+B")
         self.log_message("MainWindow: _create_actions() завершено.", level="DEBUG")
 
     def _create_menu_bar(self):
@@ -413,6 +509,7 @@ class MainWindow(QMainWindow):
 
         tools_menu = menu_bar.addMenu("&Инструменты")
         tools_menu.addAction(self.generate_plan_action)
+        tools_menu.addAction(self.batch_queue_action)
 
         view_menu = menu_bar.addMenu("&Вид")
         self.processing_tab_action = QAction("Обработка видео", self)
@@ -431,6 +528,34 @@ class MainWindow(QMainWindow):
         help_menu.addAction(self.about_action)
         self.log_message("MainWindow: _create_menu_bar() завершено.", level="DEBUG")
 
+    def start_background_warmup(self):
+        """
+        Импортирует PySceneDetect/cv2 в фоновом потоке после показа окна,
+        чтобы первый анализ не ждал загрузки библиотек, а запуск GUI не замедлялся.
+        """
+        def warm_up():
+            try:
+                elapsed_sec = warm_up_heavy_imports()
+                self.log_message(f"Фоновая загрузка библиотек анализа завершена за {elapsed_sec:.2f}s.", level="DEBUG")
+            except Exception as e:
+                self.log_message(f"Фоновая загрузка библиотек анализа не удалась: {type(e).__name__} - {e}",
+                                 level="WARN")
+
+        threading.Thread(target=warm_up, name="ImportWarmup", daemon=True).start()
+
+    def preload_whisper_model(self):
+        """Фоновая загрузка модели Whisper после импорта видео, чтобы субтитры не ждали ее загрузки."""
+        current_settings = self.settings_dialog.get_current_settings()
+        model_registry = get_model_registry(self)
+        model_registry.set_memory_limit_mb(current_settings['whisper_memory_limit_mb'])
+        if not current_settings['whisper_preload_on_import']:
+            return
+        model_size = current_settings['whisper_model_size']
+        if model_registry.is_loaded(model_size):
+            return
+        self.log_message(f"Фоновая загрузка модели Whisper '{model_size}'...", level="DEBUG")
+        model_registry.preload_async(model_size)
+
     def _create_status_bar(self):
         self.log_message("MainWindow: _create_status_bar() начало.", level="DEBUG")
         self.status_bar = QStatusBar()
@@ -438,39 +563,40 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("Готов")
         self.log_message("MainWindow: _create_status_bar() завершено.", level="DEBUG")
 
-    def _append_log_message_to_widget(self, full_log_message):
-        if hasattr(self, 'log_text_edit') and self.log_text_edit:
-            self.log_text_edit.append(full_log_message)
-            self.log_text_edit.ensureCursorVisible()
-        else:
-            print(f"INTERNAL LOG ERROR (append target missing): {full_log_message}")
-
     def log_message(self, message: str, level: str = "INFO"):
-        timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss.zzz")
-        log_prefix = "MainWindow"
-        effective_level = level
-        if level == "DEBUG_EXTRA":
-            effective_level = "DEBUG"
-
-        full_log_message = f"{timestamp} [{log_prefix}] [{level}]: {message}"
-        print(full_log_message)
-
-        if hasattr(self, 'log_text_edit') and self.log_text_edit:
-            if QThread.currentThread() != self.thread():
-                self.log_updated_signal.emit(full_log_message)
-            else:
-                self._append_log_message_to_widget(full_log_message)
-
-        if hasattr(self, 'status_bar') and self.status_bar and level in ["INFO", "WARN", "ERROR", "CRITICAL"]:
-            def update_status():
-                short_message = message.split('\n')[0]
-                timeout = 3000 if level == "INFO" else 5000 if level == "WARN" else 8000
-                self.status_bar.showMessage(f"[{level}] {short_message[:100]}", timeout)
-
-            if QThread.currentThread() != self.thread():
-                QTimer.singleShot(0, update_status)
-            else:
-                update_status()
+        # Только фильтр по уровню и постановка в очередь: безопасно и дешево из любого потока.
+        # Окно и строка состояния обновляются таймером (_flush_log_to_widget), консоль и файл - фоновым потоком.
+        self.log_pipeline.log(message, level)
+
+    def apply_log_settings(self):
+        """Применяет уровень лога и запись в файл из настроек."""
+        current_settings = self.settings_dialog.get_current_settings()
+        self.log_pipeline.set_min_level(current_settings['log_min_level'])
+        log_file_path = os.path.join(get_app_data_folder("logs"), LOG_FILE_NAME) \
+            if current_settings['log_file_enabled'] else None
+        self.log_pipeline.set_file_path(log_file_path)
+
+    def _flush_log_to_widget(self):
+        """Переносит накопившиеся строки лога в окно одним обновлением и показывает последнее сообщение в статус-баре."""
+        lines, dropped_count = self.log_pipeline.drain_pending(LOG_FLUSH_MAX_LINES)
+        if dropped_count:
+            lines.insert(0, f"... пропущено строк лога: {dropped_count} (окно не успевало их показывать)")
+        if lines:
+            scroll_bar = self.log_text_edit.verticalScrollBar()
+            at_bottom = scroll_bar.value() >= scroll_bar.maximum() - 4
+            cursor = QTextCursor(self.log_text_edit.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            text = "\n".join(lines)
+            cursor.insertText(text if self.log_text_edit.document().isEmpty() else "\n" + text)
+            if at_bottom:  # Не сбиваем прокрутку, если пользователь читает старые строки
+                scroll_bar.setValue(scroll_bar.maximum())
+
+        status = self.log_pipeline.take_status()
+        if status:
+            level, message = status
+            short_message = message.split('\n')[0]
+            timeout = 3000 if level == "INFO" else 5000 if level == "WARN" else 8000
+            self.status_bar.showMessage(f"[{level}] {short_message[:100]}", timeout)
 
     def import_video(self):
         self.log_message("import_video: Начало импорта видео.", level="INFO")
@@ -488,14 +614,16 @@ class MainWindow(QMainWindow):
                 return
 
             self.current_video_path = video_path
-            self.video_player_widget.load_video(self.current_video_path)
-            self.clips_table_widget.setRowCount(0)
+            self._load_video_into_player(self.current_video_path)
+            self.highlights_model.clear()
             self.detected_highlights = []
+            self.scene_metrics = None
             self.last_exported_clips_info = []
             if hasattr(self, 'content_planner_widget'):  # Проверка на существование
                 self.content_planner_widget.clear_plan()
             self.setWindowTitle(f"Создатель Контента - {os.path.basename(self.current_video_path)}")
             self._update_buttons_state_after_long_op(False)
+            self.preload_whisper_model()
             self.log_message(
                 f"import_video: UI обновлен для нового видео '{os.path.basename(self.current_video_path)}'.",
                 level="INFO")
@@ -503,22 +631,93 @@ class MainWindow(QMainWindow):
             self.log_message("import_video: Импорт видео отменен пользователем.", level="INFO")
             self._update_buttons_state_after_long_op(False)
 
-    def on_highlight_table_double_clicked(self, item):
-        row = item.row()
-        self.log_message(f"on_highlight_table_double_clicked: Двойной клик по строке {row}.", level="DEBUG")
-        if row < 0 or row >= self.clips_table_widget.rowCount():
-            self.log_message(f"on_highlight_table_double_clicked: Некорректный индекс строки {row}.", level="WARN")
+    def _load_video_into_player(self, video_path: str):
+        """
+        Загружает видео в плеер и таблицу миниатюр. Прокси для просмотра и индекс миниатюр
+        берутся из кеша, если они уже есть; иначе создаются в фоне и подключаются по готовности.
+        """
+        self._cancel_background_builds()
+        self.highlights_model.set_thumbnail_index(None)  # Закрывает индекс предыдущего видео
+        current_settings = self.settings_dialog.get_current_settings()
+        ffmpeg_path = current_settings[CONFIG_FFMPEG_PATH]
+
+        preview_path = None
+        if current_settings['preview_proxy_enabled']:
+            proxy_cache = PreviewProxyCache(ffmpeg_path, current_settings['preview_proxy_height'], parent_logger=self)
+            preview_path = proxy_cache.find(video_path)
+            if preview_path:
+                self.log_message(f"Плеер: используется прокси из кеша для '{os.path.basename(video_path)}'.",
+                                 level="INFO")
+            else:
+                self._start_background_build("preview", proxy_cache, video_path, "Прокси для просмотра",
+                                             self._on_preview_proxy_ready)
+        self.video_player_widget.load_video(video_path, preview_path)
+
+        if current_settings['thumbnails_enabled']:
+            thumbnail_cache = ThumbnailIndexCache(ffmpeg_path, parent_logger=self)
+            thumbnail_index = thumbnail_cache.find(video_path)
+            if thumbnail_index:
+                self._on_thumbnail_index_ready(video_path, thumbnail_index)
+            else:
+                self._start_background_build("thumbnails", thumbnail_cache, video_path, "Миниатюры",
+                                             self._on_thumbnail_index_ready)
+
+    def _start_background_build(self, kind: str, cache, video_path: str, progress_label: str, ready_slot):
+        """Запускает CacheBuildWorker в отдельном QThread (не более одного на каждый вид kind)."""
+        thread = QThread(self)
+        worker = CacheBuildWorker(cache, video_path, progress_label)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.build)
+        worker.build_progress.connect(self._on_background_build_progress)
+        worker.build_ready.connect(ready_slot)
+        worker.build_ready.connect(thread.quit)
+        worker.build_failed.connect(self._on_background_build_failed)
+        worker.build_failed.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda k=kind, t=thread: self._on_background_build_finished(k, t))
+        self.background_builds[kind] = (thread, worker)
+        self.log_message(f"{progress_label}: фоновое создание для '{os.path.basename(video_path)}'.", level="INFO")
+        thread.start()
+
+    def _cancel_background_builds(self):
+        for thread, worker in self.background_builds.values():
+            worker.cancel()  # FFmpeg завершается, поток выходит через build_failed
+
+    def _on_background_build_progress(self, video_path, percent, message):
+        if video_path == self.current_video_path:
+            self.status_bar.showMessage(message, 3000)
+
+    def _on_background_build_failed(self, video_path):
+        if video_path == self.current_video_path:
+            self.log_message(f"Фоновая подготовка '{os.path.basename(video_path)}' не выполнена "
+                             f"(ошибка или отмена), подробности - в логе выше.", level="DEBUG")
+
+    def _on_background_build_finished(self, kind, finished_thread):
+        if kind in self.background_builds and self.background_builds[kind][0] is finished_thread:
+            del self.background_builds[kind]
+
+    def _on_preview_proxy_ready(self, video_path, proxy_path):
+        if self.video_player_widget.use_preview_proxy(video_path, proxy_path):
+            self.status_bar.showMessage("Плеер переключен на прокси: перемотка ускорена.", 3000)
+
+    def _on_thumbnail_index_ready(self, video_path, thumbnail_index):
+        if video_path != self.current_video_path:
+            thumbnail_index.close()
             return
+        self.clips_table_view.setIconSize(QSize(thumbnail_index.width // 2, thumbnail_index.height // 2))
+        self.clips_table_view.verticalHeader().setDefaultSectionSize(thumbnail_index.height // 2 + 6)
+        self.highlights_model.set_thumbnail_index(thumbnail_index)
 
-        checkbox_item_or_data_item = self.clips_table_widget.item(row, 0)
-        if not checkbox_item_or_data_item:
-            self.log_message(
-                f"on_highlight_table_double_clicked: Отсутствует элемент чекбокса в строке {row}, столбце 0.",
-                level="WARN")
+    def on_highlight_table_double_clicked(self, index):
+        row = index.row()
+        self.log_message(f"on_highlight_table_double_clicked: Двойной клик по строке {row}.", level="DEBUG")
+        highlight_data = self.highlights_model.highlight_at(row)
+        if highlight_data is None:
+            self.log_message(f"on_highlight_table_double_clicked: Некорректный индекс строки {row}.", level="WARN")
             return
 
-        highlight_data = checkbox_item_or_data_item.data(Qt.ItemDataRole.UserRole)
-        if highlight_data and self.video_player_widget:
+        if self.video_player_widget:
             start_time_sec = highlight_data.get('start_time')
             desc = highlight_data.get('description', 'N/A')
             if start_time_sec is not None:
@@ -530,10 +729,6 @@ class MainWindow(QMainWindow):
             else:
                 self.log_message(f"on_highlight_table_double_clicked: 'start_time' отсутствует для хайлайта '{desc}'.",
                                  level="WARN")
-        elif not highlight_data:
-            self.log_message(
-                f"on_highlight_table_double_clicked: Нет данных (UserRole) в элементе строки {row}, столбца 0.",
-                level="WARN")
         else:
             self.log_message(f"on_highlight_table_double_clicked: video_player_widget не доступен.", level="WARN")
 
@@ -546,16 +741,12 @@ class MainWindow(QMainWindow):
         self.analyze_button.setEnabled(not effective_busy and bool(self.current_video_path))
         self.settings_button.setEnabled(not effective_busy)
         self.settings_action.setEnabled(not effective_busy)
+        self.threshold_slider.setEnabled(not effective_busy and self.scene_metrics is not None)
 
-        can_export = False
-        if not effective_busy and self.clips_table_widget.rowCount() > 0:
-            for row in range(self.clips_table_widget.rowCount()):
-                item = self.clips_table_widget.item(row, 0)
-                if item and item.checkState() == Qt.CheckState.Checked:
-                    can_export = True
-                    break
+        can_export = not effective_busy and self.highlights_model.checked_count() > 0
         self.export_clips_button.setEnabled(can_export)
         self.export_action.setEnabled(can_export)
+        self.promote_drafts_button.setEnabled(not effective_busy)
 
         can_generate_plan = not effective_busy and bool(self.last_exported_clips_info)
         self.generate_content_plan_button.setEnabled(can_generate_plan)
@@ -587,8 +778,10 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(0)
         self.progress_bar.setFormat("Анализ: %p% (Инициализация...)")
         self.progress_bar.setVisible(True)
-        self.clips_table_widget.setRowCount(0)
+        self.highlights_model.clear()
         self.detected_highlights = []
+        self.scene_metrics = None
+        self.threshold_slider.setEnabled(False)
 
         self.analysis_thread = QThread(self)
         current_ai_settings = self.settings_dialog.get_current_settings()
@@ -598,6 +791,7 @@ class MainWindow(QMainWindow):
         video_path_for_thread = self.current_video_path
         self.analysis_thread.started.connect(lambda path=video_path_for_thread: self.ai_analyzer_instance.analyze(path))
 
+        self.ai_analyzer_instance.scene_metrics_ready.connect(self.handle_scene_metrics_ready)
         self.ai_analyzer_instance.analysis_finished.connect(self.handle_analysis_finished)
         self.ai_analyzer_instance.analysis_progress.connect(self.handle_analysis_progress)
         self.ai_analyzer_instance.analysis_error.connect(self.handle_analysis_error)
@@ -637,6 +831,32 @@ class MainWindow(QMainWindow):
         self._update_buttons_state_after_long_op(False)
         self.log_message("Очистка экземпляра анализатора завершена", level="DEBUG")
 
+    def handle_scene_metrics_ready(self, scene_metrics):
+        self.scene_metrics = scene_metrics
+        threshold = self.settings_dialog.get_current_settings()['pyscenedetect_threshold']
+        self.threshold_slider.blockSignals(True)
+        self.threshold_slider.setValue(int(round(threshold)))
+        self.threshold_slider.blockSignals(False)
+        self.threshold_value_label.setText(str(self.threshold_slider.value()))
+        self.threshold_slider.setEnabled(True)
+
+    def _on_threshold_slider_changed(self, value):
+        self.threshold_value_label.setText(str(value))
+        if self.scene_metrics is not None:
+            self.threshold_preview_timer.start()
+
+    def _apply_threshold_preview(self):
+        if self.scene_metrics is None:
+            return
+        settings = self.settings_dialog.get_current_settings()
+        threshold = float(self.threshold_slider.value())
+        highlights = self.scene_metrics.build_highlights(threshold, settings['min_scene_len_sec'],
+                                                         settings['final_min_highlight_duration_sec'])
+        self.log_message(f"Порог сцен изменен на {threshold:.0f}: найдено {len(highlights)} хайлайтов "
+                         f"(пересчет без повторного анализа).", level="INFO")
+        self.detected_highlights = highlights
+        self.display_highlights_in_table(highlights)
+
     def handle_analysis_finished(self, highlights):
         self.log_message(f"Анализ завершен. Найдено {len(highlights)} хайлайтов", level="INFO")
         self.detected_highlights = highlights.copy()
@@ -673,6 +893,8 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "Ошибка анализа",
                              f"Произошла критическая ошибка во время анализа видео:\n{error_message}")
         self.detected_highlights = []
+        self.scene_metrics = None
+        self.threshold_slider.setEnabled(False)
         self.display_highlights_in_table([])
         self.progress_bar.setVisible(False)
         # self._update_buttons_state_after_long_op(False) # Вызывается в cleanup_analyzer_instance
@@ -685,40 +907,27 @@ class MainWindow(QMainWindow):
 
     def display_highlights_in_table(self, highlights):
         self.log_message(f"display_highlights_in_table: Отображение {len(highlights)} хайлайтов.", level="DEBUG")
-        try:
-            self.clips_table_widget.itemChanged.disconnect(self._on_clips_table_item_changed)
-        except TypeError:
-            pass
-
-        self.clips_table_widget.setRowCount(0)
+        self.highlights_model.set_highlights(highlights)
+        self._update_highlights_count_label()
         if not highlights:
             self.log_message("display_highlights_in_table: Хайлайты не найдены.", level="INFO")
-            # ... (код для сообщения "Хайлайты не найдены" в таблице)
             return
-
-        self.clips_table_widget.setRowCount(len(highlights))
-        for row, hl in enumerate(highlights):
-            checkbox_item = QTableWidgetItem()
-            checkbox_item.setFlags(
-                Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
-            checkbox_item.setCheckState(Qt.CheckState.Unchecked)
-            checkbox_item.setData(Qt.ItemDataRole.UserRole, hl)
-            self.clips_table_widget.setItem(row, 0, checkbox_item)
-            desc_item = QTableWidgetItem(hl.get('description', f'Хайлайт {row + 1}'))
-            self.clips_table_widget.setItem(row, 1, desc_item)
-            start_str = self.format_seconds_to_time(hl.get('start_time', 0))
-            self.clips_table_widget.setItem(row, 2, QTableWidgetItem(start_str))
-            end_str = self.format_seconds_to_time(hl.get('end_time', 0))
-            self.clips_table_widget.setItem(row, 3, QTableWidgetItem(end_str))
-            score_str = f"{hl.get('score', 0.0):.2f}"
-            self.clips_table_widget.setItem(row, 4, QTableWidgetItem(score_str))
-        self.clips_table_widget.itemChanged.connect(self._on_clips_table_item_changed)
         self._update_buttons_state_after_long_op(False)  # Обновляем состояние кнопок после заполнения таблицы
         self.log_message("Таблица хайлайтов успешно обновлена", level="INFO")
 
-    def _on_clips_table_item_changed(self, item):
-        if item.column() == 0:  # Если изменился чекбокс
-            self._update_buttons_state_after_long_op(False)
+    def _on_highlights_checked_count_changed(self, checked_count):
+        self._update_buttons_state_after_long_op(False)
+        self._update_highlights_count_label()
+
+    def _on_min_score_changed(self, value):
+        self.highlights_model.set_min_score(value)
+        self._update_highlights_count_label()
+
+    def _update_highlights_count_label(self):
+        total_count = self.highlights_model.highlight_count()
+        visible_count = self.highlights_model.visible_count()
+        text = f"Показано: {visible_count} из {total_count}" if visible_count != total_count else f"Всего: {total_count}"
+        self.highlights_count_label.setText(f"{text}, отмечено: {self.highlights_model.checked_count()}")
 
     @staticmethod
     def format_seconds_to_time(seconds_float):
@@ -734,15 +943,8 @@ class MainWindow(QMainWindow):
         return f"{h:02d}:{m:02d}:{s:02d}.{milliseconds:03d}"
 
     def get_selected_highlights_for_export(self):
-        selected_for_export = []
-        self.log_message("get_selected_highlights_for_export: Сбор выбранных хайлайтов...", level="DEBUG")
-        for row in range(self.clips_table_widget.rowCount()):
-            checkbox_item = self.clips_table_widget.item(row, 0)
-            if checkbox_item and checkbox_item.data(
-                    Qt.ItemDataRole.UserRole) and checkbox_item.checkState() == Qt.CheckState.Checked:
-                highlight_data = checkbox_item.data(Qt.ItemDataRole.UserRole)
-                if highlight_data:
-                    selected_for_export.append(highlight_data)
+        # Отмеченные хайлайты в хронологическом порядке, независимо от сортировки и фильтра таблицы
+        selected_for_export = self.highlights_model.checked_highlights()
         self.log_message(f"get_selected_highlights_for_export: Всего выбрано {len(selected_for_export)} хайлайтов.",
                          level="INFO")
         return selected_for_export
@@ -783,12 +985,23 @@ class MainWindow(QMainWindow):
             self._update_buttons_state_after_long_op(False)
             return
 
-        selected_preset_name = options_dialog.get_selected_preset_name()
-        if not selected_preset_name:
+        selected_preset_names = options_dialog.get_selected_preset_names()
+        if not selected_preset_names:
             self.log_message("export_selected_clips: Пресет не был выбран в диалоге.", level="WARN")
             self._update_buttons_state_after_long_op(False)
             return
-        self.log_message(f"export_selected_clips: Выбран пресет для экспорта: '{selected_preset_name}'", level="INFO")
+        self.log_message(f"export_selected_clips: Выбраны пресеты для экспорта: {selected_preset_names}", level="INFO")
+        draft_mode = options_dialog.get_draft_mode()
+        subtitle_options = None
+        if options_dialog.get_generate_subtitles():
+            current_settings = self.settings_dialog.get_current_settings()
+            subtitle_options = {
+                'model_size': current_settings['whisper_model_size'],
+                'padding_sec': options_dialog.get_subtitles_padding_sec(),
+                'ffmpeg_path': self.cutting_engine.ffmpeg_path,
+            }
+            self.log_message(f"export_selected_clips: Для клипов будут созданы субтитры: {subtitle_options}",
+                             level="INFO")
         # --- Конец диалога выбора параметров ---
 
         default_export_path = self.settings_dialog.settings.value(CONFIG_DEFAULT_EXPORT_FOLDER,
@@ -800,48 +1013,86 @@ class MainWindow(QMainWindow):
             self._update_buttons_state_after_long_op(False)
             return
 
-        temp_dir_base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.TempLocation)
-        app_temp_dir_for_cutting = os.path.join(temp_dir_base, "AutomatedContentCreator_TempCuts")
+        total_clips_to_export = len(highlights_to_export)
+        self.log_message(
+            f"export_selected_clips: Запуск {'чернового ' if draft_mode else ''}экспорта {total_clips_to_export} "
+            f"клипов с пресетами {selected_preset_names}.", level="INFO")
+        self._export_is_draft = draft_mode
+        self._start_export_worker(
+            total_clips_to_export, subtitle_options,
+            lambda worker: worker.process_export_list(
+                original_video_path=self.current_video_path,
+                highlights_to_export=highlights_to_export,
+                output_folder=output_folder,
+                export_preset_name=selected_preset_names,  # <--- ПЕРЕДАЕМ ВЫБРАННЫЕ ПРЕСЕТЫ
+                draft=draft_mode
+            )
+        )
+
+    def promote_drafts_to_final(self):
+        """Финальный экспорт одобренных черновиков: по манифесту, в зарезервированные при черновике пути."""
+        if self.export_thread and self.export_thread.isRunning():
+            QMessageBox.information(self, "Экспорт", "Дождитесь завершения текущего экспорта.")
+            return
+        manifest_path = self.last_draft_manifest_path
+        if not manifest_path or not os.path.exists(manifest_path):
+            default_export_path = self.settings_dialog.settings.value(CONFIG_DEFAULT_EXPORT_FOLDER,
+                                                                      get_default_output_folder())
+            manifest_path, _ = QFileDialog.getOpenFileName(
+                self, "Выберите манифест чернового экспорта", default_export_path,
+                f"Манифест экспорта ({EXPORT_MANIFEST_GLOB});;JSON (*.json)")
+            if not manifest_path:
+                return
         try:
-            os.makedirs(app_temp_dir_for_cutting, exist_ok=True)
-        except OSError as e:
-            self.log_message(
-                f"export_selected_clips: Не удалось создать временную папку '{app_temp_dir_for_cutting}': {e}",
-                level="CRITICAL")
-            QMessageBox.critical(self, "Ошибка временной папки",
-                                 f"Не удалось создать временную папку для нарезки:\n{e}")
-            self._update_buttons_state_after_long_op(False)
+            manifest = load_export_manifest(manifest_path)
+        except (OSError, ValueError) as e:
+            self.log_message(f"promote_drafts_to_final: Не удалось прочитать манифест '{manifest_path}': {e}",
+                             level="ERROR")
+            QMessageBox.warning(self, "Манифест экспорта", f"Не удалось прочитать манифест:\n{e}")
+            return
+
+        promote_dialog = PromoteDraftsDialog(manifest, self)
+        if not promote_dialog.exec():
             return
+        approved_numbers = promote_dialog.get_approved_numbers()
+        self._update_buttons_state_after_long_op(True)
+        self.log_message(f"promote_drafts_to_final: Финальный экспорт клипов {approved_numbers} "
+                         f"по манифесту '{manifest_path}'.", level="INFO")
+        self._export_is_draft = False
+        self._start_export_worker(
+            len(approved_numbers), None,
+            lambda worker: worker.promote_to_final(manifest_path, approved_numbers)
+        )
 
+    def _start_export_worker(self, total_clips_to_export: int, subtitle_options, run_export):
+        """Создает ClipExporterWorker в отдельном потоке и диалог прогресса; run_export(worker) запускает экспорт."""
         self.last_exported_clips_info = []
-        total_clips_to_export = len(highlights_to_export)
-        self.log_message(
-            f"export_selected_clips: Запуск экспорта {total_clips_to_export} клипов с пресетом '{selected_preset_name}'.",
-            level="INFO")
         self._export_actually_started_and_not_cancelled = True
 
         self.export_progress_dialog = QProgressDialog(f"Экспорт {total_clips_to_export} клипов...", "Отмена", 0,
-                                                      total_clips_to_export, self)
+                                                      total_clips_to_export * EXPORT_PROGRESS_UNITS_PER_CLIP, self)
         self.export_progress_dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
         self.export_progress_dialog.setAutoClose(False)
         self.export_progress_dialog.setAutoReset(False)
         self.export_progress_dialog.canceled.connect(self.cancel_export_process)
 
+        current_settings = self.settings_dialog.get_current_settings()
+        self.export_module.set_encoder_options(current_settings['export_encoder'],
+                                               current_settings['export_speed_tier'],
+                                               current_settings['export_threads'])
+        self.cutting_engine.set_encoder_options(current_settings['export_encoder'],
+                                                current_settings['export_speed_tier'],
+                                                current_settings['export_threads'])
+
         self.export_thread = QThread(self)
         self.export_worker = ClipExporterWorker(
             cutting_engine=self.cutting_engine,
             export_module_instance=self.export_module,  # Передаем экземпляр ExportModule
-            parent_logger=self
+            parent_logger=self,
+            max_parallel_jobs=current_settings.get('export_parallel_jobs', 0),
+            subtitle_options=subtitle_options,
+            batch_cutting=current_settings.get('export_batch_cutting', True)
         )
-        self.export_worker.set_temp_dir(app_temp_dir_for_cutting)
-
-        if not self.export_worker.temp_dir_for_cutting:  # Проверка после set_temp_dir
-            self.log_message(
-                "export_selected_clips: Ошибка установки временной папки в ClipExporterWorker. Экспорт прерван.",
-                level="CRITICAL")
-            # ... (очистка ресурсов)
-            self._update_buttons_state_after_long_op(False)
-            return
 
         self.export_worker.moveToThread(self.export_thread)
         self.export_worker.export_progress.connect(self.handle_export_progress_update)
@@ -849,30 +1100,28 @@ class MainWindow(QMainWindow):
         self.export_worker.export_all_finished.connect(self.handle_all_clips_exported)
         self.export_worker.export_error.connect(self.handle_export_error)
 
-        self.export_thread.started.connect(
-            lambda: self.export_worker.process_export_list(
-                original_video_path=self.current_video_path,
-                highlights_to_export=highlights_to_export,
-                output_folder=output_folder,
-                export_preset_name=selected_preset_name  # <--- ПЕРЕДАЕМ ВЫБРАННЫЙ ПРЕСЕТ
-            )
-        )
+        self.export_thread.started.connect(lambda: run_export(self.export_worker))
         self.export_thread.finished.connect(self.export_thread.deleteLater)  # Очистка потока
         self.export_thread.finished.connect(self.cleanup_export_worker)
 
         self.export_progress_dialog.setValue(0)
         if total_clips_to_export > 0: self.export_progress_dialog.show()
-        self.log_message("export_selected_clips: Запуск потока экспорта...", level="INFO")
+        self.log_message("_start_export_worker: Запуск потока экспорта...", level="INFO")
         self.export_thread.start()
 
     @pyqtSlot(int, int, str)
-    def handle_export_progress_update(self, current_num, total_num, description):
+    def handle_export_progress_update(self, current_units, total_units, description):
+        # Единицы - доли клипа (EXPORT_PROGRESS_UNITS_PER_CLIP на клип), обновляются по прогрессу FFmpeg
+        clips_done = current_units // EXPORT_PROGRESS_UNITS_PER_CLIP
+        clips_total = total_units // EXPORT_PROGRESS_UNITS_PER_CLIP
         if self.export_progress_dialog and self.export_progress_dialog.isVisible():
-            self.export_progress_dialog.setValue(current_num)
+            if self.export_progress_dialog.maximum() != total_units:
+                self.export_progress_dialog.setMaximum(total_units)
+            self.export_progress_dialog.setValue(current_units)
             self.export_progress_dialog.setLabelText(
-                f"Обработка клипа {current_num} из {total_num}: {description[:50]}...")
-        if current_num == 1 or current_num == total_num or current_num % (max(1, total_num // 10)) == 0:
-            self.log_message(f"Прогресс экспорта: {current_num}/{total_num} - '{description}'.", level="DEBUG")
+                f"Готово клипов: {clips_done} из {clips_total}. {description[:90]}")
+        if current_units % EXPORT_PROGRESS_UNITS_PER_CLIP == 0:  # Промежуточный прогресс клипа не логируем
+            self.log_message(f"Прогресс экспорта: {clips_done}/{clips_total} - '{description}'.", level="DEBUG")
 
     @pyqtSlot(str, bool, str)  # path, success, original_description
     def handle_single_clip_exported(self, exported_path, success, original_description):
@@ -933,8 +1182,19 @@ class MainWindow(QMainWindow):
                 self.export_progress_dialog.close()
             self.export_progress_dialog = None
 
+        if self._export_is_draft:
+            # Черновики не попадают в контент-план: в него идут только финальные клипы
+            self.last_exported_clips_info = []
+            if self.export_worker and self.export_worker.exporter.last_manifest_path:
+                self.last_draft_manifest_path = self.export_worker.exporter.last_manifest_path
+
         if self._export_actually_started_and_not_cancelled:
-            if final_successful_count > 0:
+            if final_successful_count > 0 and self._export_is_draft:
+                QMessageBox.information(self, "Черновики готовы",
+                                        f"Создано черновиков: {final_successful_count} (подпапка drafts). "
+                                        f"Просмотрите их и нажмите \"Финал из черновиков...\", чтобы "
+                                        f"экспортировать одобренные клипы в полном качестве.")
+            elif final_successful_count > 0:
                 QMessageBox.information(self, "Экспорт завершен",
                                         f"{final_successful_count} клипов было успешно экспортировано.")
             elif len(self.get_selected_highlights_for_export()) > 0:  # Если пытались экспортировать, но не вышло
@@ -1008,6 +1268,7 @@ class MainWindow(QMainWindow):
         # Обновляем состояние кнопок/UI
         self._update_buttons_state_after_long_op(False)
         self._export_actually_started_and_not_cancelled = False  # сброс флага
+        self._export_is_draft = False
         self.log_message("cleanup_export_worker: UI обновлен.", level="DEBUG")
 
         # При необходимости перезагружаем видео в плеер
@@ -1106,6 +1367,36 @@ class MainWindow(QMainWindow):
         else:
             self.log_message("Изменение настроек отменено.", level="INFO")
 
+    def _get_batch_queue(self) -> BatchQueue:
+        """Очередь пакетной обработки: создается один раз, состояние восстанавливается с диска."""
+        if self.batch_queue is None:
+            current_settings = self.settings_dialog.get_current_settings()
+            self.batch_queue = BatchQueue(max_concurrent_jobs=current_settings['batch_max_concurrent_jobs'],
+                                          parent_logger=self)
+            self.batch_queue.update_settings(current_settings)
+        return self.batch_queue
+
+    def resume_batch_queue(self):
+        """
+        Вызывается после показа окна. Если включен автозапуск и после перезапуска остались ожидающие
+        задания или следящая папка, очередь продолжает работу без открытия окна очереди.
+        """
+        batch_queue = self._get_batch_queue()
+        if not self.settings_dialog.get_current_settings()['batch_auto_start'] or not batch_queue.has_pending_work():
+            return
+        batch_queue.resume_watching()
+        batch_queue.start()
+        self.log_message("Очередь пакетной обработки продолжена после запуска приложения.", level="INFO")
+
+    def open_batch_queue(self):
+        """Открывает окно очереди пакетной обработки (очередь продолжает работать и при закрытом окне)."""
+        self._get_batch_queue().resume_watching()
+        if self.batch_queue_dialog is None:
+            self.batch_queue_dialog = BatchQueueDialog(self.batch_queue, self.export_module, self.settings_dialog, self)
+        self.batch_queue_dialog.show()
+        self.batch_queue_dialog.raise_()
+        self.batch_queue_dialog.activateWindow()
+
     def show_about_dialog(self):
         self.log_message("show_about_dialog: Открытие окна 'О программе'.", level="INFO")
         QMessageBox.about(self, "О программе Automated Content Creator",
@@ -1169,3 +1460,16 @@ class MainWindow(QMainWindow):
                 event.accept()
             else:
                 event.ignore()
+
+        if event.isAccepted() and self.batch_queue is not None:
+            # Прерванные задания сохраняются как ожидающие и выполнятся после следующего запуска;
+            # ожидание прерывания ограничено (batch_queue.SHUTDOWN_WAIT_SEC), окно не зависает
+            self.batch_queue.shutdown()
+        if event.isAccepted() and self.background_builds:
+            self._cancel_background_builds()
+            for thread, worker in list(self.background_builds.values()):
+                thread.quit()
+                thread.wait(3000)
+        if event.isAccepted():
+            self.log_flush_timer.stop()
+            self.log_pipeline.close()
@@ -1,234 +1,608 @@
 # automated_content_creator/modules/ai_analyzer.py
 
 import os
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import whisper
-from PyQt6.QtCore import QObject, pyqtSignal, QTime
-# import cv2 # cv2 импортируется неявно через PySceneDetect, если выбран OpenCV бэкенд
-
-# PySceneDetect
-from scenedetect import open_video, SceneManager, FrameTimecode  # Добавил FrameTimecode для format_timecode
-from scenedetect.detectors import ContentDetector
+# whisper (torch), PySceneDetect и cv2 импортируются при первом использовании:
+# main_window импортирует этот модуль при запуске, а их загрузка занимает секунды.
+# warm_up_heavy_imports() прогревает их в фоне после показа окна.
 from typing import List, Dict
 
+from modules.analysis_cache import AnalysisCache, compute_video_fingerprint
+from modules.audio_analyzer import AUDIO_FEATURES_VERSION, AudioFeatures, analyze_audio
+from modules.cutting_engine import CuttingEngine
+from modules.ffmpeg_runner import format_eta
+from modules.frame_features import FrameFeatureCollector, VisualFeatures, feature_columns
+from modules.parallel_scene_detect import detect_frame_scores_parallel, resolve_analysis_workers, split_into_chunks
+from modules.scene_metrics import SceneMetrics, build_highlights, format_timecode as format_seconds
+from modules.whisper_models import DEFAULT_WHISPER_MODEL_SIZE, get_model_registry
+from utils import load_audio, rebase_segments
+
+# Режимы скорости анализа сцен.
+# frame_skip - сколько кадров пропускать между анализируемыми (точность границ падает до ±(frame_skip+1) кадров);
+# downscale - во сколько раз PySceneDetect уменьшает кадр перед детектором (0 = автоматически по ширине);
+# proxy_height - высота прокси, декодируемого FFmpeg перед анализом (0 = читать исходник напрямую через OpenCV).
+ANALYSIS_SPEED_MODES = {
+    "accurate": {"title": "Точный", "frame_skip": 0, "downscale": 0, "proxy_height": 0},
+    "balanced": {"title": "Сбалансированный", "frame_skip": 0, "downscale": 0, "proxy_height": 360},
+    "fast": {"title": "Быстрый", "frame_skip": 1, "downscale": 0, "proxy_height": 240},
+    "custom": {"title": "Пользовательский"},
+}
+DEFAULT_ANALYSIS_SPEED_MODE = "accurate"
+
+
+def warm_up_heavy_imports(include_whisper: bool = False) -> float:
+    """
+    Заранее импортирует PySceneDetect/cv2 (и, по запросу, whisper), чтобы первый анализ
+    не ждал загрузки библиотек. Вызывается из фонового потока. Возвращает затраченное время в секундах.
+    """
+    start_time = time.perf_counter()
+    import cv2  # noqa: F401
+    import scenedetect  # noqa: F401
+    import scenedetect.detectors  # noqa: F401
+    if include_whisper:
+        import whisper  # noqa: F401
+    return time.perf_counter() - start_time
+
+
+def resolve_speed_params(settings: dict) -> dict:
+    """Возвращает {'frame_skip', 'downscale', 'proxy_height'} для выбранного в настройках режима."""
+    mode = settings.get('analysis_speed_mode', DEFAULT_ANALYSIS_SPEED_MODE)
+    preset = ANALYSIS_SPEED_MODES.get(mode, ANALYSIS_SPEED_MODES[DEFAULT_ANALYSIS_SPEED_MODE])
+    if mode == "custom":
+        preset = {
+            "frame_skip": settings.get('analysis_frame_skip', 0),
+            "downscale": settings.get('analysis_downscale', 0),
+            "proxy_height": settings.get('analysis_proxy_height', 0),
+        }
+    return {
+        "frame_skip": max(0, int(preset["frame_skip"])),
+        "downscale": max(0, int(preset["downscale"])),
+        "proxy_height": max(0, int(preset["proxy_height"])),
+    }
+
+
+def describe_speed_params(params: dict) -> str:
+    """Короткое описание компромисса точность/скорость для отображения в настройках."""
+    frames_step = params["frame_skip"] + 1
+    parts = [f"точность границ сцен: ±{frames_step} кадр(а)"]
+    if params["proxy_height"]:
+        parts.append(f"декодирование FFmpeg в {params['proxy_height']}p")
+    else:
+        parts.append("декодирование исходника OpenCV")
+    parts.append("уменьшение кадра: " + (f"в {params['downscale']} раз(а)" if params["downscale"] else "авто"))
+    if params["frame_skip"] and not params["proxy_height"]:
+        parts.append("без покадровых оценок (мгновенный пересчет порога недоступен)")
+    elif frames_step > 1:
+        parts.append(f"анализируется каждый {frames_step}-й кадр")
+    description = "; ".join(parts)
+    return description[0].upper() + description[1:] + "."
+
 
 # from scenedetect.video_splitter import split_video_ffmpeg # Не используется сейчас
 
-class AIAnalyzer(QObject):
-    analysis_finished = pyqtSignal(list)
-    analysis_progress = pyqtSignal(int, str)
-    analysis_error = pyqtSignal(str)
+class AnalysisError(Exception):
+    """Ошибка анализа видео (файл не найден, некорректный FPS, сбой PySceneDetect)."""
+
 
-    def __init__(self, parent_logger=None, settings=None):
-        super().__init__()
+class VideoAnalyzer:
+    """
+    Поиск хайлайтов без Qt: прогресс и промежуточные результаты передаются через обычные callback,
+    поэтому анализатор можно запускать в рабочих процессах (ProcessPoolExecutor) и в консольном режиме.
+    progress_callback(percent, message); scene_metrics_callback(SceneMetrics) - перед возвратом хайлайтов.
+    Для окна используется адаптер modules.qt_workers.AIAnalyzer с прежними сигналами.
+    """
+
+    def __init__(self, parent_logger=None, settings=None, progress_callback=None, scene_metrics_callback=None):
         self.parent_logger = parent_logger
         self.settings = settings if settings else {}
+        self.progress_callback = progress_callback
+        self.scene_metrics_callback = scene_metrics_callback
         self._video_path = None
         self._is_cancelled = False
 
         self.pyscene_threshold = self.settings.get('pyscenedetect_threshold', 27.0)
         self.min_scene_duration_sec_pysd = self.settings.get('min_scene_len_sec', 2.0)
         self.final_min_highlight_duration_sec = self.settings.get('final_min_highlight_duration_sec', 3.0)
-
-        self._log(f"AIAnalyzer инициализирован с настройками: threshold={self.pyscene_threshold}, "
+        self.use_cache = self.settings.get('analysis_cache_enabled', True)
+        self.audio_scoring_enabled = self.settings.get('audio_scoring_enabled', True)
+        self.visual_scoring_enabled = self.settings.get('visual_scoring_enabled', True)
+        self.speed_params = resolve_speed_params(self.settings)
+        self.analysis_workers = resolve_analysis_workers(self.settings.get('analysis_workers', 0))
+        self._proxy_engine = None  # CuttingEngine для создания прокси (отдельный, чтобы отмена не задевала экспорт)
+        self.analysis_cache = AnalysisCache(parent_logger=parent_logger)
+        self.scene_metrics = None
+        self._fingerprint = None  # Отпечаток текущего видео (общий для кеша сцен и аудиопризнаков)
+
+        self._log(f"VideoAnalyzer инициализирован с настройками: threshold={self.pyscene_threshold}, "
                   f"min_scene_detect_duration={self.min_scene_duration_sec_pysd}s, "
-                  f"final_min_highlight_duration={self.final_min_highlight_duration_sec}s")
+                  f"final_min_highlight_duration={self.final_min_highlight_duration_sec}s, "
+                  f"speed={self.speed_params}, workers={self.analysis_workers}", level="DEBUG")
 
-    def _log(self, message: str, important: bool = False):
+    def _log(self, message: str, level: str = "INFO"):
+        # Второстепенные сообщения (каждая сцена, каждый шаг) пишутся как DEBUG и отсекаются фильтром уровня
         if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
-            self.parent_logger.log_message(f"AIAnalyzer: {message}")
+            self.parent_logger.log_message(f"VideoAnalyzer: {message}", level=level)
         else:
-            print(f"AIAnalyzer (no logger): {message}")
+            print(f"VideoAnalyzer [{level}] (no logger): {message}")
+
+    def log(self, message: str, level: str = "INFO"):
+        """Запись в лог анализатора - для адаптеров (qt_workers) и других внешних вызовов."""
+        self._log(message, level=level)
 
-    def cancel_analysis(self):
-        self._log("Получен запрос на отмену анализа.", important=True)
+    def _report_progress(self, percent: int, message: str):
+        if self.progress_callback:
+            self.progress_callback(percent, message)
+
+    def cancel(self):
+        self._log("Получен запрос на отмену анализа.", level="INFO")
         self._is_cancelled = True
+        if self._proxy_engine:
+            self._proxy_engine.cancel_current_operation()
 
     @staticmethod
     def format_timecode(time_sec: float, fps: float) -> str:  # fps теперь обязателен для FrameTimecode
         # Используем FrameTimecode для преобразования секунд в формат временного кода
         # FrameTimecode требует fps для корректной работы
+        from scenedetect import FrameTimecode
         if fps is None or fps <= 0:  # Добавим проверку на корректность fps
-            q_time = QTime(0, 0, 0, 0).addSecs(int(time_sec))
-            milliseconds = int((time_sec - int(time_sec)) * 1000)
-            return f"{q_time.toString('HH:mm:ss')}.{milliseconds:03d} (fps error)"
+            return f"{format_seconds(time_sec)} (fps error)"
         return FrameTimecode(time_sec, fps).get_timecode()
 
-    def analyze(self, video_path: str):
-        self._log(f"Начало анализа видео: {video_path}", important=True)
+    def _make_cache_key(self, video_path: str) -> str | None:
+        """
+        Ключ кеша зависит только от содержимого видео, типа детектора и режима скорости
+        (разрешение и прореживание кадров меняют оценки). Порог и мин. длина сцены в ключ
+        не входят: сцены для других значений пересчитываются из сохраненных оценок (SceneMetrics).
+        """
+        fingerprint = self._video_fingerprint(video_path)
+        if fingerprint is None:
+            return None
+        detector_params = {
+            "detector": "ContentDetector",
+            "backend": "opencv",
+            **self.speed_params,
+        }
+        return AnalysisCache.make_key(fingerprint, detector_params)
+
+    def _video_fingerprint(self, video_path: str) -> str | None:
+        if self._fingerprint is None:
+            try:
+                self._fingerprint = compute_video_fingerprint(video_path)
+            except OSError as e:
+                self._log(f"Не удалось вычислить отпечаток видео для кеша: {e}", level="WARN")
+        return self._fingerprint
+
+    def analyze(self, video_path: str) -> list:
+        """
+        Находит хайлайты в видео и возвращает их список.
+        При отмене бросает InterruptedError, при ошибке - AnalysisError (или исключение библиотеки).
+        """
+        self._log(f"Начало анализа видео: {video_path}", level="INFO")
         self._video_path = video_path
         self._is_cancelled = False
-        highlights = []
-        video_stream = None
+        self._fingerprint = None
 
         if not os.path.exists(video_path):
             error_msg = f"Файл видео не найден: {video_path}"
-            self._log(error_msg, important=True)
-            self.analysis_error.emit(error_msg)
-            return
+            self._log(error_msg, level="ERROR")
+            raise AnalysisError(error_msg)
+
+        # Аудио анализируется в фоновом потоке параллельно с видео: FFmpeg декодирует звук
+        # в отдельном процессе, а NumPy отпускает GIL на время расчетов
+        audio_executor = None
+        audio_future = None
+        audio_stop_event = threading.Event()  # Останавливает аудиоанализ, если результат больше не нужен
+        if self.audio_scoring_enabled:
+            audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AudioAnalysis")
+            audio_future = audio_executor.submit(self._analyze_audio_features, video_path, audio_stop_event)
+
+        try:
+            self._report_progress(0, "Инициализация видео...")
+            scene_data = None
+            cache_key = None
+            if self.use_cache:
+                cache_key = self._make_cache_key(video_path)
+                scene_data = self.analysis_cache.load(cache_key) if cache_key else None
+                if (scene_data is not None and self._apply_detector_params(scene_data)
+                        and (not self.visual_scoring_enabled or scene_data.get("frame_features") is not None)):
+                    self._log("Результат анализа найден в кеше. Повторное декодирование видео не требуется.", level="INFO")
+                else:
+                    scene_data = None
+
+            if scene_data is None:
+                scene_data = self._detect_scenes(video_path)
+                if cache_key:
+                    self.analysis_cache.save(cache_key, scene_data)
+
+            scorers = []
+            visual_features = VisualFeatures.from_scene_data(scene_data) if self.visual_scoring_enabled else None
+            if visual_features is not None:
+                scorers.append(visual_features)
+            if audio_future is not None:
+                self._report_progress(92, "Оценка хайлайтов по звуку...")
+                audio_features = audio_future.result()
+                if audio_features is not None and len(audio_features.rms_db):
+                    scorers.append(audio_features)
+
+            if scene_data.get("frame_scores") is not None:
+                self.scene_metrics = SceneMetrics.from_scene_data(scene_data, scorers)
+                if self.scene_metrics_callback:
+                    self.scene_metrics_callback(self.scene_metrics)
+
+            self._report_progress(95, "Фильтрация и форматирование хайлайтов...")
+            highlights = self._build_highlights(scene_data, scorers)
+            if self._is_cancelled:
+                self._log("Анализ отменен во время фильтрации сцен.", level="INFO")
+                return highlights
 
+            self._report_progress(100, f"Завершено. Найдено {len(highlights)} хайлайтов.")
+            self._log(f"Анализ успешно завершен. Общее количество хайлайтов: {len(highlights)}.", level="INFO")
+            return highlights
+        finally:
+            if audio_executor is not None:
+                # Отмена, ошибка видеоанализа или уже готовый результат: задача аудио не должна
+                # продолжать декодировать звук в фоне, а еще не начатая - запускаться
+                audio_stop_event.set()
+                audio_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _analyze_audio_features(self, video_path: str, stop_event: threading.Event) -> AudioFeatures | None:
+        """
+        Выполняется в фоновом потоке: берет аудиопризнаки из кеша или считает их
+        (modules/audio_analyzer) за один потоковый проход по звуковой дорожке.
+        stop_event прерывает проход, когда анализ видео завершился без ожидания звука.
+        Возвращает None, если звука нет, анализ отменен или не удался - тогда оценка хайлайтов прежняя.
+        """
+        cache_key = None
+        if self.use_cache:
+            fingerprint = self._video_fingerprint(video_path)
+            if fingerprint:
+                cache_key = AnalysisCache.make_key(fingerprint, {"audio_features": AUDIO_FEATURES_VERSION})
+                cached = self.analysis_cache.load(cache_key)
+                if cached is not None:
+                    self._log("Аудиопризнаки найдены в кеше.", level="DEBUG")
+                    return AudioFeatures.from_dict(cached)
+
+        start_time = time.perf_counter()
+        try:
+            audio_features = analyze_audio(video_path, self.settings.get('paths/ffmpeg_path', 'ffmpeg'),
+                                           is_cancelled=lambda: self._is_cancelled or stop_event.is_set())
+        except Exception as e:
+            self._log(f"Аудиоанализ недоступен (нет звуковой дорожки или ошибка FFmpeg): {type(e).__name__} - {e}. "
+                      f"Хайлайты будут оценены по длительности.", level="WARN")
+            return None
+        if audio_features is None:
+            return None
+        elapsed_sec = max(time.perf_counter() - start_time, 1e-6)
+        self._log(f"Аудиоанализ: {audio_features.duration_sec:.0f}s звука за {elapsed_sec:.1f}s "
+                  f"({audio_features.duration_sec / elapsed_sec:.0f}x реального времени).", level="INFO")
+        if cache_key:
+            self.analysis_cache.save(cache_key, audio_features.to_dict())
+        return audio_features
+
+    def _create_proxy(self, video_path: str, source_fps: float, duration_sec: float | None = None) -> str | None:
+        """
+        Декодирует видео FFmpeg в маленький временный прокси (см. CuttingEngine.create_analysis_proxy).
+        При frame_skip > 0 кадры прореживаются на этапе прокси, чтобы StatsManager сохранял оценки.
+        Прогресс FFmpeg отображается в диапазоне 2-30% с оценкой оставшегося времени.
+        """
+        self._proxy_engine = CuttingEngine(self.parent_logger)
+        self._proxy_engine.set_ffmpeg_path(self.settings.get('paths/ffmpeg_path', 'ffmpeg'))
+        proxy_fd, proxy_path = tempfile.mkstemp(prefix="aca_analysis_proxy_", suffix=".mp4")
+        os.close(proxy_fd)
+        proxy_fps = source_fps / (self.speed_params["frame_skip"] + 1) if self.speed_params["frame_skip"] else None
+        def on_progress(progress):
+            if progress["fraction"] is None:
+                return
+            speed = f", {progress['speed']:.1f}x" if progress["speed"] else ""
+            self._report_progress(2 + int(progress["fraction"] * 28),
+                                  f"Декодирование FFmpeg в {self.speed_params['proxy_height']}p: "
+                                  f"{progress['fraction'] * 100:.0f}%{speed}, осталось ~{format_eta(progress['eta_sec'])}")
+
+        if self._proxy_engine.create_analysis_proxy(video_path, proxy_path, self.speed_params["proxy_height"],
+                                                    proxy_fps, duration_sec=duration_sec,
+                                                    progress_callback=on_progress):
+            return proxy_path
+        if os.path.exists(proxy_path):
+            os.remove(proxy_path)
+        return None
+
+    def _detect_scenes(self, video_path: str) -> dict:
+        """
+        Декодирует видео и находит сцены PySceneDetect.
+        Возвращает словарь {'fps', 'duration_sec', 'num_frames', 'scenes': [[start_frame, end_frame], ...],
+        'frame_scores': np.ndarray (content_val ContentDetector для каждого кадра) или None}
+        При отмене бросает InterruptedError, при ошибке - AnalysisError.
+        Номера кадров относятся к реально проанализированному потоку (прокси может иметь меньший FPS),
+        поэтому в результат пишется его fps - время в секундах от этого не меняется.
+        Длинные видео (от двух кусков по MIN_CHUNK_DURATION_SEC) анализируются в нескольких процессах.
+        """
+        from scenedetect import open_video
+        video_stream = None
+        proxy_path = None
+        frame_skip = self.speed_params["frame_skip"]
         try:
-            self.analysis_progress.emit(0, "Инициализация видео...")
             # Использование with должно гарантировать закрытие, если PySceneDetect > v0.6.1
             # Для более старых версий, PySceneDetect сам управляет закрытием при выходе из области видимости.
             video_stream = open_video(video_path, backend='opencv') # persist_frames=False может помочь с памятью
 
             fps = video_stream.frame_rate
             if fps is None or fps <= 0:
-                # Попытка получить FPS через OpenCV напрямую, если PySceneDetect не смог
-                # Это более глубокое вмешательство и может быть не нужно, если open_video всегда дает fps
-                self._log("Не удалось получить FPS от PySceneDetect, попытка через OpenCV напрямую (если возможно).",
-                          True)
-                # Это потребует video_stream.capture (если это объект cv2.VideoCapture)
-                # Но video_stream это обертка. Лучше полагаться на PySceneDetect.
                 # Если fps некорректен, дальнейший анализ может быть неточным.
                 error_msg_fps = f"Некорректное значение FPS ({fps}) от PySceneDetect для видео {video_path}"
-                self._log(error_msg_fps, True)
-                self.analysis_error.emit(error_msg_fps)
-                return
+                self._log(error_msg_fps, level="ERROR")
+                raise AnalysisError(error_msg_fps)
 
             duration_sec_total = video_stream.duration.get_seconds()
             num_frames_total = video_stream.duration.get_frames()
+            source_fps = fps
 
             self._log(
-                f"Видео '{os.path.basename(video_path)}': FPS={fps:.2f}, Длительность={duration_sec_total:.2f}s, Кадров={num_frames_total}")
+                f"Видео '{os.path.basename(video_path)}': FPS={fps:.2f}, Длительность={duration_sec_total:.2f}s, Кадров={num_frames_total}", level="DEBUG")
 
             if self._is_cancelled:
-                self._log("Анализ отменен пользователем перед началом обработки.", True)
-                self.analysis_finished.emit([])
-                # Удаляем video_stream.release()
-                return
-
-            scene_manager = SceneManager()
-            min_len_for_detector_frames = int(fps * self.min_scene_duration_sec_pysd)
-            if min_len_for_detector_frames < 1:
-                min_len_for_detector_frames = 1
-            self._log(
-                f"PySceneDetect ContentDetector min_scene_len установлен в {min_len_for_detector_frames} кадров (из {self.min_scene_duration_sec_pysd}s при {fps:.2f} FPS).")
-
-            scene_manager.add_detector(
-                ContentDetector(threshold=self.pyscene_threshold, min_scene_len=min_len_for_detector_frames))
-
-            self.analysis_progress.emit(5, "Обнаружение сцен (PySceneDetect)...")
-
-            processed_frames_for_progress = 0
-            progress_update_interval_frames = max(1, num_frames_total // 20 if num_frames_total > 20 else 5)
-
-            def progress_callback(frame_image, frame_num):
-                nonlocal processed_frames_for_progress
-                processed_frames_for_progress = frame_num
-                if frame_num % progress_update_interval_frames == 0 or frame_num == num_frames_total - 1:
-                    percent = 5 + int((frame_num / num_frames_total) * 85) if num_frames_total > 0 else 5
-                    self.analysis_progress.emit(percent, f"Обработано кадров: {frame_num + 1}/{num_frames_total}")
+                self._log("Анализ отменен пользователем перед началом обработки.", level="INFO")
+                raise InterruptedError("Анализ отменен пользователем.")
+
+            analysis_start_time = time.perf_counter()
+            progress_start = 5
+            if self.speed_params["proxy_height"]:
+                self._report_progress(2, f"Декодирование FFmpeg в {self.speed_params['proxy_height']}p...")
+                proxy_path = self._create_proxy(video_path, source_fps, duration_sec_total)
                 if self._is_cancelled:
-                    raise InterruptedError("Анализ отменен пользователем во время detect_scenes.")
-
-            try:
-                scene_manager.detect_scenes(video=video_stream, frame_skip=0, show_progress=False,
-                                            callback=progress_callback)
-            except InterruptedError:
-                self._log("Анализ (detect_scenes) прерван из-за отмены.", True)
-                self.analysis_finished.emit([])
-                # Удаляем video_stream.release()
-                return
-            except Exception as e_detect:
-                self._log(f"Ошибка во время detect_scenes: {type(e_detect).__name__} - {e_detect}", True)
-                self.analysis_error.emit(f"Ошибка PySceneDetect: {e_detect}")
-                # Удаляем video_stream.release()
-                return
-
-            # После detect_scenes объект video_stream может быть уже "потреблен" или его позиция в конце.
-            # Если нужно будет снова читать кадры (например, для другого анализа), его нужно будет "перемотать" (reset).
-            # Но для простого получения списка сцен это не требуется.
-            # video_stream.reset() # Если нужно было бы снова анализировать
-
-            scene_list_pysd = scene_manager.get_scene_list()
+                    self._log("Анализ отменен во время создания прокси.", level="INFO")
+                    raise InterruptedError("Анализ отменен пользователем.")
+                if proxy_path:
+                    del video_stream
+                    video_stream = open_video(proxy_path, backend='opencv')
+                    fps = video_stream.frame_rate
+                    num_frames_total = video_stream.duration.get_frames()
+                    frame_skip = 0  # Прореживание уже выполнено FFmpeg
+                    progress_start = 30
+                    self._log(f"Анализ по прокси: FPS={fps:.2f}, Кадров={num_frames_total} "
+                              f"(создан за {time.perf_counter() - analysis_start_time:.1f}s).", level="DEBUG")
+                else:
+                    self._log("Не удалось создать прокси FFmpeg, анализируется исходное видео.", level="WARN")
+
+            self._report_progress(progress_start, "Обнаружение сцен (PySceneDetect)...")
+            if frame_skip == 0 and len(split_into_chunks(num_frames_total, fps, self.analysis_workers)) > 1:
+                del video_stream  # Каждый процесс открывает видео сам
+                video_stream = None
+                detection = self._detect_scenes_parallel(proxy_path if proxy_path else video_path, fps,
+                                                         num_frames_total, progress_start)
+            else:
+                detection = self._detect_scenes_serial(video_stream, fps, num_frames_total, frame_skip,
+                                                       progress_start)
+            scenes, frame_scores, frame_features = detection
 
             if self._is_cancelled:
-                self._log("Анализ отменен после обнаружения сцен.", True)
-                self.analysis_finished.emit([])
-                # Удаляем video_stream.release()
-                return
-
-            self.analysis_progress.emit(95, "Фильтрация и форматирование хайлайтов...")
-            self._log(f"PySceneDetect нашел {len(scene_list_pysd)} сцен(ы).")
-
-            if not scene_list_pysd and duration_sec_total > 0:
-                self._log("Сцен не найдено PySceneDetect. Если видео не пустое, возможно, порог слишком высок.", True)
-
-            for i, (start_timecode, end_timecode) in enumerate(scene_list_pysd):
-                start_sec = start_timecode.get_seconds()
-                end_sec = end_timecode.get_seconds()
-                duration_scene_sec = end_sec - start_sec
-
-                if duration_scene_sec >= self.final_min_highlight_duration_sec:
-                    highlight = {
-                        'description': f"Хайлайт #{len(highlights) + 1} (Сцена {i + 1})",
-                        'start_time': start_sec,
-                        'end_time': end_sec,
-                        'start_time_str': start_timecode.get_timecode(),
-                        # Используем get_timecode() который уже форматирован
-                        'end_time_str': end_timecode.get_timecode(),
-                        'duration_sec': duration_scene_sec,
-                        'score': round(min(1.0, duration_scene_sec / 60.0), 2)
-                    }
-                    highlights.append(highlight)
-                    self._log(
-                        f"  Добавлен хайлайт: {highlight['description']} ({highlight['start_time_str']} - {highlight['end_time_str']})")
-                else:
-                    self._log(f"  Сцена {i + 1} ({start_timecode.get_timecode()} - {end_timecode.get_timecode()}) "
-                              f"длительностью {duration_scene_sec:.2f}с пропущена (меньше {self.final_min_highlight_duration_sec}с).")
+                self._log("Анализ отменен после обнаружения сцен.", level="INFO")
+                raise InterruptedError("Анализ отменен пользователем.")
+
+            self._log(f"PySceneDetect нашел {len(scenes)} сцен(ы).", level="DEBUG")
+            if not scenes and duration_sec_total > 0:
+                self._log("Сцен не найдено PySceneDetect. Если видео не пустое, возможно, порог слишком высок.", level="INFO")
+
+            # Компромисс скорость/точность: пропускная способность и шаг, с которым определяются границы
+            elapsed_sec = max(time.perf_counter() - analysis_start_time, 1e-6)
+            boundary_precision_sec = (self.speed_params["frame_skip"] + 1) / source_fps
+            self._log(f"Скорость анализа: {num_frames_total / elapsed_sec:.0f} кадров/с "
+                      f"({duration_sec_total / elapsed_sec:.1f}x реального времени, {elapsed_sec:.1f}s); "
+                      f"точность границ сцен: ±{boundary_precision_sec * 1000:.0f} мс. "
+                      f"Режим: {describe_speed_params(self.speed_params)}", level="INFO")
+
+            return {
+                "video_path": video_path,
+                "threshold": float(self.pyscene_threshold),
+                "min_scene_len_sec": float(self.min_scene_duration_sec_pysd),
+                "fps": float(fps),
+                "duration_sec": float(duration_sec_total),
+                "num_frames": int(num_frames_total),
+                "scenes": scenes,
+                "frame_scores": frame_scores,
+                "frame_features": frame_features,
+                "frame_feature_columns": feature_columns() if frame_features is not None else None,
+                "analysis_time_sec": elapsed_sec,
+                "boundary_precision_sec": boundary_precision_sec,
+            }
+        finally:
+            # PySceneDetect (0.6.x) сам освобождает ресурсы VideoStream при сборке мусора.
+            # Убедимся, что нет ссылок, чтобы сборщик мусора мог сработать:
+            if video_stream is not None:
+                del video_stream
+                self._log("Ссылка на video_stream удалена.", level="DEBUG")
+            if proxy_path and os.path.exists(proxy_path):
+                try:
+                    os.remove(proxy_path)
+                except OSError as e:
+                    self._log(f"Не удалось удалить временный прокси '{proxy_path}': {e}", level="WARN")
+
+    def _detect_scenes_serial(self, video_stream, fps: float, num_frames_total: int, frame_skip: int,
+                              progress_start: int):
+        """
+        Один проход SceneManager по всему видео. Возвращает (scenes, frame_scores, frame_features).
+        Визуальные признаки (modules/frame_features) считаются в том же callback, без повторного декодирования.
+        """
+        import numpy as np
+        from scenedetect import SceneManager, StatsManager
+        from scenedetect.detectors import ContentDetector
+        # StatsManager сохраняет покадровые метрики детектора (content_val) - они идут в кеш.
+        # PySceneDetect не позволяет совмещать StatsManager с frame_skip > 0.
+        stats_manager = StatsManager() if frame_skip == 0 else None
+        scene_manager = SceneManager(stats_manager)
+        if self.speed_params["downscale"]:
+            scene_manager.auto_downscale = False
+            scene_manager.downscale = self.speed_params["downscale"]
+        min_len_for_detector_frames = int(fps * self.min_scene_duration_sec_pysd)
+        if min_len_for_detector_frames < 1:
+            min_len_for_detector_frames = 1
+        self._log(
+            f"PySceneDetect ContentDetector min_scene_len установлен в {min_len_for_detector_frames} кадров (из {self.min_scene_duration_sec_pysd}s при {fps:.2f} FPS).", level="DEBUG")
+
+        scene_manager.add_detector(
+            ContentDetector(threshold=self.pyscene_threshold, min_scene_len=min_len_for_detector_frames))
+
+        progress_update_interval_frames = max(1, num_frames_total // 20 if num_frames_total > 20 else 5)
+        progress_span = 90 - progress_start
+        feature_collector = FrameFeatureCollector(num_frames_total) if self.visual_scoring_enabled else None
+
+        def progress_callback(frame_image, frame_num):
+            if feature_collector is not None:
+                feature_collector.process(frame_image, frame_num)
+            if frame_num % progress_update_interval_frames <= frame_skip or frame_num >= num_frames_total - 1 - frame_skip:
+                percent = progress_start + int((frame_num / num_frames_total) * progress_span) if num_frames_total > 0 else progress_start
+                self._report_progress(percent, f"Обработано кадров: {frame_num + 1}/{num_frames_total}")
+            if self._is_cancelled:
+                raise InterruptedError("Анализ отменен пользователем во время detect_scenes.")
 
-                if self._is_cancelled:
-                    self._log("Анализ отменен во время фильтрации сцен.", True)
-                    self.analysis_finished.emit(highlights)
-                    # Удаляем video_stream.release()
-                    return
+        try:
+            scene_manager.detect_scenes(video=video_stream, frame_skip=frame_skip, show_progress=False,
+                                        callback=progress_callback)
+        except InterruptedError:
+            self._log("Анализ (detect_scenes) прерван из-за отмены.", level="INFO")
+            raise
+        except Exception as e_detect:
+            self._log(f"Ошибка во время detect_scenes: {type(e_detect).__name__} - {e_detect}", level="ERROR")
+            raise AnalysisError(f"Ошибка PySceneDetect: {e_detect}") from e_detect
+
+        scene_list_pysd = scene_manager.get_scene_list()
+        scenes = [[start_tc.get_frames(), end_tc.get_frames()] for start_tc, end_tc in scene_list_pysd]
+
+        frame_scores = None
+        if stats_manager is not None:
+            frame_scores = np.full(num_frames_total, np.nan, dtype=np.float32)
+            score_key = [ContentDetector.FRAME_SCORE_KEY]
+            for frame_num in range(num_frames_total):
+                value = stats_manager.get_metrics(frame_num, score_key)[0]
+                if value is not None:
+                    frame_scores[frame_num] = value
+        return scenes, frame_scores, feature_collector.values if feature_collector is not None else None
+
+    def _detect_scenes_parallel(self, analyzed_path: str, fps: float, num_frames_total: int, progress_start: int):
+        """
+        Покадровые оценки считаются в нескольких процессах (modules/parallel_scene_detect),
+        склейки - по склеенному массиву оценок, как при последовательном проходе.
+        Возвращает (scenes, frame_scores, frame_features).
+        """
+        progress_span = 90 - progress_start
 
-            # Удаляем video_stream.release() отсюда, так как PySceneDetect сам управляет ресурсом
-            # или он освободится при выходе из области видимости/сборке мусора.
+        def on_progress(processed_frames, total_frames):
+            percent = progress_start + int(processed_frames / max(1, total_frames) * progress_span)
+            self._report_progress(percent, f"Обработано кадров: {processed_frames}/{total_frames} (параллельно)")
 
-            self.analysis_progress.emit(100, f"Завершено. Найдено {len(highlights)} хайлайтов.")
-            self._log(f"Анализ успешно завершен. Общее количество хайлайтов: {len(highlights)}.", important=True)
-            self.analysis_finished.emit(highlights)
+        try:
+            detection = detect_frame_scores_parallel(
+                analyzed_path, num_frames_total, fps, self.analysis_workers,
+                downscale=self.speed_params["downscale"], progress_callback=on_progress,
+                is_cancelled=lambda: self._is_cancelled, log_callback=self._log,
+                collect_features=self.visual_scoring_enabled)
+        except Exception as e_detect:
+            self._log(f"Ошибка во время параллельного анализа: {type(e_detect).__name__} - {e_detect}", level="ERROR")
+            raise AnalysisError(f"Ошибка PySceneDetect: {e_detect}") from e_detect
+        if detection is None:
+            self._log("Параллельный анализ прерван из-за отмены.", level="INFO")
+            raise InterruptedError("Анализ отменен пользователем.")
+
+        frame_scores, frame_features = detection
+        scenes = SceneMetrics(frame_scores, fps, num_frames_total).compute_scenes(
+            self.pyscene_threshold, self.min_scene_duration_sec_pysd)
+        return scenes, frame_scores, frame_features
+
+    def _apply_detector_params(self, scene_data: dict) -> bool:
+        """
+        Если запись из кеша получена с другими порогом/мин. длиной сцены,
+        пересчитывает список сцен из покадровых оценок (без декодирования видео).
+        Возвращает False, если пересчет невозможен (запись без покадровых оценок).
+        """
+        if (scene_data.get("threshold") == float(self.pyscene_threshold)
+                and scene_data.get("min_scene_len_sec") == float(self.min_scene_duration_sec_pysd)):
+            return True
+        if scene_data.get("frame_scores") is None:
+            return False
+        start_time = time.perf_counter()
+        scene_data["scenes"] = SceneMetrics.from_scene_data(scene_data).compute_scenes(
+            self.pyscene_threshold, self.min_scene_duration_sec_pysd)
+        scene_data["threshold"] = float(self.pyscene_threshold)
+        scene_data["min_scene_len_sec"] = float(self.min_scene_duration_sec_pysd)
+        self._log(f"Сцены пересчитаны из сохраненных оценок для порога {self.pyscene_threshold} "
+                  f"за {(time.perf_counter() - start_time) * 1000:.1f} мс: {len(scene_data['scenes'])} сцен(ы).", level="DEBUG")
+        return True
+
+    def _build_highlights(self, scene_data: dict, scorers=None) -> list:
+        """
+        Превращает список сцен (в кадрах) в хайлайты, отбрасывая сцены короче final_min_highlight_duration_sec.
+        scorers - источники оценки хайлайтов (VisualFeatures, AudioFeatures), см. scene_metrics.build_highlights.
+        """
+        highlights = build_highlights(scene_data["scenes"], scene_data["fps"], self.final_min_highlight_duration_sec,
+                                      scorers)
+        for highlight in highlights:
+            self._log(
+                f"  Добавлен хайлайт: {highlight['description']} ({highlight['start_time_str']} - {highlight['end_time_str']}), "
+                f"оценка {highlight['score']}", level="DEBUG")
+        skipped_count = len(scene_data["scenes"]) - len(highlights)
+        if skipped_count:
+            self._log(f"  Пропущено сцен короче {self.final_min_highlight_duration_sec}с: {skipped_count}.", level="DEBUG")
+        return highlights
 
-        except InterruptedError:
-            self._log("Анализ прерван из-за отмены (внешний InterruptedError).", True)
-            self.analysis_finished.emit([])
-        except Exception as e:
-            error_msg = f"Критическая ошибка во время анализа видео: {type(e).__name__} - {str(e)}"
-            self._log(error_msg, important=True)
-            import traceback
-            self._log(f"Traceback: {traceback.format_exc()}")
-            self.analysis_error.emit(error_msg)
-        finally:
-            # Явное удаление video_stream.release() из finally.
-            # Если video_stream является менеджером контекста (для PySceneDetect >= v0.6.1),
-            # то его лучше использовать через `with open_video(...) as video_stream:`.
-            # Но так как мы используем его в коллбэках и он должен жить дольше,
-            # полагаемся на автоматическое управление ресурсами PySceneDetect.
-            if video_stream is not None:
-                # Если есть какой-то явный метод закрытия в API PySceneDetect, его нужно использовать.
-                # В текущей версии PySceneDetect (например, 0.6.x), объект VideoStream (например, VideoStreamCv2)
-                # должен сам освобождать ресурсы при сборке мусора.
-                # Убедимся, что нет ссылок, чтобы сборщик мусора мог сработать:
-                del video_stream
-                self._log("Ссылка на video_stream удалена.")
 
 class WhisperSubtitleGenerator:
     """
     Генератор субтитров на основе OpenAI Whisper.
     """
-    def __init__(self, model_size: str = "base"):
-        # Варианты размера: tiny, base, small, medium, large
-        self.model = whisper.load_model(model_size)
+    def __init__(self, model_size: str = DEFAULT_WHISPER_MODEL_SIZE, parent_logger=None):
+        # Варианты размера: tiny, base, small, medium, large.
+        # Модель берется из общего реестра: загружается один раз на процесс и переиспользуется.
+        self.model_size = model_size
+        self.model_registry = get_model_registry(parent_logger)
+        self.model_registry.get_model(model_size)  # Загрузка (если модель еще не в памяти) при создании, как раньше
+
+    @property
+    def model(self):
+        # Ссылка не хранится в генераторе, чтобы реестр мог вытеснить модель при нехватке памяти
+        return self.model_registry.get_model(self.model_size)
+
     def transcribe(self, audio_path: str) -> List[Dict]:
         """
         Транскрибирует аудио-файл и возвращает список сегментов:
         [{'id': 0, 'start': 0.0, 'end': 2.4, 'text': '...'}, ...]
         """
-        result = self.model.transcribe(audio_path, word_timestamps=False)
+        return self._transcribe_with_model(self.model, audio_path)
+
+    def transcribe_clips(self, video_path: str, clip_ranges: List[tuple], padding_sec: float = 0.5,
+                         ffmpeg_path: str = "ffmpeg", progress_callback=None, is_cancelled=None) -> List[List[Dict]]:
+        """
+        Транскрибирует только фрагменты [start, end] исходника (обычно экспортируемые хайлайты),
+        а не весь файл. Каждый фрагмент читается из FFmpeg через pipe (без временных WAV) с запасом
+        padding_sec с обеих сторон, чтобы Whisper не обрезал слова на границах; время сегментов
+        пересчитывается от начала клипа.
+        Все фрагменты обрабатываются одной и той же загруженной моделью.
+        Возвращает список сегментов для каждого диапазона (в том же порядке).
+        При отмене (is_cancelled() == True) возвращает результаты только для обработанных диапазонов.
+        """
+        model = self.model
+        results: List[List[Dict]] = []
+        for i, (clip_start, clip_end) in enumerate(clip_ranges):
+            if is_cancelled and is_cancelled():
+                break
+            window_start = max(0.0, clip_start - padding_sec)
+            window_end = clip_end + padding_sec
+            audio = load_audio(video_path, window_start, window_end - window_start, ffmpeg_path=ffmpeg_path)
+            segments = self._transcribe_with_model(model, audio)
+            results.append(rebase_segments(segments, clip_start - window_start, clip_end - clip_start))
+            if progress_callback:
+                progress_callback(i + 1, len(clip_ranges))
+        return results
+
+    def transcribe_video(self, video_path: str, ffmpeg_path: str = "ffmpeg") -> List[Dict]:
+        """Транскрибирует аудиодорожку видео целиком, читая ее из FFmpeg через pipe (без WAV на диске)."""
+        return self._transcribe_with_model(self.model, load_audio(video_path, ffmpeg_path=ffmpeg_path))
+
+    @staticmethod
+    def _transcribe_with_model(model, audio) -> List[Dict]:
+        result = model.transcribe(audio, word_timestamps=False)
         segments: List[Dict] = []
         for seg in result.get("segments", []):
             segments.append({
@@ -237,4 +611,4 @@ class WhisperSubtitleGenerator:
                 "end": seg.get("end"),
                 "text": seg.get("text", "").strip()
             })
-        return segments
\ No newline at end of file
+        return segments
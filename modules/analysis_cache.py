@@ -0,0 +1,126 @@
+# automated_content_creator/modules/analysis_cache.py
+
+import hashlib
+import json
+import os
+import time
+
+from utils import get_cache_folder
+
+# Увеличивается при несовместимом изменении формата записей кеша
+CACHE_FORMAT_VERSION = 1
+
+
+def compute_video_fingerprint(video_path: str, sample_count: int = 8, sample_size: int = 64 * 1024) -> str:
+    """
+    Быстрый "отпечаток" видеофайла: размер, время изменения и несколько равномерно
+    распределенных по файлу блоков данных. Весь файл не читается, поэтому это дешево
+    даже для многогигабайтных записей.
+    """
+    stat = os.stat(video_path)
+    hasher = hashlib.sha1()
+    hasher.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    with open(video_path, "rb") as video_file:
+        if stat.st_size <= sample_count * sample_size:
+            hasher.update(video_file.read())
+        else:
+            step = (stat.st_size - sample_size) // (sample_count - 1)
+            for i in range(sample_count):
+                video_file.seek(i * step)
+                hasher.update(video_file.read(sample_size))
+    return hasher.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Постоянный кеш результатов анализа на диске.
+    Ключ - отпечаток видео + параметры детектора. Запись состоит из JSON с метаданными
+    (fps, список сцен и т.п.) и .npz с массивами NumPy (покадровые оценки и другие ряды).
+    """
+
+    def __init__(self, cache_dir: str | None = None, parent_logger=None):
+        self.cache_dir = cache_dir if cache_dir else get_cache_folder("analysis")
+        self.parent_logger = parent_logger
+
+    def _log(self, message, level="INFO"):
+        if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
+            self.parent_logger.log_message(f"(AnalysisCache) {message}", level=level)
+        else:
+            print(f"AnalysisCache [{level}] (no logger): {message}")
+
+    @staticmethod
+    def make_key(fingerprint: str, params: dict) -> str:
+        key_source = json.dumps({"version": CACHE_FORMAT_VERSION, "fingerprint": fingerprint, "params": params},
+                                sort_keys=True)
+        return hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+
+    def _entry_paths(self, key: str):
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self, key: str) -> dict | None:
+        """Возвращает сохраненные данные (метаданные + массивы в одном словаре) или None."""
+        meta_path, arrays_path = self._entry_paths(key)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                data = json.load(meta_file)
+            if data.get("format_version") != CACHE_FORMAT_VERSION:
+                return None
+            if os.path.exists(arrays_path):
+                import numpy as np
+                with np.load(arrays_path, allow_pickle=False) as arrays:
+                    for name in arrays.files:
+                        data[name] = arrays[name]
+            self._log(f"Найдена запись кеша {key[:12]}.", level="DEBUG")
+            return data
+        except Exception as e:
+            self._log(f"Не удалось прочитать запись кеша {key[:12]}: {type(e).__name__} - {e}", level="WARN")
+            return None
+
+    def save(self, key: str, data: dict):
+        """
+        Сохраняет данные. Значения-массивы NumPy пишутся в .npz, остальное - в JSON.
+        Запись атомарна: сначала временные файлы, затем os.replace.
+        """
+        meta_path, arrays_path = self._entry_paths(key)
+        meta = {"format_version": CACHE_FORMAT_VERSION, "saved_at": time.time()}
+        arrays = {}
+        for name, value in data.items():
+            if type(value).__module__ == "numpy" and hasattr(value, "shape"):
+                arrays[name] = value
+            elif value is not None:
+                meta[name] = value
+        try:
+            if arrays:
+                import numpy as np
+                tmp_arrays_path = f"{arrays_path}.tmp.npz"
+                np.savez(tmp_arrays_path, **arrays)
+                os.replace(tmp_arrays_path, arrays_path)
+            tmp_meta_path = f"{meta_path}.tmp"
+            with open(tmp_meta_path, "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file, ensure_ascii=False)
+            os.replace(tmp_meta_path, meta_path)
+            self._log(f"Результат анализа сохранен в кеш ({key[:12]}).", level="DEBUG")
+        except Exception as e:
+            self._log(f"Не удалось сохранить запись кеша {key[:12]}: {type(e).__name__} - {e}", level="WARN")
+
+    def get_size_bytes(self) -> int:
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def clear(self) -> int:
+        """Удаляет все записи кеша. Возвращает количество удаленных файлов."""
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith((".json", ".npz")):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError as e:
+                    self._log(f"Не удалось удалить '{entry.name}': {e}", level="WARN")
+        self._log(f"Кеш анализа очищен, удалено файлов: {removed}.", level="INFO")
+        return removed
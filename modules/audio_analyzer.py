@@ -0,0 +1,130 @@
+# automated_content_creator/modules/audio_analyzer.py
+
+import numpy as np
+
+from utils import AUDIO_SAMPLE_RATE, stream_audio_chunks
+
+# Увеличивается при изменении расчета признаков (входит в ключ кеша)
+AUDIO_FEATURES_VERSION = 1
+
+FRAME_SIZE = 512  # 32 мс при 16 кГц
+HOP_SIZE = 320  # 20 мс
+SPEECH_BAND_HZ = (300.0, 3400.0)  # Основная энергия речи
+SPEECH_BAND_RATIO_MIN = 0.5  # Доля энергии в речевой полосе, начиная с которой кадр похож на речь
+SPEECH_MIN_SNR_DB = 6.0  # Насколько кадр речи должен быть громче шумового фона
+SPEECH_SMOOTHING_FRAMES = 10  # Сглаживание маски речи (~200 мс), чтобы паузы между слогами не рвали ее
+LOUDNESS_RANGE_DB = 12.0  # Медиана громкости -> 0.5, медиана + 6 дБ -> 1.0
+
+# Вклад сигналов в итоговую оценку хайлайта
+SCORE_WEIGHTS = {"loudness": 0.4, "flux": 0.35, "speech": 0.25}
+
+
+class AudioFeatures:
+    """
+    Покадровые (шаг HOP_SIZE) аудиопризнаки всего видео: громкость (RMS, дБ),
+    спектральный поток (насколько резко меняется спектр) и доля энергии в речевой полосе.
+    score_ranges() усредняет их по произвольным интервалам за O(1) на интервал (кумулятивные суммы).
+    """
+    name = "audio"
+
+    def __init__(self, hop_sec: float, rms_db, flux, speech_band_ratio):
+        self.hop_sec = float(hop_sec)
+        self.rms_db = np.asarray(rms_db, dtype=np.float32)
+        self.flux = np.asarray(flux, dtype=np.float32)
+        self.speech_band_ratio = np.asarray(speech_band_ratio, dtype=np.float32)
+        self._prepare_signals()
+
+    def _prepare_signals(self):
+        """Нормирует сигналы относительно всего видео и строит кумулятивные суммы для усреднения."""
+        if len(self.rms_db) == 0:
+            empty = np.zeros(1, dtype=np.float64)
+            self._cumsums = {"loudness": empty, "flux": empty, "speech": empty}
+            return
+        noise_floor_db = np.percentile(self.rms_db, 10)
+        median_db = np.percentile(self.rms_db, 50)
+        loudness = np.clip((self.rms_db - median_db) / LOUDNESS_RANGE_DB + 0.5, 0.0, 1.0)
+
+        flux_reference = np.percentile(self.flux, 95)
+        flux = np.clip(self.flux / flux_reference, 0.0, 1.0) if flux_reference > 0 else np.zeros_like(self.flux)
+
+        speech_frames = ((self.speech_band_ratio >= SPEECH_BAND_RATIO_MIN)
+                         & (self.rms_db >= noise_floor_db + SPEECH_MIN_SNR_DB)).astype(np.float32)
+        kernel = np.ones(SPEECH_SMOOTHING_FRAMES, dtype=np.float32) / SPEECH_SMOOTHING_FRAMES
+        speech = (np.convolve(speech_frames, kernel, mode="same") >= 0.5).astype(np.float32)
+
+        self._cumsums = {name: np.concatenate(([0.0], np.cumsum(signal, dtype=np.float64)))
+                         for name, signal in (("loudness", loudness), ("flux", flux), ("speech", speech))}
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.rms_db) * self.hop_sec
+
+    def score_ranges(self, starts_sec, ends_sec) -> dict:
+        """
+        Средние нормированные признаки и итоговая оценка (0..1) для интервалов [starts_sec[i], ends_sec[i]).
+        Возвращает словарь массивов: 'score', 'loudness', 'flux', 'speech'.
+        """
+        frame_count = len(self.rms_db)
+        starts = np.clip(np.floor(np.asarray(starts_sec, dtype=np.float64) / self.hop_sec), 0, frame_count).astype(np.int64)
+        ends = np.clip(np.ceil(np.asarray(ends_sec, dtype=np.float64) / self.hop_sec), 0, frame_count).astype(np.int64)
+        counts = np.maximum(ends - starts, 1)
+        result = {name: ((cumsum[ends] - cumsum[starts]) / counts).astype(np.float32)
+                  for name, cumsum in self._cumsums.items()}
+        result["score"] = sum(SCORE_WEIGHTS[name] * result[name] for name in SCORE_WEIGHTS)
+        return result
+
+    def to_dict(self) -> dict:
+        """Для сохранения в AnalysisCache (массивы уходят в .npz)."""
+        return {"hop_sec": self.hop_sec, "rms_db": self.rms_db, "flux": self.flux,
+                "speech_band_ratio": self.speech_band_ratio}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["hop_sec"], data["rms_db"], data["flux"], data["speech_band_ratio"])
+
+
+def analyze_audio(video_path: str, ffmpeg_path: str = "ffmpeg", is_cancelled=None) -> AudioFeatures | None:
+    """
+    Считает AudioFeatures за один потоковый проход по аудиодорожке (FFmpeg -> pipe -> NumPy).
+    Кадры видео не декодируются. Куски обрабатываются векторно; хвост куска, не заполнивший
+    целый кадр, переносится в следующий, поэтому результат не зависит от размера кусков.
+    Возвращает None при отмене.
+    """
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    frequencies = np.fft.rfftfreq(FRAME_SIZE, 1.0 / AUDIO_SAMPLE_RATE)
+    speech_band = (frequencies >= SPEECH_BAND_HZ[0]) & (frequencies <= SPEECH_BAND_HZ[1])
+
+    carry = np.zeros(0, dtype=np.float32)
+    previous_magnitude = None
+    rms_parts, flux_parts, band_ratio_parts = [], [], []
+    audio_chunks = stream_audio_chunks(video_path, sample_rate=AUDIO_SAMPLE_RATE, ffmpeg_path=ffmpeg_path)
+    try:
+        for chunk in audio_chunks:
+            if is_cancelled and is_cancelled():
+                return None
+            samples = np.concatenate((carry, chunk)) if len(carry) else chunk
+            if len(samples) < FRAME_SIZE:
+                carry = samples
+                continue
+            frame_count = 1 + (len(samples) - FRAME_SIZE) // HOP_SIZE
+            frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE][:frame_count]
+            carry = samples[frame_count * HOP_SIZE:]
+
+            rms_parts.append(np.sqrt(np.mean(np.square(frames), axis=1)))
+            magnitude = np.abs(np.fft.rfft(frames * window, axis=1)).astype(np.float32)
+            power = np.square(magnitude)
+            band_ratio_parts.append(power[:, speech_band].sum(axis=1) / (power.sum(axis=1) + 1e-12))
+            # Спектральный поток: сумма положительных приращений амплитуд относительно предыдущего кадра
+            previous = np.empty_like(magnitude)
+            previous[0] = previous_magnitude if previous_magnitude is not None else magnitude[0]
+            previous[1:] = magnitude[:-1]
+            flux_parts.append(np.maximum(magnitude - previous, 0.0).sum(axis=1))
+            previous_magnitude = magnitude[-1]
+    finally:
+        audio_chunks.close()
+
+    if not rms_parts:
+        return AudioFeatures(HOP_SIZE / AUDIO_SAMPLE_RATE, [], [], [])
+    rms = np.concatenate(rms_parts)
+    return AudioFeatures(HOP_SIZE / AUDIO_SAMPLE_RATE, 20.0 * np.log10(rms + 1e-10),
+                         np.concatenate(flux_parts), np.concatenate(band_ratio_parts))
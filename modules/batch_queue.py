@@ -0,0 +1,393 @@
+# automated_content_creator/modules/batch_queue.py
+#
+# Очередь пакетной обработки: много видео (или следящая папка) проходят через
+# VideoPipeline (анализ -> лучшие N -> экспорт -> план) без участия пользователя.
+# Состояние очереди хранится в JSON и переживает перезапуск приложения.
+# Модуль не зависит от Qt: окно очереди (modules/batch_queue_dialog) подписывается на on_job_updated.
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from modules.pipeline import VideoPipeline, DEFAULT_TOP_N
+
+STATE_FORMAT_VERSION = 1
+STATE_FILENAME = "batch_queue.json"
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_DONE = "done"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
+JOB_STATUS_TITLES = {
+    JOB_STATUS_PENDING: "В очереди",
+    JOB_STATUS_RUNNING: "Выполняется",
+    JOB_STATUS_DONE: "Готово",
+    JOB_STATUS_FAILED: "Ошибка",
+    JOB_STATUS_CANCELLED: "Отменено",
+}
+FINISHED_STATUSES = (JOB_STATUS_DONE, JOB_STATUS_FAILED, JOB_STATUS_CANCELLED)
+
+MAX_CONCURRENT_JOBS_LIMIT = 8
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv")
+WATCH_POLL_INTERVAL_SEC = 5.0
+# Прогресс сохраняется на диск не чаще этого интервала (смена статуса сохраняется сразу)
+PROGRESS_SAVE_INTERVAL_SEC = 2.0
+# Сколько shutdown() ждет прерывания выполняющихся заданий. Whisper не прерывается на середине,
+# поэтому дольше не ждем: задание все равно сохранено как ожидающее и выполнится после перезапуска.
+SHUTDOWN_WAIT_SEC = 3.0
+
+
+def new_job(video_path: str, options: dict) -> dict:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "video_path": os.path.normpath(video_path),
+        "options": dict(options),  # {'output_folder', 'top_n', 'export_preset', 'generate_subtitles'}
+        "status": JOB_STATUS_PENDING,
+        "stage": "",
+        "progress": 0,
+        "message": "",
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class BatchQueue:
+    """
+    Очередь заданий. Одновременно выполняется не больше max_concurrent_jobs заданий,
+    каждое в своем фоновом (daemon) потоке: незавершенное задание не задерживает выход из приложения.
+    on_job_updated(job) вызывается из рабочих потоков с копией задания.
+    Задания, прерванные закрытием приложения, после перезапуска снова попадают в очередь.
+    """
+
+    def __init__(self, state_path: str | None = None, max_concurrent_jobs: int = 1, parent_logger=None,
+                 on_job_updated=None):
+        if state_path is None:
+            from utils import get_app_data_folder
+            state_path = os.path.join(get_app_data_folder("batch"), STATE_FILENAME)
+        self.state_path = state_path
+        self.parent_logger = parent_logger
+        self.on_job_updated = on_job_updated
+        self.settings = {}
+        self.max_concurrent_jobs = max(1, min(MAX_CONCURRENT_JOBS_LIMIT, int(max_concurrent_jobs)))
+
+        self._lock = threading.RLock()
+        self._jobs = []  # Порядок списка - порядок выполнения
+        self._pipelines = {}  # {job_id: VideoPipeline} выполняющихся заданий
+        self._running = False
+        self._shutting_down = False
+        self._last_save_time = 0.0
+
+        self.watch_folder = None
+        self.watch_options = None
+        self._watch_seen_paths = set()  # Уже поставленные из папки файлы (чтобы не добавлять их после очистки)
+        self._watch_stop_event = None
+        self._load_state()
+
+    def _log(self, message, level="INFO"):
+        if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
+            self.parent_logger.log_message(f"(BatchQueue) {message}", level=level)
+        else:
+            print(f"BatchQueue [{level}] (no logger): {message}")
+
+    # --- Состояние на диске ---
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError) as e:
+            self._log(f"Не удалось прочитать состояние очереди '{self.state_path}': {e}", level="WARN")
+            return
+        if state.get("version") != STATE_FORMAT_VERSION:
+            self._log("Состояние очереди сохранено в другом формате и будет проигнорировано.", level="WARN")
+            return
+        interrupted = 0
+        for job in state.get("jobs", []):
+            if job.get("status") == JOB_STATUS_RUNNING:
+                job.update(status=JOB_STATUS_PENDING, stage="", progress=0,
+                           message="Прервано закрытием приложения, будет выполнено заново")
+                interrupted += 1
+            self._jobs.append(job)
+        watch = state.get("watch")
+        if watch:
+            self.watch_folder, self.watch_options = watch.get("folder"), watch.get("options")
+            self._watch_seen_paths = set(watch.get("seen", []))
+        self._log(f"Восстановлена очередь: {len(self._jobs)} заданий (прерванных: {interrupted}).")
+
+    def _save_state_locked(self):
+        state = {
+            "version": STATE_FORMAT_VERSION,
+            "jobs": self._jobs,
+            "watch": {"folder": self.watch_folder, "options": self.watch_options,
+                      "seen": sorted(self._watch_seen_paths)} if self.watch_folder else None,
+        }
+        temp_path = self.state_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as state_file:
+                json.dump(state, state_file, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.state_path)  # Атомарно: файл не останется недописанным
+            self._last_save_time = time.monotonic()
+        except OSError as e:
+            self._log(f"Не удалось сохранить состояние очереди: {e}", level="ERROR")
+
+    # --- Управление заданиями ---
+
+    def jobs(self) -> list:
+        with self._lock:
+            return [dict(job) for job in self._jobs]
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def has_pending_work(self) -> bool:
+        """Есть ожидающие задания или следящая папка - очередь есть смысл запускать без участия пользователя."""
+        with self._lock:
+            return bool(self.watch_folder) or any(job["status"] == JOB_STATUS_PENDING for job in self._jobs)
+
+    def add_files(self, video_paths, options: dict) -> list:
+        """Добавляет видео в очередь (файлы, уже ожидающие или выполняющиеся, пропускаются)."""
+        added = []
+        with self._lock:
+            active_paths = {job["video_path"] for job in self._jobs if job["status"] not in FINISHED_STATUSES}
+            for video_path in video_paths:
+                job = new_job(video_path, options)
+                if job["video_path"] in active_paths:
+                    continue
+                active_paths.add(job["video_path"])
+                self._jobs.append(job)
+                added.append(dict(job))
+            if added:
+                self._save_state_locked()
+                for job in added:
+                    self._notify(job)
+                self._schedule_locked()
+        if added:
+            self._log(f"Добавлено в очередь: {len(added)} видео.")
+        return added
+
+    def remove_jobs(self, job_ids):
+        """Удаляет задания из очереди (выполняющиеся не удаляются - их нужно сначала отменить)."""
+        with self._lock:
+            self._jobs = [job for job in self._jobs
+                          if job["id"] not in job_ids or job["status"] == JOB_STATUS_RUNNING]
+            self._save_state_locked()
+
+    def clear_finished(self):
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job["status"] not in FINISHED_STATUSES]
+            self._save_state_locked()
+
+    def cancel_job(self, job_id: str):
+        with self._lock:
+            job = self._find_job_locked(job_id)
+            if job is None:
+                return
+            if job["status"] == JOB_STATUS_PENDING:
+                self._update_job_locked(job, status=JOB_STATUS_CANCELLED, message="Отменено до запуска")
+            elif job["status"] == JOB_STATUS_RUNNING and job_id in self._pipelines:
+                self._pipelines[job_id].cancel()
+                self._update_job_locked(job, message="Отмена...")
+
+    def retry_job(self, job_id: str):
+        with self._lock:
+            job = self._find_job_locked(job_id)
+            if job is not None and job["status"] in (JOB_STATUS_FAILED, JOB_STATUS_CANCELLED):
+                self._update_job_locked(job, status=JOB_STATUS_PENDING, stage="", progress=0, message="",
+                                        error=None, result=None)
+                self._schedule_locked()
+
+    def set_max_concurrent_jobs(self, max_concurrent_jobs: int):
+        with self._lock:
+            self.max_concurrent_jobs = max(1, min(MAX_CONCURRENT_JOBS_LIMIT, int(max_concurrent_jobs)))
+            self._schedule_locked()
+
+    def update_settings(self, settings: dict):
+        """Настройки приложения (get_current_settings) для заданий, которые запустятся после вызова."""
+        with self._lock:
+            self.settings = dict(settings)
+
+    def start(self):
+        with self._lock:
+            self._running = True
+            self._schedule_locked()
+        self._log(f"Очередь запущена (одновременно заданий: {self.max_concurrent_jobs}).")
+
+    def pause(self):
+        """Новые задания не запускаются; выполняющиеся завершаются."""
+        with self._lock:
+            self._running = False
+        self._log("Очередь приостановлена.")
+
+    def shutdown(self, wait_sec: float = SHUTDOWN_WAIT_SEC):
+        """
+        Останавливает очередь при выходе из приложения. Выполняющиеся задания прерываются
+        и сохраняются как ожидающие - они будут выполнены после следующего запуска.
+        Ждет завершения потоков заданий не дольше wait_sec: этап, который нельзя прервать
+        (распознавание Whisper), не задерживает закрытие окна.
+        """
+        self.stop_watching()
+        with self._lock:
+            self._running = False
+            self._shutting_down = True
+            pipelines = list(self._pipelines.values())
+        for pipeline in pipelines:
+            pipeline.cancel()
+        deadline = time.monotonic() + wait_sec
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pipelines:
+                    break
+            time.sleep(0.05)
+        with self._lock:
+            if self._pipelines:
+                self._log(f"Не дождались прерывания заданий ({len(self._pipelines)}), "
+                          f"они будут выполнены заново после перезапуска.", level="WARN")
+            for job in self._jobs:
+                if job["status"] == JOB_STATUS_RUNNING:
+                    job.update(status=JOB_STATUS_PENDING, stage="", progress=0,
+                               message="Прервано закрытием приложения, будет выполнено заново")
+            self._save_state_locked()
+
+    # --- Выполнение ---
+
+    def _find_job_locked(self, job_id: str) -> dict | None:
+        for job in self._jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def _notify(self, job: dict):
+        if self.on_job_updated:
+            try:
+                self.on_job_updated(job)
+            except Exception as e:
+                self._log(f"Ошибка обработчика обновления задания: {type(e).__name__} - {e}", level="WARN")
+
+    def _update_job_locked(self, job: dict, save: bool = True, **changes):
+        job.update(changes, updated_at=time.time())
+        if save or time.monotonic() - self._last_save_time >= PROGRESS_SAVE_INTERVAL_SEC:
+            self._save_state_locked()
+        self._notify(dict(job))
+
+    def _schedule_locked(self):
+        if not self._running or self._shutting_down:
+            return
+        for job in self._jobs:
+            if len(self._pipelines) >= self.max_concurrent_jobs:
+                break
+            if job["status"] != JOB_STATUS_PENDING:
+                continue
+            pipeline = VideoPipeline(self.settings, job["options"], parent_logger=self.parent_logger)
+            self._pipelines[job["id"]] = pipeline
+            self._update_job_locked(job, status=JOB_STATUS_RUNNING, stage="analyze", progress=0,
+                                    message="Запуск...", error=None)
+            threading.Thread(target=self._run_job, args=(job, pipeline), name="BatchJob", daemon=True).start()
+
+    def _run_job(self, job: dict, pipeline: VideoPipeline):
+        def on_progress(percent, stage, message):
+            with self._lock:
+                self._update_job_locked(job, save=False, progress=percent, stage=stage, message=message)
+
+        self._log(f"Задание запущено: '{os.path.basename(job['video_path'])}'.")
+        try:
+            if not os.path.exists(job["video_path"]):
+                raise RuntimeError(f"Файл видео не найден: {job['video_path']}")
+            result = pipeline.run(job["video_path"], progress_callback=on_progress)
+            final_changes = dict(status=JOB_STATUS_DONE, progress=100, result=result,
+                                 message=f"Экспортировано клипов: {len(result['exported_clips'])}")
+        except InterruptedError:
+            if self._shutting_down:
+                final_changes = dict(status=JOB_STATUS_PENDING, stage="", progress=0,
+                                     message="Прервано закрытием приложения, будет выполнено заново")
+            else:
+                final_changes = dict(status=JOB_STATUS_CANCELLED, message="Отменено")
+        except Exception as e:
+            error_msg = f"{type(e).__name__} - {e}"
+            self._log(f"Задание '{os.path.basename(job['video_path'])}' завершилось ошибкой: {error_msg}",
+                      level="ERROR")
+            final_changes = dict(status=JOB_STATUS_FAILED, error=error_msg, message=error_msg)
+
+        with self._lock:
+            self._pipelines.pop(job["id"], None)
+            self._update_job_locked(job, **final_changes)
+            self._log(f"Задание '{os.path.basename(job['video_path'])}': {JOB_STATUS_TITLES[job['status']]}.")
+            self._schedule_locked()
+
+    # --- Следящая папка ---
+
+    def start_watching(self, folder: str, options: dict, poll_interval_sec: float = WATCH_POLL_INTERVAL_SEC):
+        """
+        Периодически проверяет папку и ставит в очередь новые видео. Файл добавляется, когда его
+        размер и время изменения не менялись между двумя проверками (копирование завершено).
+        """
+        self.stop_watching()
+        with self._lock:
+            if self.watch_folder != os.path.normpath(folder):
+                self._watch_seen_paths = set()
+            self.watch_folder = os.path.normpath(folder)
+            self.watch_options = dict(options)
+            self._save_state_locked()
+            stop_event = self._watch_stop_event = threading.Event()
+        threading.Thread(target=self._watch_loop, args=(self.watch_folder, self.watch_options, stop_event,
+                                                        poll_interval_sec),
+                         name="BatchFolderWatch", daemon=True).start()
+        self._log(f"Слежение за папкой '{self.watch_folder}' включено.")
+
+    def resume_watching(self):
+        """Возобновляет слежение, сохраненное в состоянии очереди (после перезапуска)."""
+        if self.watch_folder and self._watch_stop_event is None and os.path.isdir(self.watch_folder):
+            self.start_watching(self.watch_folder, self.watch_options or {})
+
+    def stop_watching(self, forget: bool = False):
+        with self._lock:
+            if self._watch_stop_event is not None:
+                self._watch_stop_event.set()
+                self._watch_stop_event = None
+                self._log(f"Слежение за папкой '{self.watch_folder}' остановлено.")
+            if forget:
+                self.watch_folder = None
+                self.watch_options = None
+                self._watch_seen_paths = set()
+                self._save_state_locked()
+
+    def _watch_loop(self, folder: str, options: dict, stop_event: threading.Event, poll_interval_sec: float):
+        previous_snapshot = {}
+        while not stop_event.is_set():
+            snapshot = {}
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_file() and entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                            stat = entry.stat()
+                            snapshot[os.path.normpath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+            except OSError as e:
+                self._log(f"Не удалось прочитать папку '{folder}': {e}", level="WARN")
+
+            with self._lock:
+                known_paths = {job["video_path"] for job in self._jobs} | self._watch_seen_paths
+            ready = [path for path, signature in snapshot.items()
+                     if path not in known_paths and previous_snapshot.get(path) == signature]
+            if ready:
+                with self._lock:
+                    self._watch_seen_paths.update(ready)
+                self.add_files(sorted(ready), options)
+            previous_snapshot = snapshot
+            stop_event.wait(poll_interval_sec)
+
+
+def default_job_options(settings: dict, output_folder: str) -> dict:
+    """Параметры задания по умолчанию из настроек приложения."""
+    return {
+        "output_folder": output_folder,
+        "top_n": settings.get('batch_top_n', DEFAULT_TOP_N),
+        "export_preset": settings.get('batch_export_preset', "Original MP4"),
+        "generate_subtitles": settings.get('batch_generate_subtitles', False),
+    }
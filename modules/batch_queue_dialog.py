@@ -0,0 +1,257 @@
+# automated_content_creator/modules/batch_queue_dialog.py
+
+import os
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, QSpinBox, QCheckBox,
+    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar,
+    QFileDialog, QLabel, QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+
+from modules.batch_queue import (JOB_STATUS_TITLES, JOB_STATUS_RUNNING, MAX_CONCURRENT_JOBS_LIMIT,
+                                 VIDEO_EXTENSIONS)
+from modules.pipeline import STAGE_TITLES
+from modules.settings_dialog import (CONFIG_BATCH_MAX_CONCURRENT_JOBS, CONFIG_BATCH_TOP_N, CONFIG_BATCH_EXPORT_PRESET,
+                                     CONFIG_BATCH_GENERATE_SUBTITLES, CONFIG_BATCH_AUTO_START,
+                                     CONFIG_DEFAULT_EXPORT_FOLDER)
+from utils import get_default_output_folder
+
+
+class _JobUpdateBridge(QObject):
+    """Переносит обновления заданий из рабочих потоков очереди в поток GUI (queued-соединение)."""
+    job_updated = pyqtSignal(dict)
+
+
+class BatchQueueDialog(QDialog):
+    """
+    Окно очереди пакетной обработки: добавление файлов и следящей папки,
+    параметры заданий, число одновременных заданий и прогресс каждого задания.
+    Немодальное: очередь продолжает работать, пока окно закрыто.
+    """
+    COLUMN_FILE, COLUMN_STATUS, COLUMN_STAGE, COLUMN_PROGRESS, COLUMN_MESSAGE = range(5)
+
+    def __init__(self, batch_queue, export_module_instance, settings_dialog, parent=None):
+        super().__init__(parent)
+        self.batch_queue = batch_queue
+        self.export_module = export_module_instance
+        self.settings_dialog = settings_dialog
+        self.settings = settings_dialog.settings
+        self.parent_window = parent
+        self._rows = {}  # {job_id: номер строки}
+
+        self.setWindowTitle("Пакетная обработка")
+        self.setMinimumSize(900, 500)
+
+        self._bridge = _JobUpdateBridge()
+        self._bridge.job_updated.connect(self._on_job_updated)
+        self.batch_queue.on_job_updated = self._bridge.job_updated.emit
+
+        main_layout = QVBoxLayout(self)
+
+        # --- Параметры заданий ---
+        form_layout = QFormLayout()
+        self.max_concurrent_spinbox = QSpinBox()
+        self.max_concurrent_spinbox.setRange(1, MAX_CONCURRENT_JOBS_LIMIT)
+        self.max_concurrent_spinbox.setValue(int(self.settings.value(CONFIG_BATCH_MAX_CONCURRENT_JOBS, 1)))
+        self.max_concurrent_spinbox.setToolTip(
+            "Сколько видео обрабатывается одновременно. Анализ и экспорт сами используют несколько ядер,\n"
+            "поэтому больше 1-2 имеет смысл только на мощных машинах."
+        )
+        self.max_concurrent_spinbox.valueChanged.connect(self._on_max_concurrent_changed)
+        form_layout.addRow("Одновременных заданий:", self.max_concurrent_spinbox)
+
+        self.top_n_spinbox = QSpinBox()
+        self.top_n_spinbox.setRange(0, 100)
+        self.top_n_spinbox.setSpecialValueText("Все")
+        self.top_n_spinbox.setValue(int(self.settings.value(CONFIG_BATCH_TOP_N, 5)))
+        self.top_n_spinbox.setToolTip("Сколько лучших хайлайтов (по оценке) экспортировать из каждого видео.")
+        form_layout.addRow("Лучших хайлайтов на видео:", self.top_n_spinbox)
+
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItems(self.export_module.get_available_presets())
+        preset_index = self.preset_combo.findText(self.settings.value(CONFIG_BATCH_EXPORT_PRESET, "Original MP4"))
+        self.preset_combo.setCurrentIndex(max(0, preset_index))
+        form_layout.addRow("Пресет экспорта:", self.preset_combo)
+
+        self.subtitles_checkbox = QCheckBox("Создавать субтитры (.srt)")
+        self.subtitles_checkbox.setChecked(self.settings.value(CONFIG_BATCH_GENERATE_SUBTITLES, False, type=bool))
+        form_layout.addRow(self.subtitles_checkbox)
+
+        output_folder_layout = QHBoxLayout()
+        self.output_folder_edit = QLineEdit(self.settings.value(CONFIG_DEFAULT_EXPORT_FOLDER,
+                                                                get_default_output_folder()))
+        output_folder_button = QPushButton("Обзор...")
+        output_folder_button.clicked.connect(self._browse_output_folder)
+        output_folder_layout.addWidget(self.output_folder_edit)
+        output_folder_layout.addWidget(output_folder_button)
+        form_layout.addRow("Папка результатов:", output_folder_layout)
+
+        self.watch_label = QLabel()
+        form_layout.addRow("Следящая папка:", self.watch_label)
+
+        self.auto_start_checkbox = QCheckBox("Запускать очередь при старте приложения")
+        self.auto_start_checkbox.setToolTip(
+            "Если после перезапуска в очереди есть ожидающие задания или задана следящая папка,\n"
+            "очередь продолжит работу сама, без открытия этого окна."
+        )
+        self.auto_start_checkbox.setChecked(self.settings.value(CONFIG_BATCH_AUTO_START, True, type=bool))
+        self.auto_start_checkbox.toggled.connect(lambda checked: self.settings.setValue(CONFIG_BATCH_AUTO_START, checked))
+        form_layout.addRow(self.auto_start_checkbox)
+        main_layout.addLayout(form_layout)
+
+        # --- Таблица заданий ---
+        self.jobs_table = QTableWidget()
+        self.jobs_table.setColumnCount(5)
+        self.jobs_table.setHorizontalHeaderLabels(["Видео", "Статус", "Этап", "Прогресс", "Сообщение"])
+        header = self.jobs_table.horizontalHeader()
+        header.setSectionResizeMode(self.COLUMN_FILE, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(self.COLUMN_STATUS, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(self.COLUMN_STAGE, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(self.COLUMN_PROGRESS, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(self.COLUMN_MESSAGE, QHeaderView.ResizeMode.Stretch)
+        self.jobs_table.setColumnWidth(self.COLUMN_PROGRESS, 140)
+        self.jobs_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.jobs_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.jobs_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.jobs_table.setAlternatingRowColors(True)
+        main_layout.addWidget(self.jobs_table, stretch=1)
+
+        # --- Кнопки ---
+        buttons_layout = QHBoxLayout()
+        add_files_button = QPushButton("Добавить видео...")
+        add_files_button.clicked.connect(self._add_files)
+        buttons_layout.addWidget(add_files_button)
+        self.watch_button = QPushButton()
+        self.watch_button.clicked.connect(self._toggle_watch_folder)
+        buttons_layout.addWidget(self.watch_button)
+        buttons_layout.addStretch(1)
+        cancel_button = QPushButton("Отменить выбранные")
+        cancel_button.clicked.connect(lambda: self._for_selected_jobs(self.batch_queue.cancel_job))
+        buttons_layout.addWidget(cancel_button)
+        retry_button = QPushButton("Повторить")
+        retry_button.clicked.connect(lambda: self._for_selected_jobs(self.batch_queue.retry_job))
+        buttons_layout.addWidget(retry_button)
+        remove_button = QPushButton("Удалить выбранные")
+        remove_button.clicked.connect(self._remove_selected)
+        buttons_layout.addWidget(remove_button)
+        clear_button = QPushButton("Очистить завершенные")
+        clear_button.clicked.connect(self._clear_finished)
+        buttons_layout.addWidget(clear_button)
+        self.start_pause_button = QPushButton()
+        self.start_pause_button.clicked.connect(self._toggle_running)
+        buttons_layout.addWidget(self.start_pause_button)
+        main_layout.addLayout(buttons_layout)
+
+        self._reload_table()
+        self._update_controls()
+
+    def _log(self, message, level="INFO"):
+        if self.parent_window and hasattr(self.parent_window, 'log_message'):
+            self.parent_window.log_message(f"BatchQueueDialog: {message}", level=level)
+
+    def current_job_options(self) -> dict:
+        """Параметры для новых заданий (также сохраняются в настройках)."""
+        self.settings.setValue(CONFIG_BATCH_TOP_N, self.top_n_spinbox.value())
+        self.settings.setValue(CONFIG_BATCH_EXPORT_PRESET, self.preset_combo.currentText())
+        self.settings.setValue(CONFIG_BATCH_GENERATE_SUBTITLES, self.subtitles_checkbox.isChecked())
+        return {
+            "output_folder": self.output_folder_edit.text() or get_default_output_folder(),
+            "top_n": self.top_n_spinbox.value(),
+            "export_preset": self.preset_combo.currentText(),
+            "generate_subtitles": self.subtitles_checkbox.isChecked(),
+        }
+
+    # --- Действия ---
+
+    def _browse_output_folder(self):
+        path = QFileDialog.getExistingDirectory(self, "Папка для результатов пакетной обработки",
+                                                self.output_folder_edit.text())
+        if path:
+            self.output_folder_edit.setText(path)
+
+    def _add_files(self):
+        patterns = " ".join(f"*{extension}" for extension in VIDEO_EXTENSIONS)
+        paths, _ = QFileDialog.getOpenFileNames(self, "Добавить видео в очередь", self.output_folder_edit.text(),
+                                                f"Видео файлы ({patterns});;Все файлы (*)")
+        if paths:
+            self.batch_queue.update_settings(self.settings_dialog.get_current_settings())
+            self.batch_queue.add_files(paths, self.current_job_options())
+
+    def _toggle_watch_folder(self):
+        if self.batch_queue.watch_folder:
+            self.batch_queue.stop_watching(forget=True)
+        else:
+            folder = QFileDialog.getExistingDirectory(self, "Папка, за которой следить")
+            if not folder:
+                return
+            self.batch_queue.update_settings(self.settings_dialog.get_current_settings())
+            self.batch_queue.start_watching(folder, self.current_job_options())
+        self._update_controls()
+
+    def _toggle_running(self):
+        if self.batch_queue.is_running():
+            self.batch_queue.pause()
+        else:
+            self.batch_queue.update_settings(self.settings_dialog.get_current_settings())
+            self.batch_queue.start()
+        self._update_controls()
+
+    def _on_max_concurrent_changed(self, value):
+        self.settings.setValue(CONFIG_BATCH_MAX_CONCURRENT_JOBS, value)
+        self.batch_queue.set_max_concurrent_jobs(value)
+
+    def _selected_job_ids(self) -> list:
+        rows = {index.row() for index in self.jobs_table.selectionModel().selectedRows()}
+        return [self.jobs_table.item(row, self.COLUMN_FILE).data(Qt.ItemDataRole.UserRole) for row in sorted(rows)]
+
+    def _for_selected_jobs(self, action):
+        for job_id in self._selected_job_ids():
+            action(job_id)
+
+    def _remove_selected(self):
+        self.batch_queue.remove_jobs(set(self._selected_job_ids()))
+        self._reload_table()
+
+    def _clear_finished(self):
+        self.batch_queue.clear_finished()
+        self._reload_table()
+
+    # --- Отображение ---
+
+    def _update_controls(self):
+        self.start_pause_button.setText("Пауза" if self.batch_queue.is_running() else "Запустить очередь")
+        if self.batch_queue.watch_folder:
+            self.watch_label.setText(self.batch_queue.watch_folder)
+            self.watch_button.setText("Не следить за папкой")
+        else:
+            self.watch_label.setText("не задана")
+            self.watch_button.setText("Следить за папкой...")
+
+    def _reload_table(self):
+        self.jobs_table.setRowCount(0)
+        self._rows = {}
+        for job in self.batch_queue.jobs():
+            self._on_job_updated(job)
+
+    def _on_job_updated(self, job: dict):
+        row = self._rows.get(job["id"])
+        if row is None:
+            row = self.jobs_table.rowCount()
+            self.jobs_table.insertRow(row)
+            self._rows[job["id"]] = row
+            file_item = QTableWidgetItem(os.path.basename(job["video_path"]))
+            file_item.setData(Qt.ItemDataRole.UserRole, job["id"])
+            file_item.setToolTip(job["video_path"])
+            self.jobs_table.setItem(row, self.COLUMN_FILE, file_item)
+            progress_bar = QProgressBar()
+            progress_bar.setRange(0, 100)
+            self.jobs_table.setCellWidget(row, self.COLUMN_PROGRESS, progress_bar)
+
+        self.jobs_table.setItem(row, self.COLUMN_STATUS, QTableWidgetItem(JOB_STATUS_TITLES.get(job["status"], "")))
+        stage_title = STAGE_TITLES.get(job["stage"], "") if job["status"] == JOB_STATUS_RUNNING else ""
+        self.jobs_table.setItem(row, self.COLUMN_STAGE, QTableWidgetItem(stage_title))
+        message_item = QTableWidgetItem(job.get("message") or "")
+        message_item.setToolTip(job.get("error") or job.get("message") or "")
+        self.jobs_table.setItem(row, self.COLUMN_MESSAGE, message_item)
+        self.jobs_table.cellWidget(row, self.COLUMN_PROGRESS).setValue(int(job.get("progress") or 0))
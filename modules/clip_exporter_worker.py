@@ -1,10 +1,21 @@
 # automated_content_creator/modules/clip_exporter_worker.py
 
+import math
 import os
+import threading
+import time
 import traceback
-from PyQt6.QtCore import QObject, pyqtSignal, QDateTime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 import re
 
+from modules.export_manifest import (DRAFTS_SUBFOLDER, CLIP_STATUS_DRAFT, CLIP_STATUS_DRAFT_FAILED,
+                                     CLIP_STATUS_FINAL, CLIP_STATUS_FINAL_FAILED, build_export_manifest,
+                                     build_export_manifest_path, collect_reserved_paths, load_export_manifest,
+                                     save_export_manifest)
+from modules.export_module import DRAFT_PREVIEW_EXTENSION
+from modules.ffmpeg_runner import format_eta
+
 try:
     from sanitize_filename import sanitize as original_sanitize
 except ImportError:
@@ -33,93 +44,468 @@ def fallback_sanitize(filename_str: str, max_len: int = 60) -> str:  # Увел
     return name_part + ext_part
 
 
-class ClipExporterWorker(QObject):
-    export_progress = pyqtSignal(int, int, str)
-    export_finished_one = pyqtSignal(str, bool, str)  # path, success, original_description
-    export_all_finished = pyqtSignal(list, int)
-    export_error = pyqtSignal(str)
+def resolve_parallel_jobs(requested_jobs: int | None = None) -> int:
+    """
+    Число одновременных процессов FFmpeg при экспорте.
+    0/None - автоматически: libx264 сам использует несколько потоков, поэтому берем ~1 задачу на 4 ядра.
+    """
+    if requested_jobs and requested_jobs > 0:
+        return int(requested_jobs)
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+# export_progress считает в долях клипа: done/total = готовые клипы * 100 + доли выполняющихся (по -progress FFmpeg)
+EXPORT_PROGRESS_UNITS_PER_CLIP = 100
+
+# Пакетная нарезка (CuttingEngine.cut_clips_batch): включается, когда коротких клипов не меньше
+# BATCH_CUT_MIN_CLIPS; в одном процессе FFmpeg - не больше BATCH_CUT_MAX_CLIPS_PER_PROCESS клипов
+# (каждый клип - отдельный декодер и кодировщик в памяти процесса).
+BATCH_CUT_MIN_CLIPS = 4
+BATCH_CUT_MAX_CLIP_SEC = 30.0
+BATCH_CUT_MAX_CLIPS_PER_PROCESS = 8
+
 
-    def __init__(self, cutting_engine, export_module_instance, parent_logger=None):
-        super().__init__()
+class ExportError(Exception):
+    """Экспорт невозможно начать (не заданы CuttingEngine или ExportModule)."""
+
+
+class ClipExporter:
+    """
+    Экспорт списка хайлайтов без Qt. Прогресс и результаты передаются через callback:
+    progress_callback(done, total, message) и clip_exported_callback(path, success, original_description)
+    (клипы - строго в исходном порядке). Callback вызываются из потоков пула экспорта.
+    done/total прогресса - в единицах EXPORT_PROGRESS_UNITS_PER_CLIP на клип, message - с ETA.
+    Много коротких клипов режутся пачками (batch_cutting), итоговая скорость - в last_export_stats.
+    Двухэтапный экспорт: process_export_list(draft=True) создает быстрые превью и манифест,
+    promote_to_final() кодирует в полном качестве только одобренные клипы.
+    Для окна используется адаптер modules.qt_workers.ClipExporterWorker с прежними сигналами.
+    """
+
+    def __init__(self, cutting_engine, export_module_instance, parent_logger=None, max_parallel_jobs=None,
+                 subtitle_options=None, progress_callback=None, clip_exported_callback=None, batch_cutting=True):
         self.cutting_engine = cutting_engine
         self.export_module = export_module_instance  # Теперь это экземпляр ExportModule
         self.parent_logger = parent_logger
+        self.max_parallel_jobs = resolve_parallel_jobs(max_parallel_jobs)
         self._is_cancelled = False
-        self.temp_dir_for_cutting = ""
+        self._completed_clips = 0  # Читается потоками пула для отчета о прогрессе
+        self._total_clips = 0
+        self._running_fractions = {}  # индекс задачи -> доля выполнения по прогрессу FFmpeg
+        self._progress_lock = threading.Lock()
+        self._export_start_time = time.monotonic()
+        # None - без субтитров; иначе {'model_size', 'padding_sec', 'ffmpeg_path'}
+        self.subtitle_options = subtitle_options
+        # Много коротких клипов режутся пачками, по несколько клипов на процесс FFmpeg
+        self.batch_cutting = batch_cutting
+        # Итоги последнего экспорта: {'clips', 'elapsed_sec', 'clips_per_sec', 'mode', 'ffmpeg_tasks'}
+        self.last_export_stats = None
+        self.last_manifest_path = None  # Манифест последнего чернового или финального экспорта
+        self.progress_callback = progress_callback
+        self.clip_exported_callback = clip_exported_callback
         self._log_prefix = self.__class__.__name__
-        self._log(f"Инициализирован.", level="DEBUG")
+        self._log(f"Инициализирован. Параллельных задач FFmpeg: {self.max_parallel_jobs}.", level="DEBUG")
 
     def _log(self, message: str, level: str = "INFO"):
-        timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss.zzz")
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         full_message = f"{timestamp} [{self._log_prefix}] [{level}]: {message}"
         if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
             self.parent_logger.log_message(f"({self._log_prefix}) {message}", level=level)
         else:
             print(full_message)
 
+    def log(self, message: str, level: str = "INFO"):
+        """Запись в лог экспортера - для адаптеров (qt_workers) и других внешних вызовов."""
+        self._log(message, level=level)
+
+    def _report_progress(self, message: str):
+        if not self.progress_callback:
+            return
+        with self._progress_lock:
+            running = sum(self._running_fractions.values())
+        total_units = self._total_clips * EXPORT_PROGRESS_UNITS_PER_CLIP
+        done_units = min(total_units, int((self._completed_clips + running) * EXPORT_PROGRESS_UNITS_PER_CLIP))
+        self.progress_callback(done_units, total_units, message)
+
+    def _overall_eta_sec(self) -> float | None:
+        """Оценка оставшегося времени всего экспорта по средней скорости с его начала."""
+        with self._progress_lock:
+            running = sum(self._running_fractions.values())
+        done_fraction = (self._completed_clips + running) / max(1, self._total_clips)
+        if done_fraction < 0.01:
+            return None
+        elapsed_sec = time.monotonic() - self._export_start_time
+        return elapsed_sec * (1.0 - done_fraction) / done_fraction
+
+    def _on_job_progress(self, job: dict, progress: dict):
+        """Прогресс FFmpeg одной задачи (из потока пула) -> общий прогресс экспорта."""
+        fraction = progress["fraction"]
+        if fraction is None or self._is_cancelled:
+            return
+        with self._progress_lock:
+            self._running_fractions[job['index']] = fraction
+        speed = f", {progress['speed']:.1f}x" if progress["speed"] else ""
+        self._report_progress(f"Клип #{job['number']}: {fraction * 100:.0f}%{speed}, "
+                              f"осталось ~{format_eta(progress['eta_sec'])}. "
+                              f"Весь экспорт: ~{format_eta(self._overall_eta_sec())}")
+
+    def _on_batch_progress(self, batch: list, progress: dict):
+        """Прогресс пачки клипов: все клипы пачки пишутся одновременно и получают одну долю."""
+        fraction = progress["fraction"]
+        if fraction is None or self._is_cancelled:
+            return
+        with self._progress_lock:
+            for job in batch:
+                self._running_fractions[job['index']] = fraction
+        self._report_progress(f"Клипы #{batch[0]['number']}-#{batch[-1]['number']} (одним процессом): "
+                              f"{fraction * 100:.0f}%, осталось ~{format_eta(progress['eta_sec'])}. "
+                              f"Весь экспорт: ~{format_eta(self._overall_eta_sec())}")
+
+    def _report_clip(self, path: str, success: bool, description: str):
+        if self.clip_exported_callback:
+            self.clip_exported_callback(path, success, description)
+
     def cancel_export(self):
         self._log("Получен запрос на отмену экспорта.", level="WARN")
         self._is_cancelled = True
         if self.cutting_engine and hasattr(self.cutting_engine, 'cancel_current_operation'):
-            self.cutting_engine.cancel_current_operation()
-        # Дополнительно можно попробовать отменить операцию в export_module, если она длительная (например, FFmpeg процесс)
-        # if self.export_module and hasattr(self.export_module, 'cancel_current_operation'):
-        # self.export_module.cancel_current_operation() # Потребует реализации в ExportModule
+            self.cutting_engine.cancel_current_operation()  # Завершает все активные процессы FFmpeg
+
+    def _build_base_filename(self, clip_number: int, description: str, preset_name: str) -> str:
+        """Формирует имя файла клипа (без расширения): clip_<номер>_<описание>_<пресет>."""
+        sanitized_desc_part = ""
+        try:
+            desc_str = str(description)
+            if original_sanitize:
+                base_sanitized = original_sanitize(desc_str)
+                # Обрезка, если sanitize-filename не контролирует длину
+                if len(base_sanitized) > 50:  # Макс. длина для части описания в имени
+                    name_part_s, ext_part_s = os.path.splitext(base_sanitized)
+                    if len(ext_part_s) > 10: name_part_s = base_sanitized; ext_part_s = ""
+                    available_len_s = 50 - len(ext_part_s)
+                    if available_len_s < 0: available_len_s = 0
+                    name_part_s = name_part_s[:available_len_s]
+                    sanitized_desc_part = name_part_s + ext_part_s
+                else:
+                    sanitized_desc_part = base_sanitized
+            else:
+                sanitized_desc_part = fallback_sanitize(desc_str, max_len=50)
+            if not sanitized_desc_part: sanitized_desc_part = f"clip_{clip_number}"
+            self._log(f"    Sanitized description: '{sanitized_desc_part}'", level="DEBUG")
+        except Exception as e_sanitize:
+            self._log(f"    ОШИБКА sanitize: {e_sanitize}. Используется заглушка.", level="ERROR")
+            sanitized_desc_part = f"sanitize_error_{clip_number}"
+
+        clip_num_str = str(clip_number).zfill(3)
+        preset_str_clean = re.sub(r'[^a-zA-Z0-9_-]', '', str(preset_name).lower().replace(' ', '_'))
+
+        base_filename_parts = ["clip", clip_num_str, sanitized_desc_part, preset_str_clean]
+        base_filename_no_ext = "_".join(filter(None, base_filename_parts))
+        base_filename_no_ext = re.sub(r'_+', '_', base_filename_no_ext).strip('_')
+        self._log(f"  Сгенерировано базовое имя (без расширения): '{base_filename_no_ext}'", level="DEBUG")
+        return base_filename_no_ext
+
+    def _reserve_output_path(self, output_folder: str, base_filename_no_ext: str, extension: str,
+                             reserved_paths: set) -> str:
+        """
+        Подбирает свободное имя файла. Учитывает как существующие файлы, так и имена из reserved_paths:
+        зарезервированные другими задачами этого экспорта и манифестами черновиков в папке (файлы еще не созданы).
+        """
+        def is_taken(filename):
+            candidate = os.path.normpath(os.path.join(output_folder, filename))
+            return os.path.exists(candidate) or candidate in reserved_paths
+
+        final_export_filename_with_ext = f"{base_filename_no_ext}{extension}"
+        counter = 1
+        actual_final_filename = final_export_filename_with_ext
+        while is_taken(actual_final_filename):
+            actual_final_filename = f"{base_filename_no_ext}_{counter}{extension}"
+            counter += 1
+            if counter > 100:  # Защита
+                self._log(f"  Слишком много файлов с именем {base_filename_no_ext}. Перезапись.", level="WARN")
+                actual_final_filename = f"{base_filename_no_ext}_override{extension}"
+                break
+        if actual_final_filename != final_export_filename_with_ext:
+            self._log(
+                f"    Файл '{final_export_filename_with_ext}' уже существует. Новое имя: '{actual_final_filename}'",
+                level="INFO")
+        final_output_path = os.path.normpath(os.path.join(output_folder, actual_final_filename))
+        reserved_paths.add(final_output_path)
+        return final_output_path
+
+    def _run_export_job(self, job: dict, total_clips: int) -> list:
+        """
+        Выполняет одну задачу экспорта (вызывается из потока пула) и возвращает [(пресет, путь, успех)].
+        Нарезка и кодирование выполняются прямо в итоговые файлы. Все перекодируемые пресеты клипа
+        создаются одним вызовом FFmpeg (CuttingEngine.cut_clip_multi): фрагмент исходника декодируется
+        один раз; если такой вызов не удался (не из-за отмены), пресеты режутся по одному.
+        Пресеты без перекодирования режутся отдельными вызовами.
+        """
+        if self._is_cancelled:
+            return []
+        self._log(f"--- Начало обработки клипа #{job['number']}/{total_clips}: '{job['description']}' ---",
+                  level="INFO")
+        self._report_progress(f"Запущен: {job['description']}")
+
+        recode_outputs = [output for output in job['outputs'] if not output['cut_mode']]
+        steps = ([recode_outputs] if recode_outputs else []) + \
+                [[output] for output in job['outputs'] if output['cut_mode']]
+        job_results = []
+        for step_index, step_outputs in enumerate(steps):
+            if self._is_cancelled:
+                break
+
+            def on_progress(progress, step_index=step_index):
+                if progress["fraction"] is not None:  # Доля всей задачи, а не текущего вызова FFmpeg
+                    progress = dict(progress, fraction=(step_index + progress["fraction"]) / len(steps))
+                self._on_job_progress(job, progress)
+
+            success_export = self._cut_step(job, step_outputs, on_progress)
+            if not success_export and len(step_outputs) > 1 and not self._is_cancelled:
+                self._log("  Общий вызов FFmpeg для пресетов клипа не удался, пресеты будут нарезаны по одному.",
+                          level="WARN")
+                for output_index, step_output in enumerate(step_outputs):
+                    if self._is_cancelled:
+                        break
+
+                    def on_output_progress(progress, output_index=output_index, on_progress=on_progress):
+                        if progress["fraction"] is not None:
+                            progress = dict(progress,
+                                            fraction=(output_index + progress["fraction"]) / len(step_outputs))
+                        on_progress(progress)
 
-    def set_temp_dir(self, path: str):
-        self._log(f"set_temp_dir: Попытка установить временную папку: '{path}'", level="DEBUG")
+                    job_results.append((step_output['preset'], step_output['path'],
+                                        self._cut_step(job, [step_output], on_output_progress)))
+                continue
+            job_results += [(step_output['preset'], step_output['path'], success_export)
+                            for step_output in step_outputs]
+        self._log(f"--- Завершение обработки клипа #{job['number']}: '{job['description']}' ---", level="INFO")
+        return job_results
+
+    def _cut_step(self, job: dict, step_outputs: list, on_progress) -> bool:
+        """Один вызов CuttingEngine для шага задачи: stream copy/smart render, один пресет или несколько сразу."""
+        output = step_outputs[0]
         try:
-            self.temp_dir_for_cutting = os.path.normpath(path)
-            os.makedirs(self.temp_dir_for_cutting, exist_ok=True)
-            self._log(f"set_temp_dir: Временная папка для нарезки успешно установлена: '{self.temp_dir_for_cutting}'",
-                      level="INFO")
-        except Exception as e:
-            error_msg = f"set_temp_dir: КРИТИЧЕСКАЯ ОШИБКА создания временной папки '{path}': {e}. Trace: {traceback.format_exc()}"
-            self._log(error_msg, level="CRITICAL")
-            self.temp_dir_for_cutting = ""  # Сбрасываем, чтобы предотвратить использование
-            self.export_error.emit(f"Не удалось создать временную папку: {e}")
+            if output['cut_mode'] in ("stream_copy", "smart_render"):
+                return self.cutting_engine.cut_clip_stream_copy(
+                    job['source_path'], job['start_time'], job['end_time'], output['path'],
+                    smart_render=(output['cut_mode'] == "smart_render"), progress_callback=on_progress
+                )
+            if len(step_outputs) == 1:
+                return self.cutting_engine.cut_clip(
+                    job['source_path'], job['start_time'], job['end_time'], output['path'],
+                    ffmpeg_params=output['ffmpeg_params'], progress_callback=on_progress
+                )
+            return self.cutting_engine.cut_clip_multi(
+                job['source_path'], job['start_time'], job['end_time'],
+                [dict(step_output['spec'], path=step_output['path']) for step_output in step_outputs],
+                progress_callback=on_progress
+            )
+        except Exception as e_cut_eng:
+            self._log(f"  КРИТИЧЕСКАЯ ОШИБКА cutting_engine: {e_cut_eng}\n{traceback.format_exc()}",
+                      level="CRITICAL")
+            return False
+
+    def _run_export_task(self, task: list, total_clips: int) -> dict:
+        """Задача пула: один клип или пачка клипов. Возвращает {индекс хайлайта: [(пресет, путь, успех)]}."""
+        if len(task) == 1:
+            return {task[0]['index']: self._run_export_job(task[0], total_clips)}
+        return self._run_batch_job(task, total_clips)
+
+    def _run_batch_job(self, batch: list, total_clips: int) -> dict:
+        """
+        Режет пачку клипов одним процессом FFmpeg (CuttingEngine.cut_clips_batch). В пачку попадают
+        только клипы с единственным выходом, перекодируемым или stream copy. Если пакетный вызов
+        не удался (не из-за отмены), клипы пачки режутся по одному.
+        """
+        if self._is_cancelled:
+            return {}
+        self._log(f"--- Пачка клипов #{batch[0]['number']}-#{batch[-1]['number']}/{total_clips} "
+                  f"({len(batch)} шт.) одним процессом FFmpeg ---", level="INFO")
+        self._report_progress(f"Запущена пачка: клипы #{batch[0]['number']}-#{batch[-1]['number']}")
+        output = batch[0]['outputs'][0]
+        try:
+            success_batch = self.cutting_engine.cut_clips_batch(
+                batch[0]['source_path'],
+                [{"start": job['start_time'], "end": job['end_time'], "path": job['outputs'][0]['path']}
+                 for job in batch],
+                ffmpeg_params=output['ffmpeg_params'], stream_copy=(output['cut_mode'] == "stream_copy"),
+                audio=output['audio'],
+                progress_callback=lambda progress: self._on_batch_progress(batch, progress))
+        except Exception as e_cut_eng:
+            self._log(f"  КРИТИЧЕСКАЯ ОШИБКА cutting_engine: {e_cut_eng}\n{traceback.format_exc()}",
+                      level="CRITICAL")
+            success_batch = False
+        if success_batch:
+            return {job['index']: [(job['outputs'][0]['preset'], job['outputs'][0]['path'], True)] for job in batch}
+        if self._is_cancelled:
+            return {}
+        self._log("  Пакетная нарезка не удалась, клипы пачки будут нарезаны по одному.", level="WARN")
+        with self._progress_lock:
+            for job in batch:
+                self._running_fractions.pop(job['index'], None)
+        return {job['index']: self._run_export_job(job, total_clips) for job in batch}
+
+    def _plan_export_tasks(self, jobs: list) -> list:
+        """
+        Делит задачи на задачи пула: короткие клипы с одним выходом (не smart render) объединяются
+        в пачки, если их достаточно много; остальные выполняются по одной. Пачек не меньше, чем
+        параллельных задач, чтобы пул оставался загружен.
+        """
+        batchable_jobs = []
+        if self.batch_cutting:
+            batchable_jobs = [job for job in jobs if len(job['outputs']) == 1
+                              and job['outputs'][0]['cut_mode'] in (None, "stream_copy")
+                              and job['end_time'] - job['start_time'] <= BATCH_CUT_MAX_CLIP_SEC]
+        if len(batchable_jobs) < BATCH_CUT_MIN_CLIPS:
+            return [[job] for job in jobs]
+        batch_size = min(BATCH_CUT_MAX_CLIPS_PER_PROCESS,
+                         max(2, math.ceil(len(batchable_jobs) / self.max_parallel_jobs)))
+        batched_indices = {job['index'] for job in batchable_jobs}
+        tasks = [batchable_jobs[i:i + batch_size] for i in range(0, len(batchable_jobs), batch_size)]
+        tasks += [[job] for job in jobs if job['index'] not in batched_indices]
+        tasks.sort(key=lambda task: task[0]['index'])  # Раньше запускаем задачи, результаты которых отдаются первыми
+        self._log(f"  Пакетная нарезка: {len(batchable_jobs)} коротких клипов в {math.ceil(len(batchable_jobs) / batch_size)} "
+                  f"процессах FFmpeg (до {batch_size} клипов в процессе).", level="INFO")
+        return tasks
+
+    def _generate_subtitles(self, source_path: str, exported_clips_info_list: list, total_clips: int):
+        """
+        Создает .srt рядом с каждым экспортированным клипом. Whisper обрабатывает только
+        фрагменты исходника, соответствующие клипам (с запасом), одной загруженной моделью,
+        поэтому время работы зависит от суммарной длины клипов, а не исходника.
+        Клипы одного хайлайта в разных пресетах с одинаковыми границами распознаются один раз.
+        """
+        from modules.ai_analyzer import WhisperSubtitleGenerator  # whisper/torch нужен только здесь
+        from utils import segments_to_srt
+
+        clips_with_audio = []
+        for clip_info in exported_clips_info_list:
+            preset_config = self.export_module.get_preset_config(clip_info.get("preset")) or {}
+            if preset_config.get("audio", True):  # Для клипов без звука (GIF) субтитры не нужны
+                clips_with_audio.append(clip_info)
+        clip_ranges = []
+        range_indices = []  # индекс клипа -> индекс в clip_ranges
+        for clip_info in clips_with_audio:
+            hl_data = clip_info["source_highlight_info"]
+            clip_start = hl_data['start_time']
+            cut_mode = clip_info.get("cut_mode")
+            if cut_mode in ("stream_copy", "smart_render"):
+                # Клип мог начаться раньше запрошенного (прилипание к ключевому кадру)
+                clip_start = self.cutting_engine.resolve_stream_copy_start(
+                    source_path, clip_start, smart_render=(cut_mode == "smart_render"))
+            clip_range = (clip_start, hl_data['end_time'])
+            if clip_range not in clip_ranges:
+                clip_ranges.append(clip_range)
+            range_indices.append(clip_ranges.index(clip_range))
+        if not clip_ranges:
+            return
+
+        self._log(f"Генерация субтитров для {len(clip_ranges)} клипов "
+                  f"(модель '{self.subtitle_options['model_size']}', запас {self.subtitle_options['padding_sec']}с).",
+                  level="INFO")
+        self._report_progress("Субтитры: загрузка модели Whisper...")
+
+        def on_progress(done_count, total_count):
+            self._report_progress(f"Субтитры: {done_count} из {total_count}")
+
+        try:
+            generator = WhisperSubtitleGenerator(self.subtitle_options['model_size'], parent_logger=self.parent_logger)
+            segments_per_clip = generator.transcribe_clips(
+                source_path, clip_ranges, padding_sec=self.subtitle_options['padding_sec'],
+                ffmpeg_path=self.subtitle_options.get('ffmpeg_path', 'ffmpeg'),
+                progress_callback=on_progress, is_cancelled=lambda: self._is_cancelled)
+        except Exception as e_subtitles:
+            self._log(f"ОШИБКА генерации субтитров: {type(e_subtitles).__name__} - {e_subtitles}\n"
+                      f"{traceback.format_exc()}", level="ERROR")
+            return
+
+        if len(segments_per_clip) < len(clip_ranges):
+            # При отмене Whisper возвращает результаты только для уже обработанных фрагментов
+            self._log(f"Генерация субтитров прервана: обработано {len(segments_per_clip)} из {len(clip_ranges)} "
+                      f"фрагментов, субтитры сохраняются только для них.", level="WARN")
+        for clip_info, range_index in zip(clips_with_audio, range_indices):
+            if range_index >= len(segments_per_clip):
+                continue
+            segments = segments_per_clip[range_index]
+            srt_path = os.path.splitext(clip_info["path"])[0] + ".srt"
+            try:
+                segments_to_srt(segments, srt_path)
+                clip_info["subtitles_path"] = srt_path
+                self._log(f"  Субтитры сохранены: '{srt_path}' (сегментов: {len(segments)})", level="INFO")
+            except OSError as e_write:
+                self._log(f"  Не удалось записать субтитры '{srt_path}': {e_write}", level="ERROR")
 
     def process_export_list(self, original_video_path: str, highlights_to_export: list,
-                            output_folder: str, export_preset_name: str):  # export_preset_name теперь обязателен
+                            output_folder: str, export_preset_name: str | list, draft: bool = False,
+                            output_paths: list | None = None) -> tuple:
+        """
+        Экспортирует хайлайты и возвращает (exported_clips_info_list, successful_exports_count).
+        export_preset_name - имя пресета или список имен: каждый хайлайт экспортируется во все
+        пресеты, перекодируемые - одним процессом FFmpeg. Счетчик и список - по созданным файлам.
+        draft=True - вместо пресетов быстрые превью (ExportModule.build_draft_params) в подпапке
+        drafts с именами будущих финальных файлов; пути финальных файлов резервируются и вместе
+        с границами клипов пишутся в манифест (last_manifest_path); субтитры не создаются, их
+        параметры сохраняются в манифесте для финального экспорта.
+        output_paths - готовые пути [{пресет: путь}] по хайлайтам вместо новых имен (promote_to_final).
+        При отмене возвращает клипы, успешно экспортированные до нее.
+        """
+        if isinstance(export_preset_name, str):
+            preset_names = [export_preset_name]
+        else:
+            preset_names = list(dict.fromkeys(export_preset_name))  # Без повторов, порядок сохраняется
+        if not preset_names:
+            raise ExportError("Не выбран ни один пресет экспорта.")
         self._log(
-            f"process_export_list: Начало обработки. Клипов: {len(highlights_to_export)}. Пресет: '{export_preset_name}'.",
+            f"process_export_list: Начало обработки. Клипов: {len(highlights_to_export)}. "
+            f"Пресеты: {', '.join(repr(name) for name in preset_names)}. "
+            f"Параллельных задач: {self.max_parallel_jobs}.",
             level="INFO")
 
         if not self.cutting_engine:
-            # ... (обработка ошибки)
-            return
+            raise ExportError("CuttingEngine не инициализирован.")
         if not self.export_module:
-            # ... (обработка ошибки)
-            return
-        if not self.temp_dir_for_cutting or not os.path.isdir(self.temp_dir_for_cutting):
-            error_msg = f"КРИТИЧЕСКАЯ ОШИБКА: Временная папка для нарезки ('{self.temp_dir_for_cutting}') не установлена или не является директорией. Экспорт прерван."
-            self._log(error_msg, level="CRITICAL")
-            self.export_error.emit(error_msg)
-            self.export_all_finished.emit([], 0)  # Сигнализируем о завершении без успеха
-            return
-
+            raise ExportError("ExportModule не инициализирован.")
+        # Экспортер может переиспользоваться после отмены (CLI, пакетная очередь): флаги сбрасываются
+        self._is_cancelled = False
+        self.cutting_engine.reset_cancel()
         total_clips = len(highlights_to_export)
+        self._total_clips = total_clips
+        self._running_fractions = {}
+        self._export_start_time = time.monotonic()
         exported_clips_info_list = []
         successful_exports_count = 0
 
         norm_original_video_path = os.path.normpath(original_video_path)
         norm_output_folder = os.path.normpath(output_folder)
 
-        # Получаем расширение файла из пресета
-        target_extension = self.export_module.get_preset_extension(export_preset_name)
-        self._log(f"  Целевое расширение для пресета '{export_preset_name}': '{target_extension}'", level="DEBUG")
-
+        # Получаем расширение файла и параметры кодирования каждого пресета
+        preset_outputs = []
+        for preset_name in preset_names:
+            target_extension = self.export_module.get_preset_extension(preset_name)
+            self._log(f"  Целевое расширение для пресета '{preset_name}': '{target_extension}'", level="DEBUG")
+            # Пресеты "Original" режут без перекодирования (stream copy) с учетом ключевых кадров
+            preset_config = self.export_module.get_preset_config(preset_name) or {}
+            cut_mode = preset_config.get("cut_mode") if not preset_config.get("recode", False) else None
+            if cut_mode:
+                self._log(f"  Режим нарезки пресета '{preset_name}': '{cut_mode}'", level="DEBUG")
+            preset_outputs.append({
+                "preset": preset_name,
+                "extension": target_extension,
+                "cut_mode": cut_mode,
+                # None для пресетов без перекодирования - CuttingEngine использует свои параметры по умолчанию
+                "ffmpeg_params": self.export_module.build_ffmpeg_params(preset_name),
+                "spec": self.export_module.build_output_spec(preset_name),
+                "audio": preset_config.get("audio", True),
+            })
+
+        # --- Подготовка задач: имена файлов резервируются заранее, последовательно ---
+        jobs = []
+        results = {}  # индекс -> [(пресет, путь, успех)]; заполняется по мере завершения задач
+        # Имена, зарезервированные черновыми экспортами в эту папку, тоже заняты (их займет финал)
+        reserved_paths = collect_reserved_paths(norm_output_folder) if output_paths is None else set()
         for i, hl_data in enumerate(highlights_to_export):
-            if self._is_cancelled:
-                self._log("Экспорт отменен в цикле обработки клипов.", level="INFO")
-                break  # Выходим из цикла for
-
             current_clip_number = i + 1
             original_description = hl_data.get('description', f'highlight_{current_clip_number}')
-            self._log(f"--- Начало обработки клипа #{current_clip_number}/{total_clips}: '{original_description}' ---",
-                      level="INFO")
-            self.export_progress.emit(current_clip_number, total_clips, original_description)
-
             start_sec = hl_data.get('start_time')
             end_sec = hl_data.get('end_time')
 
@@ -127,181 +513,242 @@ class ClipExporterWorker(QObject):
                 self._log(
                     f"  Пропуск хайлайта '{original_description}': некорректное время (start: {start_sec}, end: {end_sec}).",
                     level="WARN")
-                self.export_finished_one.emit("", False, original_description)
+                results[i] = [(preset_name, "", False) for preset_name in preset_names]
                 continue
 
-            # Санитайзер имени файла
-            sanitized_desc_part = ""
-            try:
-                desc_str = str(original_description)
-                if original_sanitize:
-                    base_sanitized = original_sanitize(desc_str)
-                    # Обрезка, если sanitize-filename не контролирует длину
-                    if len(base_sanitized) > 50:  # Макс. длина для части описания в имени
-                        name_part_s, ext_part_s = os.path.splitext(base_sanitized)
-                        if len(ext_part_s) > 10: name_part_s = base_sanitized; ext_part_s = ""
-                        available_len_s = 50 - len(ext_part_s)
-                        if available_len_s < 0: available_len_s = 0
-                        name_part_s = name_part_s[:available_len_s]
-                        sanitized_desc_part = name_part_s + ext_part_s
-                    else:
-                        sanitized_desc_part = base_sanitized
+            outputs = []
+            for preset_output in preset_outputs:
+                if output_paths is not None:
+                    final_output_path = os.path.normpath(output_paths[i][preset_output["preset"]])
                 else:
-                    sanitized_desc_part = fallback_sanitize(desc_str, max_len=50)
-                if not sanitized_desc_part: sanitized_desc_part = f"clip_{current_clip_number}"
-                self._log(f"    Sanitized description: '{sanitized_desc_part}'", level="DEBUG")
-            except Exception as e_sanitize:
-                self._log(f"    ОШИБКА sanitize: {e_sanitize}. Используется заглушка.", level="ERROR")
-                sanitized_desc_part = f"sanitize_error_{current_clip_number}"
-
-            clip_num_str = str(current_clip_number).zfill(3)
-            preset_str_clean = re.sub(r'[^a-zA-Z0-9_-]', '', str(export_preset_name).lower().replace(' ', '_'))
-
-            base_filename_parts = ["clip", clip_num_str, sanitized_desc_part, preset_str_clean]
-            base_filename_no_ext = "_".join(filter(None, base_filename_parts))
-            base_filename_no_ext = re.sub(r'_+', '_', base_filename_no_ext).strip('_')
-            self._log(f"  Сгенерировано базовое имя (без расширения): '{base_filename_no_ext}'", level="DEBUG")
-
-            # Временный файл всегда MP4, т.к. cutting_engine выдает MP4
-            temp_cut_clip_filename = f"{base_filename_no_ext}_tempcut.mp4"
-            temp_cut_clip_path = os.path.normpath(os.path.join(self.temp_dir_for_cutting, temp_cut_clip_filename))
-            self._log(f"  Путь для временного файла нарезки: '{temp_cut_clip_path}'", level="DEBUG")
-
-            success_cut = False
-            try:
-                success_cut = self.cutting_engine.cut_clip(
-                    norm_original_video_path, start_sec, end_sec, temp_cut_clip_path
-                )
-            except Exception as e_cut_eng:
-                self._log(f"  КРИТИЧЕСКАЯ ОШИБКА cutting_engine.cut_clip: {e_cut_eng}\n{traceback.format_exc()}",
-                          level="CRITICAL")
-                success_cut = False  # Убедимся, что false
-
-            if self._is_cancelled:  # Проверка отмены ПОСЛЕ вызова cutting_engine.cut_clip
-                self._log(f"Экспорт прерван пользователем после попытки нарезки клипа '{original_description}'.",
-                          level="WARN")
-                if os.path.exists(temp_cut_clip_path):
+                    base_filename_no_ext = self._build_base_filename(current_clip_number, original_description,
+                                                                     preset_output["preset"])
+                    final_output_path = self._reserve_output_path(norm_output_folder, base_filename_no_ext,
+                                                                  preset_output["extension"], reserved_paths)
+                outputs.append(dict(preset_output, path=final_output_path))
+            final_paths = {output["preset"]: output["path"] for output in outputs}
+            if draft:
+                # Одно превью на клип, с именем первого финального файла
+                draft_base_name = os.path.splitext(os.path.basename(outputs[0]["path"]))[0]
+                draft_path = self._reserve_output_path(os.path.join(norm_output_folder, DRAFTS_SUBFOLDER),
+                                                       draft_base_name, DRAFT_PREVIEW_EXTENSION, reserved_paths)
+                outputs = [{"preset": outputs[0]["preset"], "extension": DRAFT_PREVIEW_EXTENSION,
+                            "cut_mode": None, "ffmpeg_params": self.export_module.build_draft_params(),
+                            "spec": None, "audio": True, "path": draft_path}]  # Превью всегда со звуком
+            jobs.append({
+                "index": i,
+                "number": current_clip_number,
+                "description": original_description,
+                "source_path": norm_original_video_path,
+                "start_time": start_sec,
+                "end_time": end_sec,
+                "outputs": outputs,
+                "final_paths": final_paths,
+            })
+
+        # --- Выполнение: ограниченный пул одновременных процессов FFmpeg ---
+        # Результаты отдаются через clip_exported_callback строго в исходном порядке хайлайтов,
+        # даже если задачи завершаются не по порядку.
+        next_index_to_emit = 0
+        self._completed_clips = len(results)
+        cut_clips_count = 0  # Клипы (хайлайты), нарезанные хотя бы в одном пресете - для пропускной способности
+
+        def emit_ready_results():
+            nonlocal next_index_to_emit, successful_exports_count
+            while next_index_to_emit in results:
+                hl_data = highlights_to_export[next_index_to_emit]
+                description = hl_data.get('description', f'highlight_{next_index_to_emit + 1}')
+                for preset_name, path, success in results[next_index_to_emit]:
+                    if success:
+                        self._log(f"    Клип '{description}' УСПЕШНО ЭКСПОРТИРОВАН: '{path}'", level="INFO")
+                        preset_config = self.export_module.get_preset_config(preset_name) or {}
+                        exported_clips_info_list.append({
+                            "path": path,
+                            "description": description,
+                            "title_suggestion": f"Яркий момент: {description}",
+                            "preset": preset_name,
+                            "draft": draft,
+                            "cut_mode": preset_config.get("cut_mode") if not preset_config.get("recode") else None,
+                            "source_highlight_info": hl_data.copy()  # Копируем исходные данные хайлайта
+                        })
+                        successful_exports_count += 1
+                        self._report_clip(path, True, description)
+                    else:
+                        self._log(f"    ОШИБКА ЭКСПОРТА '{description}' (preset: '{preset_name}').",
+                                  level="ERROR")
+                        self._report_clip("", False, description)
+                next_index_to_emit += 1
+
+        emit_ready_results()
+        tasks = self._plan_export_tasks(jobs)
+        with ThreadPoolExecutor(max_workers=self.max_parallel_jobs,
+                                thread_name_prefix="ClipExport") as executor:
+            pending = {executor.submit(self._run_export_task, task, total_clips): task for task in tasks}
+            while pending:
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
                     try:
-                        os.remove(temp_cut_clip_path)
-                    except OSError as e_rem_cancel:  # Исправлено: catch на except, добавлена переменная для ошибки
-                        self._log(
-                            f"  Не удалось удалить временный файл '{temp_cut_clip_path}' после отмены (после нарезки): {e_rem_cancel}",
-                            level="WARN")  # Логируем ошибку удаления
-                        pass  # Продолжаем, так как отмена важнее
-                break  # Выходим из цикла for
-
-            if success_cut:
-                self._log(f"  Клип '{original_description}' УСПЕШНО НАРЕЗАН: '{temp_cut_clip_path}'", level="INFO")
-                if not os.path.exists(temp_cut_clip_path) or os.path.getsize(temp_cut_clip_path) == 0:
-                    self._log(f"  ВНИМАНИЕ: Нарезка успешна, но файл '{temp_cut_clip_path}' не существует или пуст!",
-                              level="ERROR")
-                    self.export_finished_one.emit("", False, original_description)
-                    continue
-
-                # Формируем имя финального файла с правильным расширением из пресета
-                final_export_filename_with_ext = f"{base_filename_no_ext}{target_extension}"
-
-                # Проверка на существование и добавление индекса (опционально, но хорошо бы)
-                final_path_candidate = os.path.join(norm_output_folder, final_export_filename_with_ext)
-                counter = 1
-                actual_final_filename = final_export_filename_with_ext
-                while os.path.exists(os.path.join(norm_output_folder, actual_final_filename)):
-                    actual_final_filename = f"{base_filename_no_ext}_{counter}{target_extension}"
-                    counter += 1
-                    if counter > 100:  # Защита
-                        self._log(f"  Слишком много файлов с именем {base_filename_no_ext}. Перезапись.", level="WARN")
-                        actual_final_filename = f"{base_filename_no_ext}_override{target_extension}"
-                        break
-                if actual_final_filename != final_export_filename_with_ext:
-                    self._log(
-                        f"    Файл '{final_export_filename_with_ext}' уже существует. Новое имя: '{actual_final_filename}'",
-                        level="INFO")
-
-                self._log(f"    Подготовка к финальному экспорту. Имя файла: '{actual_final_filename}'", level="DEBUG")
-
-                exported_final_path = None
-                try:
-                    exported_final_path = self.export_module.export_clip(
-                        source_clip_path=temp_cut_clip_path,
-                        output_folder=norm_output_folder,
-                        preset_name=export_preset_name,
-                        clip_filename=actual_final_filename  # Передаем имя с расширением
-                    )
-                except Exception as e_export_mod:
-                    self._log(
-                        f"  КРИТИЧЕСКАЯ ОШИБКА export_module.export_clip: {e_export_mod}\n{traceback.format_exc()}",
-                        level="CRITICAL")
-
+                        task_results = future.result()
+                    except Exception as e_job:
+                        self._log(f"  КРИТИЧЕСКАЯ ОШИБКА задачи экспорта: {e_job}", level="CRITICAL")
+                        task_results = {}
+                    for job in task:
+                        with self._progress_lock:
+                            self._running_fractions.pop(job["index"], None)
+                        job_results = task_results.get(job["index"], [])
+                        succeeded_paths = {path for _, path, success in job_results if success}
+                        if self._is_cancelled and not succeeded_paths:
+                            continue  # Прерванные отменой задачи не считаем результатом
+                        # Выходы, до которых задача не дошла (отмена), считаются неудачными
+                        results[job["index"]] = [(output["preset"], output["path"] if output["path"] in succeeded_paths
+                                                  else "", output["path"] in succeeded_paths)
+                                                 for output in job["outputs"]]
+                        self._completed_clips += 1
+                        if succeeded_paths:
+                            cut_clips_count += 1
+                    eta_text = format_eta(self._overall_eta_sec()) if self._completed_clips < total_clips else "0:00"
+                    self._report_progress(f"Готов: {task[-1]['description']}. Весь экспорт: ~{eta_text}")
                 if self._is_cancelled:
-                    self._log(f"Экспорт прерван после попытки финального экспорта клипа '{original_description}'.",
-                              level="WARN")
-                    if os.path.exists(temp_cut_clip_path):
-                        try:
-                            os.remove(temp_cut_clip_path)
-                        except OSError:  # Исправлено: catch на except
-                            # Логируем или обрабатываем ошибку удаления, если нужно, но часто можно просто pass
-                            self._log(
-                                f"  Не удалось удалить временный файл '{temp_cut_clip_path}' после отмены (финальный экспорт).",
-                                level="DEBUG_EXTRA")
-                            pass
-                    if exported_final_path and os.path.exists(exported_final_path):
-                        try:
-                            os.remove(exported_final_path)
-                        except OSError:  # Исправлено: catch на except
-                            self._log(
-                                f"  Не удалось удалить экспортированный файл '{exported_final_path}' после отмены.",
-                                level="DEBUG_EXTRA")
-                            pass
-                    break  # Выходим из цикла for
-
-                if exported_final_path:
-                    self._log(f"    Клип '{original_description}' УСПЕШНО ЭКСПОРТИРОВАН: '{exported_final_path}'",
-                              level="INFO")
-                    clip_info_for_plan = {
-                        "path": exported_final_path,
-                        "description": original_description,
-                        "title_suggestion": f"Яркий момент: {original_description}",
-                        "source_highlight_info": hl_data.copy()  # Копируем исходные данные хайлайта
-                    }
-                    exported_clips_info_list.append(clip_info_for_plan)
-                    successful_exports_count += 1
-                    self.export_finished_one.emit(exported_final_path, True, original_description)
-                else:
-                    self._log(
-                        f"    ОШИБКА ФИНАЛЬНОГО ЭКСПОРТА '{original_description}' (preset: '{export_preset_name}').",
-                        level="ERROR")
-                    self.export_finished_one(temp_cut_clip_path, False,
-                                             original_description)  # Нарезан, но не экспортирован
-            else:  # Ошибка нарезки
-                self._log(f"  ОШИБКА НАРЕЗКИ клипа '{original_description}'. Пропуск.", level="ERROR")
-                self.export_finished_one.emit("", False, original_description)
-
-            # Удаление временного нарезанного файла
-            if os.path.exists(temp_cut_clip_path):
-                try:
-                    os.remove(temp_cut_clip_path)
-                    self._log(f"    Временный файл '{os.path.basename(temp_cut_clip_path)}' УДАЛЕН.", level="DEBUG")
-                except OSError as e_rem:
-                    self._log(
-                        f"    НЕ УДАЛОСЬ удалить временный файл '{os.path.basename(temp_cut_clip_path)}': {e_rem}",
-                        level="WARN")
-            elif success_cut:  # Если нарезка была успешной, а файла нет - это странно
-                self._log(
-                    f"   ВНИМАНИЕ: Нарезка '{original_description}' успешна, но временный файл '{temp_cut_clip_path}' НЕ НАЙДЕН для удаления.",
-                    level="WARN")
-            self._log(f"--- Завершение обработки клипа #{current_clip_number}: '{original_description}' ---",
-                      level="INFO")
+                    self._log("Экспорт отменен: снятие ожидающих задач из пула.", level="INFO")
+                    for future in list(pending):
+                        if future.cancel():
+                            pending.pop(future)
+                emit_ready_results()
+
+        if self._is_cancelled:
+            # Отдаем успешно завершенные до отмены клипы, даже если перед ними в очереди были прерванные
+            for index in sorted(i for i in results if i >= next_index_to_emit):
+                if index >= next_index_to_emit:
+                    next_index_to_emit = index
+                    emit_ready_results()
+
+        # Пропускная способность нарезки (без субтитров) - для сравнения пакетного и поклипового режимов
+        cut_elapsed_sec = time.monotonic() - self._export_start_time
+        batched = any(len(task) > 1 for task in tasks)
+        self.last_export_stats = {
+            "clips": cut_clips_count,
+            "elapsed_sec": round(cut_elapsed_sec, 2),
+            "clips_per_sec": round(cut_clips_count / cut_elapsed_sec, 3) if cut_elapsed_sec > 0 else 0.0,
+            "mode": "batch" if batched else "per_clip",
+            "ffmpeg_tasks": len(tasks),
+        }
+        self._log(f"Нарезка: {cut_clips_count} клипов за {cut_elapsed_sec:.1f} с - "
+                  f"{self.last_export_stats['clips_per_sec']:.2f} клипов/с "
+                  f"(режим: {'пакетный' if batched else 'поклиповый'}, задач FFmpeg: {len(tasks)}).", level="INFO")
+        self._report_progress(f"Нарезка завершена: {self.last_export_stats['clips_per_sec']:.2f} клипов/с")
+
+        if draft:
+            self._write_draft_manifest(norm_original_video_path, norm_output_folder, preset_names, jobs,
+                                       results, highlights_to_export)
+        elif self.subtitle_options and exported_clips_info_list and not self._is_cancelled:
+            self._generate_subtitles(norm_original_video_path, exported_clips_info_list, total_clips)
 
         # После цикла
         if self._is_cancelled:
             self._log(
-                f"Процесс экспорта был ПРЕРВАН. Успешно экспортировано до отмены: {successful_exports_count} из {total_clips} клипов.",
+                f"Процесс экспорта был ПРЕРВАН. Успешно экспортировано до отмены: {successful_exports_count} из {total_clips * (1 if draft else len(preset_names))} файлов.",
                 level="WARN")
         else:
             self._log(
-                f"Процесс экспорта ЗАВЕРШЕН. Успешно экспортировано: {successful_exports_count} из {total_clips} клипов.",
+                f"Процесс экспорта ЗАВЕРШЕН. Успешно экспортировано: {successful_exports_count} из {total_clips * (1 if draft else len(preset_names))} файлов.",
                 level="INFO")
 
-        self.export_all_finished.emit(exported_clips_info_list, successful_exports_count)
-        self._log(f"Сигнал export_all_finished отправлен. Завершение работы воркера.", level="DEBUG")
-
+        return exported_clips_info_list, successful_exports_count
+
+    def _write_draft_manifest(self, source_path: str, output_folder: str, preset_names: list, jobs: list,
+                              results: dict, highlights_to_export: list):
+        """Записывает манифест чернового экспорта: по записи на каждый клип с корректными границами."""
+        manifest = build_export_manifest(source_path, output_folder, preset_names, self.subtitle_options)
+        for job in jobs:
+            job_results = results.get(job["index"], [])
+            draft_ok = any(success for _, _, success in job_results)
+            manifest["clips"].append({
+                "number": job["number"],
+                "description": job["description"],
+                "start_time": job["start_time"],
+                "end_time": job["end_time"],
+                "draft_path": job["outputs"][0]["path"] if draft_ok else None,
+                "final_paths": job["final_paths"],
+                "status": CLIP_STATUS_DRAFT if draft_ok else CLIP_STATUS_DRAFT_FAILED,
+                "source_highlight_info": highlights_to_export[job["index"]].copy(),
+            })
+        # Свой манифест на каждый запуск: черновики прошлых экспортов в ту же папку остаются доступны для финала
+        manifest_path = build_export_manifest_path(output_folder, source_path)
+        try:
+            save_export_manifest(manifest, manifest_path)
+        except OSError as e_write:
+            self._log(f"Не удалось записать манифест экспорта '{manifest_path}': {e_write}", level="ERROR")
+            return
+        self.last_manifest_path = manifest_path
+        self._log(f"Манифест чернового экспорта сохранен: '{manifest_path}' (клипов: {len(manifest['clips'])}).",
+                  level="INFO")
+
+    def promote_to_final(self, manifest_path: str, approved_numbers: list) -> tuple:
+        """
+        Финальный экспорт одобренных черновиков: клипы с номерами approved_numbers кодируются
+        пресетами из манифеста в зарезервированные при черновом экспорте пути. Если по такому пути
+        уже лежит файл, созданный не этим манифестом, финал получает новое свободное имя (чужие файлы
+        не перезаписываются). Статусы клипов в манифесте обновляются. Субтитры создаются с параметрами,
+        сохраненными при черновом экспорте, если у экспортера не заданы свои. Возвращает то же, что process_export_list.
+        """
+        self._is_cancelled = False
+        if self.cutting_engine:
+            self.cutting_engine.reset_cancel()
+        try:
+            manifest = load_export_manifest(manifest_path)
+        except (OSError, ValueError) as e_read:
+            raise ExportError(f"Не удалось прочитать манифест экспорта: {e_read}") from e_read
+        approved = set(int(number) for number in approved_numbers)
+        entries = [entry for entry in manifest["clips"] if entry["number"] in approved]
+        if not entries:
+            self._log("promote_to_final: нет одобренных клипов из манифеста.", level="WARN")
+            return [], 0
+        self._log(f"Финальный экспорт одобренных черновиков: {len(entries)} из {len(manifest['clips'])} клипов.",
+                  level="INFO")
+        reserved_paths = collect_reserved_paths(manifest["output_folder"])
+        for entry in entries:
+            created_paths = {os.path.normpath(path) for path in entry.get("created_paths", [])}
+            for preset_name, final_path in entry["final_paths"].items():
+                norm_final_path = os.path.normpath(final_path)
+                if not os.path.exists(norm_final_path) or norm_final_path in created_paths:
+                    continue
+                base_name, extension = os.path.splitext(os.path.basename(norm_final_path))
+                new_path = self._reserve_output_path(os.path.dirname(norm_final_path), base_name, extension,
+                                                     reserved_paths)
+                self._log(f"  Зарезервированный путь '{norm_final_path}' занят файлом другого экспорта. "
+                          f"Финал клипа #{entry['number']} будет сохранен как '{new_path}'.", level="WARN")
+                entry["final_paths"][preset_name] = new_path
+
+        highlights = []
+        for entry in entries:
+            hl_data = dict(entry.get("source_highlight_info") or {})
+            hl_data.update({"description": entry["description"], "start_time": entry["start_time"],
+                            "end_time": entry["end_time"]})
+            highlights.append(hl_data)
+        own_subtitle_options = self.subtitle_options
+        if own_subtitle_options is None and manifest.get("subtitle_options"):
+            self.subtitle_options = manifest["subtitle_options"]
+        try:
+            exported_clips_info_list, successful_exports_count = self.process_export_list(
+                manifest["source_video"], highlights, manifest["output_folder"], manifest["presets"],
+                output_paths=[entry["final_paths"] for entry in entries])
+        finally:
+            self.subtitle_options = own_subtitle_options
+
+        exported_paths = {os.path.normpath(clip_info["path"]) for clip_info in exported_clips_info_list}
+        for entry in entries:
+            created_paths = set(entry.get("created_paths", []))
+            created_paths.update(os.path.normpath(path) for path in entry["final_paths"].values()
+                                 if os.path.normpath(path) in exported_paths)
+            entry["created_paths"] = sorted(created_paths)
+            if all(os.path.normpath(path) in exported_paths for path in entry["final_paths"].values()):
+                entry["status"] = CLIP_STATUS_FINAL
+            elif not self._is_cancelled:
+                entry["status"] = CLIP_STATUS_FINAL_FAILED
+        try:
+            save_export_manifest(manifest, manifest_path)
+            self.last_manifest_path = manifest_path
+        except OSError as e_write:
+            self._log(f"Не удалось обновить манифест экспорта '{manifest_path}': {e_write}", level="ERROR")
+        return exported_clips_info_list, successful_exports_count
@@ -2,14 +2,59 @@
 
 import subprocess  # Для вызова FFmpeg
 import os
+import re
 import platform  # Для разных команд в будущем, если понадобится
+import threading
+
+from modules.encoders import build_video_encoder_args
+from modules.ffmpeg_runner import DEFAULT_STALL_TIMEOUT_SEC, offset_progress_callback, run_ffmpeg
+
+# Параметры кодирования по умолчанию (используются, если пресет не задает свои).
+# Видеочасть заменяется кодировщиком и уровнем скорости из set_encoder_options().
+DEFAULT_CUT_VIDEO_PARAMS = [
+    '-c:v', 'libx264',  # Кодек видео
+    '-preset', 'medium',  # Пресет качества/скорости для x264
+    '-crf', '23',  # Constant Rate Factor (качество, меньше = лучше и больше размер)
+]
+DEFAULT_CUT_FFMPEG_PARAMS = DEFAULT_CUT_VIDEO_PARAMS + [
+    '-c:a', 'aac',  # Кодек аудио
+    '-b:a', '160k',  # Битрейт аудио
+    # '2' (make_nonnegative): сдвигает метки времени так, чтобы первая была неотрицательной.
+    # Полезно при вырезании части потока.
+    '-avoid_negative_ts', '2',
+    '-movflags', '+faststart',  # Для оптимизации MP4 для стриминга
+]
+
+# Stream copy: насколько назад от начала клипа искать ключевой кадр, допуск сравнения меток времени
+# и сдвиг точки поиска внутрь GOP (защита от ошибок округления pts).
+KEYFRAME_LOOKBACK_SEC = 30.0
+KEYFRAME_EPSILON_SEC = 0.02
+KEYFRAME_SEEK_NUDGE_SEC = 0.001
+
+# Пакетная нарезка: фрагменты с промежутком не больше этого читаются из общего входа. При перекодировании
+# промежуток декодируется впустую, поэтому он короткий; при stream copy пакеты промежутка только читаются.
+BATCH_SHARED_INPUT_MAX_GAP_SEC = 5.0
+BATCH_SHARED_INPUT_MAX_GAP_COPY_SEC = 60.0
+
+# Процесс FFmpeg завершается, если его прогресс (-progress) не продвигается столько секунд.
+# Общей длительности операции ограничение не касается: длинное перекодирование не прерывается.
+FFMPEG_STALL_TIMEOUT_SEC = DEFAULT_STALL_TIMEOUT_SEC
+
+
+def _prefix_filter_labels(filter_chain: str, prefix: str) -> str:
+    """Переименовывает метки внутри цепочки фильтров ([s0] -> [<prefix>s0]), чтобы ветви графа не конфликтовали."""
+    return re.sub(r"\[([A-Za-z0-9_]+)\]", lambda match: f"[{prefix}{match.group(1)}]", filter_chain)
 
 
 class CuttingEngine:
     def __init__(self, parent_logger=None):
         self.parent_logger = parent_logger
         self.ffmpeg_path = "ffmpeg"
-        self._current_process = None  # Для возможности отмены
+        self._live_processes = set()  # Все запущенные процессы FFmpeg (для отмены)
+        self._process_lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._stream_info_cache = {}  # {путь к видео: результат probe_streams}
+        self._video_encoder_args = None  # None - DEFAULT_CUT_VIDEO_PARAMS
 
     def _log(self, message, level="INFO"):  # Добавил level
         if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
@@ -22,22 +67,515 @@ class CuttingEngine:
         self._log(f"Установлен путь к FFmpeg: '{resolved_path}'")
         self.ffmpeg_path = resolved_path
 
+    def set_encoder_options(self, encoder: str, speed_tier: str, threads: int = 0):
+        """Кодировщик, уровень скорости и число потоков для нарезки без параметров пресета (см. modules/encoders)."""
+        self._video_encoder_args = build_video_encoder_args(encoder, speed_tier, crf=23, threads=threads)
+        self._log(f"Кодирование по умолчанию: {' '.join(self._video_encoder_args)}", level="DEBUG")
+
+    def _default_cut_params(self) -> list:
+        if not self._video_encoder_args:
+            return DEFAULT_CUT_FFMPEG_PARAMS
+        return self._video_encoder_args + DEFAULT_CUT_FFMPEG_PARAMS[len(DEFAULT_CUT_VIDEO_PARAMS):]
+
     def cancel_current_operation(self):  # Метод для попытки отмены
-        if self._current_process and self._current_process.poll() is None:  # Если процесс существует и выполняется
-            self._log("Попытка отменить текущую операцию FFmpeg...", level="WARN")
+        """
+        Отменяет все выполняющиеся процессы FFmpeg этого движка (их может быть несколько
+        при параллельном экспорте) и запрещает запуск новых до reset_cancel().
+        """
+        self._cancel_event.set()
+        with self._process_lock:
+            live_processes = [p for p in self._live_processes if p.poll() is None]
+        if not live_processes:
+            self._log("Нет активной операции FFmpeg для отмены.", level="DEBUG")
+            return
+        self._log(f"Попытка отменить активные операции FFmpeg ({len(live_processes)})...", level="WARN")
+        for process in live_processes:
             try:
-                self._current_process.terminate()  # Посылаем SIGTERM
-                # Можно добавить ожидание с тайм-аутом и self._current_process.kill() если terminate не сработал
-                self._log("Команда terminate отправлена процессу FFmpeg.", level="WARN")
+                process.kill()
+                self._log(f"Процесс FFmpeg (PID: {process.pid}) принудительно завершен.", level="WARN")
             except Exception as e:
                 self._log(f"Ошибка при попытке отменить процесс FFmpeg: {e}", level="ERROR")
+
+    def reset_cancel(self):
+        """Снимает флаг отмены перед новой серией операций."""
+        self._cancel_event.clear()
+
+    def cut_clip(self, input_video_path: str, start_time_sec: float, end_time_sec: float, output_path: str,
+                 ffmpeg_params: list | None = None, progress_callback=None) -> bool:
+        """
+        Вырезает фрагмент [start_time_sec, end_time_sec] и кодирует его одним вызовом FFmpeg.
+        ffmpeg_params - параметры кодирования выходного файла (например, из пресета ExportModule).
+        Если не указаны, используется DEFAULT_CUT_FFMPEG_PARAMS (libx264 + AAC в MP4)
+        с кодировщиком из set_encoder_options().
+        progress_callback(dict) - прогресс FFmpeg (см. ffmpeg_runner.ProgressTracker), вызывается из этого потока.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        norm_output_path = os.path.normpath(output_path)
+        duration = end_time_sec - start_time_sec
+        if not self._validate_cut_request(norm_input_video_path, start_time_sec, end_time_sec, norm_output_path):
+            return False
+
+        command = [
+            self.ffmpeg_path,
+            '-hide_banner',
+            '-loglevel', 'error',  # Оставляем error для чистого вывода, stderr будем анализировать
+            '-y',  # Перезаписывать выходной файл без запроса
+            '-ss', str(start_time_sec),  # Указываем время начала (лучше перед -i для быстрого поиска)
+            '-i', norm_input_video_path,
+            # При -ss перед -i метки времени выхода начинаются с нуля, поэтому '-to' здесь
+            # фактически означал бы длительность. Указываем длительность фрагмента явно.
+            '-t', f"{duration:.3f}",
+        ]
+        if ffmpeg_params is None:
+            ffmpeg_params = self._default_cut_params()
+        command += list(ffmpeg_params) + [norm_output_path]
+
+        self._log(f"  Сформирована команда FFmpeg: {' '.join(command)}", level="DEBUG")
+
+        return self._run_ffmpeg(command, norm_output_path, duration_sec=duration, progress_callback=progress_callback)
+
+    def cut_clip_multi(self, input_video_path: str, start_time_sec: float, end_time_sec: float, outputs: list,
+                       progress_callback=None) -> bool:
+        """
+        Кодирует фрагмент сразу в несколько файлов одним процессом FFmpeg: видео декодируется
+        один раз и раздается ветвям графа фильтров (split), аудио декодируется один раз и
+        передается всем выходам, которым оно нужно.
+        outputs - список словарей {'path', 'video_filter' (цепочка -vf или None), 'params', 'audio'},
+        см. ExportModule.build_output_spec. Возвращает True, если созданы все выходные файлы.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        norm_output_paths = [os.path.normpath(output["path"]) for output in outputs]
+        duration = end_time_sec - start_time_sec
+        for norm_output_path in norm_output_paths:
+            if not self._validate_cut_request(norm_input_video_path, start_time_sec, end_time_sec, norm_output_path):
+                return False
+
+        if len(outputs) > 1:
+            branch_labels = [f"[v{i}]" for i in range(len(outputs))]
+            filter_graph = [f"[0:v:0]split={len(outputs)}{''.join(branch_labels)}"]
         else:
-            self._log("Нет активной операции FFmpeg для отмены.", level="DEBUG")
+            branch_labels = ["[0:v:0]"]
+            filter_graph = []
+        output_args = []
+        for i, (output, norm_output_path) in enumerate(zip(outputs, norm_output_paths)):
+            chain = _prefix_filter_labels(output.get("video_filter") or "null", f"o{i}_")
+            filter_graph.append(f"{branch_labels[i]}{chain}[out{i}]")
+            output_args += ['-map', f"[out{i}]"]
+            if output.get("audio", True):
+                output_args += ['-map', '0:a:0?']
+            output_args += list(output.get("params") or []) + [norm_output_path]
+
+        command = [
+            self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+            '-ss', str(start_time_sec),
+            '-t', f"{duration:.3f}",  # Опция входа: ограничивает чтение исходника для всех выходов
+            '-i', norm_input_video_path,
+            '-filter_complex', ';'.join(filter_graph),
+        ] + output_args
+        self._log(f"  Сформирована команда FFmpeg (выходов: {len(outputs)}): {' '.join(command)}", level="DEBUG")
+        return self._run_ffmpeg(command, norm_output_paths, duration_sec=duration,
+                                progress_callback=progress_callback)
+
+    def cut_clips_batch(self, input_video_path: str, clips: list, ffmpeg_params: list | None = None,
+                        stream_copy: bool = False, audio: bool = True, progress_callback=None) -> bool:
+        """
+        Вырезает несколько фрагментов одного исходника одним процессом FFmpeg. Фрагменты, идущие
+        близко друг к другу (промежуток не больше BATCH_SHARED_INPUT_MAX_GAP_SEC), читаются из одного
+        входа: исходник открывается, разбирается и перематывается (-ss перед -i) один раз на группу,
+        декодер общий, а каждый выход отрезает свой интервал опциями выхода -ss/-t. Далекие друг от
+        друга фрагменты получают отдельные входы, чтобы не декодировать промежутки между ними.
+        clips - список словарей {'start', 'end', 'path'}; ffmpeg_params - как в cut_clip.
+        stream_copy=True - без перекодирования, начала клипов прилипают к ключевым кадрам, как в
+        cut_clip_stream_copy (ключевые кадры всей пачки - одним вызовом ffprobe, по окну на клип).
+        audio=False - не подключать аудио (форматы без звука, например GIF).
+        Возвращает True, если созданы все файлы; при ошибке частично записанные файлы удаляются.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        norm_output_paths = [os.path.normpath(clip["path"]) for clip in clips]
+        for clip, norm_output_path in zip(clips, norm_output_paths):
+            if not self._validate_cut_request(norm_input_video_path, clip["start"], clip["end"], norm_output_path):
+                return False
+
+        starts = [clip["start"] for clip in clips]
+        if stream_copy:
+            keyframes = self.probe_keyframes_windows(
+                norm_input_video_path,
+                [(max(0.0, start - KEYFRAME_LOOKBACK_SEC), start + KEYFRAME_EPSILON_SEC) for start in starts])
+            if not keyframes:
+                self._log("  Ключевые кадры не получены (ffprobe недоступен?). Stream copy от запрошенного времени.",
+                          level="WARN")
+            starts = [self._snap_to_previous_keyframe(keyframes, start) for start in starts]
+            output_params = ['-c', 'copy', '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart']
+            max_gap_sec = BATCH_SHARED_INPUT_MAX_GAP_COPY_SEC
+        else:
+            output_params = list(self._default_cut_params() if ffmpeg_params is None else ffmpeg_params)
+            max_gap_sec = BATCH_SHARED_INPUT_MAX_GAP_SEC
+
+        # Группы фрагментов с общим входом (по времени начала)
+        groups = []
+        for i in sorted(range(len(clips)), key=lambda clip_index: starts[clip_index]):
+            if groups and starts[i] - groups[-1]["end"] <= max_gap_sec:
+                groups[-1]["clips"].append(i)
+                groups[-1]["end"] = max(groups[-1]["end"], clips[i]["end"])
+            else:
+                groups.append({"start": starts[i], "end": clips[i]["end"], "clips": [i]})
+
+        input_args = []
+        output_args = []
+        for input_index, group in enumerate(groups):
+            # Сдвиг внутрь GOP - как в _build_stream_copy_command
+            seek_time = group["start"] + KEYFRAME_SEEK_NUDGE_SEC if stream_copy and group["start"] > 0 \
+                else group["start"]
+            input_args += ['-ss', f"{seek_time:.3f}", '-t', f"{group['end'] - seek_time:.3f}",
+                           '-i', norm_input_video_path]
+            for i in group["clips"]:
+                output_args += ['-map', f"{input_index}:v:0"]
+                if audio:
+                    output_args += ['-map', f"{input_index}:a:0?"]
+                offset = starts[i] - seek_time
+                if offset > KEYFRAME_EPSILON_SEC:
+                    # Перекодирование: кадры до offset декодируются и отбрасываются (точно до кадра).
+                    # Stream copy: пакеты пропускаются до первого ключевого кадра не раньше offset -
+                    # offset чуть уменьшен, чтобы им оказался ключевой кадр, к которому прилипло начало.
+                    output_args += ['-ss', f"{offset - KEYFRAME_EPSILON_SEC if stream_copy else offset:.3f}"]
+                output_args += ['-t', f"{clips[i]['end'] - starts[i]:.3f}"] + output_params + [norm_output_paths[i]]
+
+        command = [self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y'] + input_args + output_args
+        self._log(f"  Сформирована команда FFmpeg (клипов в пачке: {len(clips)}, входов: {len(groups)}): "
+                  f"{' '.join(command)}", level="DEBUG")
+        # Выходы пишутся одновременно, поэтому прогресс FFmpeg идет до длительности самого длинного клипа
+        return self._run_ffmpeg(command, norm_output_paths,
+                                duration_sec=max(clip["end"] - start for clip, start in zip(clips, starts)),
+                                progress_callback=progress_callback)
+
+    def cut_clip_stream_copy(self, input_video_path: str, start_time_sec: float, end_time_sec: float,
+                             output_path: str, smart_render: bool = False, progress_callback=None) -> bool:
+        """
+        Вырезает фрагмент без перекодирования (stream copy) с учетом ключевых кадров исходника.
+
+        smart_render=False: начало "прилипает" к ближайшему ключевому кадру не позже start_time_sec,
+            т.е. клип может начаться чуть раньше запрошенного, зато операция полностью без потерь
+            и упирается только в скорость диска.
+        smart_render=True: перекодируется только неполная GOP в начале клипа (от start_time_sec до
+            следующего ключевого кадра), остальное копируется как есть; части склеиваются concat-демуксером.
+            Поддерживается только для H.264-исходников, иначе используется режим прилипания.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        norm_output_path = os.path.normpath(output_path)
+        if not self._validate_cut_request(norm_input_video_path, start_time_sec, end_time_sec, norm_output_path):
+            return False
+
+        keyframes = self.probe_keyframes(norm_input_video_path, max(0.0, start_time_sec - KEYFRAME_LOOKBACK_SEC),
+                                         end_time_sec)
+        if not keyframes:
+            self._log("  Ключевые кадры не получены (ffprobe недоступен?). Stream copy от запрошенного времени.",
+                      level="WARN")
+
+        if smart_render and keyframes:
+            stream_info = self.probe_streams(norm_input_video_path)
+            if stream_info.get("video_codec") != "h264":
+                self._log(f"  Smart render поддерживается только для H.264 (исходник: "
+                          f"'{stream_info.get('video_codec')}'). Используется прилипание к ключевому кадру.",
+                          level="WARN")
+            else:
+                next_keyframes = [k for k in keyframes if k >= start_time_sec - KEYFRAME_EPSILON_SEC]
+                if not next_keyframes or next_keyframes[0] >= end_time_sec:
+                    # Внутри клипа нет ключевых кадров - весь клип является "неполной GOP", кодируем целиком
+                    self._log("  Внутри клипа нет ключевых кадров. Клип будет перекодирован целиком.", level="DEBUG")
+                    return self.cut_clip(norm_input_video_path, start_time_sec, end_time_sec, norm_output_path,
+                                         progress_callback=progress_callback)
+                if next_keyframes[0] - start_time_sec > KEYFRAME_EPSILON_SEC:
+                    return self._smart_render_cut(norm_input_video_path, start_time_sec, end_time_sec,
+                                                  next_keyframes[0], norm_output_path, stream_info,
+                                                  progress_callback)
+                self._log("  Начало клипа совпадает с ключевым кадром, перекодирование головы не требуется.",
+                          level="DEBUG")
+
+        copy_start = self._snap_to_previous_keyframe(keyframes, start_time_sec)
+        if start_time_sec - copy_start > KEYFRAME_EPSILON_SEC:
+            self._log(f"  Начало клипа сдвинуто к ключевому кадру: {start_time_sec:.3f}с -> {copy_start:.3f}с",
+                      level="DEBUG")
+
+        command = self._build_stream_copy_command(norm_input_video_path, copy_start, end_time_sec,
+                                                  norm_output_path, ['-movflags', '+faststart'])
+        self._log(f"  Сформирована команда FFmpeg (stream copy): {' '.join(command)}", level="DEBUG")
+        return self._run_ffmpeg(command, norm_output_path, duration_sec=end_time_sec - copy_start,
+                                progress_callback=progress_callback)
+
+    @staticmethod
+    def _snap_to_previous_keyframe(keyframes: list, start_time_sec: float) -> float:
+        previous_keyframes = [k for k in keyframes if k <= start_time_sec + KEYFRAME_EPSILON_SEC]
+        return previous_keyframes[-1] if previous_keyframes else start_time_sec
+
+    def resolve_stream_copy_start(self, input_video_path: str, start_time_sec: float,
+                                  smart_render: bool = False) -> float:
+        """
+        Фактическое время начала клипа, вырезанного cut_clip_stream_copy (в секундах исходника).
+        В режиме прилипания клип начинается с ключевого кадра не позже start_time_sec;
+        smart render для H.264 начинает ровно с запрошенного времени.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        if smart_render and self.probe_streams(norm_input_video_path).get("video_codec") == "h264":
+            return start_time_sec
+        keyframes = self.probe_keyframes(norm_input_video_path, max(0.0, start_time_sec - KEYFRAME_LOOKBACK_SEC),
+                                         start_time_sec + KEYFRAME_EPSILON_SEC)
+        return self._snap_to_previous_keyframe(keyframes, start_time_sec)
+
+    def _build_stream_copy_command(self, norm_input_video_path: str, keyframe_time_sec: float,
+                                   end_time_sec: float, norm_output_path: str, extra_params: list) -> list:
+        # Небольшой сдвиг вперед, чтобы округление метки ключевого кадра не увело поиск на предыдущую GOP
+        seek_time = keyframe_time_sec + KEYFRAME_SEEK_NUDGE_SEC if keyframe_time_sec > 0 else 0.0
+        return [
+            self.ffmpeg_path,
+            '-hide_banner', '-loglevel', 'error', '-y',
+            '-ss', f"{seek_time:.3f}",
+            '-i', norm_input_video_path,
+            '-t', f"{end_time_sec - keyframe_time_sec:.3f}",
+            '-map', '0:v:0', '-map', '0:a?',
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+        ] + extra_params + [norm_output_path]
+
+    def _smart_render_cut(self, norm_input_video_path: str, start_time_sec: float, end_time_sec: float,
+                          keyframe_time_sec: float, norm_output_path: str, stream_info: dict,
+                          progress_callback=None) -> bool:
+        """Перекодирует [start, keyframe), копирует [keyframe, end] и склеивает части без перекодирования."""
+        self._log(f"  Smart render: перекодирование {start_time_sec:.3f}с-{keyframe_time_sec:.3f}с, "
+                  f"копирование {keyframe_time_sec:.3f}с-{end_time_sec:.3f}с", level="DEBUG")
+        base_path, _ = os.path.splitext(norm_output_path)
+        head_path = f"{base_path}.head.ts"
+        tail_path = f"{base_path}.tail.ts"
+        list_path = f"{base_path}.concat.txt"
+        total_sec = end_time_sec - start_time_sec
+        head_sec = keyframe_time_sec - start_time_sec
+        try:
+            # Голова: MPEG-TS с SPS/PPS в потоке, чтобы при склейке декодер переключился на параметры исходника
+            head_command = [
+                self.ffmpeg_path,
+                '-hide_banner', '-loglevel', 'error', '-y',
+                '-ss', f"{start_time_sec:.3f}",
+                '-i', norm_input_video_path,
+                '-t', f"{keyframe_time_sec - start_time_sec:.3f}",
+                '-map', '0:v:0', '-map', '0:a?',
+                '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18',
+                '-c:a', 'copy',
+            ]
+            if stream_info.get("pix_fmt"):
+                head_command += ['-pix_fmt', stream_info["pix_fmt"]]
+            head_command += ['-f', 'mpegts', head_path]
+            if not self._run_ffmpeg(head_command, head_path, duration_sec=head_sec,
+                                    progress_callback=offset_progress_callback(progress_callback, 0.0, total_sec)):
+                return False
+
+            tail_command = self._build_stream_copy_command(norm_input_video_path, keyframe_time_sec, end_time_sec,
+                                                           tail_path, ['-bsf:v', 'h264_mp4toannexb', '-f', 'mpegts'])
+            if not self._run_ffmpeg(tail_command, tail_path, duration_sec=total_sec - head_sec,
+                                    progress_callback=offset_progress_callback(progress_callback, head_sec,
+                                                                               total_sec)):
+                return False
+
+            with open(list_path, "w", encoding="utf-8") as list_file:
+                for part_path in (head_path, tail_path):
+                    escaped = part_path.replace("\\", "/").replace("'", "'\\''")
+                    list_file.write(f"file '{escaped}'\n")
+
+            concat_command = [
+                self.ffmpeg_path,
+                '-hide_banner', '-loglevel', 'error', '-y',
+                '-f', 'concat', '-safe', '0',
+                '-i', list_path,
+                '-map', '0',
+                '-c', 'copy',
+                '-movflags', '+faststart',
+                norm_output_path
+            ]
+            self._log(f"  Сформирована команда FFmpeg (concat): {' '.join(concat_command)}", level="DEBUG")
+            return self._run_ffmpeg(concat_command, norm_output_path)
+        finally:
+            for temp_path in (head_path, tail_path, list_path):
+                if os.path.exists(temp_path):
+                    try:
+                        os.remove(temp_path)
+                    except OSError as e_rem:
+                        self._log(f"    Не удалось удалить временный файл {os.path.basename(temp_path)}: {e_rem}",
+                                  level="WARN")
+
+    def create_analysis_proxy(self, input_video_path: str, output_path: str, height: int,
+                              fps: float | None = None, duration_sec: float | None = None,
+                              progress_callback=None) -> bool:
+        """
+        Создает маленький прокси только для анализа сцен: без звука, высотой не больше height,
+        при заданном fps - с прореженной частотой кадров. Декодирование исходника выполняет
+        FFmpeg (многопоточно), а OpenCV затем читает кадры в несколько раз меньшего размера.
+        duration_sec (длительность исходника) нужна только для доли и ETA в progress_callback.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        norm_output_path = os.path.normpath(output_path)
+        video_filters = [f"scale=-2:'min(ih,{int(height)})'"]
+        if fps:
+            video_filters.insert(0, f"fps={fps:.6f}")  # Сначала прореживаем, чтобы не масштабировать лишние кадры
+        command = [
+            self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+            '-i', norm_input_video_path,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', ','.join(video_filters),
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'fastdecode', '-crf', '28',
+            '-pix_fmt', 'yuv420p',
+            norm_output_path
+        ]
+        self._log(f"Создание прокси для анализа ({height}p): {os.path.basename(norm_input_video_path)}")
+        self._log(f"  Команда FFmpeg: {' '.join(command)}", level="DEBUG")
+        # Общее время не ограничено (зависит от длины исходника): прерывается только зависший процесс
+        return self._run_ffmpeg(command, norm_output_path, duration_sec=duration_sec,
+                                progress_callback=progress_callback)
+
+    def create_preview_proxy(self, input_video_path: str, output_path: str, height: int, keyint: int,
+                             duration_sec: float | None = None, progress_callback=None) -> bool:
+        """
+        Создает прокси для просмотра в плеере: высотой не больше height, со звуком и короткой GOP
+        (ключевой кадр каждые keyint кадров, без B-кадров), поэтому перемотка к любой позиции
+        декодирует не больше keyint кадров. Для экспорта по-прежнему используется исходник.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        norm_output_path = os.path.normpath(output_path)
+        command = [
+            self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+            '-i', norm_input_video_path,
+            '-map', '0:v:0', '-map', '0:a:0?', '-sn',
+            '-vf', f"scale=-2:'min(ih,{int(height)})'",
+            '-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'fastdecode', '-crf', '28',
+            '-g', str(int(keyint)), '-keyint_min', str(int(keyint)), '-sc_threshold', '0', '-bf', '0',
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', '96k', '-ac', '2',
+            '-movflags', '+faststart',
+            '-f', 'mp4',  # Прокси пишется во временный файл с другим расширением
+            norm_output_path
+        ]
+        self._log(f"Создание прокси для просмотра ({height}p): {os.path.basename(norm_input_video_path)}")
+        self._log(f"  Команда FFmpeg: {' '.join(command)}", level="DEBUG")
+        return self._run_ffmpeg(command, norm_output_path, duration_sec=duration_sec,
+                                progress_callback=progress_callback)
 
-    def cut_clip(self, input_video_path: str, start_time_sec: float, end_time_sec: float, output_path: str) -> bool:
+    def create_thumbnail_strip(self, input_video_path: str, output_path: str, interval_sec: float, width: int,
+                               height: int, duration_sec: float | None = None, progress_callback=None) -> bool:
+        """
+        Одним последовательным проходом записывает по кадру каждые interval_sec секунд,
+        вписанному в width x height (с полями), подряд в файл rawvideo RGB24 (см. modules/thumbnail_index).
+        """
         norm_input_video_path = os.path.normpath(input_video_path)
         norm_output_path = os.path.normpath(output_path)
+        video_filter = (f"fps=1/{interval_sec:g},"
+                        f"scale={int(width)}:{int(height)}:force_original_aspect_ratio=decrease,"
+                        f"pad={int(width)}:{int(height)}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+        command = [
+            self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+            '-i', norm_input_video_path,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', video_filter,
+            '-pix_fmt', 'rgb24', '-f', 'rawvideo',
+            norm_output_path
+        ]
+        self._log(f"Создание миниатюр (каждые {interval_sec:g} с, {width}x{height}): "
+                  f"{os.path.basename(norm_input_video_path)}")
+        self._log(f"  Команда FFmpeg: {' '.join(command)}", level="DEBUG")
+        return self._run_ffmpeg(command, norm_output_path, duration_sec=duration_sec,
+                                progress_callback=progress_callback)
+
+    def get_ffprobe_path(self) -> str:
+        """Путь к ffprobe выводится из пути к FFmpeg (ffprobe поставляется вместе с ним)."""
+        ffmpeg_dir, ffmpeg_name = os.path.split(self.ffmpeg_path)
+        if not re.search("ffmpeg", ffmpeg_name, flags=re.IGNORECASE):
+            return "ffprobe"
+        return os.path.join(ffmpeg_dir, re.sub("ffmpeg", "ffprobe", ffmpeg_name, flags=re.IGNORECASE))
+
+    def _run_ffprobe(self, args: list, timeout_sec: int = 60) -> str | None:
+        command = [self.get_ffprobe_path(), '-v', 'error'] + args
+        self._log(f"  Команда FFprobe: {' '.join(command)}", level="DEBUG")
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout_sec,
+                                    startupinfo=self._get_startupinfo())
+        except FileNotFoundError:
+            self._log(f"FFprobe не найден по пути '{command[0]}'.", level="ERROR")
+            return None
+        except subprocess.TimeoutExpired:
+            self._log(f"FFprobe не ответил за {timeout_sec} секунд.", level="ERROR")
+            return None
+        if result.returncode != 0:
+            self._log(f"  ОШИБКА FFprobe (код {result.returncode}): {result.stderr.strip()}", level="ERROR")
+            return None
+        return result.stdout
+
+    def probe_streams(self, input_video_path: str) -> dict:
+        """
+        Возвращает основные параметры исходника: {'video_codec', 'pix_fmt', 'has_audio'}.
+        Результат кешируется по пути файла.
+        """
+        norm_input_video_path = os.path.normpath(input_video_path)
+        if norm_input_video_path in self._stream_info_cache:
+            return self._stream_info_cache[norm_input_video_path]
+
+        info = {"video_codec": None, "pix_fmt": None, "has_audio": False}
+        output = self._run_ffprobe(['-show_entries', 'stream=codec_type,codec_name,pix_fmt',
+                                    '-of', 'csv=print_section=0', norm_input_video_path])
+        if output is None:
+            return info
+        for line in output.splitlines():
+            fields = line.strip().split(',')
+            if len(fields) < 2:
+                continue
+            codec_name, codec_type = fields[0], fields[1]
+            if codec_type == "video" and info["video_codec"] is None:
+                info["video_codec"] = codec_name
+                info["pix_fmt"] = fields[2] if len(fields) > 2 and fields[2] else None
+            elif codec_type == "audio":
+                info["has_audio"] = True
+        self._stream_info_cache[norm_input_video_path] = info
+        return info
+
+    def probe_duration(self, input_video_path: str) -> float | None:
+        """Длительность контейнера в секундах (None, если FFprobe ее не сообщил)."""
+        output = self._run_ffprobe(['-show_entries', 'format=duration', '-of', 'csv=p=0',
+                                    os.path.normpath(input_video_path)])
+        try:
+            return float(output.strip()) if output else None
+        except ValueError:
+            return None
 
+    def probe_keyframes(self, input_video_path: str, start_time_sec: float, end_time_sec: float) -> list:
+        """
+        Возвращает отсортированный список времен (сек) ключевых кадров видеопотока в окне [start, end].
+        Читаются только заголовки пакетов (без декодирования), поэтому это быстро даже для длинных файлов.
+        """
+        return self.probe_keyframes_windows(input_video_path, [(start_time_sec, end_time_sec)])
+
+    def probe_keyframes_windows(self, input_video_path: str, windows: list) -> list:
+        """
+        Ключевые кадры в нескольких окнах [(start, end), ...] одним вызовом ffprobe: окна передаются
+        списком -read_intervals, и читаются только они, а не весь отрезок от первого окна до последнего.
+        """
+        read_intervals = ",".join(f"{start:.3f}%{end:.3f}" for start, end in windows)
+        output = self._run_ffprobe(['-select_streams', 'v:0',
+                                    '-read_intervals', read_intervals,
+                                    '-show_entries', 'packet=pts_time,flags',
+                                    '-of', 'csv=print_section=0', os.path.normpath(input_video_path)])
+        if not output:
+            return []
+        keyframes = []
+        for line in output.splitlines():
+            fields = line.strip().split(',')
+            if len(fields) < 2 or 'K' not in fields[1]:
+                continue
+            try:
+                keyframes.append(float(fields[0]))
+            except ValueError:
+                continue  # pts_time может быть N/A
+        keyframes = sorted(set(keyframes))  # Окна могут перекрываться
+        self._log(f"  Найдено ключевых кадров в окнах {read_intervals}: {len(keyframes)}", level="DEBUG")
+        return keyframes
+
+    def _validate_cut_request(self, norm_input_video_path: str, start_time_sec: float, end_time_sec: float,
+                              norm_output_path: str) -> bool:
+        """Общие проверки перед нарезкой: длительность, наличие исходника, выходная директория."""
         self._log(
             f"Попытка вырезать клип из '{os.path.basename(norm_input_video_path)}' "
             f"с {start_time_sec:.3f}с по {end_time_sec:.3f}с в '{os.path.basename(norm_output_path)}'"
@@ -61,122 +599,112 @@ class CuttingEngine:
             except OSError as e_mkdir:
                 self._log(f"  Ошибка создания выходной директории {output_dir}: {e_mkdir}", level="ERROR")
                 return False
+        return True
 
-        command = [
-            self.ffmpeg_path,
-            '-hide_banner',
-            '-loglevel', 'error',  # Оставляем error для чистого вывода, stderr будем анализировать
-            '-y',  # Перезаписывать выходной файл без запроса
-            '-ss', str(start_time_sec),  # Указываем время начала (лучше перед -i для быстрого поиска)
-            '-i', norm_input_video_path,
-            '-to', str(end_time_sec),  # Указываем время окончания (относительно начала файла)
-            # '-t', str(duration), # Альтернатива: указать длительность вырезаемого фрагмента
-            '-c:v', 'libx264',  # Кодек видео
-            '-preset', 'medium',  # Пресет качества/скорости для x264
-            '-crf', '23',  # Constant Rate Factor (качество, меньше = лучше и больше размер)
-            '-c:a', 'aac',  # Кодек аудио
-            '-b:a', '160k',  # Битрейт аудио
-            # ИСПРАВЛЕНИЕ: Замена 'make_nonnegative' на '1' или 'auto'. '1' обычно работает.
-            # Эта опция полезна, если исходное видео имеет неправильные временные метки.
-            # Для MP4 muxer, значение должно быть одним из флагов, а не строкой 'make_nonnegative'.
-            # Либо можно использовать '-output_ts_offset' или другие методы коррекции TS.
-            # Попробуем '-avoid_negative_ts', '1'
-            # '-avoid_negative_ts', '1', # Для избежания отрицательных временных меток
-            # Либо можно попробовать '-flags', '+ бит_для_коррекции_ts'
-            # По документации FFmpeg: avoid_negative_ts type:flags
-            # Available values for flags:
-            # ‘disabled’ 0
-            # ‘auto’ -1 default
-            # ‘make_zero’ 1 Shift timestamps so that the first one is 0.
-            # ‘make_nonnegative’ 2 Shift timestamps so that the first one is not negative. This is useful when clipping parts of a stream.
-            # Попробуем '2' (make_nonnegative) как числовой флаг
-            '-avoid_negative_ts', '2',
-            '-movflags', '+faststart',  # Для оптимизации MP4 для стриминга
-            norm_output_path
-        ]
+    @staticmethod
+    def _get_startupinfo():
+        """Для скрытия окна консоли FFmpeg/FFprobe на Windows."""
+        startupinfo = None
+        if platform.system() == "Windows":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+        return startupinfo
 
-        self._log(f"  Сформирована команда FFmpeg: {' '.join(command)}", level="DEBUG")
+    def _run_ffmpeg(self, command: list, norm_output_path: str | list, duration_sec: float | None = None,
+                    progress_callback=None, stall_timeout_sec: float | None = FFMPEG_STALL_TIMEOUT_SEC) -> bool:
+        """
+        Запускает сформированную команду FFmpeg (с -progress pipe:1, см. modules/ffmpeg_runner)
+        и проверяет, что выходной файл создан и не пуст. При ошибке частично записанный файл удаляется.
+        norm_output_path может быть списком - для команды с несколькими выходами (cut_clip_multi).
+        duration_sec - ожидаемая длительность результата для доли/ETA в progress_callback.
+        Процесс завершается, если прогресс не продвигается stall_timeout_sec секунд.
+        Потокобезопасен: несколько вызовов могут выполняться параллельно (пул экспорта),
+        каждый процесс регистрируется в _live_processes для отмены.
+        """
+        if self._cancel_event.is_set():
+            self._log("  Операция отменена, процесс FFmpeg не запускается.", level="DEBUG")
+            return False
+
+        output_paths = [norm_output_path] if isinstance(norm_output_path, str) else list(norm_output_path)
+        started_processes = []
+
+        def on_started(process):
+            started_processes.append(process)
+            with self._process_lock:
+                self._live_processes.add(process)
+            if self._cancel_event.is_set():  # Отмена могла прийти между проверкой и запуском
+                process.kill()
+            self._log(f"  Процесс FFmpeg запущен (PID: {process.pid}). Ожидание завершения...", level="DEBUG")
 
-        self._current_process = None
         try:
             self._log("  Запуск процесса FFmpeg...", level="DEBUG")
-            # Используем subprocess.run для более простого управления и получения вывода
-            # Для скрытия окна консоли на Windows:
-            startupinfo = None
-            if platform.system() == "Windows":
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-
-            self._current_process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,  # Захватываем stdout
-                stderr=subprocess.PIPE,  # Захватываем stderr
-                universal_newlines=True,  # Декодировать байты в строки
-                startupinfo=startupinfo
-            )
-            self._log(
-                f"  Процесс FFmpeg запущен (PID: {self._current_process.pid if self._current_process else 'N/A'}). Ожидание завершения...",
-                level="DEBUG")
+            return_code, stderr, stalled = run_ffmpeg(command, duration_sec=duration_sec,
+                                                      progress_callback=progress_callback,
+                                                      stall_timeout_sec=stall_timeout_sec, on_started=on_started,
+                                                      startupinfo=self._get_startupinfo())
 
-            stdout, stderr = self._current_process.communicate(timeout=120)  # Таймаут 2 минуты
-            return_code = self._current_process.returncode
-            self._current_process = None  # Сбрасываем после завершения
+            if stalled:
+                self._log(f"  ОШИБКА FFmpeg: нет прогресса {stall_timeout_sec:.0f} секунд, процесс принудительно "
+                          f"завершен.", level="ERROR")
+                if stderr: self._log(f"    FFmpeg STDERR (после kill): {stderr.strip()}", level="ERROR")
+                for output_path in output_paths:
+                    self._remove_partial_output(output_path)
+                return False
 
             self._log(f"  Процесс FFmpeg завершен с кодом: {return_code}", level="INFO")
 
             if return_code == 0:
-                if not os.path.exists(norm_output_path) or os.path.getsize(norm_output_path) == 0:
-                    self._log(
-                        f"  ВНИМАНИЕ: FFmpeg вернул 0, но выходной файл '{norm_output_path}' не существует или пуст!",
-                        level="ERROR")
+                missing_paths = [output_path for output_path in output_paths
+                                 if not os.path.exists(output_path) or os.path.getsize(output_path) == 0]
+                if missing_paths:
+                    for output_path in missing_paths:
+                        self._log(
+                            f"  ВНИМАНИЕ: FFmpeg вернул 0, но выходной файл '{output_path}' не существует или пуст!",
+                            level="ERROR")
                     if stderr: self._log(f"    FFmpeg STDERR (при успехе, но пустом файле): {stderr.strip()}",
                                          level="WARN")
+                    # Вызов считается неудачным целиком, как и при ненулевом коде: остальные выходы
+                    # тоже удаляются, чтобы на диске не осталось файлов, учтенных как ошибка
+                    for output_path in output_paths:
+                        self._remove_partial_output(output_path)
                     return False
-                self._log(f"  Клип успешно нарезан и сохранен: {os.path.basename(norm_output_path)}")
+                self._log(f"  Клип успешно нарезан и сохранен: "
+                          f"{', '.join(os.path.basename(output_path) for output_path in output_paths)}")
                 return True
             else:
                 self._log(f"  ОШИБКА FFmpeg при нарезке клипа (код возврата: {return_code}):", level="ERROR")
-                if stdout: self._log(f"    FFmpeg STDOUT: {stdout.strip()}",
-                                     level="WARN")  # Может содержать полезную информацию
                 if stderr: self._log(f"    FFmpeg STDERR: {stderr.strip()}", level="ERROR")  # Основные ошибки здесь
-
-                if os.path.exists(norm_output_path):  # Попытка удалить частично созданный файл
-                    try:
-                        os.remove(norm_output_path)
-                        self._log(f"    Частично созданный файл {os.path.basename(norm_output_path)} удален.",
-                                  level="DEBUG")
-                    except OSError as e_rem:
-                        self._log(
-                            f"    Не удалось удалить частично созданный файл {os.path.basename(norm_output_path)}: {e_rem}",
-                            level="WARN")
+                for output_path in output_paths:
+                    self._remove_partial_output(output_path)
                 return False
         except FileNotFoundError:
             self._log(
                 f"КРИТИЧЕСКАЯ ОШИБКА: FFmpeg не найден по пути '{self.ffmpeg_path}'. Убедитесь, что FFmpeg установлен и указан в PATH или в настройках приложения.",
                 level="CRITICAL")
             return False
-        except subprocess.TimeoutExpired:
-            self._log(
-                "  ОШИБКА FFmpeg: Время ожидания операции истекло (120 секунд). Процесс будет принудительно завершен.",
-                level="ERROR")
-            if self._current_process:
-                self._current_process.kill()
-                stdout, stderr = self._current_process.communicate()
-                self._log(f"    FFmpeg STDOUT (после kill): {stdout.strip() if stdout else ''}", level="WARN")
-                self._log(f"    FFmpeg STDERR (после kill): {stderr.strip() if stderr else ''}", level="ERROR")
-            self._current_process = None
-            return False
         except Exception as e:
             self._log(f"  НЕПРЕДВИДЕННАЯ ОШИБКА при вызове FFmpeg: {type(e).__name__} - {e}", level="CRITICAL")
             import traceback
             self._log(f"    Traceback: {traceback.format_exc()}", level="DEBUG")
-            if self._current_process:  # Если ошибка произошла после запуска, но до communicate
+            for process in started_processes:  # Если ошибка произошла после запуска (например, в progress_callback)
                 try:
-                    self._current_process.kill()
+                    process.kill()
                 except:
                     pass  # Игнорируем ошибки при kill
-            self._current_process = None
             return False
         finally:
-            self._current_process = None  # Убедимся, что сброшен
\ No newline at end of file
+            with self._process_lock:
+                for process in started_processes:
+                    self._live_processes.discard(process)
+
+    def _remove_partial_output(self, norm_output_path: str):
+        if os.path.exists(norm_output_path):  # Попытка удалить частично созданный файл
+            try:
+                os.remove(norm_output_path)
+                self._log(f"    Частично созданный файл {os.path.basename(norm_output_path)} удален.",
+                          level="DEBUG")
+            except OSError as e_rem:
+                self._log(
+                    f"    Не удалось удалить частично созданный файл {os.path.basename(norm_output_path)}: {e_rem}",
+                    level="WARN")
@@ -0,0 +1,168 @@
+# automated_content_creator/modules/encoders.py
+#
+# Программные кодировщики видео и уровни скорости для экспорта. Пресеты ExportModule задают
+# разрешение, фильтры и качество (CRF в шкале libx264), а кодировщик, уровень скорости и число
+# потоков выбираются отдельно: один и тот же пресет можно кодировать быстро (черновик) или
+# медленно и компактно (финал), в H.264, HEVC, AV1 или VP9. Там же - замер скорости кодирования
+# и размера файла по уровням на фрагменте реального видео (benchmark_encoders).
+
+import os
+import subprocess
+import tempfile
+import time
+
+from modules.ffmpeg_runner import run_ffmpeg
+
+SPEED_TIERS = {
+    "draft": "Черновик (максимальная скорость)",
+    "fast": "Быстро",
+    "balanced": "Сбалансированно",
+    "final": "Финал (медленно, меньше файл)",
+}
+DEFAULT_SPEED_TIER = "balanced"
+DEFAULT_ENCODER = "libx264"
+
+# tiers - параметры скорости для каждого уровня; crf_offset - сдвиг CRF пресета (шкала libx264)
+# к шкале кодировщика для примерно того же визуального качества; crf_max - верхняя граница шкалы.
+ENCODER_BACKENDS = {
+    "libx264": {
+        "title": "H.264 (libx264)",
+        "tiers": {
+            "draft": ['-preset', 'ultrafast'],
+            "fast": ['-preset', 'veryfast'],
+            "balanced": ['-preset', 'medium'],
+            "final": ['-preset', 'slow'],
+        },
+        "crf_offset": 0, "crf_max": 51,
+        "extra_params": [],
+    },
+    "libx265": {
+        "title": "HEVC (libx265)",
+        "tiers": {
+            "draft": ['-preset', 'ultrafast'],
+            "fast": ['-preset', 'veryfast'],
+            "balanced": ['-preset', 'medium'],
+            "final": ['-preset', 'slow'],
+        },
+        "crf_offset": 5, "crf_max": 51,
+        "extra_params": ['-tag:v', 'hvc1'],  # Без тега hvc1 MP4 с HEVC не открывается в QuickTime/iOS
+    },
+    "libsvtav1": {
+        "title": "AV1 (SVT-AV1)",
+        "tiers": {
+            "draft": ['-preset', '12'],
+            "fast": ['-preset', '10'],
+            "balanced": ['-preset', '8'],
+            "final": ['-preset', '5'],
+        },
+        "crf_offset": 12, "crf_max": 63,
+        "extra_params": [],
+    },
+    "libvpx-vp9": {
+        "title": "VP9 (libvpx)",
+        "tiers": {
+            "draft": ['-deadline', 'realtime', '-cpu-used', '8'],
+            "fast": ['-deadline', 'good', '-cpu-used', '5'],
+            "balanced": ['-deadline', 'good', '-cpu-used', '2'],
+            "final": ['-deadline', 'good', '-cpu-used', '1'],
+        },
+        "crf_offset": 10, "crf_max": 63,
+        "extra_params": ['-b:v', '0', '-row-mt', '1'],  # -b:v 0 - режим постоянного качества (CRF)
+    },
+}
+
+BENCHMARK_SAMPLE_SEC = 10.0
+BENCHMARK_DEFAULT_CRF = 23
+
+
+def build_video_encoder_args(encoder: str = DEFAULT_ENCODER, speed_tier: str = DEFAULT_SPEED_TIER,
+                             crf: int | str = BENCHMARK_DEFAULT_CRF, threads: int = 0) -> list:
+    """
+    Параметры кодирования видео: -c:v, уровень скорости, качество и число потоков.
+    crf - в шкале libx264 (как в пресетах ExportModule), переводится в шкалу кодировщика.
+    threads=0 - число потоков выбирает сам кодировщик.
+    """
+    if encoder not in ENCODER_BACKENDS:
+        encoder = DEFAULT_ENCODER
+    backend = ENCODER_BACKENDS[encoder]
+    tier_args = backend["tiers"].get(speed_tier, backend["tiers"][DEFAULT_SPEED_TIER])
+    encoder_crf = min(backend["crf_max"], int(crf) + backend["crf_offset"])
+    args = ['-c:v', encoder] + tier_args + ['-crf', str(encoder_crf)] + backend["extra_params"]
+    if threads and threads > 0:
+        args += ['-threads', str(int(threads))]
+    return args
+
+
+def list_available_encoders(ffmpeg_path: str = "ffmpeg") -> list:
+    """Кодировщики из ENCODER_BACKENDS, с которыми собран данный FFmpeg (по 'ffmpeg -encoders')."""
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'], capture_output=True, text=True,
+                                encoding='utf-8', errors='replace', timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    available = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith("V"):
+            available.add(parts[1])
+    return [encoder for encoder in ENCODER_BACKENDS if encoder in available]
+
+
+def benchmark_encoders(input_video_path: str, ffmpeg_path: str = "ffmpeg", encoders: list | None = None,
+                       speed_tiers: list | None = None, start_sec: float = 0.0,
+                       sample_sec: float = BENCHMARK_SAMPLE_SEC, crf: int = BENCHMARK_DEFAULT_CRF,
+                       threads: int = 0, scale_height: int | None = None, result_callback=None) -> list:
+    """
+    Кодирует один и тот же фрагмент [start_sec, start_sec + sample_sec] каждым кодировщиком на каждом
+    уровне скорости (без звука, во временный файл, который затем удаляется) и возвращает список
+    {'encoder', 'speed_tier', 'ok', 'encode_fps', 'speed', 'elapsed_sec', 'size_bytes', 'bitrate_kbps'}.
+    encode_fps - кадров в секунду реального времени, speed - во сколько раз быстрее реального времени.
+    result_callback(result) вызывается после каждого замера (для вывода по мере готовности).
+    """
+    encoders = encoders or list_available_encoders(ffmpeg_path) or [DEFAULT_ENCODER]
+    speed_tiers = speed_tiers or list(SPEED_TIERS)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="encoder_benchmark_") as temp_dir:
+        output_path = os.path.join(temp_dir, "sample.mkv")  # Matroska принимает любой из кодеков
+        for encoder in encoders:
+            for speed_tier in speed_tiers:
+                command = [
+                    ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+                    '-ss', f"{start_sec:.3f}", '-t', f"{sample_sec:.3f}",
+                    '-i', os.path.normpath(input_video_path),
+                    '-map', '0:v:0', '-an', '-sn',
+                ]
+                if scale_height:
+                    command += ['-vf', f"scale=-2:{int(scale_height)}"]
+                command += build_video_encoder_args(encoder, speed_tier, crf, threads) + [output_path]
+                last_progress = {}
+
+                def on_progress(progress):
+                    last_progress.update(progress)
+
+                start_time = time.monotonic()
+                return_code, stderr, stalled = run_ffmpeg(command, duration_sec=sample_sec,
+                                                          progress_callback=on_progress)
+                elapsed_sec = time.monotonic() - start_time
+                ok = return_code == 0 and not stalled and os.path.exists(output_path)
+                size_bytes = os.path.getsize(output_path) if ok else 0
+                encoded_sec = last_progress.get("out_time_sec") or sample_sec
+                result = {
+                    "encoder": encoder,
+                    "speed_tier": speed_tier,
+                    "ok": ok,
+                    "encode_fps": round((last_progress.get("frame") or 0) / elapsed_sec, 1) if ok else 0.0,
+                    "speed": round(encoded_sec / elapsed_sec, 2) if ok else 0.0,
+                    "elapsed_sec": round(elapsed_sec, 2),
+                    "size_bytes": size_bytes,
+                    "bitrate_kbps": round(size_bytes * 8 / 1000 / encoded_sec, 1) if ok and encoded_sec else 0.0,
+                }
+                if not ok:
+                    stderr_lines = (stderr or "").strip().splitlines()
+                    result["error"] = stderr_lines[-1] if stderr_lines else "FFmpeg не продвигался (завис)"
+                results.append(result)
+                if result_callback:
+                    result_callback(result)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+    return results
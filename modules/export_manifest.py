@@ -0,0 +1,93 @@
+# automated_content_creator/modules/export_manifest.py
+#
+# Манифест двухэтапного экспорта (черновик -> финал). Черновой экспорт быстро кодирует превью
+# низкого разрешения в подпапку drafts и записывает сюда границы каждого клипа, пресеты и заранее
+# зарезервированные пути финальных файлов. Финальный экспорт одобренных клипов пишет ровно в эти
+# пути (имена черновика и финала совпадают), отклоненные клипы в полном качестве не кодируются.
+# У каждого чернового экспорта свой манифест (export_manifest_<исходник>_<время>.json), а пути из
+# манифестов папки считаются занятыми и при следующих экспортах в ту же папку.
+
+import glob
+import json
+import os
+import re
+from datetime import datetime
+
+EXPORT_MANIFEST_PREFIX = "export_manifest"
+EXPORT_MANIFEST_GLOB = f"{EXPORT_MANIFEST_PREFIX}*.json"
+EXPORT_MANIFEST_FORMAT_VERSION = 1
+DRAFTS_SUBFOLDER = "drafts"
+
+CLIP_STATUS_DRAFT = "draft"  # Черновик готов, финал не создавался
+CLIP_STATUS_DRAFT_FAILED = "draft_failed"
+CLIP_STATUS_FINAL = "final"
+CLIP_STATUS_FINAL_FAILED = "final_failed"
+
+
+def build_export_manifest(source_video_path: str, output_folder: str, preset_names: list,
+                          subtitle_options: dict | None = None) -> dict:
+    return {
+        "version": EXPORT_MANIFEST_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "source_video": source_video_path,
+        "output_folder": output_folder,
+        "presets": list(preset_names),
+        # Субтитры черновиками не создаются: параметры сохраняются для финального экспорта
+        "subtitle_options": dict(subtitle_options) if subtitle_options else None,
+        # {'number', 'description', 'start_time', 'end_time', 'draft_path',
+        #  'final_paths' {пресет: путь}, 'created_paths' (финальные файлы, созданные по этому манифесту),
+        #  'status', 'source_highlight_info'}
+        "clips": [],
+    }
+
+
+def build_export_manifest_path(output_folder: str, source_video_path: str) -> str:
+    """Путь нового манифеста: export_manifest_<имя исходника>_<время>.json, не занятый другим манифестом."""
+    source_stem = os.path.splitext(os.path.basename(source_video_path))[0]
+    source_stem = re.sub(r"[^\w-]+", "_", source_stem).strip("_")[:40] or "video"
+    base_name = f"{EXPORT_MANIFEST_PREFIX}_{source_stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    manifest_path = os.path.join(output_folder, f"{base_name}.json")
+    counter = 1
+    while os.path.exists(manifest_path):
+        manifest_path = os.path.join(output_folder, f"{base_name}_{counter}.json")
+        counter += 1
+    return manifest_path
+
+
+def find_export_manifests(folder: str) -> list:
+    """Манифесты экспорта в папке, от старых к новым."""
+    return sorted(glob.glob(os.path.join(glob.escape(folder), EXPORT_MANIFEST_GLOB)), key=os.path.getmtime)
+
+
+def collect_reserved_paths(folder: str) -> set:
+    """
+    Нормализованные пути финальных файлов из всех манифестов папки: новые экспорты не должны
+    занимать имена, зарезервированные черновиками. Нечитаемые манифесты пропускаются.
+    """
+    reserved_paths = set()
+    for manifest_path in find_export_manifests(folder):
+        try:
+            manifest = load_export_manifest(manifest_path)
+        except (OSError, ValueError):
+            continue
+        for entry in manifest.get("clips", []):
+            reserved_paths.update(os.path.normpath(path) for path in entry.get("final_paths", {}).values())
+    return reserved_paths
+
+
+def load_export_manifest(manifest_path: str) -> dict:
+    """Читает манифест; ValueError - если файл не является манифестом экспорта этой версии."""
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if not isinstance(manifest, dict) or manifest.get("version") != EXPORT_MANIFEST_FORMAT_VERSION:
+        raise ValueError(f"'{manifest_path}' не является манифестом экспорта (версия {EXPORT_MANIFEST_FORMAT_VERSION})")
+    return manifest
+
+
+def save_export_manifest(manifest: dict, manifest_path: str):
+    """Записывает манифест атомарно: при сбое остается предыдущая версия файла."""
+    manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
@@ -1,20 +1,37 @@
 # automated_content_creator/modules/export_module.py
 
-import os
-import shutil  # Для простого "экспорта" путем копирования, если не требуется перекодирование
-import subprocess  # Для реального перекодирования FFmpeg
+from modules.encoders import DEFAULT_ENCODER, DEFAULT_SPEED_TIER, build_video_encoder_args
+
+# Черновой экспорт: превью низкого разрешения для проверки нарезки перед финальным кодированием
+DRAFT_PREVIEW_HEIGHT = 360
+DRAFT_PREVIEW_CRF = 30
+DRAFT_PREVIEW_EXTENSION = ".mp4"
 
 
 class ExportModule:
     def __init__(self, parent_logger=None):
         self.parent_logger = parent_logger
+        # Кодировщик, уровень скорости и потоки для пресетов с "crf" (см. set_encoder_options)
+        self.encoder = DEFAULT_ENCODER
+        self.speed_tier = DEFAULT_SPEED_TIER
+        self.threads = 0
         self.presets = {
             "Original MP4": {
-                "description": "Исходный формат нарезанного клипа (MP4). Копирование без перекодирования.",
+                "description": "Исходное качество (MP4). Нарезка без перекодирования (stream copy), "
+                               "начало клипа выравнивается по ближайшему ключевому кадру.",
                 "ffmpeg_params": [],
                 "recode": False,
+                "cut_mode": "stream_copy",
                 "extension": ".mp4"  # Явно указываем расширение
             },
+            "Original MP4 (точная нарезка)": {
+                "description": "Исходное качество (MP4). Перекодируется только начало клипа до первого "
+                               "ключевого кадра, остальное копируется без потерь (только для H.264).",
+                "ffmpeg_params": [],
+                "recode": False,
+                "cut_mode": "smart_render",
+                "extension": ".mp4"
+            },
             "Reels (9:16, MP4)": {
                 "description": "Instagram Reels, TikTok, YouTube Shorts (вертикальный MP4).",
                 "target_resolution": "1080x1920",
@@ -53,6 +70,7 @@ class ExportModule:
                     "-vf", "fps={fps},scale={width}:-1:flags=lanczos,split[s0][s1];[s0]palettegen[p];[s1][p]paletteuse",
                 ],
                 "recode": True,
+                "audio": False,  # Без аудиодорожки (при нарезке в несколько пресетов аудио не подключается)
                 "extension": ".gif"
             }
         }
@@ -64,111 +82,99 @@ class ExportModule:
         else:
             print(f"ExportModule [{level}] (no logger): {message}")
 
-    def export_clip(self, source_clip_path: str, output_folder: str,
-                    preset_name: str = "Original MP4", clip_filename: str = "exported_clip.mp4") -> str | None:
+    def set_encoder_options(self, encoder: str | None = None, speed_tier: str | None = None,
+                            threads: int | None = None):
+        """
+        Задает кодировщик видео (libx264, libx265, libsvtav1, libvpx-vp9), уровень скорости
+        (draft/fast/balanced/final) и число потоков (0 - автоматически) для перекодируемых пресетов.
+        Разрешение, фильтры и качество (crf) по-прежнему берутся из пресета.
         """
-        Экспортирует клип согласно выбранному пресету.
+        if encoder is not None:
+            self.encoder = encoder
+        if speed_tier is not None:
+            self.speed_tier = speed_tier
+        if threads is not None:
+            self.threads = max(0, int(threads))
+        self._log(f"Кодировщик: {self.encoder}, уровень скорости: {self.speed_tier}, "
+                  f"потоков: {self.threads or 'авто'}.", level="DEBUG")
+
+    def build_ffmpeg_params(self, preset_name: str) -> list | None:
         """
-        if not os.path.exists(source_clip_path):
-            self._log(f"Ошибка: Исходный нарезанный клип не найден: {source_clip_path}", level="ERROR")
+        Возвращает параметры кодирования FFmpeg для пресета с подставленными плейсхолдерами
+        ({fps}, {width}). Для пресетов без перекодирования возвращает None.
+        Кодирование видео пресетов с "crf" (-c:v, -preset, -crf) заменяется параметрами
+        выбранного кодировщика и уровня скорости (modules/encoders.build_video_encoder_args).
+        Используется при однопроходной нарезке (CuttingEngine.cut_clip) и в build_output_spec.
+        """
+        preset_config = self.presets.get(preset_name)
+        if not preset_config or not preset_config.get("recode", False):
             return None
 
-        if preset_name not in self.presets:
-            self._log(f"Предупреждение: Неизвестный пресет '{preset_name}'. Используется 'Original MP4'.", level="WARN")
-            preset_name = "Original MP4"
-
-        preset_config = self.presets[preset_name]
-        # Имя файла теперь должно приходить с правильным расширением от ClipExporterWorker
-        final_output_path = os.path.join(output_folder, clip_filename)
-        os.makedirs(output_folder, exist_ok=True)
-
-        self._log(f"Подготовка к экспорту клипа '{os.path.basename(source_clip_path)}' "
-                  f"с пресетом '{preset_name}' в '{final_output_path}'", level="INFO")
-
-        try:
-            if not preset_config.get("recode", False):
-                self._log(f"  Пресет '{preset_name}' не требует перекодирования. Копирование файла...", level="DEBUG")
-                shutil.copy2(source_clip_path, final_output_path)
-                self._log(f"  Клип успешно скопирован (экспортирован): {final_output_path}", level="INFO")
-                return final_output_path
-            else:
-                self._log(f"  Пресет '{preset_name}' требует перекодирования.", level="INFO")
-
-                ffmpeg_exe = "ffmpeg"  # По умолчанию
-                if self.parent_logger and hasattr(self.parent_logger,
-                                                  'cutting_engine') and self.parent_logger.cutting_engine:
-                    ffmpeg_exe = self.parent_logger.cutting_engine.ffmpeg_path
-
-                base_command = [
-                    ffmpeg_exe,
-                    '-hide_banner', '-loglevel', 'error', '-y',
-                    '-i', source_clip_path
-                ]
-
-                preset_ffmpeg_params = preset_config.get("ffmpeg_params_template", [])
-
-                # Обработка плейсхолдеров в параметрах FFmpeg (для GIF)
-                formatted_params = []
-                for param in preset_ffmpeg_params:
-                    if isinstance(param, str):
-                        param = param.replace("{fps}", str(preset_config.get("fps", 10)))
-                        param = param.replace("{width}",
-                                              str(preset_config.get("target_resolution", "480x-1").split('x')[0]))
-                    formatted_params.append(param)
-
-                full_command = base_command + formatted_params + [final_output_path]
-
-                self._log(f"    Команда FFmpeg: {' '.join(full_command)}", level="DEBUG")
-
-                process = subprocess.Popen(
-                    full_command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
-                )
-                stdout, stderr = process.communicate(timeout=180)  # Таймаут 3 минуты для перекодирования
-
-                if process.returncode == 0:
-                    if not os.path.exists(final_output_path) or os.path.getsize(final_output_path) == 0:
-                        self._log(
-                            f"  ВНИМАНИЕ: FFmpeg (recode) вернул 0, но файл '{final_output_path}' не найден или пуст. STDERR: {stderr.strip()}",
-                            level="ERROR")
-                        return None
-                    self._log(f"  Клип успешно перекодирован и сохранен: {final_output_path}", level="INFO")
-                    return final_output_path
-                else:
-                    self._log(f"  ОШИБКА FFmpeg при перекодировании (код {process.returncode}): {stderr.strip()}",
-                              level="ERROR")
-                    if os.path.exists(final_output_path):
-                        try:
-                            os.remove(final_output_path)
-                        except OSError:
-                            pass
-                    return None
+        # Обработка плейсхолдеров в параметрах FFmpeg (для GIF)
+        formatted_params = []
+        for param in preset_config.get("ffmpeg_params_template", []):
+            if isinstance(param, str):
+                param = param.replace("{fps}", str(preset_config.get("fps", 10)))
+                param = param.replace("{width}",
+                                      str(preset_config.get("target_resolution", "480x-1").split('x')[0]))
+            formatted_params.append(param)
+
+        if "crf" in preset_config:
+            encoder_args = build_video_encoder_args(self.encoder, self.speed_tier, preset_config["crf"],
+                                                    self.threads)
+            params_without_video_codec = []
+            insert_index = None
+            skip_next = False
+            for param in formatted_params:
+                if skip_next:
+                    skip_next = False
+                    continue
+                if param in ("-c:v", "-preset", "-crf"):
+                    if insert_index is None:
+                        insert_index = len(params_without_video_codec)
+                    skip_next = True
+                    continue
+                params_without_video_codec.append(param)
+            if insert_index is None:
+                insert_index = len(params_without_video_codec)
+            formatted_params = (params_without_video_codec[:insert_index] + encoder_args
+                                + params_without_video_codec[insert_index:])
+        elif self.threads:
+            formatted_params += ['-threads', str(self.threads)]
+        return formatted_params
+
+    def build_draft_params(self) -> list:
+        """
+        Параметры чернового превью (для любого пресета): высота не больше DRAFT_PREVIEW_HEIGHT,
+        libx264 на уровне скорости draft, звук AAC - чтобы оценить и изображение, и речь.
+        """
+        return ['-vf', f"scale=-2:'min(ih,{DRAFT_PREVIEW_HEIGHT})'"] + \
+            build_video_encoder_args("libx264", "draft", DRAFT_PREVIEW_CRF, self.threads) + \
+            ['-pix_fmt', 'yuv420p', '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart']
 
-        except subprocess.TimeoutExpired:
-            self._log(f"  ОШИБКА: Время ожидания FFmpeg для перекодирования истекло (пресет '{preset_name}').",
-                      level="ERROR")
-            if process: process.kill()
-            if os.path.exists(final_output_path):
-                try:
-                    os.remove(final_output_path)
-                except OSError:
-                    pass
-            return None
-        except Exception as e:
-            self._log(
-                f"КРИТИЧЕСКАЯ ОШИБКА при экспорте (перекодировании) клипа '{os.path.basename(source_clip_path)}': {type(e).__name__} - {e}",
-                level="CRITICAL")
-            import traceback
-            self._log(f"Traceback: {traceback.format_exc()}", level="DEBUG")
-            if os.path.exists(final_output_path) and source_clip_path != final_output_path:
-                try:
-                    if not os.path.samefile(source_clip_path, final_output_path):
-                        os.remove(final_output_path)
-                except Exception:
-                    pass
+    def build_output_spec(self, preset_name: str) -> dict | None:
+        """
+        Описание выхода для CuttingEngine.cut_clip_multi: цепочка видеофильтров (-vf) отдельно
+        от остальных параметров кодирования, чтобы встроить ее ветвью в общий граф фильтров.
+        Для пресетов без перекодирования возвращает None.
+        """
+        formatted_params = self.build_ffmpeg_params(preset_name)
+        if formatted_params is None:
             return None
+        video_filter = None
+        params = []
+        skip_next = False
+        for i, param in enumerate(formatted_params):
+            if skip_next:
+                skip_next = False
+                continue
+            if param == "-vf" and i + 1 < len(formatted_params):
+                video_filter = formatted_params[i + 1]
+                skip_next = True
+                continue
+            params.append(param)
+        return {"video_filter": video_filter, "params": params,
+                "audio": self.presets[preset_name].get("audio", True)}
 
     def get_available_presets(self):
         """Возвращает список имен доступных пресетов."""
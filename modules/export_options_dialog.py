@@ -1,19 +1,20 @@
 # automated_content_creator/modules/export_options_dialog.py
 
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QFormLayout, QComboBox,
-    QLabel, QDialogButtonBox, QTextBrowser
+    QDialog, QVBoxLayout, QFormLayout, QListWidget, QListWidgetItem,
+    QLabel, QDialogButtonBox, QTextBrowser, QCheckBox, QDoubleSpinBox, QMessageBox
 )
 from PyQt6.QtCore import Qt
 
 class ExportOptionsDialog(QDialog):
     """
-    Диалоговое окно для выбора параметров экспорта, в частности пресета.
+    Диалоговое окно для выбора параметров экспорта, в частности пресетов.
+    Можно отметить несколько пресетов: перекодируемые пресеты клипа создаются одним процессом FFmpeg.
     """
     def __init__(self, export_module_instance, parent=None):
         super().__init__(parent)
         self.export_module = export_module_instance
-        self.selected_preset_name = None
+        self.selected_preset_names = []
 
         self.setWindowTitle("Параметры экспорта клипов")
         self.setMinimumWidth(400)
@@ -22,11 +23,16 @@ class ExportOptionsDialog(QDialog):
 
         form_layout = QFormLayout()
 
-        self.preset_combo = QComboBox()
+        self.preset_list = QListWidget()
         presets = self.export_module.get_available_presets()
-        if presets:
-            self.preset_combo.addItems(presets)
-        form_layout.addRow("Пресет экспорта:", self.preset_combo)
+        for i, preset_name in enumerate(presets):
+            item = QListWidgetItem(preset_name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if i == 0 else Qt.CheckState.Unchecked)
+            self.preset_list.addItem(item)
+        self.preset_list.setFixedHeight(110)
+        self.preset_list.setToolTip("Отметьте один или несколько пресетов: каждый клип будет сохранен в каждом из них.")
+        form_layout.addRow("Пресеты экспорта:", self.preset_list)
 
         self.preset_description_label = QLabel("Описание пресета:")
         form_layout.addRow(self.preset_description_label)
@@ -36,6 +42,32 @@ class ExportOptionsDialog(QDialog):
         self.preset_description_browser.setReadOnly(True)
         form_layout.addRow(self.preset_description_browser)
 
+        self.subtitles_checkbox = QCheckBox("Создать субтитры (.srt) для каждого клипа")
+        self.subtitles_checkbox.setToolTip(
+            "Whisper распознает речь только во фрагментах выбранных хайлайтов,\n"
+            "время субтитров отсчитывается от начала каждого клипа."
+        )
+        form_layout.addRow(self.subtitles_checkbox)
+
+        self.subtitles_padding_spinbox = QDoubleSpinBox()
+        self.subtitles_padding_spinbox.setRange(0.0, 10.0)
+        self.subtitles_padding_spinbox.setSingleStep(0.5)
+        self.subtitles_padding_spinbox.setDecimals(1)
+        self.subtitles_padding_spinbox.setValue(1.0)
+        self.subtitles_padding_spinbox.setSuffix(" сек.")
+        self.subtitles_padding_spinbox.setToolTip("Сколько аудио захватывать до и после клипа, чтобы не обрезать слова.")
+        self.subtitles_padding_spinbox.setEnabled(False)
+        self.subtitles_checkbox.toggled.connect(self.subtitles_padding_spinbox.setEnabled)
+        form_layout.addRow("Запас аудио для распознавания:", self.subtitles_padding_spinbox)
+
+        self.draft_checkbox = QCheckBox("Сначала черновик (быстрые превью низкого разрешения)")
+        self.draft_checkbox.setToolTip(
+            "Клипы кодируются быстро и в низком разрешении в подпапку drafts.\n"
+            "После проверки одобренные клипы кодируются выбранными пресетами\n"
+            "кнопкой \"Финал из черновиков\" - с теми же именами файлов. Для черновиков субтитры не создаются."
+        )
+        form_layout.addRow(self.draft_checkbox)
+
 
         main_layout.addLayout(form_layout)
 
@@ -44,15 +76,16 @@ class ExportOptionsDialog(QDialog):
         self.button_box.rejected.connect(self.reject)
         main_layout.addWidget(self.button_box)
 
-        self.preset_combo.currentTextChanged.connect(self._update_preset_description)
+        self.preset_list.currentTextChanged.connect(self._update_preset_description)
         if presets:
-            self._update_preset_description(presets[0]) # Инициализация описания для первого пресета
+            self.preset_list.setCurrentRow(0) # Инициализация описания для первого пресета
+            self._update_preset_description(presets[0])
 
         if parent and hasattr(parent, 'log_message'):
             parent.log_message("ExportOptionsDialog: Инициализирован.", level="DEBUG")
 
     def _update_preset_description(self, preset_name):
-        """Обновляет описание пресета при выборе в QComboBox."""
+        """Обновляет описание пресета при выборе строки в списке."""
         if not preset_name:
             self.preset_description_browser.setText("Пресет не выбран.")
             return
@@ -78,15 +111,34 @@ class ExportOptionsDialog(QDialog):
             self.preset_description_browser.setText(f"Описание для '{preset_name}' не найдено.")
 
     def accept_options(self):
-        """Сохраняет выбранный пресет и принимает диалог."""
-        self.selected_preset_name = self.preset_combo.currentText()
+        """Сохраняет отмеченные пресеты и принимает диалог."""
+        self.selected_preset_names = [
+            self.preset_list.item(row).text() for row in range(self.preset_list.count())
+            if self.preset_list.item(row).checkState() == Qt.CheckState.Checked
+        ]
+        if not self.selected_preset_names:
+            QMessageBox.warning(self, "Пресеты не выбраны", "Отметьте хотя бы один пресет экспорта.")
+            return
         if self.parent() and hasattr(self.parent(), 'log_message'):
-            self.parent().log_message(f"ExportOptionsDialog: Выбран пресет '{self.selected_preset_name}'. Диалог принят.", level="INFO")
+            self.parent().log_message(f"ExportOptionsDialog: Выбраны пресеты {self.selected_preset_names}. Диалог принят.", level="INFO")
         self.accept()
 
+    def get_selected_preset_names(self) -> list:
+        """Возвращает имена отмеченных пресетов (в порядке списка)."""
+        return list(self.selected_preset_names)
+
     def get_selected_preset_name(self):
-        """Возвращает имя выбранного пресета."""
-        return self.selected_preset_name
+        """Возвращает имя первого отмеченного пресета."""
+        return self.selected_preset_names[0] if self.selected_preset_names else None
+
+    def get_generate_subtitles(self) -> bool:
+        return self.subtitles_checkbox.isChecked()
+
+    def get_subtitles_padding_sec(self) -> float:
+        return self.subtitles_padding_spinbox.value()
+
+    def get_draft_mode(self) -> bool:
+        return self.draft_checkbox.isChecked()
 
 if __name__ == '__main__':
     # Пример использования (требует QApplication и мок ExportModule)
@@ -109,5 +161,5 @@ if __name__ == '__main__':
     mock_exporter = MockExportModule()
     dialog = ExportOptionsDialog(mock_exporter)
     if dialog.exec():
-        print(f"Выбранный пресет: {dialog.get_selected_preset_name()}")
+        print(f"Выбранные пресеты: {dialog.get_selected_preset_names()}")
     sys.exit(app.exec())
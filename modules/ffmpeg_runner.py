@@ -0,0 +1,177 @@
+# automated_content_creator/modules/ffmpeg_runner.py
+#
+# Запуск FFmpeg с машинно-читаемым прогрессом (-progress pipe:1). Блоки key=value из stdout
+# разбираются по мере поступления (out_time, speed, fps), вызывающий получает прогресс и
+# оценку оставшегося времени каждые ~0.5 с. Вместо фиксированного таймаута процесс завершается,
+# только если прогресс не продвигается stall_timeout_sec секунд (зависание на диске, сети и т.п.).
+
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+
+PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats']
+DEFAULT_STALL_TIMEOUT_SEC = 60.0
+STALL_POLL_INTERVAL_SEC = 1.0
+STDERR_TAIL_LINES = 50  # Сколько последних строк stderr сохраняется для лога ошибок
+
+
+def with_progress_args(command: list) -> list:
+    """Добавляет глобальные опции прогресса сразу после исполняемого файла (до входов)."""
+    if '-progress' in command:
+        return list(command)
+    return [command[0]] + PROGRESS_ARGS + list(command[1:])
+
+
+def format_eta(seconds: float | None) -> str:
+    """'1:05' или '1:02:03'; '?' - если оценки нет."""
+    if seconds is None:
+        return "?"
+    total = int(round(max(0.0, seconds)))
+    h, rest = divmod(total, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def _parse_float(value: str | None) -> float | None:
+    if not value or value == "N/A":
+        return None
+    try:
+        return float(value.rstrip("x"))
+    except ValueError:
+        return None
+
+
+class ProgressTracker:
+    """
+    Собирает строки -progress в снимки. feed() возвращает снимок на строке 'progress=...':
+    {'out_time_sec', 'duration_sec', 'fraction' (None без длительности), 'speed', 'fps', 'frame',
+     'eta_sec', 'finished'}. advanced - продвинулся ли вывод (время или размер) с прошлого снимка.
+    """
+
+    def __init__(self, duration_sec: float | None = None):
+        self.duration_sec = duration_sec if duration_sec and duration_sec > 0 else None
+        self.advanced = False
+        self._values = {}
+        self._start_time = time.monotonic()
+        self._last_position = (-1.0, -1)
+
+    def feed(self, line: str) -> dict | None:
+        key, separator, value = line.strip().partition("=")
+        if not separator:
+            return None
+        if key != "progress":
+            self._values[key] = value
+            return None
+        return self._snapshot(finished=(value == "end"))
+
+    def _snapshot(self, finished: bool) -> dict:
+        out_time_us = _parse_float(self._values.get("out_time_us") or self._values.get("out_time_ms"))
+        out_time_sec = max(0.0, out_time_us / 1_000_000) if out_time_us is not None else 0.0
+        total_size = int(_parse_float(self._values.get("total_size")) or 0)
+        position = (out_time_sec, total_size)
+        self.advanced = position > self._last_position
+        self._last_position = max(position, self._last_position)
+
+        speed = _parse_float(self._values.get("speed"))
+        elapsed_sec = time.monotonic() - self._start_time
+        if not speed and out_time_sec > 0 and elapsed_sec > 0:
+            speed = out_time_sec / elapsed_sec  # FFmpeg не всегда сообщает speed (например, при stream copy)
+        fraction = None
+        eta_sec = None
+        if self.duration_sec:
+            fraction = 1.0 if finished else min(1.0, out_time_sec / self.duration_sec)
+            if finished:
+                eta_sec = 0.0
+            elif speed:
+                eta_sec = max(0.0, self.duration_sec - out_time_sec) / speed
+        return {
+            "out_time_sec": out_time_sec,
+            "duration_sec": self.duration_sec,
+            "fraction": fraction,
+            "speed": speed,
+            "fps": _parse_float(self._values.get("fps")),
+            "frame": int(_parse_float(self._values.get("frame")) or 0),
+            "eta_sec": eta_sec,
+            "finished": finished,
+        }
+
+
+def offset_progress_callback(progress_callback, offset_sec: float, total_sec: float):
+    """
+    Для операций из нескольких вызовов FFmpeg (smart render): пересчитывает прогресс части,
+    начинающейся с offset_sec, в прогресс всей операции длительностью total_sec.
+    """
+    if progress_callback is None:
+        return None
+
+    def on_progress(progress: dict):
+        out_time_sec = offset_sec + progress["out_time_sec"]
+        speed = progress["speed"]
+        shifted = dict(progress, out_time_sec=out_time_sec, duration_sec=total_sec, finished=False)
+        shifted["fraction"] = min(1.0, out_time_sec / total_sec) if total_sec > 0 else None
+        shifted["eta_sec"] = max(0.0, total_sec - out_time_sec) / speed if speed else None
+        progress_callback(shifted)
+    return on_progress
+
+
+def run_ffmpeg(command: list, duration_sec: float | None = None, progress_callback=None,
+               stall_timeout_sec: float | None = DEFAULT_STALL_TIMEOUT_SEC, on_started=None,
+               startupinfo=None) -> tuple:
+    """
+    Запускает FFmpeg с -progress pipe:1 и ждет завершения.
+    duration_sec - ожидаемая длительность результата (для доли и ETA), progress_callback(dict) -
+    снимки ProgressTracker из текущего потока. on_started(process) вызывается сразу после запуска
+    (регистрация для отмены). Если прогресс не продвигается stall_timeout_sec секунд, процесс
+    завершается (None - без ограничения).
+    Возвращает (return_code, stderr_tail, stalled). FileNotFoundError пробрасывается.
+    """
+    process = subprocess.Popen(
+        with_progress_args(command),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True, encoding="utf-8", errors="replace",
+        startupinfo=startupinfo
+    )
+    if on_started:
+        on_started(process)
+
+    # stderr читается отдельно: при заполнении буфера pipe FFmpeg остановился бы
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(process.stderr),
+                                     name="FFmpegStderr", daemon=True)
+    stderr_thread.start()
+    progress_lines = queue.SimpleQueue()
+
+    def read_progress():
+        for progress_line in process.stdout:
+            progress_lines.put(progress_line)
+        progress_lines.put(None)
+
+    threading.Thread(target=read_progress, name="FFmpegProgress", daemon=True).start()
+
+    tracker = ProgressTracker(duration_sec)
+    last_activity = time.monotonic()
+    stalled = False
+    while True:
+        try:
+            line = progress_lines.get(timeout=STALL_POLL_INTERVAL_SEC)
+        except queue.Empty:
+            line = ""
+        if line is None:
+            break
+        snapshot = tracker.feed(line) if line else None
+        if snapshot is not None:
+            if tracker.advanced:
+                last_activity = time.monotonic()
+            if progress_callback:
+                progress_callback(snapshot)
+        if stall_timeout_sec and time.monotonic() - last_activity > stall_timeout_sec:
+            stalled = True
+            process.kill()
+            break
+    process.wait()
+    stderr_thread.join(timeout=5)
+    return process.returncode, "".join(stderr_tail), stalled
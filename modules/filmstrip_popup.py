@@ -0,0 +1,59 @@
+# automated_content_creator/modules/filmstrip_popup.py
+#
+# Всплывающая полоса кадров над строкой таблицы хайлайтов. Кадры берутся из индекса
+# миниатюр через модель (HighlightsTableModel.filmstrip_image), поэтому наведение
+# не перематывает плеер и не читает исходное видео.
+
+from PyQt6.QtCore import Qt, QEvent, QObject, QPoint
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel
+
+FILMSTRIP_MAX_FRAMES = 8
+
+
+class FilmstripPopup(QLabel):
+    """Показывается при наведении на строку представления (mouse tracking), скрывается при уходе курсора."""
+
+    def __init__(self, view, model, max_frames: int = FILMSTRIP_MAX_FRAMES):
+        super().__init__(view, Qt.WindowType.ToolTip)
+        self.view = view
+        self.model = model
+        self.max_frames = max_frames
+        self._row = -1
+        self.setStyleSheet("border: 1px solid #888; background: black;")
+        view.setMouseTracking(True)
+        view.entered.connect(self._on_entered)
+        view.viewport().installEventFilter(self)
+        model.modelReset.connect(self.hide_popup)
+        model.layoutChanged.connect(self.hide_popup)
+
+    def _on_entered(self, index):
+        if not index.isValid():
+            self.hide_popup()
+            return
+        if index.row() == self._row and self.isVisible():
+            return
+        image = self.model.filmstrip_image(index.row(), self.max_frames)
+        if image is None:
+            self.hide_popup()
+            return
+        self._row = index.row()
+        self.setPixmap(QPixmap.fromImage(image))
+        self.adjustSize()
+        row_rect = self.view.visualRect(index)
+        anchor = self.view.viewport().mapToGlobal(QPoint(row_rect.left(), row_rect.bottom() + 4))
+        screen = self.view.screen().availableGeometry()
+        x = min(max(screen.left(), anchor.x()), screen.right() - self.width())
+        y = anchor.y() if anchor.y() + self.height() <= screen.bottom() \
+            else self.view.viewport().mapToGlobal(row_rect.topLeft()).y() - self.height() - 4
+        self.move(x, y)
+        self.show()
+
+    def hide_popup(self):
+        self._row = -1
+        self.hide()
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() in (QEvent.Type.Leave, QEvent.Type.Wheel, QEvent.Type.MouseButtonPress):
+            self.hide_popup()
+        return False
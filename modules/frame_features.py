@@ -0,0 +1,148 @@
+# automated_content_creator/modules/frame_features.py
+#
+# Покадровые визуальные признаки, которые считаются в том же проходе декодирования,
+# что и поиск сцен (callback SceneManager.detect_scenes получает кадр). Модуль импортируется
+# и в дочерних процессах параллельного анализа, поэтому не зависит от Qt и cv2.
+
+import numpy as np
+
+# Ширина, до которой кадр прореживается перед расчетом признаков (в пикселях)
+FEATURE_SAMPLE_WIDTH = 64
+# Веса BGR -> яркость (ITU-R BT.601)
+_LUMA_WEIGHTS_BGR = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+# Вклад признаков в оценку хайлайта
+VISUAL_SCORE_WEIGHTS = {"motion": 0.6, "contrast": 0.2, "brightness": 0.2}
+# Сцены темнее этой средней яркости (0..1) получают пониженную оценку
+DARK_SCENE_BRIGHTNESS = 0.25
+
+
+class FrameFeatureExtractor:
+    """
+    Базовый класс извлекателя признаков. columns - имена значений, которые возвращает extract().
+    extract(gray, previous_gray) получает уменьшенный кадр в оттенках серого (float32, 0..1)
+    и предыдущий обработанный кадр (или None) и возвращает кортеж чисел длиной len(columns).
+    Извлекатель вызывается для каждого кадра, поэтому должен укладываться в микросекунды.
+    """
+    columns = ()
+
+    def extract(self, gray, previous_gray) -> tuple:
+        raise NotImplementedError
+
+
+class MotionEnergyExtractor(FrameFeatureExtractor):
+    """Энергия движения: средняя абсолютная разница с предыдущим кадром."""
+    columns = ("motion",)
+
+    def extract(self, gray, previous_gray) -> tuple:
+        if previous_gray is None:
+            return (np.nan,)
+        return (float(np.mean(np.abs(gray - previous_gray))),)
+
+
+class BrightnessExtractor(FrameFeatureExtractor):
+    """Средняя яркость и контраст (стандартное отклонение яркости) кадра."""
+    columns = ("brightness", "contrast")
+
+    def extract(self, gray, previous_gray) -> tuple:
+        return float(gray.mean()), float(gray.std())
+
+
+def default_extractors() -> list:
+    return [MotionEnergyExtractor(), BrightnessExtractor()]
+
+
+def feature_columns(extractors=None) -> list:
+    """Имена столбцов массива признаков для набора извлекателей (по умолчанию - default_extractors())."""
+    extractors = extractors if extractors is not None else default_extractors()
+    return [column for extractor in extractors for column in extractor.columns]
+
+
+class FrameFeatureCollector:
+    """
+    Накапливает признаки кадров [first_frame, first_frame + num_frames) в заранее выделенный массив
+    (num_frames x число столбцов, float32). Кадры, которые не были переданы (frame_skip), остаются NaN.
+    process() подключается к callback detect_scenes и не копирует кадр целиком: он прореживается срезом.
+    """
+
+    def __init__(self, num_frames: int, extractors=None, first_frame: int = 0):
+        self.extractors = list(extractors) if extractors is not None else default_extractors()
+        self.columns = feature_columns(self.extractors)
+        self.first_frame = int(first_frame)
+        self.values = np.full((max(0, int(num_frames)), len(self.columns)), np.nan, dtype=np.float32)
+        self._previous_gray = None
+
+    def process(self, frame_image, frame_num: int):
+        if frame_image is None:
+            return
+        step = max(1, frame_image.shape[1] // FEATURE_SAMPLE_WIDTH)
+        small = frame_image[::step, ::step]
+        if small.ndim == 3:
+            gray = small.astype(np.float32) @ _LUMA_WEIGHTS_BGR[:small.shape[2]] / 255.0
+        else:
+            gray = small.astype(np.float32) / 255.0
+
+        row = frame_num - self.first_frame
+        if 0 <= row < len(self.values):
+            column = 0
+            for extractor in self.extractors:
+                values = extractor.extract(gray, self._previous_gray)
+                self.values[row, column:column + len(values)] = values
+                column += len(values)
+        # Кадры перекрытия (до first_frame) нужны только как "предыдущий" для первого кадра
+        self._previous_gray = gray
+
+
+class VisualFeatures:
+    """
+    Визуальные признаки всего видео (по одной строке на кадр анализируемого потока).
+    Интерфейс оценки тот же, что у AudioFeatures: name и score_ranges(starts_sec, ends_sec).
+    """
+    name = "visual"
+
+    def __init__(self, values, columns, fps: float):
+        self.values = np.asarray(values, dtype=np.float32)
+        self.columns = list(columns)
+        self.fps = float(fps)
+        self._prepare_signals()
+
+    def _prepare_signals(self):
+        """Кумулятивные суммы по каждому столбцу (NaN не учитываются) для усреднения по интервалам."""
+        valid = ~np.isnan(self.values)
+        zero_filled = np.where(valid, self.values, 0.0)
+        self._sums = np.vstack((np.zeros((1, len(self.columns))), np.cumsum(zero_filled, axis=0, dtype=np.float64)))
+        self._counts = np.vstack((np.zeros((1, len(self.columns))), np.cumsum(valid, axis=0, dtype=np.float64)))
+        # Движение нормируется относительно самого видео: 95-й перцентиль -> 1.0
+        self._references = {}
+        for column in ("motion", "contrast"):
+            if column in self.columns:
+                column_values = self.values[:, self.columns.index(column)]
+                column_values = column_values[~np.isnan(column_values)]
+                reference = float(np.percentile(column_values, 95)) if len(column_values) else 0.0
+                self._references[column] = reference if reference > 0 else 1.0
+
+    def score_ranges(self, starts_sec, ends_sec) -> dict:
+        frame_count = len(self.values)
+        starts = np.clip(np.floor(np.asarray(starts_sec, dtype=np.float64) * self.fps), 0, frame_count).astype(np.int64)
+        ends = np.clip(np.ceil(np.asarray(ends_sec, dtype=np.float64) * self.fps), 0, frame_count).astype(np.int64)
+        counts = self._counts[ends] - self._counts[starts]
+        means = (self._sums[ends] - self._sums[starts]) / np.maximum(counts, 1)
+
+        result = {column: means[:, i].astype(np.float32) for i, column in enumerate(self.columns)}
+        score = np.zeros(len(starts), dtype=np.float32)
+        if "motion" in result:
+            score += VISUAL_SCORE_WEIGHTS["motion"] * np.clip(result["motion"] / self._references["motion"], 0, 1)
+        if "contrast" in result:
+            score += VISUAL_SCORE_WEIGHTS["contrast"] * np.clip(result["contrast"] / self._references["contrast"], 0, 1)
+        if "brightness" in result:
+            score += VISUAL_SCORE_WEIGHTS["brightness"] * np.clip(result["brightness"] / DARK_SCENE_BRIGHTNESS, 0, 1)
+        result["score"] = score
+        return result
+
+    @classmethod
+    def from_scene_data(cls, scene_data: dict):
+        """Из результата AIAnalyzer (в том числе из кеша); None, если признаки не считались."""
+        values = scene_data.get("frame_features")
+        if values is None or not len(values):
+            return None
+        return cls(values, scene_data["frame_feature_columns"], scene_data["fps"])
@@ -0,0 +1,242 @@
+# automated_content_creator/modules/highlights_table_model.py
+#
+# Модель таблицы хайлайтов для QTableView. Вместо QTableWidgetItem на каждую ячейку
+# время и оценки хранятся столбцами NumPy, отметки - битовым массивом, а текст ячеек
+# формируется только для видимых строк (data() вызывается представлением лениво).
+# Сортировка и фильтр по оценке - перестановка индексов (argsort / flatnonzero) без пересоздания строк.
+# Миниатюры берутся из индекса миниатюр (modules/thumbnail_index) - срезом memmap, без обращения к видео.
+
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from modules.scene_metrics import format_timecode
+
+COLUMN_CHECK, COLUMN_DESCRIPTION, COLUMN_START, COLUMN_END, COLUMN_SCORE = range(5)
+COLUMN_TITLES = ["Выбор", "Описание", "Старт", "Конец", "Оценка"]
+THUMBNAIL_PIXMAP_CACHE_SIZE = 512  # QPixmap миниатюр в памяти (видимые строки + прокрутка)
+
+
+def rgb_array_to_qimage(array: np.ndarray) -> QImage:
+    """Копирует массив (height, width, 3) uint8 в QImage (QImage не владеет памятью массива)."""
+    array = np.ascontiguousarray(array)
+    height, width = array.shape[:2]
+    return QImage(array.data, width, height, 3 * width, QImage.Format.Format_RGB888).copy()
+
+
+class HighlightsTableModel(QAbstractTableModel):
+    """
+    Хайлайты анализа (список словарей как в scene_metrics.build_highlights).
+    Строка представления -> индекс хайлайта через self._order; отметки хранятся по индексу хайлайта,
+    поэтому сортировка и фильтр их не сбрасывают.
+    """
+    checked_count_changed = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._highlights = []
+        self._starts = np.empty(0, dtype=np.float64)
+        self._ends = np.empty(0, dtype=np.float64)
+        self._scores = np.empty(0, dtype=np.float32)
+        self._checked_bits = np.zeros(0, dtype=np.uint8)  # 1 бит на хайлайт
+        self._checked_count = 0
+        self._order = np.empty(0, dtype=np.int64)  # Видимые хайлайты в порядке отображения
+        self._min_score = 0.0
+        self._sort_column = COLUMN_START
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._thumbnail_index = None  # ThumbnailIndex текущего видео
+        self._thumbnail_pixmaps = {}  # индекс хайлайта -> QPixmap
+
+    # --- Данные ---
+
+    def set_highlights(self, highlights: list):
+        """Заменяет содержимое таблицы; отметки сбрасываются, сортировка и фильтр сохраняются."""
+        self.beginResetModel()
+        self._highlights = list(highlights)
+        count = len(self._highlights)
+        self._starts = np.fromiter((hl.get('start_time', 0.0) for hl in self._highlights), np.float64, count)
+        self._ends = np.fromiter((hl.get('end_time', 0.0) for hl in self._highlights), np.float64, count)
+        self._scores = np.fromiter((hl.get('score', 0.0) for hl in self._highlights), np.float32, count)
+        self._checked_bits = np.zeros((count + 7) // 8, dtype=np.uint8)
+        self._checked_count = 0
+        self._order = self._compute_order()
+        self._thumbnail_pixmaps = {}
+        self.endResetModel()
+        self.checked_count_changed.emit(0)
+
+    def clear(self):
+        self.set_highlights([])
+
+    def highlight_count(self) -> int:
+        return len(self._highlights)
+
+    def highlight_at(self, row: int) -> dict | None:
+        """Хайлайт в строке представления (с учетом сортировки и фильтра)."""
+        if 0 <= row < len(self._order):
+            return self._highlights[self._order[row]]
+        return None
+
+    # --- Миниатюры ---
+
+    def set_thumbnail_index(self, thumbnail_index):
+        """
+        Подключает индекс миниатюр видео (или отключает при None). Модель владеет открытым индексом:
+        предыдущий закрывается, иначе его отображение файла жило бы до сборки мусора.
+        """
+        if self._thumbnail_index is not None and self._thumbnail_index is not thumbnail_index:
+            self._thumbnail_index.close()
+        self._thumbnail_index = thumbnail_index
+        self._thumbnail_pixmaps = {}
+        if len(self._order):
+            self.dataChanged.emit(self.index(0, COLUMN_DESCRIPTION),
+                                  self.index(len(self._order) - 1, COLUMN_DESCRIPTION),
+                                  [Qt.ItemDataRole.DecorationRole])
+
+    def thumbnail_index(self):
+        return self._thumbnail_index
+
+    def _thumbnail_pixmap(self, highlight_index: int) -> QPixmap | None:
+        if self._thumbnail_index is None:
+            return None
+        pixmap = self._thumbnail_pixmaps.get(highlight_index)
+        if pixmap is None:
+            if len(self._thumbnail_pixmaps) >= THUMBNAIL_PIXMAP_CACHE_SIZE:
+                self._thumbnail_pixmaps.clear()
+            pixmap = QPixmap.fromImage(rgb_array_to_qimage(
+                self._thumbnail_index.frame_at(self._starts[highlight_index])))
+            self._thumbnail_pixmaps[highlight_index] = pixmap
+        return pixmap
+
+    def filmstrip_image(self, row: int, max_frames: int = 8) -> QImage | None:
+        """Полоса кадров хайлайта в строке представления (None - нет индекса миниатюр)."""
+        if self._thumbnail_index is None or not 0 <= row < len(self._order):
+            return None
+        highlight_index = int(self._order[row])
+        return rgb_array_to_qimage(self._thumbnail_index.filmstrip(
+            self._starts[highlight_index], self._ends[highlight_index], max_frames))
+
+    # --- Отметки (битовый массив) ---
+
+    def _is_checked(self, highlight_index: int) -> bool:
+        return bool(self._checked_bits[highlight_index >> 3] & (1 << (highlight_index & 7)))
+
+    def _set_checked(self, highlight_index: int, checked: bool):
+        if self._is_checked(highlight_index) == checked:
+            return
+        if checked:
+            self._checked_bits[highlight_index >> 3] |= np.uint8(1 << (highlight_index & 7))
+            self._checked_count += 1
+        else:
+            self._checked_bits[highlight_index >> 3] &= np.uint8(~(1 << (highlight_index & 7)) & 0xFF)
+            self._checked_count -= 1
+
+    def checked_count(self) -> int:
+        return self._checked_count
+
+    def checked_highlights(self) -> list:
+        """Отмеченные хайлайты в исходном (хронологическом) порядке, включая скрытые фильтром."""
+        mask = np.unpackbits(self._checked_bits, bitorder="little")[:len(self._highlights)]
+        return [self._highlights[i] for i in np.flatnonzero(mask)]
+
+    def set_all_visible_checked(self, checked: bool):
+        """Отмечает (или снимает отметку) все строки, прошедшие фильтр."""
+        if not len(self._order):
+            return
+        mask = np.unpackbits(self._checked_bits, bitorder="little")[:len(self._highlights)]
+        mask[self._order] = 1 if checked else 0
+        self._checked_bits = np.packbits(mask, bitorder="little")
+        self._checked_count = int(mask.sum())
+        self.dataChanged.emit(self.index(0, COLUMN_CHECK), self.index(len(self._order) - 1, COLUMN_CHECK),
+                              [Qt.ItemDataRole.CheckStateRole])
+        self.checked_count_changed.emit(self._checked_count)
+
+    # --- Сортировка и фильтр ---
+
+    def set_min_score(self, min_score: float):
+        """Показывает только хайлайты с оценкой не ниже min_score."""
+        if min_score == self._min_score:
+            return
+        self._min_score = float(min_score)
+        self.beginResetModel()
+        self._order = self._compute_order()
+        self.endResetModel()
+
+    def visible_count(self) -> int:
+        return len(self._order)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        self._order = self._compute_order()
+        self.layoutChanged.emit()
+
+    def _compute_order(self) -> np.ndarray:
+        visible = np.flatnonzero(self._scores >= self._min_score) if self._min_score > 0 \
+            else np.arange(len(self._highlights))
+        if self._sort_column == COLUMN_CHECK:
+            keys = np.unpackbits(self._checked_bits, bitorder="little")[:len(self._highlights)]
+        elif self._sort_column == COLUMN_END:
+            keys = self._ends
+        elif self._sort_column == COLUMN_SCORE:
+            keys = self._scores
+        else:  # Описание ("Хайлайт #N") и старт упорядочены одинаково - по времени
+            keys = self._starts
+        visible = visible[np.argsort(keys[visible], kind="stable")]
+        if self._sort_order == Qt.SortOrder.DescendingOrder:
+            visible = visible[::-1]
+        return visible
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_TITLES)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMN_TITLES[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == COLUMN_CHECK:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._order):
+            return None
+        highlight_index = int(self._order[index.row()])
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COLUMN_DESCRIPTION:
+                return self._highlights[highlight_index].get('description', f'Хайлайт {highlight_index + 1}')
+            if column == COLUMN_START:
+                return format_timecode(self._starts[highlight_index])
+            if column == COLUMN_END:
+                return format_timecode(self._ends[highlight_index])
+            if column == COLUMN_SCORE:
+                return f"{self._scores[highlight_index]:.2f}"
+        elif role == Qt.ItemDataRole.DecorationRole and column == COLUMN_DESCRIPTION:
+            return self._thumbnail_pixmap(highlight_index)
+        elif role == Qt.ItemDataRole.CheckStateRole and column == COLUMN_CHECK:
+            return Qt.CheckState.Checked if self._is_checked(highlight_index) else Qt.CheckState.Unchecked
+        elif role == Qt.ItemDataRole.UserRole:
+            return self._highlights[highlight_index]
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column in (COLUMN_START, COLUMN_END, COLUMN_SCORE):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole or index.column() != COLUMN_CHECK:
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        self._set_checked(int(self._order[index.row()]), checked)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.checked_count_changed.emit(self._checked_count)
+        return True
@@ -0,0 +1,202 @@
+# automated_content_creator/modules/log_pipeline.py
+#
+# Асинхронный журнал приложения. log() только отбрасывает записи ниже минимального уровня
+# и кладет строку в очереди: вызывающий поток (анализ, экспорт, GUI) не ждет ни stdout,
+# ни файла, ни QTextEdit. Консоль и файл пишет фоновый поток пачками, а окно забирает
+# накопившиеся строки по таймеру (drain_pending) и добавляет их одним обновлением.
+
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARN", "ERROR", "CRITICAL"]
+LEVEL_ALIASES = {"DEBUG_EXTRA": "DEBUG", "WARNING": "WARN"}
+STATUS_MIN_LEVEL = "INFO"  # С этого уровня сообщение показывается в строке состояния
+
+DEFAULT_MIN_LEVEL = "INFO"
+DEFAULT_RING_BUFFER_SIZE = 5000  # Строк в памяти (и в окне лога)
+DEFAULT_MAX_FILE_BYTES = 5 * 1024 * 1024
+DEFAULT_FILE_BACKUP_COUNT = 3
+WRITER_BATCH_SIZE = 1000  # Максимум строк за одну запись фонового потока
+
+
+def normalize_level(level: str) -> str:
+    level = LEVEL_ALIASES.get(level, level)
+    return level if level in LOG_LEVELS else "DEBUG"
+
+
+class RotatingFileSink:
+    """Текстовый файл лога с ротацией по размеру: app.log -> app.log.1 -> ... -> app.log.<backup_count>."""
+
+    def __init__(self, file_path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                 backup_count: int = DEFAULT_FILE_BACKUP_COUNT):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self._file = open(file_path, "a", encoding="utf-8")
+
+    def write_lines(self, lines: list):
+        data = "\n".join(lines) + "\n"
+        # tell() - позиция в байтах, а кириллица в UTF-8 занимает два байта на символ
+        data_bytes = len(data.encode("utf-8"))
+        if self.max_bytes and self._file.tell() + data_bytes > self.max_bytes and self._file.tell() > 0:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            older = f"{self.file_path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.file_path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.file_path, f"{self.file_path}.1")
+        else:
+            os.remove(self.file_path)
+        self._file = open(self.file_path, "a", encoding="utf-8")
+
+    def close(self):
+        self._file.close()
+
+
+class LogPipeline:
+    """
+    Потокобезопасный журнал с фильтрацией по уровню, кольцевым буфером последних строк
+    (ring_buffer_size), фоновой записью в консоль и (необязательно) в файл с ротацией.
+    Для окна: drain_pending() - новые строки с прошлого вызова, take_status() - последнее
+    сообщение для строки состояния (промежуточные не показываются, их заменяет последнее).
+    """
+
+    def __init__(self, source: str = "MainWindow", min_level: str = DEFAULT_MIN_LEVEL,
+                 ring_buffer_size: int = DEFAULT_RING_BUFFER_SIZE, console: bool = True, file_path: str = None):
+        self.source = source
+        self.ring_buffer_size = ring_buffer_size
+        self.console = console
+        self._min_level_index = LOG_LEVELS.index(normalize_level(min_level))
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=ring_buffer_size)
+        self._pending = deque(maxlen=ring_buffer_size)
+        self._pending_dropped = 0  # Строк, вытесненных из очереди окна до того, как оно их забрало
+        self._status = None
+        self._file_sink = None
+        self._sink_queue = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="LogWriter", daemon=True)
+        self._writer_thread.start()
+        if file_path:
+            self.set_file_path(file_path)
+
+    @property
+    def min_level(self) -> str:
+        return LOG_LEVELS[self._min_level_index]
+
+    def set_min_level(self, level: str):
+        self._min_level_index = LOG_LEVELS.index(normalize_level(level))
+
+    def set_file_path(self, file_path: str | None):
+        """Включает запись в файл (или выключает при None). Переключение выполняет фоновый поток."""
+        self._sink_queue.put(("file", file_path))
+
+    def is_enabled(self, level: str) -> bool:
+        return LOG_LEVELS.index(normalize_level(level)) >= self._min_level_index
+
+    def log(self, message: str, level: str = "INFO"):
+        level = normalize_level(level)
+        level_index = LOG_LEVELS.index(level)
+        if level_index < self._min_level_index:
+            return
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        line = f"{timestamp} [{self.source}] [{level}]: {message}"
+        with self._lock:
+            self._records.append(line)
+            if len(self._pending) == self._pending.maxlen:
+                self._pending_dropped += 1
+            self._pending.append(line)
+            if level_index >= LOG_LEVELS.index(STATUS_MIN_LEVEL):
+                self._status = (level, message)
+        self._sink_queue.put(line)
+
+    def drain_pending(self, max_lines: int = None) -> tuple:
+        """Забирает строки, еще не показанные в окне: (lines, dropped_count)."""
+        with self._lock:
+            if max_lines is None or max_lines >= len(self._pending):
+                lines = list(self._pending)
+                self._pending.clear()
+            else:
+                lines = [self._pending.popleft() for _ in range(max_lines)]
+            dropped_count, self._pending_dropped = self._pending_dropped, 0
+        return lines, dropped_count
+
+    def take_status(self) -> tuple | None:
+        """Последнее сообщение уровня INFO и выше с прошлого вызова: (level, message) или None."""
+        with self._lock:
+            status, self._status = self._status, None
+        return status
+
+    def records(self) -> list:
+        """Копия кольцевого буфера (последние ring_buffer_size строк)."""
+        with self._lock:
+            return list(self._records)
+
+    def close(self, timeout: float = 2.0):
+        """Дописывает очередь в консоль/файл и останавливает фоновый поток."""
+        self._sink_queue.put(None)
+        self._writer_thread.join(timeout)
+
+    def _writer_loop(self):
+        while True:
+            item = self._sink_queue.get()
+            batch = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, tuple):
+                    self._write_batch(batch)
+                    batch = []
+                    self._switch_file(item[1])
+                else:
+                    batch.append(item)
+                if len(batch) >= WRITER_BATCH_SIZE:
+                    break
+                try:
+                    item = self._sink_queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+            if stop:
+                if self._file_sink:
+                    self._file_sink.close()
+                    self._file_sink = None
+                return
+
+    def _write_batch(self, batch: list):
+        if not batch:
+            return
+        if self.console:
+            try:
+                sys.stdout.write("\n".join(batch) + "\n")
+                sys.stdout.flush()
+            except (OSError, ValueError, AttributeError):  # Нет консоли (pythonw) или stdout закрыт
+                pass
+        if self._file_sink:
+            try:
+                self._file_sink.write_lines(batch)
+            except OSError as e:
+                print(f"LogPipeline: ошибка записи в файл лога, запись в файл отключена: {e}", file=sys.stderr)
+                self._switch_file(None)
+
+    def _switch_file(self, file_path: str | None):
+        if self._file_sink and (file_path is None or self._file_sink.file_path != file_path):
+            self._file_sink.close()
+            self._file_sink = None
+        if file_path and self._file_sink is None:
+            try:
+                self._file_sink = RotatingFileSink(file_path)
+            except OSError as e:
+                print(f"LogPipeline: не удалось открыть файл лога '{file_path}': {e}", file=sys.stderr)
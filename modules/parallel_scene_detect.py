@@ -0,0 +1,162 @@
+# automated_content_creator/modules/parallel_scene_detect.py
+#
+# Параллельный (многопроцессный) расчет покадровых оценок ContentDetector.
+# Модуль импортируется в дочерних процессах (spawn), поэтому на верхнем уровне
+# не должно быть импортов PyQt, whisper и прочих тяжелых зависимостей.
+
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from modules.frame_features import FrameFeatureCollector
+
+# Кусок начинается на столько кадров раньше своей границы: content_val кадра
+# считается как разница с предыдущим, поэтому первому кадру куска нужен "сосед" слева.
+# Второй кадр запаса защищает от неточного позиционирования OpenCV при seek.
+CHUNK_OVERLAP_FRAMES = 2
+# Короче этого видео делить на куски нет смысла: запуск процессов дороже выигрыша
+MIN_CHUNK_DURATION_SEC = 60.0
+# Как часто процесс отчитывается о прогрессе (в кадрах)
+PROGRESS_REPORT_INTERVAL_FRAMES = 250
+
+
+def resolve_analysis_workers(requested_workers: int | None = None) -> int:
+    """
+    Число процессов анализа. 0/None - автоматически: половина ядер (декодер OpenCV
+    сам использует несколько потоков), но не больше 8.
+    """
+    if requested_workers and requested_workers > 0:
+        return int(requested_workers)
+    return max(1, min(8, (os.cpu_count() or 1) // 2))
+
+
+def split_into_chunks(num_frames: int, fps: float, workers: int) -> list:
+    """Делит [0, num_frames) на не более чем workers кусков длиной не меньше MIN_CHUNK_DURATION_SEC."""
+    min_chunk_frames = max(1, int(MIN_CHUNK_DURATION_SEC * fps))
+    chunk_count = max(1, min(workers, num_frames // min_chunk_frames))
+    bounds = np.linspace(0, num_frames, chunk_count + 1).astype(np.int64)
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(chunk_count)]
+
+
+def _detect_chunk_scores(video_path: str, chunk_index: int, start_frame: int, end_frame: int, downscale: int,
+                         progress_queue, cancel_event, collect_features: bool = False) -> tuple:
+    """
+    Выполняется в дочернем процессе: открывает видео, встает на start_frame (с запасом
+    CHUNK_OVERLAP_FRAMES) и возвращает (chunk_index, оценки кадров [start_frame, end_frame),
+    визуальные признаки этих кадров или None). Признаки считаются в том же проходе декодирования.
+    """
+    from scenedetect import open_video, SceneManager, StatsManager
+    from scenedetect.detectors import ContentDetector
+
+    video_stream = open_video(video_path, backend='opencv')
+    decode_start_frame = max(0, start_frame - CHUNK_OVERLAP_FRAMES)
+    if decode_start_frame > 0:
+        video_stream.seek(decode_start_frame)
+
+    stats_manager = StatsManager()
+    scene_manager = SceneManager(stats_manager)
+    if downscale:
+        scene_manager.auto_downscale = False
+        scene_manager.downscale = downscale
+    # Склейки внутри куска не используются: они пересчитываются по всем оценкам сразу (SceneMetrics)
+    scene_manager.add_detector(ContentDetector())
+
+    reported_frames = [0]
+    feature_collector = FrameFeatureCollector(end_frame - start_frame, first_frame=start_frame) \
+        if collect_features else None
+
+    def progress_callback(frame_image, frame_num):
+        if cancel_event.is_set():
+            raise InterruptedError("Анализ отменен.")
+        if feature_collector is not None:
+            feature_collector.process(frame_image, frame_num)
+        processed = frame_num - decode_start_frame + 1
+        if processed - reported_frames[0] >= PROGRESS_REPORT_INTERVAL_FRAMES:
+            progress_queue.put((chunk_index, processed))
+            reported_frames[0] = processed
+
+    try:
+        scene_manager.detect_scenes(video=video_stream, end_time=end_frame + 1, show_progress=False,
+                                    callback=progress_callback)
+    except InterruptedError:
+        return chunk_index, None, None
+    progress_queue.put((chunk_index, end_frame - decode_start_frame))
+
+    frame_scores = np.full(end_frame - start_frame, np.nan, dtype=np.float32)
+    score_key = [ContentDetector.FRAME_SCORE_KEY]
+    for frame_num in range(start_frame, end_frame):
+        value = stats_manager.get_metrics(frame_num, score_key)[0]
+        if value is not None:
+            frame_scores[frame_num - start_frame] = value
+    return chunk_index, frame_scores, feature_collector.values if feature_collector is not None else None
+
+
+def detect_frame_scores_parallel(video_path: str, num_frames: int, fps: float, workers: int, downscale: int = 0,
+                                 progress_callback=None, is_cancelled=None, log_callback=None,
+                                 collect_features: bool = False):
+    """
+    Считает content_val для всех кадров видео, разбив его на перекрывающиеся куски,
+    каждый в отдельном процессе со своим open_video/SceneManager. Оценки склеиваются
+    в один массив, идентичный последовательному проходу, а склейки затем считаются
+    по нему целиком (SceneMetrics), поэтому сцены на границах кусков не теряются.
+
+    progress_callback(processed_frames, total_frames) вызывается из вызывающего потока.
+    collect_features - заодно считать визуальные признаки кадров (modules/frame_features).
+    Возвращает (оценки - np.ndarray длиной num_frames, признаки - num_frames x столбцы или None)
+    или None при отмене.
+    """
+    chunks = split_into_chunks(num_frames, fps, workers)
+    if log_callback:
+        log_callback(f"Параллельный анализ: {len(chunks)} кусков, процессов: {min(workers, len(chunks))}.")
+
+    frame_scores = np.full(num_frames, np.nan, dtype=np.float32)
+    frame_features = None
+    spawn_context = multiprocessing.get_context("spawn")  # fork небезопасен рядом с потоками Qt
+    with spawn_context.Manager() as manager:
+        progress_queue = manager.Queue()
+        cancel_event = manager.Event()
+        chunk_progress = [0] * len(chunks)
+        total_decode_frames = sum(end - max(0, start - CHUNK_OVERLAP_FRAMES) for start, end in chunks)
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=spawn_context) as executor:
+            pending = {executor.submit(_detect_chunk_scores, video_path, i, start, end, downscale,
+                                       progress_queue, cancel_event, collect_features)
+                       for i, (start, end) in enumerate(chunks)}
+            cancelled = False
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    # Исключение процесса пробрасывается вызывающему
+                    chunk_index, chunk_scores, chunk_features = future.result()
+                    if chunk_scores is None:
+                        cancelled = True
+                        continue
+                    start, end = chunks[chunk_index]
+                    frame_scores[start:end] = chunk_scores
+                    if chunk_features is not None:
+                        if frame_features is None:
+                            frame_features = np.full((num_frames, chunk_features.shape[1]), np.nan, dtype=np.float32)
+                        frame_features[start:end] = chunk_features
+
+                while True:
+                    try:
+                        chunk_index, processed = progress_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    chunk_progress[chunk_index] = processed
+                if progress_callback:
+                    progress_callback(min(sum(chunk_progress), total_decode_frames), total_decode_frames)
+
+                if not cancelled and is_cancelled and is_cancelled():
+                    cancelled = True
+                    cancel_event.set()
+                    for future in pending:
+                        future.cancel()
+            if cancelled:
+                return None
+    return frame_scores, frame_features
@@ -0,0 +1,212 @@
+# automated_content_creator/modules/pipeline.py
+#
+# Полный цикл обработки одного видео без участия пользователя:
+# анализ -> выбор лучших N хайлайтов -> экспорт -> контент-план.
+# Используется пакетной очередью (modules/batch_queue) и консольным режимом (cli.py).
+# Работает на движках без Qt (VideoAnalyzer, ClipExporter) с обычными callback, поэтому
+# run() можно вызывать в рабочем потоке или в отдельном процессе.
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from modules.ai_analyzer import VideoAnalyzer
+from modules.clip_exporter_worker import ClipExporter, fallback_sanitize
+from modules.cutting_engine import CuttingEngine
+from modules.export_module import ExportModule
+
+PIPELINE_STAGES = ("analyze", "select", "export", "plan")
+STAGE_TITLES = {"analyze": "Анализ", "select": "Выбор хайлайтов", "export": "Экспорт", "plan": "Контент-план"}
+# Диапазон общего прогресса задания (в процентах), который занимает этап
+STAGE_PROGRESS_RANGES = {"analyze": (0, 60), "select": (60, 62), "export": (62, 97), "plan": (97, 100)}
+
+DEFAULT_TOP_N = 5
+DEFAULT_PLATFORMS = ["Instagram Reels", "YouTube Shorts", "TikTok"]
+CONTENT_PLAN_FILENAME = "content_plan.json"
+
+
+def select_top_highlights(highlights: list, top_n: int) -> list:
+    """Лучшие top_n хайлайтов по оценке ('score') в хронологическом порядке. top_n <= 0 - все."""
+    if top_n <= 0:
+        return list(highlights)
+    best = sorted(highlights, key=lambda hl: hl.get('score', 0.0), reverse=True)[:top_n]
+    return sorted(best, key=lambda hl: hl['start_time'])
+
+
+def build_posting_schedule(clips_info_list: list, start_date=None, posts_per_day: int = 1, start_hour: int = 10,
+                           platforms=None) -> list:
+    """
+    Расписание публикаций для экспортированных клипов по тем же правилам, что и
+    ContentPlannerWidget.generate_plan (платформы по кругу, posts_per_day в день с шагом 3 часа,
+    не позже 23:00), но без Qt. start_date по умолчанию - завтра.
+    Возвращает список словарей {'datetime' (ISO), 'platform', 'description', 'clip_path'}.
+    """
+    platforms = platforms or DEFAULT_PLATFORMS
+    posts_per_day = max(1, int(posts_per_day))
+    if start_date is None:
+        start_date = datetime.now().date() + timedelta(days=1)
+    day_start = datetime(start_date.year, start_date.month, start_date.day, start_hour)
+    current = day_start
+    time_increment = timedelta(hours=3)
+
+    plan = []
+    for i, clip_info in enumerate(clips_info_list):
+        plan.append({
+            "datetime": current.isoformat(timespec="minutes"),
+            "platform": platforms[i % len(platforms)],
+            "description": clip_info.get('title_suggestion', clip_info.get('description', '')),
+            "clip_path": clip_info.get('path', ''),
+        })
+        if (i + 1) % posts_per_day == 0:
+            day_start += timedelta(days=1)
+            current = day_start
+        else:
+            current += time_increment
+            if current.hour >= 23 or current.date() != day_start.date():
+                day_start += timedelta(days=1)
+                current = day_start
+    return plan
+
+
+class VideoPipeline:
+    """
+    Обрабатывает одно видео от анализа до контент-плана.
+    settings - словарь SettingsDialog.get_current_settings();
+    options - {'output_folder', 'top_n', 'export_preset', 'generate_subtitles', 'draft'}.
+    Каждое видео экспортируется в свою подпапку output_folder, туда же пишется content_plan.json.
+    При 'draft' создаются только черновики и манифест экспорта, контент-план не строится.
+    """
+
+    def __init__(self, settings: dict, options: dict, parent_logger=None):
+        self.settings = settings
+        self.options = options
+        self.parent_logger = parent_logger
+        self._is_cancelled = False
+        self._analyzer = None
+        self._exporter = None
+        self._export_stats = None
+        self._manifest_path = None
+
+    def _log(self, message, level="INFO"):
+        if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
+            self.parent_logger.log_message(f"(Pipeline) {message}", level=level)
+        else:
+            print(f"Pipeline [{level}] (no logger): {message}")
+
+    def cancel(self):
+        self._is_cancelled = True
+        if self._analyzer:
+            self._analyzer.cancel()
+        if self._exporter:
+            self._exporter.cancel_export()
+
+    def _check_cancelled(self):
+        if self._is_cancelled:
+            raise InterruptedError("Обработка отменена.")
+
+    def run(self, video_path: str, progress_callback=None) -> dict:
+        """
+        Выполняет все этапы. progress_callback(percent, stage, message) вызывается из текущего потока.
+        Возвращает словарь с итогами; при отмене бросает InterruptedError, при ошибке - RuntimeError
+        (или исключение движка: AnalysisError, ExportError).
+        """
+        def report(stage, fraction, message):
+            if progress_callback:
+                low, high = STAGE_PROGRESS_RANGES[stage]
+                progress_callback(low + int((high - low) * min(1.0, max(0.0, fraction))), stage, message)
+
+        start_time = time.perf_counter()
+        export_module = ExportModule(self.parent_logger)
+        export_module.set_encoder_options(self.settings.get('export_encoder'), self.settings.get('export_speed_tier'),
+                                          self.settings.get('export_threads'))
+        preset_name = self.options.get('export_preset')
+        if preset_name not in export_module.get_available_presets():
+            raise RuntimeError(f"Неизвестный пресет экспорта: '{preset_name}'")
+
+        # --- Анализ ---
+        report("analyze", 0.0, "Анализ видео...")
+        highlights = self._analyze(video_path, report)
+
+        # --- Выбор лучших ---
+        self._check_cancelled()
+        top_n = int(self.options.get('top_n', DEFAULT_TOP_N))
+        selected = select_top_highlights(highlights, top_n)
+        report("select", 1.0, f"Выбрано хайлайтов: {len(selected)} из {len(highlights)}")
+        self._log(f"'{os.path.basename(video_path)}': выбрано {len(selected)} из {len(highlights)} хайлайтов.")
+
+        # --- Экспорт ---
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_folder = os.path.join(self.options['output_folder'], fallback_sanitize(video_name))
+        os.makedirs(output_folder, exist_ok=True)
+        exported_clips = self._export(video_path, selected, output_folder, preset_name, export_module, report) \
+            if selected else []
+
+        # --- Контент-план (черновики в план не попадают) ---
+        self._check_cancelled()
+        plan_path = None
+        if not self.options.get('draft'):
+            plan = build_posting_schedule(exported_clips,
+                                          posts_per_day=self.settings.get('planner_posts_per_day', 1),
+                                          start_hour=self.settings.get('planner_start_time_hour', 10))
+            plan_path = os.path.join(output_folder, CONTENT_PLAN_FILENAME)
+            with open(plan_path, "w", encoding="utf-8") as plan_file:
+                json.dump({"source_video": video_path, "posts": plan}, plan_file, ensure_ascii=False, indent=2)
+        report("plan", 1.0, f"Готово: {len(exported_clips)} клипов")
+
+        elapsed_sec = time.perf_counter() - start_time
+        self._log(f"'{os.path.basename(video_path)}' обработано за {elapsed_sec:.1f}s: "
+                  f"экспортировано {len(exported_clips)} клипов в '{output_folder}'.")
+        return {
+            "highlights_found": len(highlights),
+            "highlights_selected": len(selected),
+            "exported_clips": [clip_info["path"] for clip_info in exported_clips],
+            "output_folder": output_folder,
+            "plan_path": plan_path,
+            "elapsed_sec": round(elapsed_sec, 1),
+            # {'clips', 'elapsed_sec', 'clips_per_sec', 'mode', 'ffmpeg_tasks'} или None, если экспорта не было
+            "export_stats": self._export_stats,
+            # Манифест чернового экспорта (для последующего финала одобренных клипов) или None
+            "export_manifest": self._manifest_path,
+        }
+
+    def _analyze(self, video_path: str, report) -> list:
+        self._check_cancelled()  # Отмена могла прийти до создания анализатора
+        self._analyzer = VideoAnalyzer(
+            parent_logger=self.parent_logger, settings=self.settings,
+            progress_callback=lambda percent, message: report("analyze", percent / 100.0, message))
+        try:
+            highlights = self._analyzer.analyze(video_path)
+        finally:
+            self._analyzer = None
+        self._check_cancelled()
+        return highlights
+
+    def _export(self, video_path: str, selected: list, output_folder: str, preset_name: str,
+                export_module: ExportModule, report) -> list:
+        cutting_engine = CuttingEngine(self.parent_logger)
+        cutting_engine.set_ffmpeg_path(self.settings.get('paths/ffmpeg_path', 'ffmpeg'))
+        cutting_engine.set_encoder_options(export_module.encoder, export_module.speed_tier, export_module.threads)
+        subtitle_options = None
+        if self.options.get('generate_subtitles'):
+            subtitle_options = {
+                'model_size': self.settings.get('whisper_model_size', 'base'),
+                'padding_sec': self.options.get('subtitles_padding_sec', 1.0),
+                'ffmpeg_path': cutting_engine.ffmpeg_path,
+            }
+        self._check_cancelled()
+        self._exporter = ClipExporter(cutting_engine, export_module, parent_logger=self.parent_logger,
+                                      max_parallel_jobs=self.settings.get('export_parallel_jobs', 0),
+                                      subtitle_options=subtitle_options,
+                                      progress_callback=lambda done, total, message: report(
+                                          "export", done / max(1, total), message),
+                                      batch_cutting=self.settings.get('export_batch_cutting', True))
+        try:
+            exported_clips, _ = self._exporter.process_export_list(video_path, selected, output_folder, preset_name,
+                                                                   draft=bool(self.options.get('draft')))
+            self._export_stats = self._exporter.last_export_stats
+            self._manifest_path = self._exporter.last_manifest_path
+        finally:
+            self._exporter = None
+        self._check_cancelled()
+        return exported_clips
@@ -0,0 +1,144 @@
+# automated_content_creator/modules/preview_proxy.py
+#
+# Кеш прокси-файлов для плеера. Исходник 4K/высокого битрейта с длинной GOP перематывается
+# медленно: QMediaPlayer декодирует все кадры от предыдущего ключевого. Прокси - уменьшенная
+# копия с ключевым кадром каждые PREVIEW_PROXY_KEYINT кадров, создается один раз в фоне
+# и хранится в кеше по отпечатку исходника. Экспорт всегда режет исходный файл.
+
+import hashlib
+import json
+import os
+import threading
+
+from modules.analysis_cache import compute_video_fingerprint
+from modules.cutting_engine import CuttingEngine
+from utils import get_cache_folder
+
+PREVIEW_PROXY_HEIGHT = 540
+PREVIEW_PROXY_KEYINT = 12  # Кадров между ключевыми кадрами (~0.5 с при 25 fps)
+PREVIEW_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024  # Старые прокси удаляются при превышении
+# Увеличивается при изменении параметров кодирования прокси (старые записи перестают находиться)
+PREVIEW_PROXY_FORMAT_VERSION = 1
+
+
+class PreviewProxyCache:
+    """
+    Прокси для просмотра, по одному на исходник и высоту. Ключ - отпечаток видео
+    (compute_video_fingerprint) и параметры кодирования, поэтому измененный файл получает новый прокси.
+    Потокобезопасен: build() выполняется в фоновом потоке, find() - в потоке GUI.
+    """
+
+    def __init__(self, ffmpeg_path: str = "ffmpeg", height: int = PREVIEW_PROXY_HEIGHT,
+                 cache_dir: str | None = None, max_bytes: int = PREVIEW_CACHE_MAX_BYTES, parent_logger=None):
+        self.height = int(height)
+        self.cache_dir = cache_dir if cache_dir else get_cache_folder("preview")
+        self.max_bytes = max_bytes
+        self.parent_logger = parent_logger
+        self._engine = CuttingEngine(parent_logger)
+        self._engine.ffmpeg_path = ffmpeg_path or "ffmpeg"  # Без записи в лог: кеш создается и для подсчета размера
+        self._fingerprints = {}  # {(путь, размер, mtime): отпечаток} - find() не читает файл повторно
+        self._lock = threading.Lock()
+
+    def _log(self, message, level="INFO"):
+        if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
+            self.parent_logger.log_message(f"(PreviewProxyCache) {message}", level=level)
+        else:
+            print(f"PreviewProxyCache [{level}] (no logger): {message}")
+
+    def log(self, message, level="INFO"):
+        """Запись в лог кеша - для адаптеров (qt_workers)."""
+        self._log(message, level=level)
+
+    def proxy_path_for(self, video_path: str) -> str:
+        norm_video_path = os.path.normpath(video_path)
+        stat = os.stat(norm_video_path)
+        stat_key = (norm_video_path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            fingerprint = self._fingerprints.get(stat_key)
+        if fingerprint is None:
+            fingerprint = compute_video_fingerprint(norm_video_path)
+            with self._lock:
+                self._fingerprints[stat_key] = fingerprint
+        key_source = json.dumps({"version": PREVIEW_PROXY_FORMAT_VERSION, "fingerprint": fingerprint,
+                                 "height": self.height, "keyint": PREVIEW_PROXY_KEYINT}, sort_keys=True)
+        key = hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    def find(self, video_path: str) -> str | None:
+        """Готовый прокси для видео или None."""
+        try:
+            proxy_path = self.proxy_path_for(video_path)
+        except OSError as e:
+            self._log(f"Не удалось вычислить отпечаток '{video_path}': {e}", level="WARN")
+            return None
+        if os.path.exists(proxy_path) and os.path.getsize(proxy_path) > 0:
+            os.utime(proxy_path)  # Для очистки кеша: недавно открытые прокси удаляются последними
+            return proxy_path
+        return None
+
+    def build(self, video_path: str, progress_callback=None) -> str | None:
+        """
+        Создает прокси (если его еще нет) и возвращает путь к нему; None - при ошибке или отмене.
+        Файл пишется под временным именем и переименовывается только после успешного завершения.
+        """
+        existing_path = self.find(video_path)
+        if existing_path:
+            return existing_path
+        proxy_path = self.proxy_path_for(video_path)
+        partial_path = f"{proxy_path}.part"
+        duration_sec = self._engine.probe_duration(video_path)
+        if not self._engine.create_preview_proxy(video_path, partial_path, self.height, PREVIEW_PROXY_KEYINT,
+                                                 duration_sec=duration_sec, progress_callback=progress_callback):
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return None
+        os.replace(partial_path, proxy_path)
+        self._log(f"Прокси для просмотра готов: {os.path.basename(video_path)} -> {os.path.basename(proxy_path)} "
+                  f"({os.path.getsize(proxy_path) / (1024 * 1024):.1f} МБ).")
+        self.prune(keep_path=proxy_path)
+        return proxy_path
+
+    def cancel(self):
+        self._engine.cancel_current_operation()
+
+    def prune(self, keep_path: str | None = None) -> int:
+        """Удаляет давно не открывавшиеся прокси, пока кеш больше max_bytes. Возвращает число удаленных."""
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file() and entry.name.endswith(".mp4")]
+        total = sum(entry.stat().st_size for entry in entries)
+        removed = 0
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if keep_path and os.path.normpath(entry.path) == os.path.normpath(keep_path):
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+                removed += 1
+            except OSError as e:
+                self._log(f"Не удалось удалить '{entry.name}': {e}", level="WARN")
+        if removed:
+            self._log(f"Кеш прокси превысил {self.max_bytes // (1024 * 1024)} МБ, удалено файлов: {removed}.",
+                      level="DEBUG")
+        return removed
+
+    def get_size_bytes(self) -> int:
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def clear(self) -> int:
+        """Удаляет все прокси. Возвращает количество удаленных файлов."""
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith((".mp4", ".part")):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError as e:
+                    self._log(f"Не удалось удалить '{entry.name}': {e}", level="WARN")
+        self._log(f"Кеш прокси для просмотра очищен, удалено файлов: {removed}.", level="INFO")
+        return removed
@@ -0,0 +1,94 @@
+# automated_content_creator/modules/promote_drafts_dialog.py
+
+import os
+
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton,
+    QDialogButtonBox, QMessageBox
+)
+
+from modules.export_manifest import CLIP_STATUS_DRAFT, CLIP_STATUS_FINAL, CLIP_STATUS_FINAL_FAILED
+
+STATUS_TITLES = {
+    CLIP_STATUS_DRAFT: "черновик",
+    CLIP_STATUS_FINAL: "финал готов",
+    CLIP_STATUS_FINAL_FAILED: "ошибка финала",
+}
+
+
+class PromoteDraftsDialog(QDialog):
+    """
+    Выбор одобренных черновиков для финального экспорта. Двойной щелчок открывает превью
+    во внешнем проигрывателе. По умолчанию отмечены черновики, финал которых еще не создан.
+    """
+
+    def __init__(self, manifest: dict, parent=None):
+        super().__init__(parent)
+        self.manifest = manifest
+        self.approved_numbers = []
+
+        self.setWindowTitle("Финальный экспорт черновиков")
+        self.setMinimumWidth(520)
+        main_layout = QVBoxLayout(self)
+
+        main_layout.addWidget(QLabel(
+            f"Исходник: {os.path.basename(manifest.get('source_video', ''))}\n"
+            f"Пресеты: {', '.join(manifest.get('presets', []))}\n"
+            f"Субтитры: {'да' if manifest.get('subtitle_options') else 'нет'}\n"
+            "Отметьте одобренные клипы. Двойной щелчок - открыть черновик."))
+
+        self.clips_list = QListWidget()
+        for entry in manifest.get("clips", []):
+            status = STATUS_TITLES.get(entry.get("status"), "нет черновика")
+            item = QListWidgetItem(f"#{entry['number']:03d} {entry['description']} "
+                                   f"({entry['start_time']:.1f}-{entry['end_time']:.1f} с) - {status}")
+            item.setData(Qt.ItemDataRole.UserRole, entry["number"])
+            item.setData(Qt.ItemDataRole.UserRole + 1, entry.get("draft_path"))
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if entry.get("status") == CLIP_STATUS_DRAFT
+                               else Qt.CheckState.Unchecked)
+            self.clips_list.addItem(item)
+        self.clips_list.itemDoubleClicked.connect(self._open_draft)
+        main_layout.addWidget(self.clips_list, stretch=1)
+
+        selection_layout = QHBoxLayout()
+        check_all_button = QPushButton("Отметить все")
+        check_all_button.clicked.connect(lambda: self._set_all_checked(True))
+        uncheck_all_button = QPushButton("Снять все")
+        uncheck_all_button.clicked.connect(lambda: self._set_all_checked(False))
+        selection_layout.addWidget(check_all_button)
+        selection_layout.addWidget(uncheck_all_button)
+        selection_layout.addStretch(1)
+        main_layout.addLayout(selection_layout)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        self.button_box.button(QDialogButtonBox.StandardButton.Ok).setText("Экспортировать финал")
+        self.button_box.accepted.connect(self.accept_selection)
+        self.button_box.rejected.connect(self.reject)
+        main_layout.addWidget(self.button_box)
+
+    def _set_all_checked(self, checked: bool):
+        for row in range(self.clips_list.count()):
+            self.clips_list.item(row).setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+
+    def _open_draft(self, item: QListWidgetItem):
+        draft_path = item.data(Qt.ItemDataRole.UserRole + 1)
+        if draft_path and os.path.exists(draft_path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(draft_path))
+        else:
+            QMessageBox.information(self, "Нет черновика", "Черновик этого клипа не найден.")
+
+    def accept_selection(self):
+        self.approved_numbers = [
+            self.clips_list.item(row).data(Qt.ItemDataRole.UserRole) for row in range(self.clips_list.count())
+            if self.clips_list.item(row).checkState() == Qt.CheckState.Checked
+        ]
+        if not self.approved_numbers:
+            QMessageBox.warning(self, "Клипы не выбраны", "Отметьте хотя бы один одобренный клип.")
+            return
+        self.accept()
+
+    def get_approved_numbers(self) -> list:
+        return list(self.approved_numbers)
@@ -0,0 +1,126 @@
+# automated_content_creator/modules/qt_workers.py
+#
+# Тонкие Qt-адаптеры над движками без Qt (VideoAnalyzer, ClipExporter, кеши прокси и миниатюр).
+# Окно переносит их в QThread и получает результаты сигналами, как раньше;
+# вся работа и логика остаются в ядре, которое можно запускать и в отдельных процессах.
+
+import traceback
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from modules.ai_analyzer import VideoAnalyzer
+from modules.clip_exporter_worker import ClipExporter
+from modules.ffmpeg_runner import format_eta
+
+
+class AIAnalyzer(QObject):
+    analysis_finished = pyqtSignal(list)
+    analysis_progress = pyqtSignal(int, str)
+    analysis_error = pyqtSignal(str)
+    # Отправляется перед analysis_finished: SceneMetrics с покадровыми оценками для мгновенного пересчета порога
+    scene_metrics_ready = pyqtSignal(object)
+
+    def __init__(self, parent_logger=None, settings=None):
+        super().__init__()
+        self.parent_logger = parent_logger
+        self.analyzer = VideoAnalyzer(parent_logger=parent_logger, settings=settings,
+                                      progress_callback=self.analysis_progress.emit,
+                                      scene_metrics_callback=self.scene_metrics_ready.emit)
+
+    @property
+    def scene_metrics(self):
+        return self.analyzer.scene_metrics
+
+    def cancel_analysis(self):
+        self.analyzer.cancel()
+
+    def analyze(self, video_path: str):
+        try:
+            highlights = self.analyzer.analyze(video_path)
+        except InterruptedError:
+            self.analyzer.log("Анализ прерван из-за отмены.")
+            self.analysis_finished.emit([])
+        except Exception as e:
+            error_msg = f"Критическая ошибка во время анализа видео: {type(e).__name__} - {str(e)}"
+            self.analyzer.log(error_msg, level="ERROR")
+            self.analyzer.log(f"Traceback: {traceback.format_exc()}", level="DEBUG")
+            self.analysis_error.emit(error_msg)
+        else:
+            self.analysis_finished.emit(highlights)
+
+
+class ClipExporterWorker(QObject):
+    export_progress = pyqtSignal(int, int, str)
+    export_finished_one = pyqtSignal(str, bool, str)  # path, success, original_description
+    export_all_finished = pyqtSignal(list, int)
+    export_error = pyqtSignal(str)
+
+    def __init__(self, cutting_engine, export_module_instance, parent_logger=None, max_parallel_jobs=None,
+                 subtitle_options=None, batch_cutting=True):
+        super().__init__()
+        self.exporter = ClipExporter(cutting_engine, export_module_instance, parent_logger=parent_logger,
+                                     max_parallel_jobs=max_parallel_jobs, subtitle_options=subtitle_options,
+                                     progress_callback=self.export_progress.emit,
+                                     clip_exported_callback=self.export_finished_one.emit,
+                                     batch_cutting=batch_cutting)
+
+    def cancel_export(self):
+        self.exporter.cancel_export()
+
+    def process_export_list(self, original_video_path: str, highlights_to_export: list,
+                            output_folder: str, export_preset_name: str | list, draft: bool = False):
+        self._run(lambda: self.exporter.process_export_list(
+            original_video_path, highlights_to_export, output_folder, export_preset_name, draft=draft))
+
+    def promote_to_final(self, manifest_path: str, approved_numbers: list):
+        self._run(lambda: self.exporter.promote_to_final(manifest_path, approved_numbers))
+
+    def _run(self, export_call):
+        try:
+            exported_clips_info_list, successful_exports_count = export_call()
+        except Exception as e:
+            self.exporter.log(f"Критическая ошибка экспорта: {type(e).__name__} - {e}\n{traceback.format_exc()}",
+                              level="CRITICAL")
+            self.export_error.emit(f"{type(e).__name__} - {e}")
+            return
+        self.export_all_finished.emit(exported_clips_info_list, successful_exports_count)
+        self.exporter.log("Сигнал export_all_finished отправлен. Завершение работы воркера.", level="DEBUG")
+
+
+class CacheBuildWorker(QObject):
+    """
+    Фоновое создание кешируемых данных видео: прокси для плеера (PreviewProxyCache)
+    или индекса миниатюр (ThumbnailIndexCache). cache должен иметь build(video_path, progress_callback),
+    cancel() и log(message, level). Сигналы передают путь исходника, чтобы окно игнорировало результаты для старого видео.
+    """
+    build_progress = pyqtSignal(str, int, str)  # video_path, percent, message
+    build_ready = pyqtSignal(str, object)  # video_path, результат build()
+    build_failed = pyqtSignal(str)  # video_path (ошибка или отмена)
+
+    def __init__(self, cache, video_path: str, progress_label: str):
+        super().__init__()
+        self.cache = cache
+        self.video_path = video_path
+        self.progress_label = progress_label
+
+    def cancel(self):
+        self.cache.cancel()
+
+    def _on_progress(self, progress: dict):
+        if progress["fraction"] is None:
+            return
+        percent = int(progress["fraction"] * 100)
+        self.build_progress.emit(self.video_path, percent,
+                                 f"{self.progress_label}: {percent}%, осталось ~{format_eta(progress['eta_sec'])}")
+
+    def build(self):
+        try:
+            result = self.cache.build(self.video_path, progress_callback=self._on_progress)
+        except Exception as e:
+            self.cache.log(f"Ошибка ({self.progress_label}): {type(e).__name__} - {e}\n{traceback.format_exc()}",
+                           level="ERROR")
+            result = None
+        if result is not None:
+            self.build_ready.emit(self.video_path, result)
+        else:
+            self.build_failed.emit(self.video_path)
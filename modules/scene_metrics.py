@@ -0,0 +1,117 @@
+# automated_content_creator/modules/scene_metrics.py
+
+import numpy as np
+
+
+def format_timecode(seconds: float) -> str:
+    """Форматирует секунды в 'HH:MM:SS.mmm' (как FrameTimecode.get_timecode())."""
+    total_ms = int(round(max(0.0, seconds) * 1000))
+    h, rest = divmod(total_ms, 3600 * 1000)
+    m, rest = divmod(rest, 60 * 1000)
+    s, ms = divmod(rest, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+def build_highlights(scenes, fps: float, final_min_highlight_duration_sec: float, scorers=None) -> list:
+    """
+    Превращает список сцен [[start_frame, end_frame], ...] в хайлайты,
+    отбрасывая сцены короче final_min_highlight_duration_sec.
+    scorers - источники оценки (например, AudioFeatures) с атрибутом name и методом
+    score_ranges(starts_sec, ends_sec) -> {'score': ..., <признак>: ...}. Если заданы,
+    'score' хайлайта - среднее их оценок, а признаки сохраняются как '<name>_<признак>'.
+    Без них оценка считается по длительности сцены.
+    """
+    highlights = []
+    for i, (start_frame, end_frame) in enumerate(scenes):
+        start_sec = int(start_frame) / fps
+        end_sec = int(end_frame) / fps
+        duration_scene_sec = end_sec - start_sec
+        if duration_scene_sec < final_min_highlight_duration_sec:
+            continue
+        highlights.append({
+            'description': f"Хайлайт #{len(highlights) + 1} (Сцена {i + 1})",
+            'start_time': start_sec,
+            'end_time': end_sec,
+            'start_time_str': format_timecode(start_sec),
+            'end_time_str': format_timecode(end_sec),
+            'duration_sec': duration_scene_sec,
+            'score': round(min(1.0, duration_scene_sec / 60.0), 2)
+        })
+    if scorers and highlights:
+        apply_scorers(highlights, scorers)
+    return highlights
+
+
+def apply_scorers(highlights: list, scorers) -> list:
+    """Пересчитывает 'score' хайлайтов по источникам оценки (см. build_highlights). Изменяет список на месте."""
+    starts = np.array([hl['start_time'] for hl in highlights], dtype=np.float64)
+    ends = np.array([hl['end_time'] for hl in highlights], dtype=np.float64)
+    combined = np.zeros(len(highlights), dtype=np.float64)
+    for scorer in scorers:
+        values = scorer.score_ranges(starts, ends)
+        combined += values['score']
+        for key, column in values.items():
+            feature_key = f"{scorer.name}_{key}"
+            for hl, value in zip(highlights, column):
+                hl[feature_key] = round(float(value), 3)
+    combined /= len(scorers)
+    for hl, value in zip(highlights, combined):
+        hl['score'] = round(float(np.clip(value, 0.0, 1.0)), 2)
+    return highlights
+
+
+class SceneMetrics:
+    """
+    Покадровые оценки ContentDetector (content_val) одного видео.
+    Позволяет пересчитать границы сцен для другого порога и мин. длины сцены
+    за миллисекунды, без повторного декодирования видео. Не зависит от Qt и PySceneDetect.
+    """
+
+    def __init__(self, frame_scores, fps: float, num_frames: int | None = None, scorers=None):
+        scores = np.asarray(frame_scores, dtype=np.float32)
+        # Кадры без оценки (первый кадр, пропущенные кадры) никогда не становятся склейкой
+        self.frame_scores = np.where(np.isnan(scores), -np.inf, scores)
+        self.fps = float(fps)
+        self.num_frames = int(num_frames) if num_frames is not None else len(self.frame_scores)
+        self.scorers = list(scorers or [])  # Источники оценки хайлайтов (см. build_highlights)
+
+    @classmethod
+    def from_scene_data(cls, scene_data: dict, scorers=None):
+        """Создает объект из результата AIAnalyzer (в том числе загруженного из кеша)."""
+        return cls(scene_data["frame_scores"], scene_data["fps"], scene_data.get("num_frames"), scorers)
+
+    def detect_cuts(self, threshold: float, min_scene_len_frames: int) -> np.ndarray:
+        """
+        Номера кадров, на которых начинается новая сцена. Повторяет логику ContentDetector:
+        кадр становится склейкой, если его оценка >= threshold и с предыдущей склейки
+        (или с начала видео) прошло не меньше min_scene_len_frames кадров.
+        Так работает PySceneDetect до 0.6.3 включительно; с 0.6.4 ContentDetector объединяет близкие
+        склейки (FlashFilter), поэтому версия ограничена в requirements.txt. Совпадение с детектором
+        проверяет tests/test_scene_metrics.py.
+        """
+        min_scene_len_frames = max(1, int(min_scene_len_frames))
+        candidates = np.flatnonzero(self.frame_scores >= threshold)
+        cuts = []
+        last_cut = 0
+        # Итераций столько, сколько склеек, а не кадров: следующий кандидат ищется бинарным поиском
+        while True:
+            position = np.searchsorted(candidates, last_cut + min_scene_len_frames, side="left")
+            if position >= len(candidates):
+                break
+            last_cut = int(candidates[position])
+            cuts.append(last_cut)
+        return np.asarray(cuts, dtype=np.int64)
+
+    def compute_scenes(self, threshold: float, min_scene_len_sec: float) -> list:
+        """Список сцен [[start_frame, end_frame], ...]. Как и SceneManager, без склеек возвращает пустой список."""
+        min_scene_len_frames = int(self.fps * min_scene_len_sec)
+        cuts = self.detect_cuts(threshold, min_scene_len_frames)
+        if len(cuts) == 0:
+            return []
+        boundaries = [0] + cuts.tolist() + [self.num_frames]
+        return [[boundaries[i], boundaries[i + 1]] for i in range(len(boundaries) - 1)]
+
+    def build_highlights(self, threshold: float, min_scene_len_sec: float,
+                         final_min_highlight_duration_sec: float) -> list:
+        scenes = self.compute_scenes(threshold, min_scene_len_sec)
+        return build_highlights(scenes, self.fps, final_min_highlight_duration_sec, self.scorers)
@@ -2,10 +2,19 @@
 
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QLineEdit,
                              QPushButton, QHBoxLayout, QMessageBox, QDialogButtonBox, QFileDialog,
-                             QLabel, QGroupBox, QDoubleSpinBox, QSpinBox, QTabWidget, QWidget, QCheckBox) # Добавил QDoubleSpinBox
+                             QLabel, QGroupBox, QDoubleSpinBox, QSpinBox, QTabWidget, QWidget, QCheckBox,
+                             QComboBox) # Добавил QDoubleSpinBox
 from PyQt6.QtCore import QSettings, QStandardPaths, Qt
 import os
 from utils import get_default_output_folder # Используем нашу утилиту
+from modules.analysis_cache import AnalysisCache
+from modules.whisper_models import WHISPER_MODEL_SIZES, DEFAULT_WHISPER_MODEL_SIZE, DEFAULT_WHISPER_MEMORY_LIMIT_MB
+from modules.ai_analyzer import (ANALYSIS_SPEED_MODES, DEFAULT_ANALYSIS_SPEED_MODE, resolve_speed_params,
+                                 describe_speed_params)
+from modules.log_pipeline import LOG_LEVELS, DEFAULT_MIN_LEVEL
+from modules.preview_proxy import PreviewProxyCache, PREVIEW_PROXY_HEIGHT
+from modules.thumbnail_index import ThumbnailIndexCache
+from modules.encoders import ENCODER_BACKENDS, SPEED_TIERS, DEFAULT_ENCODER, DEFAULT_SPEED_TIER
 
 # --- Ключи для QSettings ---
 # Пути
@@ -17,6 +26,43 @@ CONFIG_AI_PYSCENEDETECT_THRESHOLD = "ai/pyscenedetect_threshold"
 CONFIG_AI_MIN_SCENE_DURATION_SEC = "ai/min_scene_len_sec" # Минимальная длина сцены от детектора
 CONFIG_AI_FINAL_MIN_HIGHLIGHT_DURATION_SEC = "ai/final_min_highlight_duration_sec" # Финальная мин. длина для хайлайта
 
+CONFIG_AI_ANALYSIS_CACHE_ENABLED = "ai/analysis_cache_enabled" # Повторно использовать результаты анализа с диска
+CONFIG_AI_SPEED_MODE = "ai/speed_mode" # Ключ из ANALYSIS_SPEED_MODES
+CONFIG_AI_FRAME_SKIP = "ai/frame_skip" # Параметры пользовательского режима скорости
+CONFIG_AI_DOWNSCALE = "ai/downscale"
+CONFIG_AI_PROXY_HEIGHT = "ai/proxy_height"
+CONFIG_AI_ANALYSIS_WORKERS = "ai/analysis_workers" # 0 = автоматически, 1 = без параллельного анализа
+CONFIG_AI_AUDIO_SCORING_ENABLED = "ai/audio_scoring_enabled" # Оценка хайлайтов по громкости, динамике звука и речи
+CONFIG_AI_VISUAL_SCORING_ENABLED = "ai/visual_scoring_enabled" # Оценка хайлайтов по движению и яркости кадров
+
+# Настройки субтитров (Whisper)
+CONFIG_WHISPER_MODEL_SIZE = "whisper/model_size"
+CONFIG_WHISPER_MEMORY_LIMIT_MB = "whisper/memory_limit_mb" # Суммарный объем моделей в памяти
+CONFIG_WHISPER_PRELOAD_ON_IMPORT = "whisper/preload_on_import" # Загружать модель в фоне при импорте видео
+
+# Настройки экспорта
+CONFIG_EXPORT_PARALLEL_JOBS = "export/parallel_jobs"  # 0 = автоматически по числу ядер
+CONFIG_EXPORT_BATCH_CUTTING = "export/batch_cutting"  # Много коротких клипов - по несколько на процесс FFmpeg
+CONFIG_EXPORT_ENCODER = "export/encoder"  # Ключ из ENCODER_BACKENDS
+CONFIG_EXPORT_SPEED_TIER = "export/speed_tier"  # Ключ из SPEED_TIERS
+CONFIG_EXPORT_THREADS = "export/threads"  # Потоков кодировщика на процесс FFmpeg, 0 = автоматически
+
+# Плеер
+CONFIG_PLAYER_PREVIEW_PROXY_ENABLED = "player/preview_proxy_enabled" # Создавать в фоне прокси для быстрой перемотки
+CONFIG_PLAYER_PREVIEW_PROXY_HEIGHT = "player/preview_proxy_height"
+CONFIG_PLAYER_THUMBNAILS_ENABLED = "player/thumbnails_enabled" # Миниатюры и полоса кадров в таблице хайлайтов
+
+# Журнал
+CONFIG_LOG_MIN_LEVEL = "log/min_level" # Сообщения ниже уровня отбрасываются сразу при вызове
+CONFIG_LOG_FILE_ENABLED = "log/file_enabled" # Дублировать лог в файл с ротацией
+
+# Пакетная обработка (задаются в окне очереди)
+CONFIG_BATCH_MAX_CONCURRENT_JOBS = "batch/max_concurrent_jobs"
+CONFIG_BATCH_TOP_N = "batch/top_n" # Сколько лучших хайлайтов экспортировать из видео, 0 = все
+CONFIG_BATCH_EXPORT_PRESET = "batch/export_preset"
+CONFIG_BATCH_GENERATE_SUBTITLES = "batch/generate_subtitles"
+CONFIG_BATCH_AUTO_START = "batch/auto_start" # Запускать очередь при старте, если есть ожидающие задания или следящая папка
+
 # Настройки Контент-плана (Пример)
 CONFIG_PLANNER_POSTS_PER_DAY = "planner/posts_per_day"
 CONFIG_PLANNER_START_TIME_HOUR = "planner/start_time_hour"
@@ -56,6 +102,88 @@ class SettingsDialog(QDialog):
         export_folder_layout.addWidget(self.default_export_folder_edit)
         export_folder_layout.addWidget(self.default_export_folder_button)
         paths_layout.addRow("Папка экспорта по умолчанию:", export_folder_layout)
+
+        # Параллельный экспорт
+        self.export_parallel_jobs_spinbox = QSpinBox()
+        self.export_parallel_jobs_spinbox.setRange(0, 64)
+        self.export_parallel_jobs_spinbox.setSpecialValueText("Авто")
+        self.export_parallel_jobs_spinbox.setToolTip(
+            "Сколько процессов FFmpeg запускать одновременно при экспорте клипов.\n"
+            f"\"Авто\" - примерно одна задача на 4 ядра процессора (ядер: {os.cpu_count() or 1})."
+        )
+        paths_layout.addRow("Параллельных задач экспорта:", self.export_parallel_jobs_spinbox)
+        self.export_batch_cutting_checkbox = QCheckBox("Пакетная нарезка коротких клипов")
+        self.export_batch_cutting_checkbox.setToolTip(
+            "Если коротких клипов много, несколько клипов режутся одним процессом FFmpeg:\n"
+            "запуск процесса и разбор исходника выполняются один раз на пачку, а не на каждый клип.\n"
+            "Скорость (клипов/с) записывается в лог после экспорта."
+        )
+        paths_layout.addRow(self.export_batch_cutting_checkbox)
+
+        # Кодировщик и скорость кодирования
+        self.export_encoder_combo = QComboBox()
+        for encoder_key, backend in ENCODER_BACKENDS.items():
+            self.export_encoder_combo.addItem(backend["title"], encoder_key)
+        self.export_encoder_combo.setToolTip(
+            "Кодировщик видео для перекодируемых пресетов. Должен быть в сборке FFmpeg\n"
+            "(проверка и замер скорости: python -m cli --benchmark-encoders <видео>)."
+        )
+        paths_layout.addRow("Кодировщик видео:", self.export_encoder_combo)
+        self.export_speed_tier_combo = QComboBox()
+        for tier_key, tier_title in SPEED_TIERS.items():
+            self.export_speed_tier_combo.addItem(tier_title, tier_key)
+        self.export_speed_tier_combo.setToolTip(
+            "Чем быстрее уровень, тем больше файл при том же качестве.\n"
+            "Черновик - для предпросмотра, финал - для публикации."
+        )
+        paths_layout.addRow("Скорость кодирования:", self.export_speed_tier_combo)
+        self.export_threads_spinbox = QSpinBox()
+        self.export_threads_spinbox.setRange(0, 256)
+        self.export_threads_spinbox.setSpecialValueText("Авто")
+        self.export_threads_spinbox.setToolTip(
+            "Потоков кодировщика в каждом процессе FFmpeg. При нескольких параллельных задачах\n"
+            "имеет смысл ограничить: примерно число ядер / число задач."
+        )
+        paths_layout.addRow("Потоков кодировщика:", self.export_threads_spinbox)
+
+        # Журнал
+        self.log_min_level_combo = QComboBox()
+        self.log_min_level_combo.addItems(LOG_LEVELS)
+        self.log_min_level_combo.setToolTip(
+            "Сообщения ниже выбранного уровня не записываются никуда.\n"
+            "DEBUG - подробный лог (каждый кадр/сцена), заметно больше сообщений при анализе."
+        )
+        paths_layout.addRow("Уровень лога:", self.log_min_level_combo)
+        self.log_file_checkbox = QCheckBox("Писать лог в файл (с ротацией по размеру)")
+        paths_layout.addRow(self.log_file_checkbox)
+
+        # Прокси для просмотра
+        self.preview_proxy_checkbox = QCheckBox("Создавать прокси для быстрой перемотки в плеере")
+        self.preview_proxy_checkbox.setToolTip(
+            "После импорта в фоне создается уменьшенная копия видео с частыми ключевыми кадрами,\n"
+            "и плеер переключается на нее: переход к хайлайту происходит почти мгновенно.\n"
+            "Прокси хранится в кеше и используется повторно; клипы экспортируются из исходника."
+        )
+        paths_layout.addRow(self.preview_proxy_checkbox)
+        self.preview_proxy_height_spinbox = QSpinBox()
+        self.preview_proxy_height_spinbox.setRange(240, 1080)
+        self.preview_proxy_height_spinbox.setSingleStep(60)
+        self.preview_proxy_height_spinbox.setSuffix("p")
+        preview_proxy_layout = QHBoxLayout()
+        preview_proxy_layout.addWidget(self.preview_proxy_height_spinbox)
+        self.preview_cache_size_label = QLabel()
+        preview_proxy_layout.addWidget(self.preview_cache_size_label)
+        preview_proxy_layout.addStretch(1)
+        clear_preview_cache_button = QPushButton("Очистить кеш прокси и миниатюр")
+        clear_preview_cache_button.clicked.connect(self.clear_preview_cache)
+        preview_proxy_layout.addWidget(clear_preview_cache_button)
+        paths_layout.addRow("Высота прокси:", preview_proxy_layout)
+        self.thumbnails_checkbox = QCheckBox("Показывать миниатюры хайлайтов (полоса кадров при наведении)")
+        self.thumbnails_checkbox.setToolTip(
+            "После импорта в фоне один раз проходит FFmpeg и сохраняет в кеш по кадру каждые несколько секунд.\n"
+            "Миниатюры в таблице и полоса кадров при наведении берутся из этого файла, без перемотки видео."
+        )
+        paths_layout.addRow(self.thumbnails_checkbox)
         paths_layout.setFieldGrowthPolicy(QFormLayout.FieldGrowthPolicy.ExpandingFieldsGrow) # Чтобы поля растягивались
 
         self.tab_widget.addTab(paths_tab, "Пути и Общие")
@@ -91,6 +219,60 @@ class SettingsDialog(QDialog):
         ai_form_layout.addRow("Мин. длина сцены (детектор):", self.min_scene_duration_spinbox)
         ai_main_layout.addWidget(pyscenedetect_group)
 
+        # Группа для режима скорости анализа
+        speed_group = QGroupBox("Скорость анализа")
+        speed_form_layout = QFormLayout(speed_group)
+
+        self.speed_mode_combo = QComboBox()
+        for mode_key, mode in ANALYSIS_SPEED_MODES.items():
+            self.speed_mode_combo.addItem(mode["title"], mode_key)
+        self.speed_mode_combo.setToolTip(
+            "Точный - каждый кадр исходника.\n"
+            "Сбалансированный - исходник декодируется FFmpeg в 360p, анализируется каждый кадр.\n"
+            "Быстрый - 240p и каждый второй кадр: границы сцен определяются с точностью до 2 кадров."
+        )
+        speed_form_layout.addRow("Режим:", self.speed_mode_combo)
+
+        self.frame_skip_spinbox = QSpinBox()
+        self.frame_skip_spinbox.setRange(0, 10)
+        self.frame_skip_spinbox.setToolTip("Сколько кадров пропускать между анализируемыми.")
+        speed_form_layout.addRow("Пропуск кадров:", self.frame_skip_spinbox)
+
+        self.downscale_spinbox = QSpinBox()
+        self.downscale_spinbox.setRange(0, 16)
+        self.downscale_spinbox.setSpecialValueText("Авто")
+        self.downscale_spinbox.setToolTip("Во сколько раз PySceneDetect уменьшает кадр перед детектором.")
+        speed_form_layout.addRow("Уменьшение кадра:", self.downscale_spinbox)
+
+        self.proxy_height_spinbox = QSpinBox()
+        self.proxy_height_spinbox.setRange(0, 1080)
+        self.proxy_height_spinbox.setSingleStep(120)
+        self.proxy_height_spinbox.setSpecialValueText("Выкл.")
+        self.proxy_height_spinbox.setSuffix("p")
+        self.proxy_height_spinbox.setToolTip(
+            "Перед анализом FFmpeg декодирует видео в прокси этой высоты.\n"
+            "Значительно ускоряет анализ 1080p/4K исходников."
+        )
+        speed_form_layout.addRow("Декодирование FFmpeg:", self.proxy_height_spinbox)
+
+        self.analysis_workers_spinbox = QSpinBox()
+        self.analysis_workers_spinbox.setRange(0, 32)
+        self.analysis_workers_spinbox.setSpecialValueText("Авто")
+        self.analysis_workers_spinbox.setToolTip(
+            "Длинные видео делятся на куски, которые анализируются в отдельных процессах.\n"
+            "1 - анализ в одном потоке. \"Авто\" - половина ядер процессора, не больше 8."
+        )
+        speed_form_layout.addRow("Процессов анализа:", self.analysis_workers_spinbox)
+
+        self.speed_tradeoff_label = QLabel()
+        self.speed_tradeoff_label.setWordWrap(True)
+        speed_form_layout.addRow(self.speed_tradeoff_label)
+
+        self.speed_mode_combo.currentIndexChanged.connect(self._on_speed_mode_changed)
+        for spinbox in (self.frame_skip_spinbox, self.downscale_spinbox, self.proxy_height_spinbox):
+            spinbox.valueChanged.connect(self._update_speed_tradeoff_label)
+        ai_main_layout.addWidget(speed_group)
+
         # Группа для финальной обработки хайлайтов
         highlight_filter_group = QGroupBox("Фильтрация хайлайтов (после анализа)")
         highlight_form_layout = QFormLayout(highlight_filter_group)
@@ -105,7 +287,67 @@ class SettingsDialog(QDialog):
              "Даже если сцена была найдена, она будет отброшена, если короче этого значения."
         )
         highlight_form_layout.addRow("Мин. длина итогового хайлайта:", self.final_min_highlight_duration_spinbox)
+
+        self.audio_scoring_checkbox = QCheckBox("Оценивать хайлайты по звуку")
+        self.audio_scoring_checkbox.setToolTip(
+            "Оценка хайлайта считается по громкости, резким изменениям звука и наличию речи\n"
+            "(один быстрый проход по аудиодорожке параллельно с анализом видео).\n"
+            "Если выключено, оценка зависит только от длительности сцены."
+        )
+        highlight_form_layout.addRow(self.audio_scoring_checkbox)
+
+        self.visual_scoring_checkbox = QCheckBox("Оценивать хайлайты по движению в кадре")
+        self.visual_scoring_checkbox.setToolTip(
+            "Энергия движения, яркость и контраст считаются по кадрам, которые уже\n"
+            "декодируются для поиска сцен, поэтому анализ почти не замедляется."
+        )
+        highlight_form_layout.addRow(self.visual_scoring_checkbox)
         ai_main_layout.addWidget(highlight_filter_group)
+
+        # Группа для кеша результатов анализа
+        cache_group = QGroupBox("Кеш анализа")
+        cache_form_layout = QFormLayout(cache_group)
+
+        self.analysis_cache_checkbox = QCheckBox("Использовать кеш результатов анализа")
+        self.analysis_cache_checkbox.setToolTip(
+            "Результаты анализа сохраняются на диск и используются повторно,\n"
+            "если видео и параметры детектора не изменились. Повторный анализ\n"
+            "того же файла выполняется без декодирования видео."
+        )
+        cache_form_layout.addRow(self.analysis_cache_checkbox)
+
+        cache_buttons_layout = QHBoxLayout()
+        self.analysis_cache_size_label = QLabel()
+        clear_cache_button = QPushButton("Очистить кеш")
+        clear_cache_button.clicked.connect(self.clear_analysis_cache)
+        cache_buttons_layout.addWidget(self.analysis_cache_size_label)
+        cache_buttons_layout.addStretch(1)
+        cache_buttons_layout.addWidget(clear_cache_button)
+        cache_form_layout.addRow(cache_buttons_layout)
+        ai_main_layout.addWidget(cache_group)
+
+        # Группа для субтитров (Whisper)
+        whisper_group = QGroupBox("Субтитры (Whisper)")
+        whisper_form_layout = QFormLayout(whisper_group)
+
+        self.whisper_model_combo = QComboBox()
+        self.whisper_model_combo.addItems(WHISPER_MODEL_SIZES)
+        self.whisper_model_combo.setToolTip("Больше модель - точнее распознавание, но медленнее и больше памяти.")
+        whisper_form_layout.addRow("Модель:", self.whisper_model_combo)
+
+        self.whisper_memory_limit_spinbox = QSpinBox()
+        self.whisper_memory_limit_spinbox.setRange(256, 65536)
+        self.whisper_memory_limit_spinbox.setSingleStep(256)
+        self.whisper_memory_limit_spinbox.setSuffix(" МБ")
+        self.whisper_memory_limit_spinbox.setToolTip(
+            "Сколько памяти могут занимать загруженные модели Whisper.\n"
+            "При превышении выгружается модель, которая дольше всех не использовалась."
+        )
+        whisper_form_layout.addRow("Лимит памяти моделей:", self.whisper_memory_limit_spinbox)
+
+        self.whisper_preload_checkbox = QCheckBox("Загружать модель в фоне при импорте видео")
+        whisper_form_layout.addRow(self.whisper_preload_checkbox)
+        ai_main_layout.addWidget(whisper_group)
         ai_main_layout.addStretch(1) # Растягиваем, чтобы группы были вверху
 
         self.tab_widget.addTab(ai_tab, "AI Анализ")
@@ -204,11 +446,44 @@ class SettingsDialog(QDialog):
         # Пути
         self.ffmpeg_path_edit.setText(self.settings.value(CONFIG_FFMPEG_PATH, "ffmpeg"))
         self.default_export_folder_edit.setText(self.settings.value(CONFIG_DEFAULT_EXPORT_FOLDER, get_default_output_folder()))
+        self.export_parallel_jobs_spinbox.setValue(int(self.settings.value(CONFIG_EXPORT_PARALLEL_JOBS, 0)))
+        self.export_batch_cutting_checkbox.setChecked(self.settings.value(CONFIG_EXPORT_BATCH_CUTTING, True, type=bool))
+        self.export_encoder_combo.setCurrentIndex(
+            max(0, self.export_encoder_combo.findData(self.settings.value(CONFIG_EXPORT_ENCODER, DEFAULT_ENCODER))))
+        self.export_speed_tier_combo.setCurrentIndex(
+            max(0, self.export_speed_tier_combo.findData(self.settings.value(CONFIG_EXPORT_SPEED_TIER, DEFAULT_SPEED_TIER))))
+        self.export_threads_spinbox.setValue(int(self.settings.value(CONFIG_EXPORT_THREADS, 0)))
+        self.log_min_level_combo.setCurrentIndex(
+            max(0, self.log_min_level_combo.findText(self.settings.value(CONFIG_LOG_MIN_LEVEL, DEFAULT_MIN_LEVEL))))
+        self.log_file_checkbox.setChecked(self.settings.value(CONFIG_LOG_FILE_ENABLED, False, type=bool))
+        self.preview_proxy_checkbox.setChecked(
+            self.settings.value(CONFIG_PLAYER_PREVIEW_PROXY_ENABLED, True, type=bool))
+        self.preview_proxy_height_spinbox.setValue(
+            int(self.settings.value(CONFIG_PLAYER_PREVIEW_PROXY_HEIGHT, PREVIEW_PROXY_HEIGHT)))
+        self.thumbnails_checkbox.setChecked(self.settings.value(CONFIG_PLAYER_THUMBNAILS_ENABLED, True, type=bool))
+        self._update_preview_cache_size_label()
 
         # AI Анализ
         self.pyscene_threshold_spinbox.setValue(float(self.settings.value(CONFIG_AI_PYSCENEDETECT_THRESHOLD, 27.0)))
         self.min_scene_duration_spinbox.setValue(float(self.settings.value(CONFIG_AI_MIN_SCENE_DURATION_SEC, 2.0)))
         self.final_min_highlight_duration_spinbox.setValue(float(self.settings.value(CONFIG_AI_FINAL_MIN_HIGHLIGHT_DURATION_SEC, 3.0)))
+        self.analysis_cache_checkbox.setChecked(self.settings.value(CONFIG_AI_ANALYSIS_CACHE_ENABLED, True, type=bool))
+        self.audio_scoring_checkbox.setChecked(self.settings.value(CONFIG_AI_AUDIO_SCORING_ENABLED, True, type=bool))
+        self.visual_scoring_checkbox.setChecked(self.settings.value(CONFIG_AI_VISUAL_SCORING_ENABLED, True, type=bool))
+        self.frame_skip_spinbox.setValue(int(self.settings.value(CONFIG_AI_FRAME_SKIP, 0)))
+        self.downscale_spinbox.setValue(int(self.settings.value(CONFIG_AI_DOWNSCALE, 0)))
+        self.proxy_height_spinbox.setValue(int(self.settings.value(CONFIG_AI_PROXY_HEIGHT, 0)))
+        self.analysis_workers_spinbox.setValue(int(self.settings.value(CONFIG_AI_ANALYSIS_WORKERS, 0)))
+        speed_mode_index = self.speed_mode_combo.findData(self.settings.value(CONFIG_AI_SPEED_MODE, DEFAULT_ANALYSIS_SPEED_MODE))
+        self.speed_mode_combo.setCurrentIndex(max(0, speed_mode_index))
+        self._on_speed_mode_changed()
+        self._update_analysis_cache_size_label()
+        whisper_model_index = self.whisper_model_combo.findText(
+            self.settings.value(CONFIG_WHISPER_MODEL_SIZE, DEFAULT_WHISPER_MODEL_SIZE))
+        self.whisper_model_combo.setCurrentIndex(max(0, whisper_model_index))
+        self.whisper_memory_limit_spinbox.setValue(
+            int(self.settings.value(CONFIG_WHISPER_MEMORY_LIMIT_MB, DEFAULT_WHISPER_MEMORY_LIMIT_MB)))
+        self.whisper_preload_checkbox.setChecked(self.settings.value(CONFIG_WHISPER_PRELOAD_ON_IMPORT, True, type=bool))
 
         # Контент-план
         self.posts_per_day_spinbox.setValue(int(self.settings.value(CONFIG_PLANNER_POSTS_PER_DAY, 1)))
@@ -222,11 +497,33 @@ class SettingsDialog(QDialog):
         # Пути
         self.settings.setValue(CONFIG_FFMPEG_PATH, self.ffmpeg_path_edit.text())
         self.settings.setValue(CONFIG_DEFAULT_EXPORT_FOLDER, self.default_export_folder_edit.text())
+        self.settings.setValue(CONFIG_EXPORT_PARALLEL_JOBS, self.export_parallel_jobs_spinbox.value())
+        self.settings.setValue(CONFIG_EXPORT_BATCH_CUTTING, self.export_batch_cutting_checkbox.isChecked())
+        self.settings.setValue(CONFIG_EXPORT_ENCODER, self.export_encoder_combo.currentData())
+        self.settings.setValue(CONFIG_EXPORT_SPEED_TIER, self.export_speed_tier_combo.currentData())
+        self.settings.setValue(CONFIG_EXPORT_THREADS, self.export_threads_spinbox.value())
+        self.settings.setValue(CONFIG_LOG_MIN_LEVEL, self.log_min_level_combo.currentText())
+        self.settings.setValue(CONFIG_LOG_FILE_ENABLED, self.log_file_checkbox.isChecked())
+        self.settings.setValue(CONFIG_PLAYER_PREVIEW_PROXY_ENABLED, self.preview_proxy_checkbox.isChecked())
+        self.settings.setValue(CONFIG_PLAYER_PREVIEW_PROXY_HEIGHT, self.preview_proxy_height_spinbox.value())
+        self.settings.setValue(CONFIG_PLAYER_THUMBNAILS_ENABLED, self.thumbnails_checkbox.isChecked())
 
         # AI Анализ
         self.settings.setValue(CONFIG_AI_PYSCENEDETECT_THRESHOLD, self.pyscene_threshold_spinbox.value())
         self.settings.setValue(CONFIG_AI_MIN_SCENE_DURATION_SEC, self.min_scene_duration_spinbox.value())
         self.settings.setValue(CONFIG_AI_FINAL_MIN_HIGHLIGHT_DURATION_SEC, self.final_min_highlight_duration_spinbox.value())
+        self.settings.setValue(CONFIG_AI_ANALYSIS_CACHE_ENABLED, self.analysis_cache_checkbox.isChecked())
+        self.settings.setValue(CONFIG_AI_AUDIO_SCORING_ENABLED, self.audio_scoring_checkbox.isChecked())
+        self.settings.setValue(CONFIG_AI_VISUAL_SCORING_ENABLED, self.visual_scoring_checkbox.isChecked())
+        self.settings.setValue(CONFIG_AI_SPEED_MODE, self.speed_mode_combo.currentData())
+        self.settings.setValue(CONFIG_AI_ANALYSIS_WORKERS, self.analysis_workers_spinbox.value())
+        self.settings.setValue(CONFIG_WHISPER_MODEL_SIZE, self.whisper_model_combo.currentText())
+        self.settings.setValue(CONFIG_WHISPER_MEMORY_LIMIT_MB, self.whisper_memory_limit_spinbox.value())
+        self.settings.setValue(CONFIG_WHISPER_PRELOAD_ON_IMPORT, self.whisper_preload_checkbox.isChecked())
+        if self.speed_mode_combo.currentData() == "custom":
+            self.settings.setValue(CONFIG_AI_FRAME_SKIP, self.frame_skip_spinbox.value())
+            self.settings.setValue(CONFIG_AI_DOWNSCALE, self.downscale_spinbox.value())
+            self.settings.setValue(CONFIG_AI_PROXY_HEIGHT, self.proxy_height_spinbox.value())
 
         # Контент-план
         self.settings.setValue(CONFIG_PLANNER_POSTS_PER_DAY, self.posts_per_day_spinbox.value())
@@ -237,6 +534,8 @@ class SettingsDialog(QDialog):
              self.parent_window.cutting_engine.set_ffmpeg_path(self.ffmpeg_path_edit.text())
              if self.parent_window: self.parent_window.log_message(f"Настройки: Путь к FFmpeg немедленно обновлен на '{self.ffmpeg_path_edit.text()}'.")
 
+        if self.parent_window and hasattr(self.parent_window, 'apply_log_settings'):
+            self.parent_window.apply_log_settings()
         if self.parent_window: self.parent_window.log_message("Настройки: Текущие значения сохранены.")
 
     def apply_settings(self):
@@ -251,6 +550,47 @@ class SettingsDialog(QDialog):
         self.save_settings()
         self.accept() # Закрывает диалог с QDialog.DialogCode.Accepted
 
+    def _on_speed_mode_changed(self):
+        """Готовые режимы подставляют свои значения; редактировать их можно только в пользовательском режиме."""
+        mode_key = self.speed_mode_combo.currentData()
+        is_custom = mode_key == "custom"
+        if not is_custom:
+            preset = ANALYSIS_SPEED_MODES[mode_key]
+            self.frame_skip_spinbox.setValue(preset["frame_skip"])
+            self.downscale_spinbox.setValue(preset["downscale"])
+            self.proxy_height_spinbox.setValue(preset["proxy_height"])
+        for spinbox in (self.frame_skip_spinbox, self.downscale_spinbox, self.proxy_height_spinbox):
+            spinbox.setEnabled(is_custom)
+        self._update_speed_tradeoff_label()
+
+    def _update_speed_tradeoff_label(self):
+        params = resolve_speed_params({
+            'analysis_speed_mode': "custom",
+            'analysis_frame_skip': self.frame_skip_spinbox.value(),
+            'analysis_downscale': self.downscale_spinbox.value(),
+            'analysis_proxy_height': self.proxy_height_spinbox.value(),
+        })
+        self.speed_tradeoff_label.setText(describe_speed_params(params))
+
+    def _update_analysis_cache_size_label(self):
+        size_mb = AnalysisCache().get_size_bytes() / (1024 * 1024)
+        self.analysis_cache_size_label.setText(f"Размер кеша: {size_mb:.1f} МБ")
+
+    def clear_analysis_cache(self):
+        removed_count = AnalysisCache(parent_logger=self.parent_window).clear()
+        self._update_analysis_cache_size_label()
+        if self.parent_window: self.parent_window.log_message(f"Настройки: Кеш анализа очищен (удалено файлов: {removed_count}).")
+
+    def _update_preview_cache_size_label(self):
+        size_mb = (PreviewProxyCache().get_size_bytes() + ThumbnailIndexCache().get_size_bytes()) / (1024 * 1024)
+        self.preview_cache_size_label.setText(f"Кеш: {size_mb:.0f} МБ")
+
+    def clear_preview_cache(self):
+        removed_count = PreviewProxyCache(parent_logger=self.parent_window).clear()
+        removed_count += ThumbnailIndexCache(parent_logger=self.parent_window).clear()
+        self._update_preview_cache_size_label()
+        if self.parent_window: self.parent_window.log_message(f"Настройки: Кеш прокси и миниатюр очищен (удалено файлов: {removed_count}).")
+
     def get_current_settings(self):
         """
         Возвращает словарь с текущими настройками, считанными из QSettings.
@@ -265,6 +605,32 @@ class SettingsDialog(QDialog):
             'pyscenedetect_threshold': float(self.settings.value(CONFIG_AI_PYSCENEDETECT_THRESHOLD, 27.0)),
             'min_scene_len_sec': float(self.settings.value(CONFIG_AI_MIN_SCENE_DURATION_SEC, 2.0)),
             'final_min_highlight_duration_sec': float(self.settings.value(CONFIG_AI_FINAL_MIN_HIGHLIGHT_DURATION_SEC, 3.0)),
+            'analysis_cache_enabled': self.settings.value(CONFIG_AI_ANALYSIS_CACHE_ENABLED, True, type=bool),
+            'audio_scoring_enabled': self.settings.value(CONFIG_AI_AUDIO_SCORING_ENABLED, True, type=bool),
+            'visual_scoring_enabled': self.settings.value(CONFIG_AI_VISUAL_SCORING_ENABLED, True, type=bool),
+            'analysis_speed_mode': self.settings.value(CONFIG_AI_SPEED_MODE, DEFAULT_ANALYSIS_SPEED_MODE),
+            'analysis_frame_skip': int(self.settings.value(CONFIG_AI_FRAME_SKIP, 0)),
+            'analysis_downscale': int(self.settings.value(CONFIG_AI_DOWNSCALE, 0)),
+            'analysis_proxy_height': int(self.settings.value(CONFIG_AI_PROXY_HEIGHT, 0)),
+            'analysis_workers': int(self.settings.value(CONFIG_AI_ANALYSIS_WORKERS, 0)),
+            'whisper_model_size': self.settings.value(CONFIG_WHISPER_MODEL_SIZE, DEFAULT_WHISPER_MODEL_SIZE),
+            'whisper_memory_limit_mb': int(self.settings.value(CONFIG_WHISPER_MEMORY_LIMIT_MB, DEFAULT_WHISPER_MEMORY_LIMIT_MB)),
+            'whisper_preload_on_import': self.settings.value(CONFIG_WHISPER_PRELOAD_ON_IMPORT, True, type=bool),
+            'export_parallel_jobs': int(self.settings.value(CONFIG_EXPORT_PARALLEL_JOBS, 0)),
+            'export_batch_cutting': self.settings.value(CONFIG_EXPORT_BATCH_CUTTING, True, type=bool),
+            'export_encoder': self.settings.value(CONFIG_EXPORT_ENCODER, DEFAULT_ENCODER),
+            'export_speed_tier': self.settings.value(CONFIG_EXPORT_SPEED_TIER, DEFAULT_SPEED_TIER),
+            'export_threads': int(self.settings.value(CONFIG_EXPORT_THREADS, 0)),
+            'log_min_level': self.settings.value(CONFIG_LOG_MIN_LEVEL, DEFAULT_MIN_LEVEL),
+            'log_file_enabled': self.settings.value(CONFIG_LOG_FILE_ENABLED, False, type=bool),
+            'preview_proxy_enabled': self.settings.value(CONFIG_PLAYER_PREVIEW_PROXY_ENABLED, True, type=bool),
+            'preview_proxy_height': int(self.settings.value(CONFIG_PLAYER_PREVIEW_PROXY_HEIGHT, PREVIEW_PROXY_HEIGHT)),
+            'thumbnails_enabled': self.settings.value(CONFIG_PLAYER_THUMBNAILS_ENABLED, True, type=bool),
+            'batch_max_concurrent_jobs': int(self.settings.value(CONFIG_BATCH_MAX_CONCURRENT_JOBS, 1)),
+            'batch_top_n': int(self.settings.value(CONFIG_BATCH_TOP_N, 5)),
+            'batch_export_preset': self.settings.value(CONFIG_BATCH_EXPORT_PRESET, "Original MP4"),
+            'batch_generate_subtitles': self.settings.value(CONFIG_BATCH_GENERATE_SUBTITLES, False, type=bool),
+            'batch_auto_start': self.settings.value(CONFIG_BATCH_AUTO_START, True, type=bool),
             'planner_posts_per_day': int(self.settings.value(CONFIG_PLANNER_POSTS_PER_DAY, 1)),
             'planner_start_time_hour': int(self.settings.value(CONFIG_PLANNER_START_TIME_HOUR, 10)),
             # Добавьте другие настройки по мере необходимости
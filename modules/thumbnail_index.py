@@ -0,0 +1,205 @@
+# automated_content_creator/modules/thumbnail_index.py
+#
+# Индекс миниатюр видео для таблицы хайлайтов. Один последовательный проход FFmpeg
+# (fps=1/interval + масштабирование) пишет кадры подряд в один файл rawvideo RGB24;
+# файл открывается через np.memmap как массив (кадр, высота, ширина, 3), и миниатюра
+# любой позиции - это срез массива без декодирования и перемотки исходника.
+# Индекс кешируется по отпечатку видео.
+
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from modules.analysis_cache import compute_video_fingerprint
+from modules.cutting_engine import CuttingEngine
+from utils import get_cache_folder
+
+THUMBNAIL_WIDTH = 160
+THUMBNAIL_HEIGHT = 90
+THUMBNAIL_INTERVAL_SEC = 2.0
+THUMBNAIL_MAX_COUNT = 3600  # Для очень длинных видео интервал увеличивается (не больше ~150 МБ на индекс)
+THUMBNAIL_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Старые индексы удаляются при превышении
+# Увеличивается при несовместимом изменении формата индекса
+THUMBNAIL_INDEX_FORMAT_VERSION = 1
+
+
+class ThumbnailIndex:
+    """
+    Открытый индекс: frames - np.memmap (count, height, width, 3) uint8, кадр i снят в момент i * interval_sec.
+    Данные читаются с диска лениво, по мере обращения к кадрам.
+    """
+
+    def __init__(self, frames_path: str, meta: dict):
+        self.frames_path = frames_path
+        self.interval_sec = float(meta["interval_sec"])
+        self.width = int(meta["width"])
+        self.height = int(meta["height"])
+        frame_bytes = self.width * self.height * 3
+        count = os.path.getsize(frames_path) // frame_bytes
+        if count == 0:
+            raise ValueError(f"файл миниатюр пуст: {frames_path}")
+        self.frames = np.memmap(frames_path, dtype=np.uint8, mode="r", shape=(count, self.height, self.width, 3))
+
+    @property
+    def count(self) -> int:
+        return self.frames.shape[0]
+
+    def frame_index_at(self, time_sec: float) -> int:
+        return int(min(max(0, round(time_sec / self.interval_sec)), self.count - 1))
+
+    def frame_at(self, time_sec: float) -> np.ndarray:
+        """Миниатюра ближайшего к time_sec кадра (height, width, 3)."""
+        return self.frames[self.frame_index_at(time_sec)]
+
+    def filmstrip(self, start_sec: float, end_sec: float, max_frames: int = 8) -> np.ndarray:
+        """
+        Кадры отрезка [start_sec, end_sec], склеенные по горизонтали: (height, width * n, 3).
+        Если в отрезке больше max_frames кадров индекса, они берутся равномерно.
+        """
+        first_index = self.frame_index_at(start_sec)
+        last_index = max(first_index, self.frame_index_at(end_sec))
+        indices = np.unique(np.linspace(first_index, last_index, min(max_frames, last_index - first_index + 1))
+                            .round().astype(np.int64))
+        frames = self.frames[indices]  # Одно чтение для всех кадров полосы
+        return np.ascontiguousarray(frames.transpose(1, 0, 2, 3).reshape(self.height, -1, 3))
+
+    def close(self):
+        """Освобождает отображение файла (в Windows отображенный файл нельзя удалить)."""
+        self.frames = None
+
+
+class ThumbnailIndexCache:
+    """
+    Индексы миниатюр на диске: <ключ>.rgb (кадры) и <ключ>.json (параметры).
+    Ключ - отпечаток видео и параметры индекса, поэтому измененный файл получает новый индекс.
+    """
+
+    def __init__(self, ffmpeg_path: str = "ffmpeg", cache_dir: str | None = None,
+                 max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES, parent_logger=None):
+        self.cache_dir = cache_dir if cache_dir else get_cache_folder("thumbnails")
+        self.max_bytes = max_bytes
+        self.parent_logger = parent_logger
+        self._engine = CuttingEngine(parent_logger)
+        self._engine.ffmpeg_path = ffmpeg_path or "ffmpeg"  # Без записи в лог: кеш создается и для подсчета размера
+
+    def _log(self, message, level="INFO"):
+        if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
+            self.parent_logger.log_message(f"(ThumbnailIndexCache) {message}", level=level)
+        else:
+            print(f"ThumbnailIndexCache [{level}] (no logger): {message}")
+
+    def log(self, message, level="INFO"):
+        """Запись в лог кеша - для адаптеров (qt_workers)."""
+        self._log(message, level=level)
+
+    def _entry_paths(self, video_path: str):
+        key_source = json.dumps({"version": THUMBNAIL_INDEX_FORMAT_VERSION,
+                                 "fingerprint": compute_video_fingerprint(video_path),
+                                 "width": THUMBNAIL_WIDTH, "height": THUMBNAIL_HEIGHT}, sort_keys=True)
+        key = hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.rgb"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def find(self, video_path: str) -> ThumbnailIndex | None:
+        """Открывает готовый индекс видео или возвращает None."""
+        try:
+            frames_path, meta_path = self._entry_paths(video_path)
+            if not os.path.exists(meta_path) or not os.path.exists(frames_path):
+                return None
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            if meta.get("format_version") != THUMBNAIL_INDEX_FORMAT_VERSION:
+                return None
+            os.utime(frames_path)  # Для очистки кеша: недавно открытые индексы удаляются последними
+            return ThumbnailIndex(frames_path, meta)
+        except (OSError, ValueError, KeyError) as e:
+            self._log(f"Не удалось открыть индекс миниатюр для '{video_path}': {type(e).__name__} - {e}",
+                      level="WARN")
+            return None
+
+    def build(self, video_path: str, progress_callback=None) -> ThumbnailIndex | None:
+        """Создает индекс одним проходом FFmpeg (если его еще нет). None - при ошибке или отмене."""
+        existing_index = self.find(video_path)
+        if existing_index:
+            return existing_index
+        frames_path, meta_path = self._entry_paths(video_path)
+        partial_path = f"{frames_path}.part"
+        duration_sec = self._engine.probe_duration(video_path)
+        interval_sec = THUMBNAIL_INTERVAL_SEC
+        if duration_sec:
+            interval_sec = max(THUMBNAIL_INTERVAL_SEC, math.ceil(duration_sec / THUMBNAIL_MAX_COUNT))
+        if not self._engine.create_thumbnail_strip(video_path, partial_path, interval_sec, THUMBNAIL_WIDTH,
+                                                   THUMBNAIL_HEIGHT, duration_sec=duration_sec,
+                                                   progress_callback=progress_callback):
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return None
+        os.replace(partial_path, frames_path)
+        meta = {"format_version": THUMBNAIL_INDEX_FORMAT_VERSION, "interval_sec": interval_sec,
+                "width": THUMBNAIL_WIDTH, "height": THUMBNAIL_HEIGHT, "source": os.path.basename(video_path)}
+        tmp_meta_path = f"{meta_path}.tmp"
+        with open(tmp_meta_path, "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file, ensure_ascii=False)
+        os.replace(tmp_meta_path, meta_path)
+        index = ThumbnailIndex(frames_path, meta)
+        self._log(f"Индекс миниатюр готов: {index.count} кадров через {interval_sec:g} с "
+                  f"({os.path.getsize(frames_path) / (1024 * 1024):.1f} МБ).")
+        self.prune(keep_path=frames_path)
+        return index
+
+    def cancel(self):
+        self._engine.cancel_current_operation()
+
+    def prune(self, keep_path: str | None = None) -> int:
+        """
+        Удаляет давно не открывавшиеся индексы (.rgb и его .json), пока кеш больше max_bytes.
+        Возвращает число удаленных индексов.
+        """
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file() and entry.name.endswith(".rgb")]
+        total = sum(entry.stat().st_size for entry in entries)
+        removed = 0
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if keep_path and os.path.normpath(entry.path) == os.path.normpath(keep_path):
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+                removed += 1
+            except OSError as e:  # В Windows открытый индекс удалить нельзя
+                self._log(f"Не удалось удалить '{entry.name}': {e}", level="WARN")
+                continue
+            meta_path = f"{os.path.splitext(entry.path)[0]}.json"
+            if os.path.exists(meta_path):
+                try:
+                    os.remove(meta_path)
+                except OSError as e:
+                    self._log(f"Не удалось удалить '{os.path.basename(meta_path)}': {e}", level="WARN")
+        if removed:
+            self._log(f"Кеш миниатюр превысил {self.max_bytes // (1024 * 1024)} МБ, удалено индексов: {removed}.",
+                      level="DEBUG")
+        return removed
+
+    def get_size_bytes(self) -> int:
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def clear(self) -> int:
+        """Удаляет все индексы. Возвращает количество удаленных файлов."""
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith((".rgb", ".json", ".part")):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError as e:
+                    self._log(f"Не удалось удалить '{entry.name}': {e}", level="WARN")
+        self._log(f"Кеш миниатюр очищен, удалено файлов: {removed}.", level="INFO")
+        return removed
@@ -11,6 +11,8 @@ from PyQt6.QtCore import Qt, QUrl, QTime, qFormatLogMessage, QDateTime, QTimer
 class VideoPlayerWidget(QWidget):
     """
     Виджет для воспроизведения видео с элементами управления.
+    Может воспроизводить прокси для просмотра вместо исходника (см. modules.preview_proxy):
+    временная шкала у них общая, поэтому позиции хайлайтов не пересчитываются.
     """
 
     def __init__(self, parent_window=None):  # parent_window - это MainWindow
@@ -19,6 +21,10 @@ class VideoPlayerWidget(QWidget):
         self.media_player = None
         self.audio_output = None
         self._video_loaded = False
+        self.source_path = None  # Исходное видео (используется для экспорта)
+        self.playback_path = None  # Фактически воспроизводимый файл: исходник или прокси
+        self._pending_position_ms = None  # Позиция, восстанавливаемая после смены файла
+        self._resume_after_switch = False
         self._log_prefix = self.__class__.__name__
 
         self._init_ui()
@@ -69,6 +75,10 @@ class VideoPlayerWidget(QWidget):
 
         self.time_label = QLabel("00:00:00 / 00:00:00")
         buttons_and_time_layout.addWidget(self.time_label)
+
+        self.source_label = QLabel()  # "Прокси" - если воспроизводится прокси для просмотра
+        self.source_label.setStyleSheet("color: gray;")
+        buttons_and_time_layout.addWidget(self.source_label)
         buttons_and_time_layout.addSpacerItem(
             QSpacerItem(20, 10, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
 
@@ -110,6 +120,10 @@ class VideoPlayerWidget(QWidget):
                 self.media_player.durationChanged.disconnect(self._handle_duration_changed)
             except TypeError:
                 pass
+            try:
+                self.media_player.mediaStatusChanged.disconnect(self._handle_media_status_changed)
+            except TypeError:
+                pass
 
             # Отсоединяем от video_widget и audio_output
             self.media_player.setVideoOutput(None)
@@ -135,6 +149,7 @@ class VideoPlayerWidget(QWidget):
         self.media_player.playbackStateChanged.connect(self._handle_playback_state_changed)
         self.media_player.positionChanged.connect(self._handle_position_changed)
         self.media_player.durationChanged.connect(self._handle_duration_changed)
+        self.media_player.mediaStatusChanged.connect(self._handle_media_status_changed)
 
         # Громкость подключается здесь, так как audio_output только что создан
         if self.audio_output:  # Убедимся что он создан
@@ -154,7 +169,8 @@ class VideoPlayerWidget(QWidget):
         self.time_slider.sliderMoved.connect(self._set_position_from_slider)
         # self.volume_slider.valueChanged уже подключен в _create_media_player
 
-    def load_video(self, file_path: str):
+    def load_video(self, file_path: str, preview_path: str | None = None):
+        """Загружает видео; если передан preview_path (готовый прокси), воспроизводится он."""
         self._log(f"load_video: Попытка загрузки видео '{file_path}'", level="INFO")
         if not file_path or not os.path.exists(file_path):
             err_msg = f"Ошибка загрузки: Файл не найден или путь не указан '{file_path}'"
@@ -166,14 +182,51 @@ class VideoPlayerWidget(QWidget):
 
         self._create_media_player()  # Пересоздаем плеер для нового видео
 
-        source = QUrl.fromLocalFile(file_path)
-        self.media_player.setSource(source)
+        self.source_path = file_path
+        self._pending_position_ms = None
+        self._set_playback_file(preview_path if preview_path and os.path.exists(preview_path) else file_path)
 
         self._set_controls_enabled(True)
         self.play_pause_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
         self._video_loaded = True
         self._log(f"Видео '{os.path.basename(file_path)}' загружено. Готово к воспроизведению.", level="INFO")
 
+    def _set_playback_file(self, path: str):
+        self.playback_path = path
+        self.media_player.setSource(QUrl.fromLocalFile(path))
+        is_proxy = self.is_preview_proxy_active()
+        self.source_label.setText("Прокси" if is_proxy else "")
+        self.source_label.setToolTip("Воспроизводится уменьшенная копия для быстрой перемотки.\n"
+                                     "Клипы экспортируются из исходного видео." if is_proxy else "")
+
+    def is_preview_proxy_active(self) -> bool:
+        return bool(self.playback_path and self.source_path and self.playback_path != self.source_path)
+
+    def use_preview_proxy(self, source_path: str, proxy_path: str) -> bool:
+        """
+        Переключает воспроизведение на готовый прокси, если в плеере все еще source_path.
+        Позиция и состояние воспроизведения сохраняются.
+        """
+        if not self._video_loaded or not self.media_player or source_path != self.source_path:
+            return False
+        if self.playback_path == proxy_path:
+            return True
+        self._pending_position_ms = self.media_player.position()
+        self._resume_after_switch = \
+            self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState
+        self._set_playback_file(proxy_path)
+        self._log(f"Плеер переключен на прокси для просмотра: {os.path.basename(proxy_path)}", level="INFO")
+        return True
+
+    def _handle_media_status_changed(self, status: QMediaPlayer.MediaStatus):
+        if self._pending_position_ms is None or status not in (QMediaPlayer.MediaStatus.LoadedMedia,
+                                                                QMediaPlayer.MediaStatus.BufferedMedia):
+            return
+        position_ms, self._pending_position_ms = self._pending_position_ms, None
+        self.media_player.setPosition(position_ms)
+        if self._resume_after_switch:
+            self.media_player.play()
+
     def toggle_play_pause(self):
         if not self._video_loaded or not self.media_player:
             self._log("Воспроизведение/пауза: Видео не загружено.", level="WARN")
@@ -208,6 +261,13 @@ class VideoPlayerWidget(QWidget):
             final_error_string = error_string
 
         self._log(f"Ошибка медиаплеера: {final_error_string}", level="ERROR")
+        if self.is_preview_proxy_active():
+            # Поврежденный или недочитанный прокси не должен мешать просмотру - возвращаемся к исходнику
+            self._log("Прокси не воспроизводится, загружается исходное видео.", level="WARN")
+            self._pending_position_ms = self.media_player.position()
+            self._resume_after_switch = False
+            self._set_playback_file(self.source_path)
+            return
         QMessageBox.critical(self, "Ошибка воспроизведения", f"Не удалось воспроизвести видео:\n{final_error_string}")
         self._set_controls_enabled(False)
         self._video_loaded = False
@@ -300,6 +360,10 @@ class VideoPlayerWidget(QWidget):
             self._log("Медиаплеер не был активен, активная очистка не требуется.", level="DEBUG")
 
         self._video_loaded = False  # Сбрасываем флаг
+        self.source_path = None
+        self.playback_path = None
+        self._pending_position_ms = None
+        self.source_label.setText("")
         self._set_controls_enabled(False)  # Отключаем контролы
         self._log("cleanup: VideoPlayerWidget очищен.", level="INFO")
 
@@ -0,0 +1,130 @@
+# automated_content_creator/modules/whisper_models.py
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+WHISPER_MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+DEFAULT_WHISPER_MODEL_SIZE = "base"
+DEFAULT_WHISPER_MEMORY_LIMIT_MB = 4096
+
+# Примерный объем весов (fp32) - используется для решения о вытеснении до загрузки модели.
+# После загрузки берется фактический размер параметров.
+ESTIMATED_MODEL_SIZE_MB = {"tiny": 150, "base": 290, "small": 970, "medium": 3060, "large": 6170}
+
+
+class WhisperModelRegistry:
+    """
+    Общий для процесса реестр загруженных моделей Whisper.
+    Каждая модель загружается один раз и переиспользуется всеми заданиями субтитров.
+    Суммарный объем ограничен memory_limit_mb: при превышении вытесняются давно не использованные
+    модели (LRU). Вытесненная модель освобождается, когда на нее не останется ссылок.
+    """
+
+    def __init__(self, memory_limit_mb: int = DEFAULT_WHISPER_MEMORY_LIMIT_MB, parent_logger=None):
+        self.memory_limit_mb = memory_limit_mb
+        self.parent_logger = parent_logger
+        self._models = OrderedDict()  # {model_size: (model, size_mb)}, последний - недавно использованный
+        self._lock = threading.Lock()
+        self._load_locks = {}  # {model_size: Lock} - параллельные запросы одной модели ждут одну загрузку
+        self._preload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="WhisperPreload")
+
+    def _log(self, message, level="INFO"):
+        if self.parent_logger and hasattr(self.parent_logger, 'log_message'):
+            self.parent_logger.log_message(f"(WhisperModels) {message}", level=level)
+        else:
+            print(f"WhisperModels [{level}] (no logger): {message}")
+
+    def set_memory_limit_mb(self, memory_limit_mb: int):
+        with self._lock:
+            self.memory_limit_mb = memory_limit_mb
+            self._evict_locked(0, keep_latest=True)
+
+    def get_model(self, model_size: str = DEFAULT_WHISPER_MODEL_SIZE):
+        """Возвращает загруженную модель; при первом обращении загружает ее (блокирующе)."""
+        with self._lock:
+            if model_size in self._models:
+                self._models.move_to_end(model_size)
+                return self._models[model_size][0]
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        with load_lock:
+            with self._lock:  # Модель могла загрузиться, пока ждали load_lock
+                if model_size in self._models:
+                    self._models.move_to_end(model_size)
+                    return self._models[model_size][0]
+                self._evict_locked(ESTIMATED_MODEL_SIZE_MB.get(model_size, 0))
+
+            import whisper  # torch загружается только здесь
+            self._log(f"Загрузка модели Whisper '{model_size}'...")
+            start_time = time.perf_counter()
+            model = whisper.load_model(model_size)
+            size_mb = self._measure_model_mb(model, model_size)
+            with self._lock:
+                self._models[model_size] = (model, size_mb)
+                self._evict_locked(0, keep_latest=True)
+            self._log(f"Модель Whisper '{model_size}' загружена за {time.perf_counter() - start_time:.1f}s "
+                      f"(~{size_mb:.0f} МБ). Загружено моделей: {len(self._models)}.")
+            return model
+
+    def preload_async(self, model_size: str = DEFAULT_WHISPER_MODEL_SIZE):
+        """Загружает модель в фоновом потоке. Возвращает Future; повторный вызов для загруженной модели дешев."""
+
+        def preload():
+            try:
+                return self.get_model(model_size)
+            except Exception as e:
+                self._log(f"Фоновая загрузка модели Whisper '{model_size}' не удалась: {type(e).__name__} - {e}",
+                          level="WARN")
+                return None
+
+        return self._preload_executor.submit(preload)
+
+    def is_loaded(self, model_size: str) -> bool:
+        with self._lock:
+            return model_size in self._models
+
+    def loaded_models(self) -> dict:
+        """{model_size: объем в МБ} в порядке от давно использованной к недавней."""
+        with self._lock:
+            return {model_size: size_mb for model_size, (_, size_mb) in self._models.items()}
+
+    def unload_all(self):
+        with self._lock:
+            self._models.clear()
+
+    def _evict_locked(self, incoming_mb: float, keep_latest: bool = False):
+        """
+        Вытесняет LRU-модели, пока занятый объем + incoming_mb превышает лимит. Вызывается под self._lock.
+        keep_latest - не вытеснять последнюю использованную модель, даже если она одна больше лимита.
+        """
+        used_mb = sum(size_mb for _, size_mb in self._models.values())
+        min_models = 1 if keep_latest else 0
+        while len(self._models) > min_models and used_mb + incoming_mb > self.memory_limit_mb:
+            evicted_size, (_, evicted_mb) = self._models.popitem(last=False)
+            used_mb -= evicted_mb
+            self._log(f"Модель Whisper '{evicted_size}' выгружена из памяти (лимит {self.memory_limit_mb} МБ).")
+
+    @staticmethod
+    def _measure_model_mb(model, model_size: str) -> float:
+        try:
+            size_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+            return size_bytes / (1024 * 1024)
+        except Exception:
+            return float(ESTIMATED_MODEL_SIZE_MB.get(model_size, 0))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry(parent_logger=None) -> WhisperModelRegistry:
+    """Возвращает общий реестр моделей (создается при первом вызове)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = WhisperModelRegistry(parent_logger=parent_logger)
+        elif parent_logger is not None and _registry.parent_logger is None:
+            _registry.parent_logger = parent_logger
+        return _registry
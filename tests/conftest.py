@@ -0,0 +1,9 @@
+# automated_content_creator/tests/conftest.py
+#
+# Тесты импортируют модули так же, как приложение (modules.*, utils), поэтому корень проекта
+# добавляется в sys.path. Запуск из корня проекта: python -m pytest -q
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
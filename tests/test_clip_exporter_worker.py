@@ -0,0 +1,90 @@
+# automated_content_creator/tests/test_clip_exporter_worker.py
+
+import pytest
+
+from modules import ai_analyzer
+from modules.clip_exporter_worker import ClipExporter
+from modules.cutting_engine import CuttingEngine
+from modules.export_module import ExportModule
+
+
+class FileWritingEngine(CuttingEngine):
+    """Вместо FFmpeg: перекодирование создает файл-клип. on_cut вызывается перед каждой нарезкой."""
+    on_cut = None
+
+    def cut_clip(self, input_video_path, start_time_sec, end_time_sec, output_clip_path, ffmpeg_params=None,
+                 progress_callback=None):
+        if self.on_cut:
+            self.on_cut()
+        if self._cancel_event.is_set():
+            return False
+        with open(output_clip_path, "wb") as clip_file:
+            clip_file.write(b"clip")
+        return True
+
+
+class FakeSubtitleGenerator:
+    """Вместо Whisper: как WhisperSubtitleGenerator.transcribe_clips, при отмене отдает только готовые фрагменты."""
+
+    def __init__(self, model_size, parent_logger=None):
+        pass
+
+    def transcribe_clips(self, video_path, clip_ranges, padding_sec=0.5, ffmpeg_path="ffmpeg",
+                         progress_callback=None, is_cancelled=None):
+        results = []
+        for i, (clip_start, clip_end) in enumerate(clip_ranges):
+            if is_cancelled and is_cancelled():
+                break
+            results.append([{"id": 0, "start": 0.0, "end": clip_end - clip_start, "text": f"фрагмент {i}"}])
+            if progress_callback:
+                progress_callback(i + 1, len(clip_ranges))
+        return results
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "WhisperSubtitleGenerator", FakeSubtitleGenerator)
+    return ClipExporter(CuttingEngine(), ExportModule(),
+                        subtitle_options={"model_size": "tiny", "padding_sec": 0.0, "ffmpeg_path": "ffmpeg"})
+
+
+def make_clips(folder, count):
+    return [{"path": str(folder / f"clip_{i}.mp4"), "preset": None, "cut_mode": None,
+             "source_highlight_info": {"start_time": i * 10.0, "end_time": i * 10.0 + 5.0}} for i in range(count)]
+
+
+def test_subtitles_for_all_clips(exporter, tmp_path):
+    clips = make_clips(tmp_path, 3)
+    exporter._generate_subtitles("source.mp4", clips, total_clips=3)
+    assert all((tmp_path / f"clip_{i}.srt").exists() for i in range(3))
+
+
+def test_cancel_halfway_keeps_finished_subtitles(exporter, tmp_path):
+    clips = make_clips(tmp_path, 4)
+
+    def cancel_after_second(message):
+        if message == "Субтитры: 2 из 4":
+            exporter.cancel_export()
+
+    exporter.progress_callback = lambda done, total, message: cancel_after_second(message)
+    exporter._generate_subtitles("source.mp4", clips, total_clips=4)
+    assert [clip.get("subtitles_path") is not None for clip in clips] == [True, True, False, False]
+    assert not (tmp_path / "clip_2.srt").exists()
+
+
+def test_exporter_can_be_reused_after_cancel(tmp_path):
+    source_path = tmp_path / "source.mp4"
+    source_path.write_bytes(b"video")
+    engine = FileWritingEngine()
+    exporter = ClipExporter(engine, ExportModule(), max_parallel_jobs=1, batch_cutting=False)
+    highlights = [{"description": f"Хайлайт #{i + 1}", "start_time": i * 10.0, "end_time": i * 10.0 + 5.0}
+                  for i in range(3)]
+    engine.on_cut = exporter.cancel_export  # Отмена во время первого клипа
+    _, cancelled_count = exporter.process_export_list(str(source_path), highlights, str(tmp_path),
+                                                      "Reels (9:16, MP4)")
+    assert cancelled_count < len(highlights)
+
+    engine.on_cut = None
+    _, exported_count = exporter.process_export_list(str(source_path), highlights, str(tmp_path),
+                                                     "Reels (9:16, MP4)")
+    assert exported_count == len(highlights)
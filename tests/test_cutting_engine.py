@@ -0,0 +1,50 @@
+# automated_content_creator/tests/test_cutting_engine.py
+
+import os
+import stat
+import sys
+
+import pytest
+
+from modules.cutting_engine import CuttingEngine
+
+# Вместо FFmpeg: создает выходы (аргументы с расширением .mp4 после последнего -i), кроме путей с меткой "NOFILE"
+FAKE_FFMPEG_SOURCE = """
+import sys
+args = sys.argv[1:]
+last_input = max(i for i, arg in enumerate(args) if arg == "-i") + 1
+for arg in args[last_input + 1:]:
+    if arg.endswith(".mp4") and "NOFILE" not in arg:
+        with open(arg, "wb") as output_file:
+            output_file.write(b"clip")
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    if os.name == "nt":
+        pytest.skip("фиктивный FFmpeg - shell-скрипт")
+    script_path = tmp_path / "fake_ffmpeg.py"
+    script_path.write_text(FAKE_FFMPEG_SOURCE, encoding="utf-8")
+    launcher_path = tmp_path / "ffmpeg"
+    launcher_path.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script_path}" "$@"\n', encoding="utf-8")
+    launcher_path.chmod(launcher_path.stat().st_mode | stat.S_IEXEC)
+    cutting_engine = CuttingEngine()
+    cutting_engine.ffmpeg_path = str(launcher_path)
+    (tmp_path / "source.mp4").write_bytes(b"video")
+    return cutting_engine
+
+
+def test_batch_creates_all_outputs(engine, tmp_path):
+    clips = [{"start": i * 10.0, "end": i * 10.0 + 5.0, "path": str(tmp_path / f"clip_{i}.mp4")} for i in range(3)]
+    assert engine.cut_clips_batch(str(tmp_path / "source.mp4"), clips)
+    assert all(os.path.exists(clip["path"]) for clip in clips)
+
+
+def test_missing_output_removes_the_other_outputs(engine, tmp_path):
+    clips = [{"start": 0.0, "end": 5.0, "path": str(tmp_path / "clip_0.mp4")},
+             {"start": 10.0, "end": 15.0, "path": str(tmp_path / "clip_NOFILE.mp4")},
+             {"start": 20.0, "end": 25.0, "path": str(tmp_path / "clip_2.mp4")}]
+    assert not engine.cut_clips_batch(str(tmp_path / "source.mp4"), clips)
+    # Вызов неудачен целиком: файлы, которые вызывающий код посчитает ошибкой, не остаются на диске
+    assert not any(os.path.exists(clip["path"]) for clip in clips)
@@ -0,0 +1,55 @@
+# automated_content_creator/tests/test_export_manifest.py
+
+import json
+import os
+
+import pytest
+
+from modules.export_manifest import (CLIP_STATUS_DRAFT, EXPORT_MANIFEST_FORMAT_VERSION, build_export_manifest,
+                                     build_export_manifest_path, collect_reserved_paths, find_export_manifests,
+                                     load_export_manifest, save_export_manifest)
+
+
+def make_manifest(folder, final_paths):
+    manifest = build_export_manifest("/видео/исходник.mp4", str(folder), ["Preset A"],
+                                     subtitle_options={"language": "ru"})
+    manifest["clips"].append({"number": 1, "description": "Хайлайт #1", "start_time": 1.5, "end_time": 7.25,
+                              "draft_path": str(folder / "drafts" / "clip.mp4"), "final_paths": final_paths,
+                              "created_paths": [], "status": CLIP_STATUS_DRAFT, "source_highlight_info": {}})
+    return manifest
+
+
+def test_round_trip(tmp_path):
+    manifest = make_manifest(tmp_path, {"Preset A": str(tmp_path / "clip.mp4")})
+    manifest_path = build_export_manifest_path(str(tmp_path), "/видео/исходник.mp4")
+    save_export_manifest(manifest, manifest_path)
+    loaded = load_export_manifest(manifest_path)
+    assert loaded == manifest
+    assert loaded["subtitle_options"] == {"language": "ru"}
+    assert "updated_at" in loaded
+    assert not os.path.exists(f"{manifest_path}.tmp")
+
+
+def test_manifest_paths_are_unique(tmp_path):
+    first_path = build_export_manifest_path(str(tmp_path), "/видео/мой клип (1).mp4")
+    assert os.path.basename(first_path).startswith("export_manifest_")
+    save_export_manifest(make_manifest(tmp_path, {}), first_path)
+    second_path = build_export_manifest_path(str(tmp_path), "/видео/мой клип (1).mp4")
+    assert second_path != first_path
+    save_export_manifest(make_manifest(tmp_path, {}), second_path)
+    assert set(find_export_manifests(str(tmp_path))) == {first_path, second_path}
+
+
+def test_load_rejects_foreign_json(tmp_path):
+    other_path = tmp_path / "export_manifest_other.json"
+    other_path.write_text(json.dumps({"version": EXPORT_MANIFEST_FORMAT_VERSION + 1}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_export_manifest(str(other_path))
+
+
+def test_collect_reserved_paths_skips_unreadable(tmp_path):
+    final_path = str(tmp_path / "clip.mp4")
+    save_export_manifest(make_manifest(tmp_path, {"Preset A": final_path}),
+                         build_export_manifest_path(str(tmp_path), "a.mp4"))
+    (tmp_path / "export_manifest_broken.json").write_text("{", encoding="utf-8")
+    assert collect_reserved_paths(str(tmp_path)) == {os.path.normpath(final_path)}
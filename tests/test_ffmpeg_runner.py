@@ -0,0 +1,74 @@
+# automated_content_creator/tests/test_ffmpeg_runner.py
+
+import pytest
+
+from modules import ffmpeg_runner
+from modules.ffmpeg_runner import ProgressTracker, format_eta, offset_progress_callback, with_progress_args
+
+
+def feed_block(tracker, **values):
+    """Подает блок строк -progress (key=value ... progress=continue|end) и возвращает снимок."""
+    status = values.pop("progress", "continue")
+    for key, value in values.items():
+        assert tracker.feed(f"{key}={value}\n") is None
+    return tracker.feed(f"progress={status}\n")
+
+
+def test_with_progress_args_inserted_once():
+    command = ["ffmpeg", "-i", "in.mp4", "out.mp4"]
+    assert with_progress_args(command) == ["ffmpeg", "-progress", "pipe:1", "-nostats", "-i", "in.mp4", "out.mp4"]
+    assert with_progress_args(with_progress_args(command)).count("-progress") == 1
+
+
+def test_format_eta():
+    assert format_eta(None) == "?"
+    assert format_eta(65) == "1:05"
+    assert format_eta(3723) == "1:02:03"
+
+
+def test_progress_snapshot_fraction_and_eta(monkeypatch):
+    monkeypatch.setattr(ffmpeg_runner.time, "monotonic", lambda: 100.0)
+    tracker = ProgressTracker(duration_sec=20.0)
+    snapshot = feed_block(tracker, frame="125", fps="25.0", out_time_us="5000000", total_size="1024", speed="2.5x")
+    assert snapshot["out_time_sec"] == pytest.approx(5.0)
+    assert snapshot["fraction"] == pytest.approx(0.25)
+    assert snapshot["eta_sec"] == pytest.approx(6.0)  # (20 - 5) / 2.5
+    assert snapshot["frame"] == 125 and snapshot["fps"] == pytest.approx(25.0)
+    assert tracker.advanced and not snapshot["finished"]
+
+
+def test_progress_without_speed_uses_elapsed_time(monkeypatch):
+    clock = iter([0.0, 4.0])
+    monkeypatch.setattr(ffmpeg_runner.time, "monotonic", lambda: next(clock))
+    tracker = ProgressTracker(duration_sec=10.0)
+    snapshot = feed_block(tracker, out_time_us="2000000", speed="N/A")
+    assert snapshot["speed"] == pytest.approx(0.5)
+    assert snapshot["eta_sec"] == pytest.approx(16.0)
+
+
+def test_progress_advanced_flag_and_end():
+    tracker = ProgressTracker(duration_sec=10.0)
+    feed_block(tracker, out_time_us="1000000", total_size="100")
+    feed_block(tracker, out_time_us="1000000", total_size="100")
+    assert not tracker.advanced
+    feed_block(tracker, out_time_us="1000000", total_size="200")  # Stream copy: растет только размер
+    assert tracker.advanced
+    snapshot = feed_block(tracker, progress="end")
+    assert snapshot["finished"] and snapshot["fraction"] == 1.0 and snapshot["eta_sec"] == 0.0
+
+
+def test_progress_without_duration():
+    snapshot = feed_block(ProgressTracker(), out_time_us="N/A")
+    assert snapshot["fraction"] is None and snapshot["eta_sec"] is None
+    assert snapshot["out_time_sec"] == 0.0
+
+
+def test_offset_progress_callback():
+    received = []
+    callback = offset_progress_callback(received.append, offset_sec=6.0, total_sec=10.0)
+    callback({"out_time_sec": 2.0, "speed": 2.0, "fraction": 0.5, "finished": True})
+    assert received[0]["out_time_sec"] == 8.0
+    assert received[0]["fraction"] == pytest.approx(0.8)
+    assert received[0]["eta_sec"] == pytest.approx(1.0)
+    assert not received[0]["finished"]
+    assert offset_progress_callback(None, 0.0, 1.0) is None
@@ -0,0 +1,52 @@
+# automated_content_creator/tests/test_frame_features.py
+
+import numpy as np
+import pytest
+
+from modules.frame_features import DARK_SCENE_BRIGHTNESS, VISUAL_SCORE_WEIGHTS, VisualFeatures
+
+
+def test_range_means_use_cumulative_sums_and_skip_nan():
+    values = np.array([[1.0], [2.0], [np.nan], [4.0], [5.0]], dtype=np.float32)
+    features = VisualFeatures(values, ["brightness"], fps=1.0)
+    result = features.score_ranges([0.0, 1.0, 2.0], [2.0, 4.0, 3.0])
+    # [0, 2) -> 1, 2; [1, 4) -> 2, NaN, 4; [2, 3) - только NaN, среднее 0
+    assert result["brightness"].tolist() == pytest.approx([1.5, 3.0, 0.0])
+
+
+def test_range_bounds_are_rounded_outward_and_clipped():
+    values = np.arange(10, dtype=np.float32).reshape(-1, 1)
+    features = VisualFeatures(values, ["brightness"], fps=2.0)
+    # 1.2-2.2 с -> кадры floor(2.4)=2 .. ceil(4.4)=5; конец за пределами видео обрезается
+    result = features.score_ranges([1.2, 4.0], [2.2, 100.0])
+    assert result["brightness"].tolist() == pytest.approx([3.0, 8.5])
+
+
+def test_motion_is_normalized_by_95th_percentile():
+    motion = np.linspace(0.0, 1.0, 101, dtype=np.float32)
+    features = VisualFeatures(motion.reshape(-1, 1), ["motion"], fps=1.0)
+    reference = float(np.percentile(motion, 95))
+    result = features.score_ranges([0.0, 96.0], [1.0, 97.0])
+    assert result["score"][0] == pytest.approx(0.0)
+    # Выше перцентиля оценка движения ограничена единицей
+    assert result["score"][1] == pytest.approx(VISUAL_SCORE_WEIGHTS["motion"])
+    assert features._references["motion"] == pytest.approx(reference)
+
+
+def test_score_combines_weighted_features():
+    values = np.array([[0.5, 0.5, DARK_SCENE_BRIGHTNESS / 2]] * 4, dtype=np.float32)
+    features = VisualFeatures(values, ["motion", "contrast", "brightness"], fps=1.0)
+    score = features.score_ranges([0.0], [4.0])["score"][0]
+    # Постоянные motion и contrast равны своему 95-му перцентилю -> 1.0
+    expected = VISUAL_SCORE_WEIGHTS["motion"] + VISUAL_SCORE_WEIGHTS["contrast"] + VISUAL_SCORE_WEIGHTS["brightness"] / 2
+    assert score == pytest.approx(expected)
+
+
+def test_zero_motion_video_does_not_divide_by_zero():
+    features = VisualFeatures(np.zeros((5, 1), dtype=np.float32), ["motion"], fps=1.0)
+    assert features.score_ranges([0.0], [5.0])["score"].tolist() == [0.0]
+
+
+def test_from_scene_data_without_features():
+    assert VisualFeatures.from_scene_data({"fps": 25.0}) is None
+    assert VisualFeatures.from_scene_data({"fps": 25.0, "frame_features": []}) is None
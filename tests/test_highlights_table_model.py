@@ -0,0 +1,74 @@
+# automated_content_creator/tests/test_highlights_table_model.py
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from PyQt6.QtCore import Qt  # noqa: E402
+
+from modules.highlights_table_model import (  # noqa: E402
+    COLUMN_CHECK, COLUMN_END, COLUMN_SCORE, COLUMN_START, HighlightsTableModel)
+
+
+def make_highlights(starts, scores):
+    return [{'description': f"Хайлайт #{i + 1}", 'start_time': float(start), 'end_time': float(start) + 5.0,
+             'score': score} for i, (start, score) in enumerate(zip(starts, scores))]
+
+
+def set_checked(model, row, checked):
+    state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+    return model.setData(model.index(row, COLUMN_CHECK), state.value, Qt.ItemDataRole.CheckStateRole)
+
+
+def visible_starts(model):
+    return [model.highlight_at(row)['start_time'] for row in range(model.visible_count())]
+
+
+def test_check_and_uncheck_across_byte_boundary():
+    model = HighlightsTableModel()
+    model.set_highlights(make_highlights(range(0, 100, 10), [0.5] * 10))
+    for row in (0, 3, 8, 9):  # Строки 8 и 9 - во втором байте битового массива
+        assert set_checked(model, row, True)
+    assert model.checked_count() == 4
+    assert [hl['start_time'] for hl in model.checked_highlights()] == [0.0, 30.0, 80.0, 90.0]
+
+    set_checked(model, 3, True)  # Повторная отметка не меняет счетчик
+    assert model.checked_count() == 4
+    set_checked(model, 8, False)
+    assert model.checked_count() == 3
+    assert model.data(model.index(8, COLUMN_CHECK), Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Unchecked
+    assert model.data(model.index(9, COLUMN_CHECK), Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+
+
+def test_checks_follow_highlights_through_sort_and_filter():
+    model = HighlightsTableModel()
+    model.set_highlights(make_highlights([0, 10, 20, 30], [0.2, 0.9, 0.5, 0.7]))
+    model.sort(COLUMN_SCORE, Qt.SortOrder.DescendingOrder)
+    assert visible_starts(model) == [10.0, 30.0, 20.0, 0.0]
+    set_checked(model, 0, True)  # Хайлайт с лучшей оценкой (старт 10)
+
+    model.set_min_score(0.6)
+    assert visible_starts(model) == [10.0, 30.0]
+    model.set_all_visible_checked(True)
+    model.set_min_score(0.0)
+    model.sort(COLUMN_START, Qt.SortOrder.AscendingOrder)
+    assert visible_starts(model) == [0.0, 10.0, 20.0, 30.0]
+    assert [hl['start_time'] for hl in model.checked_highlights()] == [10.0, 30.0]
+
+
+def test_sort_is_stable_for_equal_keys():
+    model = HighlightsTableModel()
+    model.set_highlights(make_highlights([0, 10, 20, 30], [0.5, 0.5, 0.8, 0.5]))
+    model.sort(COLUMN_SCORE, Qt.SortOrder.AscendingOrder)
+    assert visible_starts(model) == [0.0, 10.0, 30.0, 20.0]
+    model.sort(COLUMN_END, Qt.SortOrder.DescendingOrder)
+    assert visible_starts(model) == [30.0, 20.0, 10.0, 0.0]
+
+
+def test_set_highlights_resets_checks():
+    model = HighlightsTableModel()
+    model.set_highlights(make_highlights([0, 10], [0.5, 0.5]))
+    set_checked(model, 1, True)
+    model.set_highlights(make_highlights([0, 10, 20], [0.5, 0.5, 0.5]))
+    assert model.checked_count() == 0
+    assert model.checked_highlights() == []
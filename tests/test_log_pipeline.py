@@ -0,0 +1,74 @@
+# automated_content_creator/tests/test_log_pipeline.py
+
+import pytest
+
+from modules.log_pipeline import LogPipeline, RotatingFileSink, normalize_level
+
+
+@pytest.fixture
+def pipeline():
+    log = LogPipeline(min_level="DEBUG", ring_buffer_size=3, console=False)
+    yield log
+    log.close()
+
+
+def test_normalize_level():
+    assert normalize_level("WARNING") == "WARN"
+    assert normalize_level("DEBUG_EXTRA") == "DEBUG"
+    assert normalize_level("unknown") == "DEBUG"
+
+
+def test_ring_buffer_keeps_last_lines_and_counts_dropped(pipeline):
+    for i in range(5):
+        pipeline.log(f"строка {i}")
+    assert [line.endswith(f"строка {i}") for line, i in zip(pipeline.records(), range(2, 5))] == [True] * 3
+    lines, dropped = pipeline.drain_pending()
+    assert len(lines) == 3 and lines[0].endswith("строка 2")
+    assert dropped == 2
+    assert pipeline.drain_pending() == ([], 0)  # Счетчик сбрасывается после чтения
+
+
+def test_drain_pending_in_portions(pipeline):
+    for i in range(3):
+        pipeline.log(f"строка {i}")
+    lines, dropped = pipeline.drain_pending(max_lines=2)
+    assert len(lines) == 2 and dropped == 0
+    lines, _ = pipeline.drain_pending(max_lines=2)
+    assert len(lines) == 1 and lines[0].endswith("строка 2")
+
+
+def test_level_filter_and_status():
+    log = LogPipeline(min_level="INFO", console=False)
+    try:
+        log.log("отладка", level="DEBUG")
+        log.log("важное", level="WARNING")
+        assert len(log.records()) == 1
+        assert "[WARN]" in log.records()[0]
+        assert log.take_status() == ("WARN", "важное")
+        assert log.take_status() is None
+        log.set_min_level("ERROR")
+        assert not log.is_enabled("WARN")
+    finally:
+        log.close()
+
+
+def test_file_sink_rotates_by_size(tmp_path):
+    log_path = tmp_path / "app.log"
+    sink = RotatingFileSink(str(log_path), max_bytes=30, backup_count=2)
+    for i in range(4):
+        sink.write_lines([f"line {i:02d}".ljust(19, ".")])  # 20 байт: каждая следующая строка - новый файл
+    sink.close()
+    assert log_path.read_text(encoding="utf-8").startswith("line 03")
+    assert (tmp_path / "app.log.1").read_text(encoding="utf-8").startswith("line 02")
+    assert (tmp_path / "app.log.2").read_text(encoding="utf-8").startswith("line 01")
+    assert not (tmp_path / "app.log.3").exists()  # Старше backup_count копий не хранится
+
+
+def test_file_sink_limit_counts_utf8_bytes(tmp_path):
+    log_path = tmp_path / "app.log"
+    sink = RotatingFileSink(str(log_path), max_bytes=25, backup_count=1)
+    for i in range(2):
+        sink.write_lines([f"строка {i}"])  # С переводом строки 9 символов, но 15 байт
+    sink.close()
+    assert log_path.stat().st_size <= 25
+    assert (tmp_path / "app.log.1").exists()
@@ -0,0 +1,31 @@
+# automated_content_creator/tests/test_pipeline.py
+
+from datetime import date
+
+from modules.pipeline import build_posting_schedule, select_top_highlights
+
+
+def test_select_top_highlights_keeps_chronological_order():
+    highlights = [{'start_time': 10.0, 'score': 0.3}, {'start_time': 0.0, 'score': 0.9},
+                  {'start_time': 30.0, 'score': 0.7}, {'start_time': 20.0, 'score': 0.8}]
+    assert [hl['start_time'] for hl in select_top_highlights(highlights, 2)] == [0.0, 20.0]
+    assert select_top_highlights(highlights, 0) == highlights
+    assert len(select_top_highlights(highlights, 10)) == 4
+
+
+def test_posting_schedule_rotates_platforms_and_days():
+    clips = [{'path': f"clip{i}.mp4", 'description': f"Клип {i}"} for i in range(5)]
+    plan = build_posting_schedule(clips, start_date=date(2024, 3, 1), posts_per_day=2, start_hour=10,
+                                  platforms=["A", "B"])
+    assert [post['datetime'] for post in plan] == [
+        "2024-03-01T10:00", "2024-03-01T13:00", "2024-03-02T10:00", "2024-03-02T13:00", "2024-03-03T10:00"]
+    assert [post['platform'] for post in plan] == ["A", "B", "A", "B", "A"]
+    assert plan[4]['clip_path'] == "clip4.mp4"
+
+
+def test_posting_schedule_moves_late_posts_to_next_day():
+    clips = [{'title_suggestion': "Заголовок"}] * 3
+    plan = build_posting_schedule(clips, start_date=date(2024, 3, 1), posts_per_day=3, start_hour=18)
+    # 18:00, 21:00, а третий пост (00:00) переносится на утро следующего дня - к часу начала
+    assert [post['datetime'] for post in plan] == ["2024-03-01T18:00", "2024-03-01T21:00", "2024-03-02T18:00"]
+    assert plan[0]['description'] == "Заголовок"
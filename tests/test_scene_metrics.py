@@ -0,0 +1,89 @@
+# automated_content_creator/tests/test_scene_metrics.py
+
+import numpy as np
+import pytest
+
+from modules.scene_metrics import SceneMetrics, apply_scorers, build_highlights, format_timecode
+
+
+def test_format_timecode():
+    assert format_timecode(0) == "00:00:00.000"
+    assert format_timecode(3725.5) == "01:02:05.500"
+    assert format_timecode(-1.0) == "00:00:00.000"
+
+
+def test_detect_cuts_respects_min_scene_length():
+    scores = np.zeros(100, dtype=np.float32)
+    scores[[5, 8, 30, 31, 70]] = 50.0
+    metrics = SceneMetrics(scores, fps=10.0)
+    assert metrics.detect_cuts(threshold=27.0, min_scene_len_frames=10).tolist() == [30, 70]
+    assert metrics.detect_cuts(threshold=27.0, min_scene_len_frames=1).tolist() == [5, 8, 30, 31, 70]
+
+
+def test_frames_without_score_never_become_cuts():
+    scores = np.full(50, np.nan)
+    scores[20] = 40.0
+    metrics = SceneMetrics(scores, fps=10.0)
+    assert metrics.detect_cuts(threshold=0.0, min_scene_len_frames=5).tolist() == [20]
+
+
+def test_detect_cuts_matches_content_detector():
+    scenedetect_detectors = pytest.importorskip("scenedetect.detectors")
+
+    class FixedScoreDetector(scenedetect_detectors.ContentDetector):
+        """ContentDetector, который берет оценку кадра из заданного ряда вместо расчета по изображению."""
+
+        def __init__(self, scores, **kwargs):
+            super().__init__(**kwargs)
+            self._fixed_scores = scores
+
+        def _calculate_frame_score(self, frame_num, frame_img):
+            return float(self._fixed_scores[frame_num])
+
+    rng = np.random.default_rng(7)
+    scores = rng.uniform(0.0, 20.0, 600)
+    # Одиночные склейки, серии близких склеек (вспышки) и склейка сразу после начала
+    scores[[3, 40, 44, 47, 90, 91, 92, 150, 300, 302, 340, 341, 342, 343, 500, 514, 515]] = 45.0
+    frame_img = np.zeros((2, 2, 3), dtype=np.uint8)
+    for threshold, min_scene_len in ((27.0, 1), (27.0, 5), (27.0, 15), (15.0, 10)):
+        detector = FixedScoreDetector(scores, threshold=threshold, min_scene_len=min_scene_len)
+        expected = [cut for frame_num in range(len(scores))
+                    for cut in detector.process_frame(frame_num, frame_img)]
+        actual = SceneMetrics(scores, fps=25.0).detect_cuts(threshold, min_scene_len).tolist()
+        assert actual == expected, (threshold, min_scene_len)
+
+
+def test_compute_scenes_and_highlights():
+    scores = np.zeros(100, dtype=np.float32)
+    scores[[30, 70]] = 50.0
+    metrics = SceneMetrics(scores, fps=10.0)
+    assert metrics.compute_scenes(threshold=27.0, min_scene_len_sec=1.0) == [[0, 30], [30, 70], [70, 100]]
+    highlights = metrics.build_highlights(27.0, 1.0, final_min_highlight_duration_sec=3.5)
+    assert [(hl['start_time'], hl['end_time']) for hl in highlights] == [(3.0, 7.0)]
+    assert highlights[0]['start_time_str'] == "00:00:03.000"
+    assert SceneMetrics(np.zeros(10), fps=10.0).compute_scenes(27.0, 0.1) == []
+
+
+class ConstantScorer:
+    """Источник оценки с постоянными значениями - проверяет усреднение и имена признаков."""
+
+    def __init__(self, name, score):
+        self.name = name
+        self.score = score
+
+    def score_ranges(self, starts_sec, ends_sec):
+        return {'score': np.full(len(starts_sec), self.score), 'level': np.asarray(ends_sec) - np.asarray(starts_sec)}
+
+
+def test_scorers_are_averaged_and_features_prefixed():
+    highlights = build_highlights([[0, 100], [100, 150]], fps=10.0, final_min_highlight_duration_sec=1.0,
+                                  scorers=[ConstantScorer("audio", 0.9), ConstantScorer("visual", 0.4)])
+    assert [hl['score'] for hl in highlights] == [0.65, 0.65]
+    assert highlights[0]['audio_level'] == pytest.approx(10.0)
+    assert highlights[1]['visual_level'] == pytest.approx(5.0)
+
+
+def test_scores_are_clipped():
+    highlights = build_highlights([[0, 10]], fps=10.0, final_min_highlight_duration_sec=0.0)
+    apply_scorers(highlights, [ConstantScorer("audio", 3.0)])
+    assert highlights[0]['score'] == 1.0
@@ -1,7 +1,25 @@
 import os
 import subprocess
+import tempfile
 from typing import List, Dict
-from PyQt6.QtCore import QStandardPaths
+
+# Qt не импортируется на уровне модуля: утилиты используются и в процессах без Qt
+# (параллельный анализ, консольный режим). Без PyQt6 папки берутся по соглашениям XDG.
+_FALLBACK_LOCATIONS = {
+    "MoviesLocation": os.path.join("~", "Videos"),
+    "DocumentsLocation": os.path.join("~", "Documents"),
+    "GenericCacheLocation": os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache"),
+    "GenericDataLocation": os.environ.get("XDG_DATA_HOME") or os.path.join("~", ".local", "share"),
+}
+
+
+def _standard_locations(location_name: str) -> list:
+    """Список путей QStandardPaths.StandardLocation.<location_name> или запасной путь, если PyQt6 недоступен."""
+    try:
+        from PyQt6.QtCore import QStandardPaths
+    except ImportError:
+        return [os.path.expanduser(_FALLBACK_LOCATIONS[location_name])]
+    return QStandardPaths.standardLocations(getattr(QStandardPaths.StandardLocation, location_name))
 
 def get_resource_path(relative_path: str) -> str:
     """Получает абсолютный путь к ресурсу в папке resources."""
@@ -13,32 +31,162 @@ def get_default_output_folder() -> str:
     Возвращает папку 'Видео/AutomatedContentCreator_Output' или 
     'Документы/AutomatedContentCreator_Output', если папка Видео не найдена.
     """
-    videos = QStandardPaths.standardLocations(QStandardPaths.StandardLocation.MoviesLocation)
+    videos = _standard_locations("MoviesLocation")
     if videos:
         default_folder = os.path.join(videos[0], "AutomatedContentCreator_Output")
     else:
-        docs = QStandardPaths.standardLocations(QStandardPaths.StandardLocation.DocumentsLocation)
+        docs = _standard_locations("DocumentsLocation")
         default_folder = os.path.join(docs[0], "AutomatedContentCreator_Output")
 
     os.makedirs(default_folder, exist_ok=True)
     return default_folder
 
-def extract_audio(video_path: str, audio_path: str):
+def get_cache_folder(subfolder: str = "") -> str:
+    """
+    Возвращает папку кеша приложения (например, '~/.cache/AutomatedContentCreator/<subfolder>').
+    Если системная папка кеша недоступна, используется временная папка.
+    """
+    cache_locations = _standard_locations("GenericCacheLocation")
+    base_folder = cache_locations[0] if cache_locations else tempfile.gettempdir()
+    cache_folder = os.path.join(base_folder, "AutomatedContentCreator", subfolder)
+    os.makedirs(cache_folder, exist_ok=True)
+    return cache_folder
+
+def get_app_data_folder(subfolder: str = "") -> str:
     """
-    Шаг 1. Извлечение аудиодорожки из видео.
-    Извлекает моно WAV с частотой 16000 Гц из видео-файла.
+    Возвращает папку постоянных данных приложения (состояние очереди и т.п.),
+    например '~/.local/share/AutomatedContentCreator/<subfolder>'. В отличие от кеша, ее не чистят.
     """
-    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
-    cmd = [
-        "ffmpeg",
-        "-y",                # перезаписать, если файл уже есть
-        "-i", video_path,    # входной файл
-        "-ac", "1",          # моно
-        "-ar", "16000",      # частота 16 кГц
-        "-vn",               # без видео
-        audio_path           # выходной WAV
+    data_locations = _standard_locations("GenericDataLocation")
+    base_folder = data_locations[0] if data_locations else os.path.expanduser("~")
+    data_folder = os.path.join(base_folder, "AutomatedContentCreator", subfolder)
+    os.makedirs(data_folder, exist_ok=True)
+    return data_folder
+
+AUDIO_SAMPLE_RATE = 16000  # Частота, которую ожидает Whisper
+
+def _build_audio_pipe_command(video_path: str, start_sec: float | None, duration_sec: float | None,
+                              sample_rate: int, ffmpeg_path: str) -> list:
+    cmd = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if start_sec:
+        cmd += ["-ss", f"{max(0.0, start_sec):.3f}"]  # быстрый поиск по входу
+    if duration_sec is not None:
+        cmd += ["-t", f"{duration_sec:.3f}"]
+    cmd += [
+        "-i", video_path,
+        "-vn", "-sn", "-dn",
+        "-ac", "1",               # моно
+        "-ar", str(sample_rate),  # частота дискретизации
+        "-f", "s16le",            # сырые 16-битные сэмплы без заголовка
+        "-acodec", "pcm_s16le",
+        "pipe:1"
     ]
-    subprocess.run(cmd, check=True)
+    return cmd
+
+def stream_audio_chunks(video_path: str, start_sec: float | None = None, duration_sec: float | None = None,
+                        sample_rate: int = AUDIO_SAMPLE_RATE, chunk_sec: float = 30.0, ffmpeg_path: str = "ffmpeg",
+                        max_queued_chunks: int = 8):
+    """
+    Генератор: декодирует аудио FFmpeg в моно s16le и отдает его кусками np.float32 в диапазоне [-1, 1]
+    через pipe, без временных файлов. Чтение stdout выполняет отдельный поток, складывающий куски
+    в ограниченную очередь (max_queued_chunks): если потребитель (Whisper, анализ аудио) не успевает,
+    FFmpeg приостанавливается, и в памяти никогда не лежит больше нескольких кусков.
+    При досрочном закрытии генератора процесс FFmpeg завершается.
+    """
+    import queue
+    import threading
+    from collections import deque
+    import numpy as np
+    from modules.ffmpeg_runner import STDERR_TAIL_LINES
+
+    chunk_bytes = max(2, int(chunk_sec * sample_rate) * 2)
+    chunk_queue = queue.Queue(maxsize=max(1, max_queued_chunks))
+    stop_event = threading.Event()
+    process = subprocess.Popen(_build_audio_pipe_command(video_path, start_sec, duration_sec, sample_rate,
+                                                         ffmpeg_path),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=chunk_bytes)
+
+    def put_until_stopped(item):
+        while not stop_event.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def reader():
+        try:
+            while not stop_event.is_set():
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                put_until_stopped(data)
+        finally:
+            put_until_stopped(None)
+
+    reader_thread = threading.Thread(target=reader, name="AudioPipeReader", daemon=True)
+    reader_thread.start()
+    # stderr читается отдельно, как в ffmpeg_runner.run_ffmpeg: при заполнении буфера pipe FFmpeg остановился бы
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(process.stderr),
+                                     name="AudioPipeStderr", daemon=True)
+    stderr_thread.start()
+    try:
+        while True:
+            data = chunk_queue.get()
+            if data is None:
+                break
+            usable_bytes = len(data) - len(data) % 2
+            yield np.frombuffer(data[:usable_bytes], dtype=np.int16).astype(np.float32) / 32768.0
+        return_code = process.wait()
+        if return_code != 0:
+            stderr_thread.join(timeout=5)
+            stderr_text = b"".join(stderr_tail).decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"FFmpeg завершился с кодом {return_code} при чтении аудио: {stderr_text}")
+    finally:
+        stop_event.set()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        reader_thread.join(timeout=1.0)
+        stderr_thread.join(timeout=1.0)
+        process.stdout.close()
+        process.stderr.close()
+
+def load_audio(video_path: str, start_sec: float | None = None, duration_sec: float | None = None,
+               sample_rate: int = AUDIO_SAMPLE_RATE, ffmpeg_path: str = "ffmpeg"):
+    """
+    Возвращает аудио (моно, sample_rate) одним массивом np.float32 - формат, который Whisper
+    принимает напрямую вместо пути к WAV. Если длительность известна, буфер выделяется заранее.
+    """
+    import numpy as np
+
+    if duration_sec is not None:
+        buffer = np.empty(int(round(duration_sec * sample_rate)) + sample_rate, dtype=np.float32)
+        filled = 0
+        for chunk in stream_audio_chunks(video_path, start_sec, duration_sec, sample_rate, ffmpeg_path=ffmpeg_path):
+            if filled + len(chunk) > len(buffer):
+                buffer = np.resize(buffer, filled + len(chunk))
+            buffer[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        return buffer[:filled]
+    chunks = list(stream_audio_chunks(video_path, start_sec, None, sample_rate, ffmpeg_path=ffmpeg_path))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+def rebase_segments(segments: List[Dict], offset_sec: float, clip_duration_sec: float) -> List[Dict]:
+    """
+    Переводит время сегментов из системы координат фрагмента аудио в систему координат клипа:
+    вычитает offset_sec (запас перед началом клипа), обрезает по [0, clip_duration_sec]
+    и отбрасывает сегменты, целиком попавшие в запас.
+    """
+    rebased = []
+    for seg in segments:
+        start = seg["start"] - offset_sec
+        end = seg["end"] - offset_sec
+        if end <= 0 or start >= clip_duration_sec:
+            continue
+        rebased.append({**seg, "start": max(0.0, start), "end": min(clip_duration_sec, end)})
+    return rebased
 
 def segments_to_srt(segments: List[Dict], srt_path: str):
     """
@@ -62,10 +210,7 @@ def segments_to_srt(segments: List[Dict], srt_path: str):
 
 if __name__ == "__main__":
     # Быстрая проверка
-    sample_video = "example.mp4"
-    sample_wav   = "example.wav"
     sample_srt   = "example.srt"
     print("Вывод папки по умолчанию:", get_default_output_folder())
-    # extract_audio(sample_video, sample_wav)
     # segments = [{"start":0.0,"end":1.2,"text":"Привет"}]
     # segments_to_srt(segments, sample_srt)